@@ -7,13 +7,22 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 import asyncio
-import aiohttp
 from typing import Optional, Dict, Tuple, Any, List
 from dotenv import load_dotenv
 # 導入語言工具
 from utils.language_utils import detect_language, get_response_in_language
 # 導入 Gemini API 連接池工具
 from utils.gemini_pool import generate_content, get_pool_stats
+# 導入共用 HTTP 連線池
+from utils.http_pool import HttpClientPool
+# 導入 TDX 存取權杖管理器
+from utils.tdx_auth import TDXTokenManager
+# 導入資料集持久化快取
+from utils.persistent_cache import PersistentCache
+# 導入條件式下載器
+from utils.conditional_fetch import ConditionalFetcher
+# 導入背景預取排程
+from utils.prefetch_scheduler import PrefetchScheduler
 
 # 設定日誌
 logging.basicConfig(
@@ -135,19 +144,22 @@ class CustomBot(commands.Bot):
         ]
         self.startup_channels = {}
         self._sync_in_progress = False
-        self.connector = None
+        # 所有 Cog 共用的 HTTP 連線池 (依上游主機保持長連線)
+        self.http_pool = HttpClientPool(ssl_context=ssl_context)
+        # 所有 TDX 相關指令共用的存取權杖 (背景自動續期)
+        self.tdx_token_manager = TDXTokenManager(http_pool=self.http_pool)
+        # 上游資料的磁碟快取 (data/dataset_cache.db)，重啟後各 Cog 由此預熱
+        self.persistent_cache = PersistentCache()
+        # CWA 檔案型 API / 水利署資料集的條件式下載 (304 或內容未變更時不重新解析)
+        self.conditional_fetcher = ConditionalFetcher(http_pool=self.http_pool, persistent=self.persistent_cache)
+        # 熱門資料集的背景預取 (各 Cog 載入時註冊)
+        self.prefetch_scheduler = PrefetchScheduler(max_concurrency=3)
         
     async def setup_hook(self):
         """在機器人啟動時執行的設置 - 終極修復版本"""
         try:
-            # 初始化 aiohttp 連接器
-            self.connector = aiohttp.TCPConnector(
-                ssl=ssl_context,
-                limit=10,
-                force_close=True,
-                enable_cleanup_closed=True
-            )
-            logger.info('成功初始化 aiohttp 連接器')
+            logger.info('已啟用共用 HTTP 連線池 (各 Cog 透過 bot.http_pool 存取)')
+            self.prefetch_scheduler.start()
             
             # 🔥 終極指令重複註冊修復方案
             logger.info('🔥 執行終極指令重複註冊修復...')
@@ -376,6 +388,19 @@ class CustomBot(commands.Bot):
             import traceback
             logger.error(f'錯誤詳情: {traceback.format_exc()}')
             
+    async def close(self):
+        """關閉機器人時一併關閉共用資源"""
+        # 先讓各 Cog 卸載，再關閉它們借用的連線池
+        await super().close()
+        try:
+            await self.prefetch_scheduler.close()
+            await self.tdx_token_manager.close()
+            await self.http_pool.close()
+            self.persistent_cache.close()
+            logger.info('已關閉共用 HTTP 連線池')
+        except Exception as e:
+            logger.error(f'關閉共用 HTTP 連線池時發生錯誤: {str(e)}')
+
     async def on_ready(self):
         """機器人準備就緒時執行"""
         # 顯示機器人資訊
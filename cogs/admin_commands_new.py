@@ -3,8 +3,17 @@ from discord import app_commands
 from discord.ext import commands
 import logging
 import os
+from typing import List
 from dotenv import load_dotenv
 
+from utils.cache_manager import get_all_cache_stats
+from utils.single_flight import get_all_single_flight_stats
+from utils.hedged_request import get_all_hedge_stats
+from utils.broadcast import get_all_broadcast_stats
+from utils.adaptive_poller import get_all_poller_stats
+from utils.metro_snapshot import get_all_snapshot_stats
+from utils.metro_direction import get_all_direction_stats
+
 # 載入環境變數
 load_dotenv()
 
@@ -32,6 +41,196 @@ class AdminCommands(commands.Cog):
         
         await interaction.response.send_message("✅ 開發者工具測試成功！這是一個簡化版的指令。", ephemeral=True)
 
+    @app_commands.command(name="upstream_status", description="查看上游 API 連線狀態（僅限開發者）")
+    async def upstream_status(self, interaction: discord.Interaction):
+        """顯示共用 HTTP 連線池的各主機統計與資料快取狀態"""
+        developer_id = os.getenv('BOT_DEVELOPER_ID')
+        if not developer_id or str(interaction.user.id) != developer_id:
+            await interaction.response.send_message("❌ 此指令僅限機器人開發者使用！", ephemeral=True)
+            return
+        
+        embed = discord.Embed(
+            title="🌐 上游 API 連線狀態",
+            color=discord.Color.blue(),
+            timestamp=discord.utils.utcnow()
+        )
+        
+        pool = getattr(self.bot, 'http_pool', None)
+        stats = pool.get_stats() if pool else {}
+        if not stats:
+            embed.description = "目前尚無任何上游請求紀錄"
+        circuit_labels = {'closed': '🟢 正常', 'half_open': '🟡 試探中', 'open': '🔴 開啟'}
+        for host, host_stats in list(stats.items())[:20]:
+            circuit = host_stats['circuit']
+            circuit_text = circuit_labels.get(circuit['state'], circuit['state'])
+            if circuit['state'] == 'open':
+                circuit_text += f" ({circuit['retry_in']:.0f} 秒後試探)"
+            embed.add_field(
+                name=host or "(未知主機)",
+                value=(
+                    f"請求: {host_stats['requests']} / 錯誤: {host_stats['errors']}\n"
+                    f"新連線: {host_stats['new_connections']} / 重用: {host_stats['reused_connections']}\n"
+                    f"平均耗時: {host_stats['avg_time'] * 1000:.0f} ms / 上限: {host_stats['limit']}\n"
+                    f"最後狀態碼: {host_stats['last_status']}\n"
+                    f"斷路器: {circuit_text} / 開啟 {circuit['opened']} 次 / 拒絕 {circuit['rejected']}"
+                ),
+                inline=True
+            )
+        
+        token_manager = getattr(self.bot, 'tdx_token_manager', None)
+        if token_manager:
+            token_stats = token_manager.get_stats()
+            embed.add_field(
+                name="🔑 TDX 存取權杖",
+                value=(
+                    f"狀態: {'有效' if token_stats['valid'] else '無效'} / 剩餘 {token_stats['expires_in'] / 60:.0f} 分鐘\n"
+                    f"申請 {token_stats['refreshes']} (失敗 {token_stats['refresh_errors']}) / "
+                    f"背景續期 {token_stats['background_renewals']} / 401 重試 {token_stats['unauthorized_retries']}"
+                ),
+                inline=False
+            )
+        
+        cache_lines = []
+        for name, cache_stats in get_all_cache_stats().items():
+            cache_lines.append(
+                f"`{name}` 命中 {cache_stats['hits']} / 舊資料 {cache_stats['stale_hits']} / "
+                f"未命中 {cache_stats['misses']} / 更新 {cache_stats['refreshes']} "
+                f"(失敗 {cache_stats['refresh_errors']}) / 項目 {cache_stats['size']}"
+            )
+        persistent_cache = getattr(self.bot, 'persistent_cache', None)
+        if persistent_cache:
+            disk_stats = persistent_cache.get_stats()
+            cache_lines.append(
+                f"`磁碟快取` 讀取 {disk_stats['loads']} / 寫入 {disk_stats['saves']} / 錯誤 {disk_stats['errors']}"
+            )
+        conditional_fetcher = getattr(self.bot, 'conditional_fetcher', None)
+        if conditional_fetcher:
+            conditional_stats = conditional_fetcher.get_stats()
+            cache_lines.append(
+                f"`條件式下載` 請求 {conditional_stats['requests']} / 304 {conditional_stats['not_modified']} / "
+                f"內容未變更 {conditional_stats['unchanged']} / 已更新 {conditional_stats['changed']} / "
+                f"錯誤 {conditional_stats['errors']}"
+            )
+        if cache_lines:
+            embed.add_field(name="🗃️ 資料快取", value="\n".join(cache_lines)[:1024], inline=False)
+        
+        flight_lines = []
+        for name, flight_stats in get_all_single_flight_stats().items():
+            if flight_stats['calls']:
+                flight_lines.append(
+                    f"`{name}` 呼叫 {flight_stats['calls']} / 實際請求 {flight_stats['executions']} / "
+                    f"合併 {flight_stats['coalesced']}"
+                )
+        if flight_lines:
+            embed.add_field(name="🔗 請求合併", value="\n".join(flight_lines)[:1024], inline=False)
+        
+        hedge_lines = []
+        for name, hedge_stats in get_all_hedge_stats().items():
+            if hedge_stats['calls']:
+                wins = ", ".join(f"{label} {count}" for label, count in hedge_stats['wins'].items()) or "無"
+                hedge_lines.append(
+                    f"`{name}` 呼叫 {hedge_stats['calls']} / 加派 {hedge_stats['hedges']} / "
+                    f"取消 {hedge_stats['cancelled']} / 全數失敗 {hedge_stats['failures']} / 勝出: {wins}"
+                )
+        if hedge_lines:
+            embed.add_field(name="🏁 對沖請求", value="\n".join(hedge_lines)[:1024], inline=False)
+        
+        broadcast_lines = []
+        for name, broadcast_stats in get_all_broadcast_stats().items():
+            if broadcast_stats['broadcasts']:
+                broadcast_lines.append(
+                    f"`{name}` 廣播 {broadcast_stats['broadcasts']} 次 / 送達 {broadcast_stats['sent']} / "
+                    f"失敗 {broadcast_stats['failed']} / 權限不足 {broadcast_stats['forbidden']}\n"
+                    f"最近一次 ({broadcast_stats['last_event']}) 延遲 p50 {broadcast_stats['last_p50']:.2f} 秒 / "
+                    f"p95 {broadcast_stats['last_p95']:.2f} 秒 / 最慢 {broadcast_stats['last_max']:.2f} 秒"
+                )
+        if broadcast_lines:
+            embed.add_field(name="📣 通知廣播", value="\n".join(broadcast_lines)[:1024], inline=False)
+
+        poller_lines = []
+        for name, poller_stats in get_all_poller_stats().items():
+            mode = "⚡ 快速" if poller_stats['mode'] == 'burst' else "🕰️ 平時"
+            line = (
+                f"`{name}` {mode} (每 {poller_stats['interval']:g} 秒) / 輪詢 {poller_stats['cycles']} 次 / "
+                f"平均 {poller_stats['avg_cycle_time']:.2f} 秒 / 快速模式 {poller_stats['bursts']} 次"
+            )
+            if poller_stats['detections']:
+                line += (
+                    f"\n發生→偵測 p50 {poller_stats['latency_p50']:.0f} 秒 / p95 {poller_stats['latency_p95']:.0f} 秒 / "
+                    f"最近一次 ({poller_stats['last_event']}) {poller_stats['last_latency']:.0f} 秒"
+                )
+            if poller_stats['sends']:
+                line += (
+                    f"\n發生→發送完成 p50 {poller_stats['send_latency_p50']:.0f} 秒 / p95 {poller_stats['send_latency_p95']:.0f} 秒 / "
+                    f"最近一次 ({poller_stats['last_sent_event']}) {poller_stats['last_send_latency']:.0f} 秒"
+                )
+            poller_lines.append(line)
+        if poller_lines:
+            embed.add_field(name="🛰️ 事件輪詢", value="\n".join(poller_lines)[:1024], inline=False)
+
+        snapshot_lines = []
+        for name, snapshot_stats in get_all_snapshot_stats().items():
+            versions = " ".join(
+                f"{system} v{system_stats['version']}" for system, system_stats in snapshot_stats['systems'].items()
+                if system_stats['version'] is not None
+            )
+            snapshot_lines.append(
+                f"`{name}` {'💤 閒置' if snapshot_stats['idle'] else '🔄 輪詢中'} (每 {snapshot_stats['interval']:g} 秒) / "
+                f"輪詢 {snapshot_stats['polls']} 次 / 發佈 {snapshot_stats['published']} / 未變更 {snapshot_stats['unchanged']} / "
+                f"失敗 {snapshot_stats['failures']} / 上次耗時 {snapshot_stats['last_poll_time']:.2f} 秒"
+                + (f"\n{versions}" if versions else "")
+            )
+        if snapshot_lines:
+            embed.add_field(name="🗂️ 看板快照", value="\n".join(snapshot_lines)[:1024], inline=False)
+
+        direction_lines = []
+        for name, direction_stats in get_all_direction_stats().items():
+            line = (
+                f"`{name}` {direction_stats['systems']} 個系統 / {direction_stats['entries']} 站 / "
+                f"已判斷 {direction_stats['resolved']} / 無法判斷 {direction_stats['unresolved']}"
+            )
+            if direction_stats['top_unresolved']:
+                line += "\n" + ", ".join(f"{key} ×{count}" for key, count in direction_stats['top_unresolved'])
+            direction_lines.append(line)
+        if direction_lines:
+            embed.add_field(name="🧭 方向判斷", value="\n".join(direction_lines)[:1024], inline=False)
+        
+        prefetch_scheduler = getattr(self.bot, 'prefetch_scheduler', None)
+        if prefetch_scheduler:
+            prefetch_lines = []
+            for name, job_stats in prefetch_scheduler.get_stats().items():
+                prefetch_lines.append(
+                    f"`{name}` {'💤 閒置' if job_stats['idle'] else '🔄 預取中'} / 更新 {job_stats['runs']} "
+                    f"(失敗 {job_stats['failures']}) / 略過 {job_stats['skipped_idle']} / "
+                    f"平均 {job_stats['avg_time'] * 1000:.0f} ms"
+                )
+            if prefetch_lines:
+                embed.add_field(name="⏱️ 背景預取", value="\n".join(prefetch_lines)[:1024], inline=False)
+        
+        # 主機與統計欄位可能超過 Discord 單則嵌入訊息的上限，拆成多則依序發送
+        embeds = self._split_embed(embed)
+        await interaction.response.send_message(embed=embeds[0], ephemeral=True)
+        for extra in embeds[1:]:
+            await interaction.followup.send(embed=extra, ephemeral=True)
+
+    @staticmethod
+    def _split_embed(embed: discord.Embed, max_fields: int = 25, max_length: int = 6000) -> List[discord.Embed]:
+        """將欄位過多或總字數過長的嵌入訊息拆成多則 (Discord 限制每則 25 個欄位、6000 字元)"""
+        embeds: List[discord.Embed] = []
+        current = None
+        for field in embed.fields:
+            if (current is None or len(current.fields) >= max_fields
+                    or len(current) + len(field.name) + len(field.value) > max_length):
+                current = discord.Embed(
+                    title=embed.title if not embeds else f"{embed.title} (續)",
+                    description=embed.description if not embeds else None,
+                    color=embed.color,
+                    timestamp=embed.timestamp
+                )
+                embeds.append(current)
+            current.add_field(name=field.name, value=field.value, inline=field.inline)
+        return embeds or [embed]
+
 async def setup(bot):
     try:
         logger.info("正在載入新的 AdminCommands cog...")
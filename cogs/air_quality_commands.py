@@ -17,8 +17,18 @@ from typing import Optional, List, Dict, Tuple
 import urllib.parse
 from datetime import datetime
 
+from utils.http_pool import get_http_pool
+from utils.cache_manager import TTLCache, mark_stale
+from utils.single_flight import coalesce
+from utils.prefetch_scheduler import get_prefetch_scheduler
+from utils.hedged_request import get_hedge_group
+from utils.county_resolver import resolve_county
+
 logger = logging.getLogger(__name__)
 
+# 空氣品質對沖請求：前一個端點送出後多少秒仍無結果，就加派下一個備援端點
+AIR_QUALITY_HEDGE_DELAY = 3.0
+
 class AirQualityCommands(commands.Cog):
     """空氣品質查詢相關指令"""
     
@@ -42,9 +52,8 @@ class AirQualityCommands(commands.Cog):
             logger.info("請在 .env 檔案中設定 AQI_API_KEY=您的環保署API密鑰")
             self.api_key = None  # 不設定預設值，強制使用環境變數
         
-        self.air_quality_cache = {}  # 快取空氣品質資料
-        self.cache_timestamp = 0
         self.cache_duration = 1800  # 快取 30 分鐘
+        self.air_quality_cache = TTLCache('air_quality', ttl=self.cache_duration, stale_ttl=1800, max_entries=1)  # 快取空氣品質資料
         
         # 設定 SSL 上下文 - 更寬鬆的設定
         self.ssl_context = ssl.create_default_context()
@@ -53,6 +62,10 @@ class AirQualityCommands(commands.Cog):
         # 加入更多 SSL 選項
         self.ssl_context.set_ciphers('DEFAULT@SECLEVEL=1')
         
+        # 讓共用連線池對空氣品質主機使用上述寬鬆的 SSL 設定
+        for api_url in [self.epa_api_base] + self.backup_apis:
+            self.http.configure_host(urllib.parse.urlsplit(api_url).hostname, ssl_context=self.ssl_context)
+        
         # DNS 設定
         self.dns_servers = ['8.8.8.8', '1.1.1.1', '168.95.1.1']
         
@@ -74,20 +87,39 @@ class AirQualityCommands(commands.Cog):
             {"min": 301, "max": 999, "level": "危害", "color": 0x800000, "emoji": "🟤", "description": "所有人都會受到嚴重健康影響"}
         ]
         
+    async def cog_load(self):
+        """向背景預取排程註冊空氣品質資料 (未設定 API 密鑰時略過)"""
+        if self.api_key:
+            self.prefetch.register('air_quality', self.air_quality_cache, 'aqx_p_432', self._request_air_quality_data)
+    
+    async def cog_unload(self):
+        """Cog 卸載時移除預取項目"""
+        self.prefetch.unregister('air_quality')
+    
+    @property
+    def prefetch(self):
+        """機器人共用的背景預取排程"""
+        return get_prefetch_scheduler(self.bot)
+    
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
+    
     async def fetch_air_quality_data(self) -> Dict:
-        """從環保署 API 獲取空氣品質資料，支援多端點備援"""
+        """從環保署 API 獲取空氣品質資料 (含快取)，支援多端點備援"""
+        # 檢查 API 密鑰是否設定
+        if not self.api_key:
+            logger.error("❌ AQI API 密鑰未設定，無法查詢空氣品質資料")
+            return {}
+        
+        data = await self.air_quality_cache.get_or_fetch('aqx_p_432', self._request_air_quality_data)
+        return data or {}
+    
+    @coalesce('air_quality')
+    async def _request_air_quality_data(self) -> Dict:
+        """依序嘗試主要與備援端點取得空氣品質資料"""
         try:
-            # 檢查 API 密鑰是否設定
-            if not self.api_key:
-                logger.error("❌ AQI API 密鑰未設定，無法查詢空氣品質資料")
-                return {}
-            
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (self.air_quality_cache and 
-                current_time - self.cache_timestamp < self.cache_duration):
-                return self.air_quality_cache
-            
             # 構建 API 參數
             params = {
                 "api_key": self.api_key,
@@ -99,55 +131,39 @@ class AirQualityCommands(commands.Cog):
             # 嘗試的 API 端點列表
             api_endpoints = [self.epa_api_base] + self.backup_apis
             
-            for i, api_url in enumerate(api_endpoints):
-                try:
-                    logger.info(f"正在嘗試第 {i+1} 個 API 端點: {api_url}")
-                    
-                    # 設定連接器 - 每次嘗試都使用新的設定
-                    connector = aiohttp.TCPConnector(
-                        ssl=self.ssl_context,
-                        limit=10,
-                        force_close=True,
-                        enable_cleanup_closed=True,
-                        use_dns_cache=False,  # 禁用 DNS 快取
-                        family=0,  # 允許 IPv4 和 IPv6
-                        local_addr=None
-                    )
-                    
-                    timeout = aiohttp.ClientTimeout(
-                        total=30,
-                        connect=10,
-                        sock_read=10
-                    )
-                    
-                    async with aiohttp.ClientSession(
-                        connector=connector, 
-                        timeout=timeout,
-                        headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-                    ) as session:
-                        async with session.get(api_url, params=params) as response:
+            timeout = aiohttp.ClientTimeout(
+                total=30,
+                connect=10,
+                sock_read=10
+            )
+            
+            def make_attempt(i, api_url):
+                async def run():
+                    try:
+                        logger.info(f"正在嘗試第 {i+1} 個 API 端點: {api_url}")
+                        async with self.http.get(api_url, params=params, timeout=timeout) as response:
                             if response.status == 200:
                                 data = await response.json()
-                                
-                                # 更新快取
-                                self.air_quality_cache = data
-                                self.cache_timestamp = current_time
-                                
                                 logger.info(f"✓ 成功從第 {i+1} 個端點獲取空氣品質資料，共 {len(data.get('records', []))} 筆記錄")
                                 return data
                             else:
                                 logger.warning(f"✗ 第 {i+1} 個端點回應異常: HTTP {response.status}")
-                                
-                except asyncio.TimeoutError:
-                    logger.warning(f"✗ 第 {i+1} 個端點請求超時")
-                except aiohttp.ClientConnectorError as e:
-                    logger.warning(f"✗ 第 {i+1} 個端點連線錯誤: {e}")
-                except Exception as e:
-                    logger.warning(f"✗ 第 {i+1} 個端點發生錯誤: {e}")
-                
-                # 等待一下再嘗試下一個端點
-                if i < len(api_endpoints) - 1:
-                    await asyncio.sleep(1)
+                    except asyncio.TimeoutError:
+                        logger.warning(f"✗ 第 {i+1} 個端點請求超時")
+                    except aiohttp.ClientConnectorError as e:
+                        logger.warning(f"✗ 第 {i+1} 個端點連線錯誤: {e}")
+                    return None
+                return run
+            
+            # 對沖請求：主要端點送出後若數秒內沒有結果 (或已失敗) 就加派備援端點，
+            # 採用第一個含有 records 的回應，其餘請求隨即取消
+            data = await get_hedge_group('air_quality', AIR_QUALITY_HEDGE_DELAY).run(
+                [make_attempt(i, api_url) for i, api_url in enumerate(api_endpoints)],
+                validate=lambda data: isinstance(data, dict) and bool(data.get('records')),
+                labels=[urllib.parse.urlsplit(api_url).hostname for api_url in api_endpoints]
+            )
+            if data:
+                return data
             
             # 所有端點都失敗
             logger.error("✗ 所有空氣品質 API 端點都無法連線")
@@ -180,15 +196,11 @@ class AirQualityCommands(commands.Cog):
     
     def search_sites_by_county(self, records: List[Dict], county: str) -> List[Dict]:
         """根據縣市搜尋測站"""
-        results = []
-        county = county.replace('台', '臺')  # 處理台/臺差異
-        
-        for record in records:
-            record_county = record.get('county', '')
-            if county in record_county or record_county in county:
-                results.append(record)
-        
-        return results
+        target_county = resolve_county(county)
+        if not target_county:
+            return []
+        # 縣市名稱解析結果有快取，每筆測站只需一次字典查詢
+        return [record for record in records if resolve_county(record.get('county', '')) == target_county]
     
     def create_site_embed(self, site_data: Dict) -> discord.Embed:
         """建立測站詳細資訊 Embed"""
@@ -373,7 +385,7 @@ class AirQualityCommands(commands.Cog):
                 return
             
             # 建立回應
-            embed = self.create_list_embed(results, page, total_pages, f"查詢: {query}")
+            embed = mark_stale(self.create_list_embed(results, page, total_pages, f"查詢: {query}"), self.air_quality_cache, 'aqx_p_432')
             
             # 建立按鈕視圖
             view = AirQualityView(self, results, page, total_pages, query)
@@ -441,7 +453,7 @@ class AirQualityCommands(commands.Cog):
                 return
             
             # 建立回應
-            embed = self.create_list_embed(results, page, total_pages, f"縣市: {county}")
+            embed = mark_stale(self.create_list_embed(results, page, total_pages, f"縣市: {county}"), self.air_quality_cache, 'aqx_p_432')
             
             # 建立按鈕視圖
             view = AirQualityView(self, results, page, total_pages, county)
@@ -482,7 +494,7 @@ class AirQualityCommands(commands.Cog):
                 return
             
             # 建立詳細資訊 Embed
-            embed = self.create_site_embed(found_site)
+            embed = mark_stale(self.create_site_embed(found_site), self.air_quality_cache, 'aqx_p_432')
             
             await interaction.followup.send(embed=embed)
             
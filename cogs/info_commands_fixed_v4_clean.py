@@ -6,309 +6,54 @@ import aiohttp
 import xmltodict
 import logging
 import asyncio
-import ssl
-from typing import Optional, Dict, Any, List
+import time
+import copy
+from typing import Optional, Dict, Any, List, Tuple, Iterable, Callable, Awaitable
 import urllib3
 from discord.ui import Select, View, Button
 import os
 from dotenv import load_dotenv
 
+from utils.http_pool import get_http_pool
+from utils.circuit_breaker import CircuitOpenError
+from utils.tdx_auth import get_tdx_token_manager
+from utils.cache_manager import TTLCache, mark_stale
+from utils.persistent_cache import get_persistent_cache
+from utils.single_flight import coalesce, make_key
+from utils.prefetch_scheduler import get_prefetch_scheduler
+from utils.hedged_request import get_hedge_group
+from utils.broadcast import BroadcastEngine
+from utils.adaptive_poller import AdaptivePoller
+from utils.metro_snapshot import MetroSnapshot, MetroSnapshotService
+from utils.metro_direction import DIRECTION_DOWN, MetroDirectionTable
+from utils.metro_reference import FACILITY, NETWORK, STATION_OF_LINE, MetroReferenceStore
+from utils.metro_station_index import MetroStationIndex
+from utils.earthquake_history import EarthquakeHistory, summarize_earthquake
+from utils.subscription_store import SubscriptionStore
+from utils.tra_station_index import TRAStationIndex, load_english_names
+from utils.tra_station_data import get_tra_station_dataset
+from utils.county_resolver import COUNTIES, resolve_county
+from utils.earthquake_intensity import INTENSITY_LEVELS, county_max_intensity, intensity_name
+
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 # 台灣縣市列表
-TW_LOCATIONS = [
-    "基隆市", "臺北市", "新北市", "桃園市", "新竹市", "新竹縣", "苗栗縣",
-    "臺中市", "彰化縣", "南投縣", "雲林縣", "嘉義市", "嘉義縣", "臺南市",
-    "高雄市", "屏東縣", "宜蘭縣", "花蓮縣", "臺東縣", "澎湖縣", "金門縣", "連江縣"
-]
-
-# 台鐵車站資料按縣市分類
-TRA_STATIONS = {
-    "基隆市": [
-        {"name": "基隆", "id": "0900"},
-        {"name": "三坑", "id": "0910"},
-        {"name": "八堵", "id": "0920"},
-        {"name": "七堵", "id": "0930"},
-        {"name": "百福", "id": "0940"},
-        {"name": "海科館", "id": "7361"},
-        {"name": "暖暖", "id": "7390"},
-    ],
-    "臺北市": [
-        {"name": "南港", "id": "0980"},
-        {"name": "松山", "id": "0990"},
-        {"name": "臺北", "id": "1000"},
-        {"name": "臺北-環島", "id": "1001"},
-        {"name": "萬華", "id": "1010"},
-    ],
-    "新北市": [
-        {"name": "五堵", "id": "0950"},
-        {"name": "汐止", "id": "0960"},
-        {"name": "汐科", "id": "0970"},
-        {"name": "板橋", "id": "1020"},
-        {"name": "浮洲", "id": "1030"},
-        {"name": "樹林", "id": "1040"},
-        {"name": "南樹林", "id": "1050"},
-        {"name": "山佳", "id": "1060"},
-        {"name": "鶯歌", "id": "1070"},
-        {"name": "鳳鳴", "id": "1075"},
-        {"name": "福隆", "id": "7290"},
-        {"name": "貢寮", "id": "7300"},
-        {"name": "雙溪", "id": "7310"},
-        {"name": "牡丹", "id": "7320"},
-        {"name": "三貂嶺", "id": "7330"},
-        {"name": "大華", "id": "7331"},
-        {"name": "十分", "id": "7332"},
-        {"name": "望古", "id": "7333"},
-        {"name": "嶺腳", "id": "7334"},
-        {"name": "平溪", "id": "7335"},
-        {"name": "菁桐", "id": "7336"},
-        {"name": "猴硐", "id": "7350"},
-        {"name": "瑞芳", "id": "7360"},
-        {"name": "八斗子", "id": "7362"},
-        {"name": "四腳亭", "id": "7380"},
-    ],
-    "桃園市": [
-        {"name": "桃園", "id": "1080"},
-        {"name": "內壢", "id": "1090"},
-        {"name": "中壢", "id": "1100"},
-        {"name": "埔心", "id": "1110"},
-        {"name": "楊梅", "id": "1120"},
-        {"name": "富岡", "id": "1130"},
-        {"name": "新富", "id": "1140"},
-    ],
-    "新竹市": [
-        {"name": "北新竹", "id": "1190"},
-        {"name": "千甲", "id": "1191"},
-        {"name": "新莊", "id": "1192"},
-        {"name": "新竹", "id": "1210"},
-        {"name": "三姓橋", "id": "1220"},
-        {"name": "香山", "id": "1230"},
-    ],
-    "新竹縣": [
-        {"name": "北湖", "id": "1150"},
-        {"name": "湖口", "id": "1160"},
-        {"name": "新豐", "id": "1170"},
-        {"name": "竹北", "id": "1180"},
-        {"name": "竹中", "id": "1193"},
-        {"name": "六家", "id": "1194"},
-        {"name": "上員", "id": "1201"},
-        {"name": "榮華", "id": "1202"},
-        {"name": "竹東", "id": "1203"},
-        {"name": "橫山", "id": "1204"},
-        {"name": "九讚頭", "id": "1205"},
-        {"name": "合興", "id": "1206"},
-        {"name": "富貴", "id": "1207"},
-        {"name": "內灣", "id": "1208"},
-    ],
-    "苗栗縣": [
-        {"name": "崎頂", "id": "1240"},
-        {"name": "竹南", "id": "1250"},
-        {"name": "談文", "id": "2110"},
-        {"name": "大山", "id": "2120"},
-        {"name": "後龍", "id": "2130"},
-        {"name": "龍港", "id": "2140"},
-        {"name": "白沙屯", "id": "2150"},
-        {"name": "新埔", "id": "2160"},
-        {"name": "通霄", "id": "2170"},
-        {"name": "苑裡", "id": "2180"},
-        {"name": "造橋", "id": "3140"},
-        {"name": "豐富", "id": "3150"},
-        {"name": "苗栗", "id": "3160"},
-        {"name": "南勢", "id": "3170"},
-        {"name": "銅鑼", "id": "3180"},
-        {"name": "三義", "id": "3190"},
-    ],
-    "臺中市": [
-        {"name": "日南", "id": "2190"},
-        {"name": "大甲", "id": "2200"},
-        {"name": "臺中港", "id": "2210"},
-        {"name": "清水", "id": "2220"},
-        {"name": "沙鹿", "id": "2230"},
-        {"name": "龍井", "id": "2240"},
-        {"name": "大肚", "id": "2250"},
-        {"name": "追分", "id": "2260"},
-        {"name": "泰安", "id": "3210"},
-        {"name": "后里", "id": "3220"},
-        {"name": "豐原", "id": "3230"},
-        {"name": "栗林", "id": "3240"},
-        {"name": "潭子", "id": "3250"},
-        {"name": "頭家厝", "id": "3260"},
-        {"name": "松竹", "id": "3270"},
-        {"name": "太原", "id": "3280"},
-        {"name": "精武", "id": "3290"},
-        {"name": "臺中", "id": "3300"},
-        {"name": "五權", "id": "3310"},
-        {"name": "大慶", "id": "3320"},
-        {"name": "烏日", "id": "3330"},
-        {"name": "新烏日", "id": "3340"},
-        {"name": "成功", "id": "3350"},
-    ],
-    "彰化縣": [
-        {"name": "彰化", "id": "3360"},
-        {"name": "花壇", "id": "3370"},
-        {"name": "大村", "id": "3380"},
-        {"name": "員林", "id": "3390"},
-        {"name": "永靖", "id": "3400"},
-        {"name": "社頭", "id": "3410"},
-        {"name": "田中", "id": "3420"},
-        {"name": "二水", "id": "3430"},
-        {"name": "源泉", "id": "3431"},
-    ],
-    "南投縣": [
-        {"name": "濁水", "id": "3432"},
-        {"name": "龍泉", "id": "3433"},
-        {"name": "集集", "id": "3434"},
-        {"name": "水里", "id": "3435"},
-        {"name": "車埕", "id": "3436"},
-    ],
-    "雲林縣": [
-        {"name": "林內", "id": "3450"},
-        {"name": "石榴", "id": "3460"},
-        {"name": "斗六", "id": "3470"},
-        {"name": "斗南", "id": "3480"},
-        {"name": "石龜", "id": "3490"},
-    ],
-    "嘉義市": [
-        {"name": "嘉北", "id": "4070"},
-        {"name": "嘉義", "id": "4080"},
-    ],
-    "嘉義縣": [
-        {"name": "大林", "id": "4050"},
-        {"name": "民雄", "id": "4060"},
-        {"name": "水上", "id": "4090"},
-        {"name": "南靖", "id": "4100"},
-    ],
-    "臺南市": [
-        {"name": "後壁", "id": "4110"},
-        {"name": "新營", "id": "4120"},
-        {"name": "柳營", "id": "4130"},
-        {"name": "林鳳營", "id": "4140"},
-        {"name": "隆田", "id": "4150"},
-        {"name": "拔林", "id": "4160"},
-        {"name": "善化", "id": "4170"},
-        {"name": "南科", "id": "4180"},
-        {"name": "新市", "id": "4190"},
-        {"name": "永康", "id": "4200"},
-        {"name": "大橋", "id": "4210"},
-        {"name": "臺南", "id": "4220"},
-        {"name": "保安", "id": "4250"},
-        {"name": "仁德", "id": "4260"},
-        {"name": "中洲", "id": "4270"},
-        {"name": "長榮大學", "id": "4271"},
-        {"name": "沙崙", "id": "4272"},
-    ],
-    "高雄市": [
-        {"name": "大湖", "id": "4290"},
-        {"name": "路竹", "id": "4300"},
-        {"name": "岡山", "id": "4310"},
-        {"name": "橋頭", "id": "4320"},
-        {"name": "楠梓", "id": "4330"},
-        {"name": "新左營", "id": "4340"},
-        {"name": "左營", "id": "4350"},
-        {"name": "內惟", "id": "4360"},
-        {"name": "美術館", "id": "4370"},
-        {"name": "鼓山", "id": "4380"},
-        {"name": "三塊厝", "id": "4390"},
-        {"name": "高雄", "id": "4400"},
-        {"name": "民族", "id": "4410"},
-        {"name": "科工館", "id": "4420"},
-        {"name": "正義", "id": "4430"},
-        {"name": "鳳山", "id": "4440"},
-        {"name": "後庄", "id": "4450"},
-        {"name": "九曲堂", "id": "4460"},
-    ],
-    "屏東縣": [
-        {"name": "六塊厝", "id": "4470"},
-        {"name": "屏東", "id": "5000"},
-        {"name": "歸來", "id": "5010"},
-        {"name": "麟洛", "id": "5020"},
-        {"name": "西勢", "id": "5030"},
-        {"name": "竹田", "id": "5040"},
-        {"name": "潮州", "id": "5050"},
-        {"name": "崁頂", "id": "5060"},
-        {"name": "南州", "id": "5070"},
-        {"name": "鎮安", "id": "5080"},
-        {"name": "林邊", "id": "5090"},
-        {"name": "佳冬", "id": "5100"},
-        {"name": "東海", "id": "5110"},
-        {"name": "枋寮", "id": "5120"},
-        {"name": "加祿", "id": "5130"},
-        {"name": "內獅", "id": "5140"},
-        {"name": "枋山", "id": "5160"},
-        {"name": "枋野", "id": "5170"},
-        {"name": "南方小站", "id": "5998"},
-        {"name": "潮州基地", "id": "5999"},
-    ],
-    "臺東縣": [
-        {"name": "大武", "id": "5190"},
-        {"name": "瀧溪", "id": "5200"},
-        {"name": "金崙", "id": "5210"},
-        {"name": "太麻里", "id": "5220"},
-        {"name": "知本", "id": "5230"},
-        {"name": "康樂", "id": "5240"},
-        {"name": "臺東", "id": "6000"},
-        {"name": "山里", "id": "6010"},
-        {"name": "鹿野", "id": "6020"},
-        {"name": "瑞源", "id": "6030"},
-        {"name": "瑞和", "id": "6040"},
-        {"name": "關山", "id": "6050"},
-        {"name": "海端", "id": "6060"},
-        {"name": "池上", "id": "6070"},
-    ],
-    "花蓮縣": [
-        {"name": "富里", "id": "6080"},
-        {"name": "東竹", "id": "6090"},
-        {"name": "東里", "id": "6100"},
-        {"name": "玉里", "id": "6110"},
-        {"name": "三民", "id": "6120"},
-        {"name": "瑞穗", "id": "6130"},
-        {"name": "富源", "id": "6140"},
-        {"name": "大富", "id": "6150"},
-        {"name": "光復", "id": "6160"},
-        {"name": "萬榮", "id": "6170"},
-        {"name": "鳳林", "id": "6180"},
-        {"name": "南平", "id": "6190"},
-        {"name": "林榮新光", "id": "6200"},
-        {"name": "豐田", "id": "6210"},
-        {"name": "壽豐", "id": "6220"},
-        {"name": "平和", "id": "6230"},
-        {"name": "志學", "id": "6240"},
-        {"name": "吉安", "id": "6250"},
-        {"name": "花蓮", "id": "7000"},
-        {"name": "北埔", "id": "7010"},
-        {"name": "景美", "id": "7020"},
-        {"name": "新城", "id": "7030"},
-        {"name": "崇德", "id": "7040"},
-        {"name": "和仁", "id": "7050"},
-        {"name": "和平", "id": "7060"},
-    ],
-    "宜蘭縣": [
-        {"name": "漢本", "id": "7070"},
-        {"name": "武塔", "id": "7080"},
-        {"name": "南澳", "id": "7090"},
-        {"name": "東澳", "id": "7100"},
-        {"name": "永樂", "id": "7110"},
-        {"name": "蘇澳", "id": "7120"},
-        {"name": "蘇澳新", "id": "7130"},
-        {"name": "新馬", "id": "7140"},
-        {"name": "冬山", "id": "7150"},
-        {"name": "羅東", "id": "7160"},
-        {"name": "中里", "id": "7170"},
-        {"name": "二結", "id": "7180"},
-        {"name": "宜蘭", "id": "7190"},
-        {"name": "四城", "id": "7200"},
-        {"name": "礁溪", "id": "7210"},
-        {"name": "頂埔", "id": "7220"},
-        {"name": "頭城", "id": "7230"},
-        {"name": "外澳", "id": "7240"},
-        {"name": "龜山", "id": "7250"},
-        {"name": "大溪", "id": "7260"},
-        {"name": "大里", "id": "7270"},
-        {"name": "石城", "id": "7280"},
-    ]
-}
+TW_LOCATIONS = list(COUNTIES)
+
+# 台鐵車站資料按縣市分類：內建資料改由預先編譯的 data/tra_stations.bin 提供 (第一次使用時才載入)
+def get_builtin_tra_stations() -> Dict[str, List[Dict[str, str]]]:
+    """內建 (離線) 台鐵車站資料，縣市 → [{'name': 站名, 'id': 車站代碼}]"""
+    dataset = get_tra_station_dataset()
+    return dataset.stations_by_county() if dataset else {}
+
+
+def __getattr__(name: str):
+    # 舊腳本仍以 TRA_STATIONS 匯入內建車站資料，延遲到實際使用時才載入資料檔
+    if name == 'TRA_STATIONS':
+        return get_builtin_tra_stations()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 氣象顏色代碼
 WEATHER_COLOR_MAP = {
@@ -322,16 +67,49 @@ WEATHER_COLOR_MAP = {
     'default': discord.Color.light_grey()
 }
 
+# 台鐵全線即時電子看板、誤點快照的更新間隔 (秒)
+TRA_LIVEBOARD_TTL = 60
+
+# 地震監控輪詢間隔 (秒)：平時 / 新報告後的快速輪詢 / 快速輪詢維持時間
+EARTHQUAKE_POLL_QUIET_INTERVAL = 60
+EARTHQUAKE_POLL_BURST_INTERVAL = 15
+EARTHQUAKE_POLL_BURST_WINDOW = 1800
+
+# 有新地震報告時，為歷史紀錄補抓最近幾筆報告 (涵蓋兩次輪詢之間或機器人離線期間發布的報告)
+EARTHQUAKE_HISTORY_BACKFILL = 20
+
+# 地震報告的 OriginTime 為臺灣時間
+TAIWAN_TZ = datetime.timezone(datetime.timedelta(hours=8))
+
+# 備用地震資料 (API 全部失敗時) 使用的編號，不會觸發通知
+BACKUP_EARTHQUAKE_NO = 999999
+
+# 地震資料對沖請求：有認證模式送出後多少秒仍無結果，就同時送出無認證模式
+EARTHQUAKE_HEDGE_DELAY = 1.5
+
+# TDX 提供即時電子看板的捷運系統 (由快照服務同時輪詢)
+METRO_LIVEBOARD_SYSTEMS = ['TRTC', 'KRTC', 'TYMC', 'TMRT', 'KLRT', 'NTDLRT', 'TRTCMG', 'NTMC', 'NTALRT']
+# 捷運系統顯示名稱
+METRO_SYSTEM_NAMES = {
+    'TRTC': '臺北捷運', 'KRTC': '高雄捷運', 'TYMC': '桃園捷運', 'TMRT': '臺中捷運', 'KLRT': '高雄輕軌',
+    'NTDLRT': '淡海輕軌', 'TRTCMG': '貓空纜車', 'NTMC': '新北捷運', 'NTALRT': '安坑輕軌'
+}
+# 捷運看板快照的輪詢間隔 (秒)
+METRO_LIVEBOARD_INTERVAL = 30
+# /metro_facility 與 /metro_network 提供的捷運系統 (參考資料每日預取)
+METRO_FACILITY_SYSTEMS = ['TRTC', 'TYMC', 'NTMC', 'TMRT']
+METRO_NETWORK_SYSTEMS = ['TRTC', 'KRTC', 'TYMC', 'TMRT', 'TRTCMG', 'NTMC']
+
 class InfoCommands(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.earthquake_cache = {}
-        self.tsunami_cache = {}  # 新增海嘯資料快取
+        # 地震資料快取 (一般/小區域分開計算過期時間)
+        self.earthquake_cache = TTLCache('earthquake', ttl=300, stale_ttl=600, max_entries=4)
+        # 海嘯資料快取 (監控迴圈與 /tsunami 共用)
+        self.tsunami_cache = TTLCache('tsunami', ttl=300, stale_ttl=600, max_entries=1)
         self.weather_alert_cache = {}
         self.reservoir_cache = {}
         self.water_info_cache = {}  # 新增水情資料快取
-        self.cache_time = 0
-        self.tsunami_cache_time = 0  # 新增海嘯資料快取時間
         self.weather_alert_cache_time = 0
         self.reservoir_cache_time = 0
         self.water_info_cache_time = 0  # 新增水情資料快取時間
@@ -352,20 +130,77 @@ class InfoCommands(commands.Cog):
             logger.error("❌ 錯誤: 找不到 TDX API 憑證")
             logger.info("請在 .env 檔案中設定 TDX_CLIENT_ID 和 TDX_CLIENT_SECRET")
         
-        # TDX 存取權杖快取
-        self.tdx_access_token = None
-        self.tdx_token_expires_at = 0
-        
         # 台鐵車站資料快取
-        self.tra_stations_cache = None
-        self.tra_stations_cache_time = 0
         self.tra_stations_cache_duration = 86400  # 24小時更新一次
+        # 台鐵車站索引 (車站資料更新時重建，供自動完成與車站代碼查詢)
+        self.tra_station_index = TRAStationIndex()
+        self._tra_index_source = None
+        self._tra_english_names: Optional[Dict[str, str]] = None
+        
+        # 變動不頻繁的參考資料 (台鐵車站、測站基本資料、捷運設施/路網)，同步寫入 data/ 供重啟後立即使用
+        self.reference_cache = TTLCache(
+            'reference_data', ttl=86400, stale_ttl=7 * 86400, max_entries=64,
+            persistent=get_persistent_cache(bot)
+        )
+        
+        # 台鐵全線即時電子看板快照 (依 StationID 建立索引，各車站的查詢與重新整理都從記憶體回應)
+        self.tra_liveboard_cache = TTLCache('tra_liveboard', ttl=TRA_LIVEBOARD_TTL, stale_ttl=TRA_LIVEBOARD_TTL, max_entries=1)
         
-        self.notification_channels = {}
-        self.last_eq_time = {}
-        self.check_interval = 300  # 每5分鐘檢查一次
-          # 建立 aiohttp 工作階段
-        self.session = None
+        # 台鐵全線誤點快照 (依車站與縣市建立索引，已依誤點時間排序)
+        self.tra_delay_cache = TTLCache('tra_delay', ttl=TRA_LIVEBOARD_TTL, stale_ttl=TRA_LIVEBOARD_TTL, max_entries=1)
+        
+        # 捷運即時電子看板快照 (背景同時輪詢所有系統，最近 10 分鐘內無人查詢時暫停)
+        self.metro_snapshots = MetroSnapshotService(
+            'metro_liveboard', METRO_LIVEBOARD_SYSTEMS, self._request_metro_liveboard,
+            interval=METRO_LIVEBOARD_INTERVAL, idle_after=600
+        )
+        # 捷運靜態參考資料 (設施、路網、路線車站序列)：原始資料存於參考資料快取並每日更新，
+        # 資料變動時才重建各系統的索引
+        self.metro_reference = MetroReferenceStore(self.reference_cache, {
+            FACILITY: self._request_metro_facility,
+            NETWORK: self._request_metro_network,
+            STATION_OF_LINE: self._request_metro_station_of_line,
+        })
+        self._metro_reference_jobs: List[str] = []
+        # 跨系統捷運車站索引 (由各系統的路線車站序列建立，參考資料更新時重建)
+        self.metro_station_index = MetroStationIndex()
+        self._metro_station_index_versions: Optional[Tuple[int, ...]] = None
+        # 捷運列車方向對照表 (由參考資料索引中的 StationOfLine 編譯)
+        self.metro_directions = MetroDirectionTable()
+        # 已建好的捷運看板嵌入訊息 (以系統、快照版本與視圖狀態為鍵，切換路線/方向時不必重新計算)
+        self.metro_render_cache = TTLCache('metro_render', ttl=600, max_entries=512)
+        
+        # 地震通知訂閱與全域「最後已通知地震編號」(data/subscriptions.db，cog_load 時載入)
+        self.subscriptions = SubscriptionStore()
+        # 地震歷史紀錄 (data/earthquake_history.db，供 /earthquake_history 查詢)
+        self.earthquake_history = EarthquakeHistory()
+        # 地震/海嘯通知廣播 (並行發送、全域速率限制、記錄各伺服器送達延遲)
+        self.earthquake_broadcaster = BroadcastEngine('earthquake', max_concurrency=10, rate=25)
+        # 地震監控輪詢：平時每分鐘，有新報告後 30 分鐘內每 15 秒 (捕捉修正報告與餘震)
+        self.earthquake_poller = AdaptivePoller(
+            'earthquake', quiet_interval=EARTHQUAKE_POLL_QUIET_INTERVAL,
+            burst_interval=EARTHQUAKE_POLL_BURST_INTERVAL, burst_window=EARTHQUAKE_POLL_BURST_WINDOW
+        )
+        
+        # cog_load 建立的背景工作 (保留參照，避免未完成就被回收，並在卸載時取消)
+        self.eq_check_task: Optional[asyncio.Task] = None
+        self.tdx_start_task: Optional[asyncio.Task] = None
+        self.warm_reference_task: Optional[asyncio.Task] = None
+
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
+
+    @property
+    def prefetch(self):
+        """機器人共用的背景預取排程"""
+        return get_prefetch_scheduler(self.bot)
+
+    @property
+    def tdx(self):
+        """機器人共用的 TDX 權杖管理器 (發送 TDX 請求時自動帶入權杖並處理 401)"""
+        return get_tdx_token_manager(self.bot)
 
     async def _check_admin(self, interaction: discord.Interaction) -> bool:
         """檢查使用者是否為機器人開發者"""
@@ -376,122 +211,294 @@ class InfoCommands(commands.Cog):
         await interaction.response.send_message("❌ 此指令僅限機器人開發者使用！", ephemeral=True)
         logger.warning(f"用戶 {interaction.user.name} ({interaction.user.id}) 嘗試使用管理員指令")
         return False
-        self.eq_check_task = None
         
     async def cog_load(self):
         """Cog 載入時的初始化"""
         await self.init_aiohttp_session()
-        # 開始地震監控
+        # 預先取得 TDX 存取權杖，之後由權杖管理器在背景續期
+        self.tdx_start_task = self._create_background_task(self.tdx.start(), "預先取得 TDX 存取權杖")
+        # 從磁碟載回上次的參考資料，並在背景重新驗證
+        self.warm_reference_task = self._create_background_task(self.warm_reference_data(), "預熱參考資料")
+        # 載入通知訂閱後再開始地震監控
+        await self.subscriptions.load()
         self.eq_check_task = asyncio.create_task(self.check_earthquake_updates())
+        self._register_prefetch_jobs()
+        self.metro_snapshots.start()
+
+    @staticmethod
+    def _create_background_task(coro, description: str) -> asyncio.Task:
+        """建立背景工作，結束時若發生例外則記錄 (呼叫端需保留回傳的工作)"""
+        def report(task: asyncio.Task):
+            if not task.cancelled() and task.exception() is not None:
+                logger.error(f"{description}時發生錯誤: {str(task.exception())}")
+        task = asyncio.create_task(coro)
+        task.add_done_callback(report)
+        return task
+
+    def _register_prefetch_jobs(self):
+        """向背景預取排程註冊台鐵看板、誤點與捷運參考資料 (地震資料由監控迴圈、捷運看板由快照服務持續更新)"""
+        # 台鐵全線看板快照同樣只在最近 10 分鐘內有人查詢時才預取
+        self.prefetch.register(
+            "tra_liveboard", self.tra_liveboard_cache, "network",
+            self._request_tra_liveboard_snapshot, idle_after=600
+        )
+        self.prefetch.register(
+            "tra_delay", self.tra_delay_cache, "network",
+            self._request_tra_delay_snapshot, idle_after=600
+        )
+        # 捷運參考資料每日更新 (不論是否有人查詢，讓設施/路網瀏覽與車站搜尋隨時可用)
+        self._metro_reference_jobs = self.metro_reference.register_prefetch(self.prefetch, {
+            FACILITY: METRO_FACILITY_SYSTEMS,
+            NETWORK: METRO_NETWORK_SYSTEMS,
+            STATION_OF_LINE: METRO_LIVEBOARD_SYSTEMS,
+        })
 
     async def init_aiohttp_session(self):
-        """初始化 aiohttp 工作階段"""
+        """初始化 aiohttp 工作階段 (改用機器人共用的連線池，保留此方法供舊腳本呼叫)"""
         try:
-            # 完全停用 SSL 驗證
-            import ssl
-            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(
-                ssl=ssl_context,  # 使用自訂的 SSL 上下文
-                limit=10          # 同時連接數限制
-            )
-            
-            # 建立 aiohttp 工作階段
-            self.session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=20, connect=10, sock_read=15),
-                connector=connector,
-                trust_env=True   # 允許從環境變數讀取代理設定
-            )
-            logger.info("已初始化 aiohttp 工作階段 (使用自訂 SSL 上下文)")
+            pool = self.http
+            logger.info(f"已連結共用 HTTP 連線池 (目前主機數: {len(pool.get_stats())})")
         except Exception as e:
             logger.error(f"初始化 aiohttp 工作階段時發生錯誤: {str(e)}")
 
+    async def warm_reference_data(self):
+        """從持久化快取載回參考資料，過期的資料會在背景向上游重新取得"""
+        try:
+            await self.reference_cache.warm()
+            # 讀取一次即可觸發 stale-while-revalidate 的背景更新 (或在沒有資料時預先下載)
+            await self.get_tra_station_index()
+            await self.fetch_weather_station_info()
+            await self.get_metro_station_index()
+        except Exception as e:
+            logger.error(f"預熱參考資料時發生錯誤: {str(e)}")
+
     async def cog_unload(self):
-        """當Cog被卸載時停止地震檢查任務和關閉aiohttp工作階段"""
-        if self.eq_check_task:
-            self.eq_check_task.cancel()
-        if self.session and not self.session.closed:
-            await self.session.close()
-            logger.info("已關閉 aiohttp 工作階段")
+        """當Cog被卸載時停止地震檢查與預熱等背景任務 (共用連線池由機器人負責關閉)"""
+        for task in (self.eq_check_task, self.tdx_start_task, self.warm_reference_task):
+            if task and not task.done():
+                task.cancel()
+        self.subscriptions.close()
+        self.earthquake_history.close()
+        for name in ["tra_liveboard", "tra_delay", *self._metro_reference_jobs]:
+            self.prefetch.unregister(name)
+        await self.metro_snapshots.close()
             
     async def check_earthquake_updates(self):
-        """定期檢查是否有新地震"""
+        """定期檢查是否有新地震 (平時較慢，有新報告後一段時間內快速輪詢)"""
         await self.bot.wait_until_ready()
         while not self.bot.is_closed():
-            try:                # 檢查一般地震
-                data = await self.fetch_earthquake_data(small_area=False)
-                if data:
-                    # 支援兩種資料結構
-                    records = None
-                    if 'records' in data:
-                        # 有認證模式：records 在根級別
-                        records = data['records']
-                    elif 'result' in data and 'records' in data['result']:
-                        # 無認證模式：records 在 result 內
-                        records = data['result']['records']
-                    
-                    if records:
-                        latest_eq = None
-                        
-                        # 檢查不同可能的資料格式
-                        if isinstance(records, dict) and 'Earthquake' in records:
-                            earthquake_data = records['Earthquake']
-                            if isinstance(earthquake_data, list) and len(earthquake_data) > 0:
-                                latest_eq = earthquake_data[0]
-                            elif isinstance(earthquake_data, dict):
-                                latest_eq = earthquake_data
-                    
-                    if latest_eq:
-                        report_time = latest_eq.get('EarthquakeNo', '')
-                        
-                        # 檢查是否有新地震報告
-                        for guild in self.bot.guilds:
-                            channel_id = self.notification_channels.get(guild.id, None)
-                            
-                            # 如果該伺服器已設定通知頻道，且有新地震報告
-                            if channel_id and guild.id in self.last_eq_time and report_time != self.last_eq_time[guild.id]:
-                                channel = guild.get_channel(channel_id)
-                                if channel:
-                                    try:
-                                        # 檢查機器人是否有此頻道的發送權限
-                                        if channel.permissions_for(guild.me).send_messages:
-                                            # 獲取並發送地震嵌入
-                                            embed = await self.format_earthquake_data(latest_eq)
-                                            if embed:
-                                                embed.title = "🚨 新地震通報！"
-                                                await channel.send(embed=embed)
-                                    except Exception as e:
-                                        logger.error(f"發送地震通知時發生錯誤: {str(e)}")
-                        
-                        # 更新最後地震時間
-                        for guild in self.bot.guilds:
-                            self.last_eq_time[guild.id] = report_time
+            started = time.monotonic()
+            try:
+                # 一般地震、小區域地震與海嘯在同一輪內並行檢查
+                await asyncio.gather(
+                    self.poll_earthquake_feed(small_area=False),
+                    self.poll_earthquake_feed(small_area=True),
+                    self.poll_tsunami_feed()
+                )
             except asyncio.CancelledError:
                 # 正常取消
                 break
             except Exception as e:
                 logger.error(f"檢查地震更新時發生錯誤: {str(e)}")
+            self.earthquake_poller.record_cycle(time.monotonic() - started)
                 
-            await asyncio.sleep(self.check_interval)
+            await asyncio.sleep(self.earthquake_poller.next_interval())
+
+    async def poll_earthquake_feed(self, small_area: bool = False):
+        """檢查單一地震報告端點，有新報告時通知訂閱頻道"""
+        try:
+            # 監控需要最新資料，略過快取直接更新 (同時替指令預熱快取)
+            data = await self.fetch_earthquake_data(small_area=small_area, force_refresh=True)
+            latest_eq = self._latest_earthquake(data)
+            if latest_eq:
+                # 地震編號可能是數字，統一轉成字串與水位比較
+                report_no = str(latest_eq.get('EarthquakeNo', '') or '')
+                if report_no != str(BACKUP_EARTHQUAKE_NO):
+                    await self.record_earthquake_history(latest_eq, small_area=small_area)
+                watermark_name = 'earthquake:small' if small_area else 'earthquake'
+                if await self.broadcast_earthquake(latest_eq, report_no, watermark_name):
+                    self.earthquake_poller.burst()
+        except Exception as e:
+            logger.error(f"檢查{'小區域' if small_area else '一般'}地震更新時發生錯誤: {str(e)}")
+
+    async def poll_tsunami_feed(self):
+        """檢查海嘯報告，有新報告時通知所有地震通知頻道 (不套用地區/震度條件)"""
+        try:
+            data = await self.fetch_tsunami_data(force_refresh=True)
+            tsunami_records = ((data or {}).get('records') or {}).get('Tsunami')
+            if not tsunami_records or not isinstance(tsunami_records, list):
+                return
+            latest_tsunami = tsunami_records[0]
+            report_no = str(latest_tsunami.get('ReportNo', '') or '')
+            
+            async def render() -> Optional[discord.Embed]:
+                embed = await self.format_tsunami_data(latest_tsunami)
+                if embed:
+                    embed.title = "🌊 新海嘯通報！"
+                return embed
+            
+            if await self._announce_report('tsunami', report_no, lambda: [sub.guild_id for sub in self.subscriptions.all()], render):
+                self.earthquake_poller.burst()
+        except Exception as e:
+            logger.error(f"檢查海嘯更新時發生錯誤: {str(e)}")
+
+    async def record_earthquake_history(self, latest_eq: Dict[str, Any], small_area: bool = False):
+        """將地震報告寫入歷史紀錄；最新報告比已記錄的最新一筆更新時，補抓最近的報告一併寫入"""
+        newest = await self.earthquake_history.newest(small_area)
+        row = summarize_earthquake(latest_eq, small_area)
+        if row is None or (newest is not None and (row['origin_time'], row['report_no']) <= newest):
+            # 同一筆報告 (內容被修正時才會覆寫)，或報告被撤回後最新一筆反而較舊：不補抓，避免每次輪詢都重新請求
+            await self.earthquake_history.record([latest_eq], small_area=small_area)
+            return
+        data = await self._request_earthquake_data(small_area, limit=EARTHQUAKE_HISTORY_BACKFILL)
+        reports = self._earthquake_records(data) or [latest_eq]
+        if latest_eq not in reports:
+            reports.append(latest_eq)
+        await self.earthquake_history.record_newer(reports, small_area=small_area)
+
+    def _earthquake_records(self, data: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """從地震 API 回應中取出所有地震報告 (由新到舊)"""
+        if not data:
+            return []
+        # 支援兩種資料結構
+        records = None
+        if 'records' in data:
+            # 有認證模式：records 在根級別
+            records = data['records']
+        elif 'result' in data and 'records' in data['result']:
+            # 無認證模式：records 在 result 內
+            records = data['result']['records']
+        
+        if isinstance(records, dict) and 'Earthquake' in records:
+            earthquake_data = records['Earthquake']
+            if isinstance(earthquake_data, list):
+                return [eq for eq in earthquake_data if isinstance(eq, dict)]
+            elif isinstance(earthquake_data, dict):
+                return [earthquake_data]
+        return []
+
+    def _latest_earthquake(self, data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """從地震 API 回應中取出最新一筆地震"""
+        records = self._earthquake_records(data)
+        return records[0] if records else None
+
+    @staticmethod
+    def _seconds_since_origin(latest_eq: Dict[str, Any]) -> Optional[float]:
+        """地震發生 (OriginTime，臺灣時間) 至今的秒數，無法解析時回傳 None"""
+        origin_time = (latest_eq.get('EarthquakeInfo') or {}).get('OriginTime') or latest_eq.get('OriginTime')
+        try:
+            origin = datetime.datetime.strptime(origin_time, "%Y-%m-%d %H:%M:%S").replace(tzinfo=TAIWAN_TZ)
+        except (TypeError, ValueError):
+            return None
+        return (datetime.datetime.now(TAIWAN_TZ) - origin).total_seconds()
     
+    def _subscription_targets(self, guild_ids: Iterable[int]) -> List[Tuple[int, discord.abc.Messageable]]:
+        """列出機器人有發送權限的訂閱頻道"""
+        targets = []
+        for guild_id in guild_ids:
+            subscription = self.subscriptions.get(guild_id)
+            if subscription is None:
+                continue
+            channel = self.bot.get_channel(subscription.channel_id)
+            if channel is None or channel.guild is None:
+                continue
+            # 檢查機器人是否有此頻道的發送權限
+            if channel.permissions_for(channel.guild.me).send_messages:
+                targets.append((subscription.guild_id, channel))
+        return targets
+
+    async def _announce_report(self,
+                               watermark_name: str,
+                               report_no: str,
+                               select_guilds: Callable[[], Iterable[int]],
+                               render: Callable[[], Awaitable[Optional[discord.Embed]]],
+                               on_new: Optional[Callable[[], None]] = None,
+                               on_sent: Optional[Callable[[], None]] = None) -> bool:
+        """以報告編號比對水位，有新報告時嵌入訊息只產生一次，再並行發送到訂閱頻道
+
+        Args:
+            watermark_name: 水位名稱 (每個資料來源一個，例如 'earthquake'、'tsunami')
+            report_no: 最新報告編號
+            select_guilds: 回傳需要通知的伺服器 ID
+            render: 產生嵌入訊息
+            on_new: 偵測到新報告時 (發送前) 呼叫
+            on_sent: 通知發送完成且至少送達一個頻道時呼叫
+
+        Returns:
+            bool: 是否為新的報告 (第一次啟動僅記錄水位時為 False)
+        """
+        if not report_no:
+            return False
+        watermark = self.subscriptions.get_watermark(watermark_name)
+        if report_no == watermark:
+            return False
+        
+        # 第一次啟動 (尚無水位) 只記錄目前的報告編號，不通知既有的報告
+        if watermark is not None:
+            detected_at = time.monotonic()
+            if on_new:
+                on_new()
+            targets = self._subscription_targets(select_guilds())
+            if targets:
+                embed = await render()
+                if embed:
+                    result = await self.earthquake_broadcaster.broadcast(
+                        f"{watermark_name} {report_no}", targets,
+                        lambda channel: channel.send(embed=embed), started_at=detected_at
+                    )
+                    if on_sent and result.sent:
+                        on_sent()
+        
+        # 更新最後已通知的報告編號 (寫入磁碟，重啟後不會重複通知)
+        await self.subscriptions.set_watermark(watermark_name, report_no)
+        return watermark is not None
+
+    async def broadcast_earthquake(self, latest_eq: Dict[str, Any], report_no: str, watermark_name: str = 'earthquake') -> bool:
+        """新地震報告：依地區/震度條件篩選訂閱後通知
+
+        Returns:
+            bool: 是否為新的地震報告 (第一次啟動僅記錄水位時為 False)
+        """
+        if report_no == str(BACKUP_EARTHQUAKE_NO):
+            return False
+        
+        def record_detection():
+            # 發生 → 偵測 (尚未產生與發送通知)
+            latency = self._seconds_since_origin(latest_eq)
+            if latency is not None:
+                self.earthquake_poller.record_detection(report_no, latency)
+        
+        def record_send():
+            # 發生 → 通知發送完成 (廣播結束的時間)
+            latency = self._seconds_since_origin(latest_eq)
+            if latency is not None:
+                self.earthquake_poller.record_send(report_no, latency)
+        
+        def select_guilds() -> Iterable[int]:
+            # 有感地區只解析一次，再比對各縣市的訂閱門檻
+            county_intensity = county_max_intensity((latest_eq.get('Intensity') or {}).get('ShakingArea'))
+            return self.subscriptions.match(county_intensity)
+        
+        async def render() -> Optional[discord.Embed]:
+            embed = await self.format_earthquake_data(latest_eq)
+            if embed:
+                embed.title = "🚨 新地震通報！"
+            return embed
+        
+        return await self._announce_report(watermark_name, report_no, select_guilds, render,
+                                           on_new=record_detection, on_sent=record_send)
+
+    @coalesce('fetch_with_retry', key=lambda self, url, params=None, *args, **kwargs: (url, make_key(params)))
     async def fetch_with_retry(self, url: str, params: Dict[str, Any] = None, timeout: int = 20, max_retries: int = 3) -> Optional[Dict[str, Any]]:
-        """以重試機制發送非同步請求"""
+        """以重試機制發送非同步請求 (相同 URL 的並行呼叫會合併)"""
+        return await self._fetch_with_retry(url, params, timeout, max_retries)
+
+    async def _fetch_with_retry(self, url: str, params: Dict[str, Any] = None, timeout: int = 20, max_retries: int = 3) -> Optional[Dict[str, Any]]:
+        """以重試機制發送非同步請求 (未合併，取消呼叫端時請求會一併中止)"""
         for attempt in range(max_retries):
             try:
-                if self.session is None or self.session.closed:
-                    # 建立新的會話時禁用SSL驗證
-                    connector = aiohttp.TCPConnector(ssl=False, limit=10)
-                    self.session = aiohttp.ClientSession(
-                        timeout=aiohttp.ClientTimeout(total=30, connect=10, sock_read=20),
-                        connector=connector,
-                        raise_for_status=True
-                    )
-                    logger.info("已創建新的 aiohttp 工作階段")
-
                 logger.info(f"正在發送請求到 {url} (嘗試 {attempt + 1}/{max_retries})")
-                async with self.session.get(url, params=params, timeout=timeout) as response:
+                async with self.http.get(url, params=params, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
                     if response.status == 200:
                         try:
                             data = await response.json()
@@ -505,6 +512,10 @@ class InfoCommands(commands.Cog):
                         text = await response.text()
                         logger.warning(f"回應內容: {text[:200]}...")  # 只記錄前200個字元
                         return None
+            except CircuitOpenError as e:
+                # 上游已判定為故障，不再重試，交由呼叫端改用快取資料
+                logger.warning(f"略過請求: {str(e)}")
+                return None
             except asyncio.TimeoutError:
                 logger.error(f"API請求超時 (嘗試 {attempt+1}/{max_retries})")
                 if attempt < max_retries - 1:
@@ -518,20 +529,27 @@ class InfoCommands(commands.Cog):
                     logger.error(f"最終API請求失敗: {str(e)}")
         return None
 
-    async def fetch_earthquake_data(self, small_area: bool = False) -> Optional[Dict[str, Any]]:
+    async def fetch_earthquake_data(self, small_area: bool = False, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
         """從氣象局取得最新地震資料 (使用非同步請求)"""
-        current_time = datetime.datetime.now().timestamp()
         cache_key = "small" if small_area else "normal"
         
         logger.info(f"開始獲取地震資料 (類型: {cache_key})")
         
-        # 如果快取資料未過期（5分鐘內），直接返回快取
-        if (cache_key in self.earthquake_cache and 
-            current_time - self.cache_time < 300):
-            logger.info(f"使用快取的地震資料 (類型: {cache_key})")
-            logger.info(f"快取資料內容: {str(self.earthquake_cache[cache_key])[:200]}...")
-            return self.earthquake_cache[cache_key]
+        # 一般/小區域地震各自計算快取時間，過期後先回傳舊資料並在背景更新
+        data = await self.earthquake_cache.get_or_fetch(
+            cache_key, lambda: self._request_earthquake_data(small_area),
+            force_refresh=force_refresh
+        )
+        if data:
+            return data
+        
+        # 如果所有 API 調用方式都失敗，使用備用資料
+        logger.warning("所有 API 調用方式都失敗，使用備用地震資料")
+        return await self.get_backup_earthquake_data(small_area)
 
+    @coalesce('earthquake')
+    async def _request_earthquake_data(self, small_area: bool = False, limit: int = 1) -> Optional[Dict[str, Any]]:
+        """依序嘗試有認證/無認證模式向氣象署請求最近 limit 筆地震資料，全部失敗時回傳 None"""
         # 選擇適當的 API 端點
         if small_area:
             endpoint = "E-A0016-001"  # 小區域有感地震
@@ -545,22 +563,21 @@ class InfoCommands(commands.Cog):
                 "name": "有認證模式", 
                 "params": {
                     'Authorization': self.api_auth,
-                    'limit': 1,
+                    'limit': limit,
                     'format': 'JSON'
                 }
             },
             {
                 "name": "無認證模式",
                 "params": {
-                    'limit': 1,
+                    'limit': limit,
                     'format': 'JSON'
                 }
             }
         ]
 
-        try:
-            # 按順序嘗試不同的 API 調用方式
-            for attempt in api_attempts:
+        def make_attempt(attempt):
+            async def run():
                 logger.info(f"嘗試{attempt['name']}獲取地震資料")
                 
                 # 構建完整的URL
@@ -568,83 +585,70 @@ class InfoCommands(commands.Cog):
                 full_url = f"{url}?{param_string}"
                 
                 logger.info(f"正在獲取地震資料，URL: {full_url}")
-                
-                # 使用非同步請求獲取資料，並處理 SSL 相關錯誤
-                try:
-                    data = await self.fetch_with_retry(full_url, timeout=30, max_retries=3)                    
-                    if data and isinstance(data, dict):                        # 驗證資料結構
-                        if 'success' in data and (data['success'] == 'true' or data['success'] is True):
-                            # 檢查是否為API異常格式（只有欄位定義，無實際資料）
-                            # 修復：有認證模式的 result 也會包含 records
-                            if ('result' in data and isinstance(data['result'], dict) and 
-                                set(data['result'].keys()) == {'resource_id', 'fields'} and 
-                                'records' not in data):
-                                logger.warning(f"API回傳異常資料結構（{attempt['name']}失敗），嘗試下一種方式")
-                                continue  # 嘗試下一種 API 調用方式
-                            
-                            # 檢查是否有實際的地震資料 (支援兩種資料結構)
-                            records_data = None
-                            if 'records' in data:
-                                # 有認證模式：records 在根級別
-                                records_data = data['records']
-                                logger.info(f"使用有認證模式資料結構 (根級別 records)")
-                            elif 'result' in data and 'records' in data.get('result', {}):
-                                # 無認證模式：records 在 result 內
-                                records_data = data['result']['records']
-                                logger.info(f"使用無認證模式資料結構 (result.records)")
-                            
-                            if (records_data and isinstance(records_data, dict) and
-                                'Earthquake' in records_data and records_data['Earthquake']):
-                                
-                                logger.info(f"✅ {attempt['name']}成功獲取地震資料")
-                                
-                                # 更新快取
-                                self.earthquake_cache[cache_key] = data
-                                self.cache_time = current_time
-                                logger.info(f"成功獲取並更新地震資料快取")
-                                
-                                return data
-                            else:
-                                logger.warning(f"{attempt['name']}獲取的資料結構不完整，嘗試下一種方式")
-                                logger.warning(f"records_data 內容: {records_data}")
-                                continue
-                        else:
-                            logger.warning(f"{attempt['name']} API 請求不成功: {data.get('success', 'unknown')}")
-                            continue
-                    else:
-                        logger.warning(f"{attempt['name']}獲取到的資料格式不正確")
-                        continue
-                        
-                except Exception as api_e:
-                    logger.error(f"{attempt['name']}請求失敗: {str(api_e)}")
-                    continue  # 嘗試下一種方式
-              # 如果所有 API 調用方式都失敗，使用備用資料
-            logger.warning("所有 API 調用方式都失敗，使用備用地震資料")
-            return await self.get_backup_earthquake_data(small_area)
+                data = await self._fetch_with_retry(full_url, timeout=30, max_retries=3)
+                return data if self._is_valid_earthquake_payload(data, attempt['name']) else None
+            return run
+
+        try:
+            # 對沖請求：有認證模式先送出，若 EARTHQUAKE_HEDGE_DELAY 秒內沒有結果 (或已失敗) 就同時送出無認證模式，
+            # 採用第一個含有 records.Earthquake 的回應，另一個請求隨即取消
+            data = await get_hedge_group('earthquake', EARTHQUAKE_HEDGE_DELAY).run(
+                [make_attempt(attempt) for attempt in api_attempts],
+                labels=[attempt['name'] for attempt in api_attempts]
+            )
+            return data
             
         except Exception as e:
             logger.error(f"獲取地震資料時發生錯誤: {str(e)}")
-            
-            # 如果發生錯誤，檢查是否有快取資料可用
-            if cache_key in self.earthquake_cache:
-                logger.info("發生錯誤，使用地震快取資料")
-                return self.earthquake_cache[cache_key]
-            
-            # 最後的備用方案
-            logger.warning("沒有可用的快取資料，使用備用地震資料")
-            return await self.get_backup_earthquake_data(small_area)
+            return None
 
-    async def fetch_tsunami_data(self) -> Optional[Dict[str, Any]]:
-        """從氣象局取得最新海嘯資料 (使用非同步請求)"""
-        current_time = datetime.datetime.now().timestamp()
+    def _is_valid_earthquake_payload(self, data: Optional[Dict[str, Any]], attempt_name: str) -> bool:
+        """檢查地震 API 回應是否含有實際的 records.Earthquake 資料"""
+        if not data or not isinstance(data, dict):
+            logger.warning(f"{attempt_name}獲取到的資料格式不正確")
+            return False
+        
+        if not ('success' in data and (data['success'] == 'true' or data['success'] is True)):
+            logger.warning(f"{attempt_name} API 請求不成功: {data.get('success', 'unknown')}")
+            return False
+        
+        # 檢查是否為API異常格式（只有欄位定義，無實際資料）
+        # 修復：有認證模式的 result 也會包含 records
+        if ('result' in data and isinstance(data['result'], dict) and 
+            set(data['result'].keys()) == {'resource_id', 'fields'} and 
+            'records' not in data):
+            logger.warning(f"API回傳異常資料結構（{attempt_name}失敗）")
+            return False
+        
+        # 檢查是否有實際的地震資料 (支援兩種資料結構)
+        records_data = None
+        if 'records' in data:
+            # 有認證模式：records 在根級別
+            records_data = data['records']
+            logger.info(f"使用有認證模式資料結構 (根級別 records)")
+        elif 'result' in data and 'records' in data.get('result', {}):
+            # 無認證模式：records 在 result 內
+            records_data = data['result']['records']
+            logger.info(f"使用無認證模式資料結構 (result.records)")
+        
+        if (records_data and isinstance(records_data, dict) and
+            'Earthquake' in records_data and records_data['Earthquake']):
+            logger.info(f"✅ {attempt_name}成功獲取地震資料")
+            return True
         
+        logger.warning(f"{attempt_name}獲取的資料結構不完整")
+        logger.warning(f"records_data 內容: {records_data}")
+        return False
+
+    async def fetch_tsunami_data(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """從氣象局取得最新海嘯資料 (使用非同步請求)"""
         logger.info("開始獲取海嘯資料")
-          # 如果快取資料未過期（5分鐘內），直接返回快取
-        if (self.tsunami_cache and 
-            current_time - self.tsunami_cache_time < 300):
-            logger.info("使用快取的海嘯資料")
-            return self.tsunami_cache
+        # 過期後先回傳舊資料並在背景更新；請求失敗時在 stale_ttl 內沿用舊資料
+        return await self.tsunami_cache.get_or_fetch('latest', self._request_tsunami_data, force_refresh=force_refresh)
 
+    @coalesce('tsunami_data')
+    async def _request_tsunami_data(self) -> Optional[Dict[str, Any]]:
+        """向氣象署請求海嘯資料"""
         try:
             # 使用海嘯資料API端點
             url = "https://opendata.cwa.gov.tw/api/v1/rest/datastore/E-A0014-001"
@@ -653,14 +657,8 @@ class InfoCommands(commands.Cog):
                 'format': 'JSON'
             }
             
-            # 構建完整的URL
-            param_string = "&".join([f"{k}={v}" for k, v in params.items()])
-            full_url = f"{url}?{param_string}"
-            
-            logger.info(f"正在獲取海嘯資料，URL: {full_url}")
-            
             # 使用非同步請求獲取資料
-            data = await self.fetch_with_retry(full_url, timeout=30, max_retries=3)
+            data = await self._fetch_with_retry(url, params=params, timeout=30, max_retries=3)
             
             if data and isinstance(data, dict):
                 # 驗證資料結構
@@ -672,44 +670,21 @@ class InfoCommands(commands.Cog):
                     if 'records' in data:
                         records_keys = list(data['records'].keys()) if isinstance(data['records'], dict) else "not a dictionary"
                         logger.info(f"海嘯API records結構: {records_keys}")
-                        
-                        if 'Tsunami' in data['records'] and isinstance(data['records']['Tsunami'], list):
-                            first_tsunami = data['records']['Tsunami'][0] if data['records']['Tsunami'] else {}
-                            logger.info(f"第一筆海嘯資料欄位: {list(first_tsunami.keys()) if first_tsunami else 'empty'}")
-                            
-                            # 特別檢查是否有圖片欄位
-                            if 'ReportImageURI' in first_tsunami:
-                                logger.info(f"找到海嘯圖片URL: {first_tsunami['ReportImageURI']}")
-                            elif 'Web' in first_tsunami:
-                                logger.info(f"找到海嘯網頁URL: {first_tsunami['Web']}")
-                    
-                    # 更新快取
-                    self.tsunami_cache = data
-                    self.tsunami_cache_time = current_time
-                    logger.info("成功獲取並更新海嘯資料快取")
                     
+                    logger.info("成功獲取海嘯資料")
                     return data
                 else:
                     logger.error(f"海嘯API請求不成功: {data}")
             else:
                 logger.error(f"獲取到的海嘯資料格式不正確: {data}")
                 
-            # 如果請求失敗，檢查是否有快取資料可用
-            if self.tsunami_cache:
-                logger.warning("使用過期的海嘯資料快取")
-                return self.tsunami_cache
-                
             return None
                 
         except Exception as e:
             logger.error(f"獲取海嘯資料時發生錯誤: {str(e)}")
-              # 如果發生錯誤，檢查是否有快取資料可用
-            if self.tsunami_cache:
-                logger.info("發生錯誤，使用海嘯快取資料")
-                return self.tsunami_cache
-            
             return None
 
+    @coalesce('weather_station_data')
     async def fetch_weather_station_data(self) -> Optional[Dict[str, Any]]:
         """獲取自動氣象站觀測資料"""
         try:
@@ -734,7 +709,12 @@ class InfoCommands(commands.Cog):
             return None
 
     async def fetch_weather_station_info(self) -> Optional[Dict[str, Any]]:
-        """獲取氣象測站基本資料"""
+        """獲取氣象測站基本資料 (含持久化快取)"""
+        return await self.reference_cache.get_or_fetch('C-B0074-001', self._request_weather_station_info)
+
+    @coalesce('weather_station_info')
+    async def _request_weather_station_info(self) -> Optional[Dict[str, Any]]:
+        """向氣象署請求氣象測站基本資料"""
         try:
             url = "https://opendata.cwa.gov.tw/api/v1/rest/datastore/C-B0074-001"
             params = {
@@ -969,6 +949,8 @@ class InfoCommands(commands.Cog):
                     embed = await self.format_earthquake_data(earthquake_record)
                     
                     if embed:
+                        # 上游無法連線 (例如斷路器開啟) 時標示為舊資料
+                        mark_stale(embed, self.earthquake_cache, "small" if small_area else "normal")
                         await interaction.followup.send(embed=embed)
                     else:
                         await interaction.followup.send("❌ 無法解析地震資料，請稍後再試。")
@@ -1043,8 +1025,18 @@ class InfoCommands(commands.Cog):
             return eq_data  # 返回原始資料
 
     @app_commands.command(name="set_earthquake_channel", description="設定地震通知頻道 (需管理員權限)")
-    @app_commands.describe(channel="要設定為地震通知頻道的文字頻道")
-    async def set_earthquake_channel(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
+    @app_commands.describe(
+        channel="要設定為地震通知頻道的文字頻道",
+        region="只在此縣市有感時通知 (不選擇則為全臺)",
+        min_intensity="最低通知震度 (指定縣市時以該縣市震度判斷，否則以全臺最大震度判斷)"
+    )
+    @app_commands.choices(
+        region=[app_commands.Choice(name=county, value=county) for county in TW_LOCATIONS],
+        min_intensity=[app_commands.Choice(name=name, value=level) for name, level in INTENSITY_LEVELS.items()]
+    )
+    async def set_earthquake_channel(self, interaction: discord.Interaction, channel: discord.TextChannel = None,
+                                     region: app_commands.Choice[str] = None,
+                                     min_intensity: app_commands.Choice[int] = None):
         """設定地震通知頻道"""
         # 檢查權限
         if not await self._check_admin(interaction):
@@ -1056,37 +1048,29 @@ class InfoCommands(commands.Cog):
                 await interaction.response.send_message("❌ 我沒有在該頻道發送訊息的權限！請選擇另一個頻道或給予我適當的權限。", ephemeral=True)
                 return
                 
-            # 設定通知頻道
-            self.notification_channels[interaction.guild.id] = channel.id
-              # 初始化最後地震時間
-            try:
-                eq_data = await self.fetch_earthquake_data()
-                if eq_data:
-                    # 支援兩種資料結構
-                    records = None
-                    if 'records' in eq_data:
-                        # 有認證模式：records 在根級別
-                        records = eq_data['records']
-                    elif 'result' in eq_data and 'records' in eq_data['result']:
-                        # 無認證模式：records 在 result 內
-                        records = eq_data['result']['records']
-                    
-                    if records and isinstance(records, dict) and 'Earthquake' in records:
-                        earthquake_data = records['Earthquake']
-                        if isinstance(earthquake_data, list) and len(earthquake_data) > 0:
-                            latest_eq = earthquake_data[0]
-                            self.last_eq_time[interaction.guild.id] = latest_eq.get('EarthquakeNo', '')
-            except Exception as e:
-                logger.error(f"初始化最後地震時間時發生錯誤: {str(e)}")
-                self.last_eq_time[interaction.guild.id] = ""
+            # 設定通知頻道 (寫入磁碟；之後有新的地震報告才會通知)
+            subscription = await self.subscriptions.subscribe(
+                interaction.guild.id,
+                channel.id,
+                region=region.value if region else None,
+                min_intensity=min_intensity.value if min_intensity else 0
+            )
+            
+            scope = subscription.region or "全臺"
+            if subscription.min_intensity:
+                condition = f"{scope}震度達 {intensity_name(subscription.min_intensity)} 以上"
+            elif subscription.region:
+                condition = f"{scope}有感"
+            else:
+                condition = "有新的地震報告"
                 
-            await interaction.response.send_message(f"✅ 已將 {channel.mention} 設定為地震通知頻道。當有新的地震報告時，我會在此頻道發送通知。", ephemeral=True)
+            await interaction.response.send_message(f"✅ 已將 {channel.mention} 設定為地震通知頻道。當{condition}時，我會在此頻道發送通知。", ephemeral=True)
             
             # 發送測試訊息
             try:
                 embed = discord.Embed(
                     title="✅ 地震通知頻道設定成功",
-                    description="此頻道已被設定為地震通知頻道。當有新的地震報告時，機器人會在此頻道發送通知。",
+                    description=f"此頻道已被設定為地震通知頻道。當{condition}時，機器人會在此頻道發送通知。",
                     color=discord.Color.green()
                 )
                 embed.set_footer(text=f"設定者: {interaction.user} | 設定時間: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -1095,13 +1079,73 @@ class InfoCommands(commands.Cog):
             except Exception as e:
                 logger.error(f"發送測試訊息時發生錯誤: {str(e)}")
         else:            # 清除設定
-            if interaction.guild.id in self.notification_channels:
-                del self.notification_channels[interaction.guild.id]
-            if interaction.guild.id in self.last_eq_time:
-                del self.last_eq_time[interaction.guild.id]
+            await self.subscriptions.unsubscribe(interaction.guild.id)
                 
             await interaction.response.send_message("✅ 已清除地震通知頻道設定。", ephemeral=True)
 
+    @app_commands.command(name="earthquake_history", description="查詢機器人記錄的歷史地震")
+    @app_commands.describe(
+        count="顯示筆數 (預設 10 筆)",
+        min_magnitude="最小規模",
+        county="震央縣市",
+        days="只查詢最近幾天"
+    )
+    @app_commands.choices(county=[
+        app_commands.Choice(name=county, value=county) for county in TW_LOCATIONS
+    ])
+    async def earthquake_history(self, interaction: discord.Interaction,
+                                 count: app_commands.Range[int, 1, 25] = 10,
+                                 min_magnitude: app_commands.Range[float, 0.0, 10.0] = None,
+                                 county: app_commands.Choice[str] = None,
+                                 days: app_commands.Range[int, 1, 3650] = None):
+        """從本機的地震歷史紀錄查詢 (不需向中央氣象署請求)"""
+        await interaction.response.defer()
+        
+        try:
+            records = await self.earthquake_history.query(
+                limit=count,
+                min_magnitude=min_magnitude,
+                county=county.value if county else None,
+                days=days
+            )
+            
+            conditions = []
+            if county:
+                conditions.append(f"震央位於{county.value}")
+            if min_magnitude is not None:
+                conditions.append(f"規模 {min_magnitude:g} 以上")
+            if days:
+                conditions.append(f"最近 {days} 天")
+            condition_text = "、".join(conditions) or "全部"
+            
+            if not records:
+                await interaction.followup.send(f"📭 沒有符合條件 ({condition_text}) 的地震紀錄。")
+                return
+            
+            embed = discord.Embed(
+                title="📜 歷史地震紀錄",
+                description=f"條件：{condition_text}",
+                color=discord.Color.blue()
+            )
+            for record in records:
+                magnitude = f"{record['magnitude']:g}" if record['magnitude'] is not None else "未知"
+                depth = f"{record['depth']:g} 公里" if record['depth'] is not None else "未知"
+                value = f"🔍 規模 {magnitude} | ⬇️ 深度 {depth}"
+                if record['max_intensity']:
+                    value += f" | 最大震度 {intensity_name(record['max_intensity'])}"
+                value += f"\n📍 {record['location'] or '未知位置'}"
+                if record['web']:
+                    value += f"\n[報告連結]({record['web']})"
+                kind = "小區域" if record['small_area'] else "編號"
+                embed.add_field(name=f"🕒 {record['origin_time']} ({kind} {record['report_no']})", value=value[:1024], inline=False)
+            
+            embed.set_footer(text=f"共 {len(records)} 筆 | 資料來源：機器人監控期間記錄的中央氣象署地震報告")
+            await interaction.followup.send(embed=embed)
+            
+        except Exception as e:
+            logger.error(f"earthquake_history指令執行時發生錯誤: {str(e)}")
+            await interaction.followup.send("❌ 查詢歷史地震時發生錯誤，請稍後再試。")
+
     async def format_tsunami_data(self, tsunami_data: Dict[str, Any]) -> Optional[discord.Embed]:
         """將海嘯資料格式化為Discord嵌入訊息"""
         try:
@@ -1327,7 +1371,7 @@ class InfoCommands(commands.Cog):
                 "resource_id": "E-A0016-001" if small_area else "E-A0015-001",
                 "records": {
                     "Earthquake": [{
-                        "EarthquakeNo": 999999,
+                        "EarthquakeNo": BACKUP_EARTHQUAKE_NO,
                         "ReportType": "小區域有感地震報告" if small_area else "有感地震報告",
                         "ReportContent": f"備用地震資料 - API 暫時不可用 (時間: {current_time.strftime('%Y-%m-%d %H:%M:%S')})",
                         "ReportColor": "綠色",
@@ -1362,17 +1406,15 @@ class InfoCommands(commands.Cog):
         return backup_data
 
     async def fetch_tra_stations_from_api(self) -> Optional[Dict[str, List[Dict[str, str]]]]:
-        """從台鐵官方開放資料平台獲取最新車站資料"""
+        """從台鐵官方開放資料平台獲取最新車站資料 (含持久化快取)"""
+        return await self.reference_cache.get_or_fetch(
+            'tra_stations', self._request_tra_stations, ttl=self.tra_stations_cache_duration
+        )
+
+    @coalesce('tra_stations')
+    async def _request_tra_stations(self) -> Optional[Dict[str, List[Dict[str, str]]]]:
+        """向台鐵官方開放資料平台請求車站資料並按縣市分類"""
         try:
-            import time
-            current_time = time.time()
-            
-            # 檢查快取是否仍有效
-            if (self.tra_stations_cache and 
-                current_time - self.tra_stations_cache_time < self.tra_stations_cache_duration):
-                logger.info("使用快取的台鐵車站資料")
-                return self.tra_stations_cache
-            
             logger.info("正在從台鐵官方API獲取最新車站資料...")
             
             # 台鐵車站資料API端點
@@ -1384,39 +1426,25 @@ class InfoCommands(commands.Cog):
                 'Accept-Language': 'zh-TW,zh;q=0.9,en;q=0.8'
             }
             
-            # 建立SSL連接
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        # API回應的是二進制內容，需要手動解碼
-                        content = await response.read()
-                        text_content = content.decode('utf-8')
-                        import json
-                        data = json.loads(text_content)
-                        logger.info(f"成功獲取台鐵車站資料，共{len(data)}筆")
-                        
-                        # 處理資料並按縣市分類
-                        processed_stations = await self._process_tra_stations_data(data)
+            async with self.http.get(url, headers=headers) as response:
+                if response.status == 200:
+                    # API回應的是二進制內容，需要手動解碼
+                    content = await response.read()
+                    text_content = content.decode('utf-8')
+                    import json
+                    data = json.loads(text_content)
+                    logger.info(f"成功獲取台鐵車站資料，共{len(data)}筆")
                         
-                        # 更新快取
-                        self.tra_stations_cache = processed_stations
-                        self.tra_stations_cache_time = current_time
+                    # 處理資料並按縣市分類
+                    processed_stations = await self._process_tra_stations_data(data)
                         
-                        logger.info(f"台鐵車站資料處理完成，共{len(processed_stations)}個縣市")
-                        return processed_stations
-                    else:
-                        logger.error(f"台鐵API請求失敗: HTTP {response.status}")
-                        response_text = await response.text()
-                        logger.error(f"錯誤回應: {response_text}")
-                        return None
+                    logger.info(f"台鐵車站資料處理完成，共{len(processed_stations)}個縣市")
+                    return processed_stations
+                else:
+                    logger.error(f"台鐵API請求失敗: HTTP {response.status}")
+                    response_text = await response.text()
+                    logger.error(f"錯誤回應: {response_text}")
+                    return None
                         
         except Exception as e:
             logger.error(f"獲取台鐵車站資料時發生錯誤: {str(e)}")
@@ -1435,56 +1463,8 @@ class InfoCommands(commands.Cog):
                 station_id = station.get('stationCode', '').strip()
                 county = station.get('stationAddrTw', '')
                 
-                # 從地址提取縣市資訊
-                if county:
-                    # 提取縣市名稱
-                    county_name = None
-                    for location in TW_LOCATIONS:
-                        if location in county:
-                            county_name = location
-                            break
-                    
-                    if not county_name:
-                        # 嘗試更寬鬆的匹配
-                        if '臺北' in county or '台北' in county:
-                            county_name = '臺北市'
-                        elif '新北' in county:
-                            county_name = '新北市'
-                        elif '桃園' in county:
-                            county_name = '桃園市'
-                        elif '臺中' in county or '台中' in county:
-                            county_name = '臺中市'
-                        elif '臺南' in county or '台南' in county:
-                            county_name = '臺南市'
-                        elif '高雄' in county:
-                            county_name = '高雄市'
-                        elif '基隆' in county:
-                            county_name = '基隆市'
-                        elif '新竹市' in county:
-                            county_name = '新竹市'
-                        elif '新竹縣' in county or ('新竹' in county and '市' not in county):
-                            county_name = '新竹縣'
-                        elif '嘉義市' in county:
-                            county_name = '嘉義市'
-                        elif '嘉義縣' in county or ('嘉義' in county and '市' not in county):
-                            county_name = '嘉義縣'
-                        elif '雲林' in county:
-                            county_name = '雲林縣'
-                        elif '彰化' in county:
-                            county_name = '彰化縣'
-                        elif '南投' in county:
-                            county_name = '南投縣'
-                        elif '宜蘭' in county:
-                            county_name = '宜蘭縣'
-                        elif '花蓮' in county:
-                            county_name = '花蓮縣'
-                        elif '臺東' in county or '台東' in county:
-                            county_name = '臺東縣'
-                        elif '屏東' in county:
-                            county_name = '屏東縣'
-                        else:
-                            # 預設分類
-                            county_name = '其他'
+                # 從地址提取縣市資訊 (一次掃描，處理台/臺與簡稱)
+                county_name = resolve_county(county) or '其他'
                 
                 # 如果有有效的車站名稱和ID
                 if station_name and station_id and county_name:
@@ -1518,61 +1498,182 @@ class InfoCommands(commands.Cog):
                 return api_data
             else:
                 logger.warning("API獲取失敗，使用內建台鐵車站資料")
-                return TRA_STATIONS
+                return get_builtin_tra_stations()
                 
         except Exception as e:
             logger.error(f"獲取台鐵車站資料時發生錯誤: {str(e)}")
             logger.info("使用內建台鐵車站資料作為備援")
-            return TRA_STATIONS
+            return get_builtin_tra_stations()
 
-    async def get_tdx_access_token(self) -> Optional[str]:
-        """取得 TDX API 存取權杖"""
+    def _refresh_tra_station_index(self, stations_by_county: Dict[str, List[Dict[str, str]]]) -> TRAStationIndex:
+        """車站資料換新時重建索引 (同一份資料只建立一次)"""
+        if stations_by_county is not self._tra_index_source:
+            if self._tra_english_names is None:
+                # 英文站名優先取自內建資料檔，資料檔不存在時才讀取車站基本資料集
+                dataset = get_tra_station_dataset()
+                self._tra_english_names = (dataset.english_names() if dataset else {}) or load_english_names()
+            self.tra_station_index.build(stations_by_county, self._tra_english_names)
+            self._tra_index_source = stations_by_county
+        return self.tra_station_index
+
+    async def get_tra_station_index(self) -> TRAStationIndex:
+        """取得以最新車站資料建立的索引"""
+        return self._refresh_tra_station_index(await self.get_updated_tra_stations())
+
+    def _refresh_metro_station_index(self) -> MetroStationIndex:
+        """以快取中現有的路線車站序列更新跨系統車站索引 (不觸發請求，資料有變動時才重建)"""
+        indexes = [self.metro_reference.current(system) for system in METRO_LIVEBOARD_SYSTEMS]
+        versions = tuple(index.version for index in indexes)
+        if versions != self._metro_station_index_versions:
+            self.metro_station_index.build(
+                {index.system: index.lines for index in indexes if index.lines}, METRO_SYSTEM_NAMES
+            )
+            self._metro_station_index_versions = versions
+        return self.metro_station_index
+
+    async def get_metro_station_index(self) -> MetroStationIndex:
+        """取得跨系統車站索引 (尚未取得的路線車站序列會先向上游取得)"""
+        await asyncio.gather(*(
+            self.metro_reference.get(system, (STATION_OF_LINE,)) for system in METRO_LIVEBOARD_SYSTEMS
+        ))
+        return self._refresh_metro_station_index()
+
+    async def fetch_tra_liveboard_snapshot(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """取得台鐵全線即時電子看板快照 (每個更新間隔最多向 TDX 請求一次)"""
+        return await self.tra_liveboard_cache.get_or_fetch(
+            "network", self._request_tra_liveboard_snapshot, force_refresh=force_refresh
+        )
+
+    @coalesce('tra_liveboard_snapshot')
+    async def _request_tra_liveboard_snapshot(self) -> Optional[Dict[str, Any]]:
+        """向 TDX 請求全線 StationLiveBoard (不加篩選)，並依 StationID 建立索引
+
+        Returns:
+            {'stations': {StationID: [列車, ...]}, 'names': {站名: StationID}, 'update_time': 資料更新時間, 'count': 列車筆數}
+        """
         try:
-            import time
-            import base64
+            url = "https://tdx.transportdata.tw/api/basic/v3/Rail/TRA/StationLiveBoard?%24format=JSON"
+            headers = {
+                'Accept': 'application/json',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+            }
             
-            # 檢查是否有有效的權杖
-            current_time = time.time()
-            if (self.tdx_access_token and 
-                current_time < self.tdx_token_expires_at - 60):  # 提前60秒更新
-                return self.tdx_access_token
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status != 200:
+                    logger.error(f"台鐵全線電子看板請求失敗: HTTP {response.status}")
+                    return None
+                data = await response.json()
+            
+            # v3 API返回的是包含StationLiveBoards的物件，而不是直接的陣列
+            if isinstance(data, dict):
+                trains_data = data.get('StationLiveBoards') or []
+                update_time = data.get('UpdateTime', '')
+            elif isinstance(data, list):
+                trains_data, update_time = data, ''
+            else:
+                logger.error(f"台鐵全線電子看板資料格式不正確: {type(data)}")
+                return None
             
-            # 準備認證資料
-            auth_url = "https://tdx.transportdata.tw/auth/realms/TDXConnect/protocol/openid-connect/token"
+            stations: Dict[str, List[Dict[str, Any]]] = {}
+            names: Dict[str, str] = {}
+            for train in trains_data:
+                station_id = train.get('StationID')
+                if not station_id:
+                    continue
+                stations.setdefault(station_id, []).append(train)
+                station_name = (train.get('StationName') or {}).get('Zh_tw')
+                if station_name:
+                    names.setdefault(station_name, station_id)
             
-            # 建立 Basic Authentication
-            credentials = f"{self.tdx_client_id}:{self.tdx_client_secret}"
-            encoded_credentials = base64.b64encode(credentials.encode()).decode()
+            logger.info(f"✅ 台鐵全線電子看板快照已更新: {len(stations)} 站 / {len(trains_data)} 筆列車")
+            return {'stations': stations, 'names': names, 'update_time': update_time, 'count': len(trains_data)}
             
+        except Exception as e:
+            logger.error(f"取得台鐵全線電子看板資料時發生錯誤: {str(e)}")
+            return None
+
+    async def get_tra_station_liveboard(self, station_id: str, station_name: str = None) -> Optional[List[Dict[str, Any]]]:
+        """從全線快照取出單一車站的列車 (快照無法取得時回傳 None)"""
+        snapshot = await self.fetch_tra_liveboard_snapshot()
+        if not snapshot:
+            return None
+        trains = snapshot['stations'].get(station_id)
+        if trains is None and station_name:
+            # 車站代碼對不上時改以站名查找
+            trains = snapshot['stations'].get(snapshot['names'].get(station_name, ''))
+        return list(trains or [])
+
+    async def fetch_tra_delay_snapshot(self, force_refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """取得台鐵全線誤點快照 (每個更新間隔最多向 TDX 請求一次)"""
+        return await self.tra_delay_cache.get_or_fetch(
+            "network", self._request_tra_delay_snapshot, force_refresh=force_refresh
+        )
+
+    @coalesce('tra_delay_snapshot')
+    async def _request_tra_delay_snapshot(self) -> Optional[Dict[str, Any]]:
+        """向 TDX 請求全線 LiveTrainDelay (不加篩選)，並建立車站與縣市索引
+
+        每筆誤點列車依起點站、終點站與目前所在車站歸入對應的車站與縣市；
+        所有清單都已依誤點時間由高到低排序，查詢時直接取用即可
+
+        Returns:
+            {'all': [列車], 'by_station': {StationID: [列車]}, 'by_county': {縣市: [列車]}, 'count': 全部列車筆數}
+        """
+        try:
+            url = "https://tdx.transportdata.tw/api/basic/v2/Rail/TRA/LiveTrainDelay?%24format=JSON"
             headers = {
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'Authorization': f'Basic {encoded_credentials}'
+                'Accept': 'application/json',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
             }
             
-            data = 'grant_type=client_credentials'
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status != 200:
+                    logger.error(f"台鐵全線誤點資料請求失敗: HTTP {response.status}")
+                    return None
+                data = await response.json()
             
-            logger.info("正在取得 TDX 存取權杖...")
+            if not isinstance(data, list):
+                logger.error(f"台鐵全線誤點資料格式不正確: {type(data)}")
+                return None
+            
+            # 車站代碼 → 縣市
+            station_county = {
+                station['id']: county
+                for county, stations in (await self.get_updated_tra_stations()).items()
+                for station in stations
+            }
+            
+            # 只保留有誤點的列車，按誤點時間排序（由高到低），之後依序放入各索引即維持相同順序
+            delayed = sorted(
+                (train for train in data if (train.get('DelayTime') or 0) > 0),
+                key=lambda train: train.get('DelayTime', 0), reverse=True
+            )
+            by_station: Dict[str, List[Dict[str, Any]]] = {}
+            by_county: Dict[str, List[Dict[str, Any]]] = {}
+            for train in delayed:
+                station_ids = {
+                    (train.get('OriginStopTime') or {}).get('StationID'),
+                    (train.get('DestinationStopTime') or {}).get('StationID'),
+                    train.get('StationID'),
+                }
+                station_ids.discard(None)
+                for station_id in station_ids:
+                    by_station.setdefault(station_id, []).append(train)
+                for county in {station_county.get(station_id) for station_id in station_ids} - {None}:
+                    by_county.setdefault(county, []).append(train)
+            
+            logger.info(f"✅ 台鐵全線誤點快照已更新: {len(delayed)} / {len(data)} 班列車誤點")
+            return {'all': delayed, 'by_station': by_station, 'by_county': by_county, 'count': len(data)}
             
-            # 使用 aiohttp 發送請求
-            async with self.session.post(auth_url, headers=headers, data=data) as response:
-                if response.status == 200:
-                    token_data = await response.json()
-                    
-                    self.tdx_access_token = token_data.get('access_token')
-                    expires_in = token_data.get('expires_in', 3600)  # 預設1小時
-                    self.tdx_token_expires_at = current_time + expires_in
-                    
-                    logger.info("✅ 成功取得 TDX 存取權杖")
-                    return self.tdx_access_token
-                else:
-                    error_text = await response.text()
-                    logger.error(f"❌ 取得 TDX 存取權杖失敗: {response.status} - {error_text}")
-                    return None
-                    
         except Exception as e:
-            logger.error(f"取得 TDX 存取權杖時發生錯誤: {str(e)}")
+            logger.error(f"取得台鐵全線誤點資料時發生錯誤: {str(e)}")
             return None
 
+    async def get_tdx_access_token(self) -> Optional[str]:
+        """取得 TDX API 存取權杖 (由共用的權杖管理器處理快取、加鎖與續期)"""
+        return await self.tdx.get_token()
+
+    @coalesce('rail_alerts')
     async def fetch_rail_alerts(self, rail_type: str = "tra") -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得鐵路事故資料"""
         try:
@@ -1600,7 +1701,7 @@ class InfoCommands(commands.Cog):
             
             # 使用非同步請求獲取資料
             logger.info(f"正在發送認證請求到 {url}")
-            async with self.session.get(url, headers=headers, timeout=30) as response:
+            async with self.tdx.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status == 200:
                     try:
                         data = await response.json()
@@ -1640,6 +1741,7 @@ class InfoCommands(commands.Cog):
             logger.error(f"獲取{rail_type.upper()}事故資料時發生錯誤: {str(e)}")
             return None
 
+    @coalesce('tra_news')
     async def fetch_tra_news(self) -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得台鐵最新消息"""
         try:
@@ -1661,7 +1763,7 @@ class InfoCommands(commands.Cog):
             
             # 使用非同步請求獲取資料
             logger.info(f"正在發送認證請求到 {url}")
-            async with self.session.get(url, headers=headers, timeout=30) as response:
+            async with self.tdx.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status == 200:
                     try:
                         data = await response.json()
@@ -1727,6 +1829,7 @@ class InfoCommands(commands.Cog):
             logger.error(f"獲取台鐵新聞時發生錯誤: {str(e)}")
             return None
 
+    @coalesce('thsr_news')
     async def fetch_thsr_news(self) -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得高鐵最新消息"""
         try:
@@ -1748,7 +1851,7 @@ class InfoCommands(commands.Cog):
             
             # 使用非同步請求獲取資料
             logger.info(f"正在發送認證請求到 {url}")
-            async with self.session.get(url, headers=headers, timeout=30) as response:
+            async with self.tdx.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status == 200:
                     try:
                         data = await response.json()
@@ -1789,6 +1892,7 @@ class InfoCommands(commands.Cog):
             logger.error(f"獲取高鐵新聞時發生錯誤: {str(e)}")
             return None
 
+    @coalesce('metro_alerts')
     async def fetch_metro_alerts(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得捷運系統事故資料"""
         try:
@@ -1823,7 +1927,7 @@ class InfoCommands(commands.Cog):
             
             # 使用非同步請求獲取資料
             logger.info(f"正在發送認證請求到 {url}")
-            async with self.session.get(url, headers=headers, timeout=30) as response:
+            async with self.tdx.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=30)) as response:
                 if response.status == 200:
                     try:
                         data = await response.json()
@@ -2421,10 +2525,20 @@ class InfoCommands(commands.Cog):
             logger.error(f"捷運狀態指令執行時發生錯誤: {str(e)}")
             await interaction.followup.send("❌ 執行指令時發生錯誤，請稍後再試。")
 
-    async def fetch_metro_liveboard(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
+    async def get_metro_snapshot(self, metro_system: str = "TRTC") -> Optional[MetroSnapshot]:
+        """取得捷運系統最新的看板快照 (由快照服務在背景保持新鮮，通常只是讀取記憶體)"""
+        return await self.metro_snapshots.get(metro_system)
+
+    async def fetch_metro_liveboard(self, metro_system: str = "TRTC", force_refresh: bool = False) -> Optional[List[Dict[str, Any]]]:
+        """取得捷運車站即時到離站電子看板資料 (保留給舊腳本使用，視圖請改用 get_metro_snapshot)"""
+        snapshot = await (self.metro_snapshots.refresh(metro_system) if force_refresh else self.get_metro_snapshot(metro_system))
+        return list(snapshot.stations) if snapshot is not None else None
+
+    @coalesce('metro_liveboard')
+    async def _request_metro_liveboard(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得捷運車站即時到離站電子看板資料"""
         try:
-            logger.info(f"正在從TDX平台取得{metro_system}車站即時電子看板資料...")
+            logger.debug(f"正在從TDX平台取得{metro_system}車站即時電子看板資料...")
             
             # 取得access token
             access_token = await self.get_tdx_access_token()
@@ -2450,75 +2564,69 @@ class InfoCommands(commands.Cog):
                 logger.error(f"不支援的捷運系統: {metro_system}")
                 return None
             
+            # 方向對照表只讀取快取中現有的路線車站序列 (不發請求)，由每日預取負責更新
+            self.metro_directions.load(metro_system, self.metro_reference.current(metro_system).directions)
+            
             headers = {
                 'Authorization': f'Bearer {access_token}',
                 'Accept': 'application/json',
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
             }
             
-            # 建立SSL連接
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"成功取得{metro_system}車站電子看板資料，共{len(data)}筆")
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.debug(f"成功取得{metro_system}車站電子看板資料，共{len(data)}筆")
                         
-                        # 詳細統計分析
-                        if data and len(data) > 0:
-                            # 統計各路線資料
-                            line_stats = {}
-                            stations_with_data = 0
-                            stations_without_data = 0
+                    # 詳細統計分析 (背景每次輪詢都會執行，只在除錯時記錄)
+                    if data and logger.isEnabledFor(logging.DEBUG):
+                        # 統計各路線資料
+                        line_stats = {}
+                        stations_with_data = 0
+                        stations_without_data = 0
                             
-                            for station in data:
-                                line_id = station.get('LineID', '未知路線')
-                                if line_id not in line_stats:
-                                    line_stats[line_id] = 0
-                                line_stats[line_id] += 1
+                        for station in data:
+                            line_id = station.get('LineID', '未知路線')
+                            if line_id not in line_stats:
+                                line_stats[line_id] = 0
+                            line_stats[line_id] += 1
                                 
-                                # 檢查是否有實際的列車資料
-                                live_boards = station.get('LiveBoards', [])
-                                if live_boards:
-                                    stations_with_data += 1
-                                else:
-                                    stations_without_data += 1
+                            # 檢查是否有實際的列車資料
+                            live_boards = station.get('LiveBoards', [])
+                            if live_boards:
+                                stations_with_data += 1
+                            else:
+                                stations_without_data += 1
                             
-                            logger.info(f"{metro_system} 資料統計:")
-                            logger.info(f"  總車站數: {len(data)}")
-                            logger.info(f"  有列車資料的車站: {stations_with_data}")
-                            logger.info(f"  無列車資料的車站: {stations_without_data}")
-                            logger.info(f"  各路線分布: {line_stats}")
+                        logger.debug(f"{metro_system} 資料統計:")
+                        logger.debug(f"  總車站數: {len(data)}")
+                        logger.debug(f"  有列車資料的車站: {stations_with_data}")
+                        logger.debug(f"  無列車資料的車站: {stations_without_data}")
+                        logger.debug(f"  各路線分布: {line_stats}")
                             
-                            # 調試：記錄第一筆資料的結構
-                            first_station = data[0]
-                            logger.debug(f"第一筆車站資料結構: {list(first_station.keys())}")
+                        # 調試：記錄第一筆資料的結構
+                        first_station = data[0]
+                        logger.debug(f"第一筆車站資料結構: {list(first_station.keys())}")
                             
-                            # 檢查LiveBoards結構
-                            live_boards = first_station.get('LiveBoards', [])
-                            if live_boards and len(live_boards) > 0:
-                                first_board = live_boards[0]
-                                logger.debug(f"第一筆LiveBoard資料結構: {list(first_board.keys())}")
-                                logger.debug(f"LiveBoard內容範例: {first_board}")
-                            else:
-                                logger.debug("該車站沒有LiveBoard資料")
+                        # 檢查LiveBoards結構
+                        live_boards = first_station.get('LiveBoards', [])
+                        if live_boards and len(live_boards) > 0:
+                            first_board = live_boards[0]
+                            logger.debug(f"第一筆LiveBoard資料結構: {list(first_board.keys())}")
+                            logger.debug(f"LiveBoard內容範例: {first_board}")
                         else:
-                            logger.warning(f"{metro_system} 沒有收到任何車站資料")
+                            logger.debug("該車站沒有LiveBoard資料")
+                    elif not data:
+                        logger.debug(f"{metro_system} 沒有收到任何車站資料")
                         
-                        # 處理資料：將LiveBoards分類為上行/下行列車
-                        processed_data = self._process_metro_liveboard_data(data, metro_system)
-                        return processed_data
-                    else:
-                        logger.error(f"TDX API請求失敗: HTTP {response.status}")
-                        response_text = await response.text()
-                        logger.error(f"錯誤回應: {response_text}")
-                        return None
+                    # 處理資料：依方向對照表將列車分類為上行/下行
+                    processed_data = self._process_metro_liveboard_data(data, metro_system)
+                    return processed_data
+                else:
+                    logger.error(f"TDX API請求失敗: HTTP {response.status}")
+                    response_text = await response.text()
+                    logger.error(f"錯誤回應: {response_text}")
+                    return None
                         
         except asyncio.TimeoutError:
             logger.error("TDX API請求超時")
@@ -2529,181 +2637,111 @@ class InfoCommands(commands.Cog):
         
         return None
 
+    async def fetch_metro_direction_table(self, metro_system: str = "TRTC") -> Optional[Dict[str, Dict[str, str]]]:
+        """取得捷運系統的方向對照表 {路線代碼: {車站代碼: 方向}} (由參考資料索引編譯，每日更新)"""
+        index = await self.metro_reference.get(metro_system, (STATION_OF_LINE,))
+        return index.directions or None
+
     def _process_metro_liveboard_data(self, raw_data: List[Dict[str, Any]], metro_system: str) -> List[Dict[str, Any]]:
-        """處理捷運即時電子看板資料，將LiveBoards分類為上行/下行列車"""
+        """處理捷運即時電子看板資料：依方向對照表標記每筆列車的方向 (Direction)，
+        並將車站的 LiveBoards 分類為上行/下行列車；無法判斷方向的列車放在上行"""
         try:
             processed_stations = []
-            
-            # 定義各路線的終點站（用於判斷方向）
-            terminal_stations = {
-                'TRTC': {  # 台北捷運
-                    'BR': {'up': ['南港展覽館'], 'down': ['動物園']},
-                    'BL': {'up': ['頂埔', '永寧'], 'down': ['南港展覽館', '昆陽']},
-                    'R': {'up': ['淡水'], 'down': ['象山', '信義']},
-                    'G': {'up': ['松山'], 'down': ['新店']},
-                    'O': {'up': ['蘆洲', '回龍'], 'down': ['南勢角']},
-                    'Y': {'up': ['大坪林'], 'down': ['新北產業園區']},
-                    'LG': {'up': ['十四張'], 'down': ['頂埔']},
-                    'V': {'up': ['淡海新市鎮'], 'down': ['紅樹林']}
-                },
-                'KRTC': {  # 高雄捷運
-                    'RO': {'up': ['小港'], 'down': ['南岡山']},
-                    'OR': {'up': ['哈瑪星', '西子灣'], 'down': ['大寮']},
-                    'R': {'up': ['小港'], 'down': ['南岡山']},
-                    'O': {'up': ['哈瑪星', '西子灣'], 'down': ['大寮']}
-                },
-                'KLRT': {  # 高雄輕軌
-                    'C': {'up': ['愛河之心', '文武聖殿'], 'down': ['哈瑪星', '駁二大義']}
-                }
-            }
-            
-            system_terminals = terminal_stations.get(metro_system, {})
+            classify = self.metro_directions.classify
             
             for station in raw_data:
-                # 取得基本車站資訊
                 station_copy = station.copy()
                 line_id = station.get('LineID', '')
-                live_boards = station.get('LiveBoards', [])
                 
-                # 初始化上行/下行列車列表
+                # 每筆看板資料本身就是一班列車 (含終點站) 時直接標記方向
+                if 'DestinationStationID' in station:
+                    station_copy['Direction'] = classify(metro_system, line_id, station.get('DestinationStationID'))
+                
                 up_trains = []
                 down_trains = []
-                
-                # 取得該路線的終點站資訊
-                line_terminals = system_terminals.get(line_id, {'up': [], 'down': []})
-                up_terminals = line_terminals.get('up', [])
-                down_terminals = line_terminals.get('down', [])
-                
-                # 處理每個LiveBoard
-                for board in live_boards:
-                    dest_name_info = board.get('DestinationStationName', {})
-                    if isinstance(dest_name_info, dict):
-                        dest_name = dest_name_info.get('Zh_tw', '')
-                    else:
-                        dest_name = str(dest_name_info)
-                    
-                    # 判斷方向
-                    is_up = False
-                    is_down = False
-                    
-                    # 根據目的地判斷方向
-                    for up_terminal in up_terminals:
-                        if up_terminal in dest_name or dest_name in up_terminal:
-                            is_up = True
-                            break
-                    
-                    if not is_up:
-                        for down_terminal in down_terminals:
-                            if down_terminal in dest_name or dest_name in down_terminal:
-                                is_down = True
-                                break
-                    
-                    # 如果無法明確判斷，使用簡單的規則
-                    if not is_up and not is_down:
-                        # 根據路線和常見模式判斷
-                        if metro_system == 'TRTC':
-                            if line_id in ['R', 'BR'] and any(keyword in dest_name for keyword in ['淡水', '動物園', '南港']):
-                                is_up = '淡水' in dest_name or '南港' in dest_name
-                                is_down = '動物園' in dest_name or '象山' in dest_name
-                            elif line_id in ['BL'] and any(keyword in dest_name for keyword in ['頂埔', '永寧', '南港']):
-                                is_up = '頂埔' in dest_name or '永寧' in dest_name
-                                is_down = '南港' in dest_name
-                            else:
-                                # 預設分類：奇數班次為上行，偶數為下行
-                                estimate_time = board.get('EstimateTime', 0)
-                                is_up = (estimate_time % 2) == 0
-                                is_down = not is_up
-                        elif metro_system == 'TRTC':
-                            # 台北捷運特殊判斷
-                            if line_id in ['BL']:
-                                # 板南線：往頂埔/永寧為上行，往南港展覽館為下行
-                                if '頂埔' in dest_name or '永寧' in dest_name:
-                                    is_up = True
-                                elif '南港展覽館' in dest_name or '昆陽' in dest_name or '南港' in dest_name:
-                                    is_down = True
-                            elif line_id in ['BR']:
-                                # 文湖線：往南港展覽館為上行，往動物園為下行
-                                if '南港展覽館' in dest_name or '南港' in dest_name:
-                                    is_up = True
-                                elif '動物園' in dest_name:
-                                    is_down = True
-                            elif line_id in ['R']:
-                                # 淡水信義線：往淡水為上行，往象山/信義為下行
-                                if '淡水' in dest_name:
-                                    is_up = True
-                                elif '象山' in dest_name or '信義' in dest_name:
-                                    is_down = True
-                            elif line_id in ['G']:
-                                # 松山新店線：往松山為上行，往新店為下行
-                                if '松山' in dest_name:
-                                    is_up = True
-                                elif '新店' in dest_name:
-                                    is_down = True
-                            elif line_id in ['O']:
-                                # 中和新蘆線：往蘆洲/回龍為上行，往南勢角為下行
-                                if '蘆洲' in dest_name or '回龍' in dest_name:
-                                    is_up = True
-                                elif '南勢角' in dest_name:
-                                    is_down = True
-                        elif metro_system == 'KRTC':
-                            # 高雄捷運特殊判斷
-                            if line_id in ['O', 'OR']:
-                                # 橘線：往哈瑪星為上行，往大寮為下行
-                                if '哈瑪星' in dest_name or '西子灣' in dest_name:
-                                    is_up = True
-                                elif '大寮' in dest_name:
-                                    is_down = True
-                            elif line_id in ['R', 'RO']:
-                                # 紅線：往小港為上行，往南岡山為下行
-                                if '小港' in dest_name:
-                                    is_up = True
-                                elif '南岡山' in dest_name:
-                                    is_down = True
-                        
-                        # 如果還是無法判斷，使用預設邏輯
-                        if not is_up and not is_down:
-                            estimate_time = board.get('EstimateTime', 0)
-                            is_up = (estimate_time % 2) == 0
-                            is_down = not is_up
-                        else:
-                            # 其他系統的預設分類
-                            estimate_time = board.get('EstimateTime', 0)
-                            is_up = (estimate_time % 2) == 0
-                            is_down = not is_up
-                    
-                    # 將列車分類到對應方向
-                    if is_up:
-                        up_trains.append(board)
-                    elif is_down:
+                for board in station.get('LiveBoards', []):
+                    if classify(metro_system, line_id, board.get('DestinationStationID')) == DIRECTION_DOWN:
                         down_trains.append(board)
                     else:
-                        # 如果還是無法分類，預設放到上行
                         up_trains.append(board)
                 
-                # 添加分類後的列車資料到車站
                 station_copy['up_trains'] = up_trains
                 station_copy['down_trains'] = down_trains
-                
                 processed_stations.append(station_copy)
                 
-            logger.info(f"處理完成：{len(processed_stations)}個車站的方向分類")
-            
-            # 統計分類結果
-            total_up = sum(len(s.get('up_trains', [])) for s in processed_stations)
-            total_down = sum(len(s.get('down_trains', [])) for s in processed_stations)
-            logger.info(f"方向分類結果：上行 {total_up} 班，下行 {total_down} 班")
-            
+            logger.debug(f"處理完成：{len(processed_stations)}個車站的方向分類")
             return processed_stations
             
         except Exception as e:
             logger.error(f"處理捷運電子看板資料時發生錯誤: {str(e)}")
             return raw_data  # 如果處理失敗，返回原始資料
 
+    @staticmethod
+    def _group_metro_trains(liveboard_data: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """將看板資料按路線、車站分組：{路線: {車站代碼: {'StationName', 'trains', 'up_trains', 'strict_up_trains', 'down_trains'}}}
+
+        up_trains 含無法判斷方向的列車 (顯示全部方向時放在上行)，strict_up_trains 只含確定為上行的列車
+        """
+        lines_data: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for train_data in liveboard_data:
+            line_id = train_data.get('LineID', '未知路線')
+            station_id = train_data.get('StationID', '未知車站')
+            station_info = lines_data.setdefault(line_id, {}).setdefault(station_id, {
+                'StationName': train_data.get('StationName', {}),
+                'trains': [],
+                'up_trains': [],
+                'strict_up_trains': [],
+                'down_trains': [],
+            })
+            station_info['trains'].append(train_data)
+            
+            # 方向已在處理看板資料時依方向對照表判斷
+            direction = train_data.get('Direction')
+            if direction == 'down':
+                station_info['down_trains'].append(train_data)
+            else:
+                station_info['up_trains'].append(train_data)
+                if direction == 'up':
+                    station_info['strict_up_trains'].append(train_data)
+        return lines_data
+
+    def _metro_train_groups(self, liveboard_data) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """取得看板資料的分組結果；傳入快照時每個快照只分組一次"""
+        if isinstance(liveboard_data, MetroSnapshot):
+            return liveboard_data.derived('train_groups', self._group_metro_trains)
+        return self._group_metro_trains(liveboard_data)
+
+    def _render_metro_embed(self, key: Tuple, render: Callable[[], Optional[discord.Embed]]) -> Optional[discord.Embed]:
+        """以 (種類, 系統, 快照版本, 視圖狀態...) 為鍵快取建好的嵌入訊息
+
+        每次都回傳新的 Embed 物件，呼叫端可以再修改 (例如加上「資料已刷新」)
+        """
+        def build():
+            embed = render()
+            return embed.to_dict() if embed else None
+        
+        data = self.metro_render_cache.get_or_compute(key, build)
+        return discord.Embed.from_dict(copy.deepcopy(data)) if data else None
+
+    def render_metro_liveboard_by_direction(self, snapshot: MetroSnapshot, system_name: str, selected_line: str = None, direction_filter: str = None) -> Optional[discord.Embed]:
+        """format_metro_liveboard_by_direction 的快取版本"""
+        return self._render_metro_embed(
+            ('direction', snapshot.system, snapshot.version, selected_line, direction_filter),
+            lambda: self.format_metro_liveboard_by_direction(snapshot, snapshot.system, system_name, selected_line, direction_filter)
+        )
+
+    def render_metro_liveboard_by_line(self, snapshot: MetroSnapshot, system_name: str, selected_line: str = None) -> Optional[discord.Embed]:
+        """format_metro_liveboard_by_line 的快取版本"""
+        return self._render_metro_embed(
+            ('line', snapshot.system, snapshot.version, selected_line),
+            lambda: self.format_metro_liveboard_by_line(snapshot, snapshot.system, system_name, selected_line)
+        )
+
     def format_metro_liveboard_by_direction(self, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str, selected_line: str = None, direction_filter: str = None) -> Optional[discord.Embed]:
         """將捷運車站即時電子看板資料按方向分類格式化為Discord嵌入訊息
         
         Args:
-            liveboard_data: 即時電子看板資料
+            liveboard_data: 即時電子看板資料 (或看板快照，分組結果會保留在快照中)
             metro_system: 捷運系統代碼
             system_name: 捷運系統名稱
             selected_line: 選擇的路線
@@ -2727,73 +2765,32 @@ class InfoCommands(commands.Cog):
                 'KLRT': 0x00A651   # 高雄輕軌綠
             }
             
-            # 定義各路線的終點站，用於判斷方向
-            line_terminals = {
-                # 台北捷運
-                'R': ['淡水', '象山'],  # 淡水信義線
-                'G': ['松山', '新店'],  # 松山新店線
-                'O': ['南勢角', '迴龍'],  # 中和新蘆線
-                'BL': ['頂埔', '南港展覽館'],  # 板南線
-                'BR': ['動物園', '南港展覽館'],  # 文湖線
-                'Y': ['大坪林', '新北產業園區'],  # 環狀線
-                # 高雄捷運
-                'RO': ['小港', '南岡山'],  # 紅線
-                'OR': ['西子灣', '大寮'],  # 橘線
-                # 高雄輕軌
-                'C': ['籬仔內', '哈瑪星']  # 環狀輕軌
-            }
-            
             color = colors.get(metro_system, 0x3498DB)
             
-            # 按路線、車站和方向分組資料
-            lines_data = {}
-            for train_data in liveboard_data:
-                line_id = train_data.get('LineID', '未知路線')
-                station_id = train_data.get('StationID', '未知車站')
-                
-                # 取得目的地名稱來判斷方向
-                destination = train_data.get('DestinationStationName', {})
-                if isinstance(destination, dict):
-                    dest_name = destination.get('Zh_tw', '未知目的地')
-                else:
-                    dest_name = str(destination)
-                
-                # 判斷方向
-                direction = 'unknown'
-                if line_id in line_terminals:
-                    terminals = line_terminals[line_id]
-                    if len(terminals) >= 2:
-                        if dest_name in terminals[1:]:  # 往後面的終點站為上行
-                            direction = 'up'
-                        elif dest_name in terminals[:1]:  # 往前面的終點站為下行
-                            direction = 'down'
-                
-                # 如果有方向過濾，跳過不符合的資料
-                if direction_filter and direction != direction_filter:
-                    continue
-                
-                if line_id not in lines_data:
-                    lines_data[line_id] = {}
-                
-                if station_id not in lines_data[line_id]:
-                    lines_data[line_id][station_id] = {
-                        'StationName': train_data.get('StationName', {}),
-                        'up_trains': [],
-                        'down_trains': []
+            # 按路線、車站和方向分組資料 (每個快照只分組一次)，再依方向過濾
+            grouped = self._metro_train_groups(liveboard_data)
+            
+            def filter_line(stations: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+                if not direction_filter:
+                    return stations
+                key = 'strict_up_trains' if direction_filter == 'up' else 'down_trains'
+                # 只保留有該方向列車的車站
+                return {
+                    station_id: {
+                        'StationName': info['StationName'],
+                        'up_trains': info[key] if direction_filter == 'up' else [],
+                        'down_trains': info[key] if direction_filter == 'down' else [],
                     }
-                
-                # 根據方向添加列車資訊
-                if direction == 'up':
-                    lines_data[line_id][station_id]['up_trains'].append(train_data)
-                elif direction == 'down':
-                    lines_data[line_id][station_id]['down_trains'].append(train_data)
-                else:
-                    # 方向不明的資料放在上行
-                    lines_data[line_id][station_id]['up_trains'].append(train_data)
+                    for station_id, info in stations.items() if info[key]
+                }
             
             # 如果指定了路線，只顯示該路線
-            if selected_line and selected_line in lines_data:
-                lines_data = {selected_line: lines_data[selected_line]}
+            selected_stations = filter_line(grouped[selected_line]) if selected_line in grouped else {}
+            if selected_line and selected_stations:
+                lines_data = {selected_line: selected_stations}
+            else:
+                lines_data = {line_id: filtered for line_id, filtered in
+                              ((line_id, filter_line(stations)) for line_id, stations in grouped.items()) if filtered}
             
             direction_text = ""
             if direction_filter == 'up':
@@ -3045,7 +3042,7 @@ class InfoCommands(commands.Cog):
             return ""
 
     def format_metro_liveboard_by_line(self, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str, selected_line: str = None) -> Optional[discord.Embed]:
-        """將捷運車站即時電子看板資料按路線分類格式化為Discord嵌入訊息"""
+        """將捷運車站即時電子看板資料 (或看板快照) 按路線分類格式化為Discord嵌入訊息"""
         try:
             if not liveboard_data:
                 embed = discord.Embed(
@@ -3078,23 +3075,8 @@ class InfoCommands(commands.Cog):
             
             color = colors.get(metro_system, 0x3498DB)
             
-            # 按路線和車站分組重新整理資料
-            lines_data = {}
-            for train_data in liveboard_data:
-                line_id = train_data.get('LineID', '未知路線')
-                station_id = train_data.get('StationID', '未知車站')
-                
-                if line_id not in lines_data:
-                    lines_data[line_id] = {}
-                
-                if station_id not in lines_data[line_id]:
-                    lines_data[line_id][station_id] = {
-                        'StationName': train_data.get('StationName', {}),
-                        'trains': []
-                    }
-                
-                # 添加列車資訊
-                lines_data[line_id][station_id]['trains'].append(train_data)
+            # 按路線和車站分組 (每個快照只分組一次)
+            lines_data = self._metro_train_groups(liveboard_data)
             
             # 如果指定了路線，只顯示該路線
             if selected_line and selected_line in lines_data:
@@ -3412,10 +3394,76 @@ class InfoCommands(commands.Cog):
             except discord.errors.NotFound:
                 logger.warning(f"metro_direction 指令在發送錯誤訊息時互動已過期")
 
+    @app_commands.command(name='metro_station', description='搜尋捷運車站並直接查看即時到離站資訊')
+    @app_commands.describe(station='輸入車站名稱、英文站名或車站代碼 (可使用自動完成，涵蓋所有捷運系統)')
+    async def metro_station(self, interaction: discord.Interaction, station: str):
+        """以跨系統車站索引直接開啟單一捷運車站的即時看板"""
+        await interaction.response.defer()
+        
+        try:
+            logger.info(f"使用者 {interaction.user} 搜尋捷運車站: {station}")
+            index = await self.get_metro_station_index()
+            target = index.resolve(station)
+            
+            if not target:
+                embed = discord.Embed(
+                    title="🚇 車站未找到",
+                    description=f"找不到捷運車站 '{station}'",
+                    color=0xFF9900
+                )
+                candidates = index.search(station, limit=10)
+                if candidates:
+                    embed.add_field(
+                        name="您是不是要找",
+                        value="\n".join(f"• {candidate.label()}" for candidate in candidates),
+                        inline=False
+                    )
+                await interaction.followup.send(embed=embed)
+                return
+            
+            snapshot = await self.get_metro_snapshot(target.system)
+            if snapshot is None:
+                embed = discord.Embed(
+                    title=f"🚇 {target.name}",
+                    description=f"❌ 目前無法取得{target.system_name}即時電子看板資料，請稍後再試。",
+                    color=0xFF0000
+                )
+                embed.set_footer(text="資料來源: TDX運輸資料流通服務")
+                await interaction.followup.send(embed=embed)
+                return
+            
+            view = MetroSingleStationView(
+                cog=self,
+                user_id=interaction.user.id,
+                snapshot=snapshot,
+                station_id=target.id,
+                system_name=target.system_name,
+                line_id=target.line_id,
+                station_name=target.name
+            )
+            await interaction.followup.send(embed=view.create_station_embed(), view=view)
+            
+        except Exception as e:
+            logger.error(f"metro_station 指令執行時發生錯誤: {str(e)}")
+            await interaction.followup.send("❌ 執行指令時發生錯誤，請稍後再試。")
+
+    @metro_station.autocomplete('station')
+    async def metro_station_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """捷運車站自動完成 (只查記憶體索引，不等待上游)"""
+        try:
+            candidates = self._refresh_metro_station_index().search(current, limit=25)
+            return [
+                app_commands.Choice(name=candidate.label()[:100], value=candidate.key)
+                for candidate in candidates
+            ]
+        except Exception as e:
+            logger.error(f"捷運車站自動完成時發生錯誤: {str(e)}")
+            return []
+
     @app_commands.command(name='tra_liveboard', description='查詢台鐵車站即時電子看板')
     @app_commands.describe(
         county='選擇縣市',
-        station_name='選擇車站'
+        station_name='輸入車站名稱、英文站名或車站代碼 (可使用自動完成)'
     )
     @app_commands.choices(county=[
         app_commands.Choice(name=county, value=county) for county in TW_LOCATIONS
@@ -3442,32 +3490,37 @@ class InfoCommands(commands.Cog):
             
             stations = tra_stations[county.value]
             
-            # 如果指定了車站名稱，查找該車站
+            # 如果指定了車站名稱 (或自動完成選擇的車站代碼)，以索引查找該車站
             if station_name:
-                target_station = None
-                for station in stations:
-                    if station['name'] == station_name or station_name in station['name']:
-                        target_station = station
-                        break
+                index = self._refresh_tra_station_index(tra_stations)
+                target_station = (index.resolve(station_name, county=county.value)
+                                  or index.resolve(station_name))
                 
                 if not target_station:
-                    # 顯示該縣市可用的車站列表
-                    station_list = "\n".join([f"• {station['name']}" for station in stations])
                     embed = discord.Embed(
                         title="🚆 車站未找到",
                         description=f"在 {county.value} 找不到車站 '{station_name}'",
                         color=0xFF9900
                     )
-                    embed.add_field(
-                        name=f"{county.value} 可用車站",
-                        value=station_list,
-                        inline=False
-                    )
+                    # 列出最接近的候選車站 (不限縣市)，沒有候選時才顯示該縣市的車站列表
+                    candidates = index.search(station_name, limit=10)
+                    if candidates:
+                        embed.add_field(
+                            name="您是不是要找",
+                            value="\n".join(f"• {station.label()}" for station in candidates),
+                            inline=False
+                        )
+                    else:
+                        embed.add_field(
+                            name=f"{county.value} 可用車站",
+                            value="\n".join([f"• {station['name']}" for station in stations])[:1024],
+                            inline=False
+                        )
                     await interaction.followup.send(embed=embed)
                     return
                 
-                # 使用台鐵電子看板視圖
-                view = TRALiveboardView(interaction, county.value, target_station['name'], target_station['id'])
+                # 使用台鐵電子看板視圖 (以車站代碼查詢時可跨縣市)
+                view = TRALiveboardView(interaction, target_station.county, target_station.name, target_station.id)
                 await view.send_with_view()
                 
             else:
@@ -3490,6 +3543,26 @@ class InfoCommands(commands.Cog):
             logger.error(f"台鐵電子看板指令執行時發生錯誤: {str(e)}")
             await interaction.followup.send("❌ 執行指令時發生錯誤，請稍後再試。")
 
+    @tra_liveboard.autocomplete('station_name')
+    async def tra_liveboard_station_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """車站名稱自動完成 (只查記憶體索引，尚未建立時以內建資料建立)"""
+        try:
+            index = self.tra_station_index
+            if not len(index):
+                index = self._refresh_tra_station_index(get_builtin_tra_stations())
+            county = getattr(interaction.namespace, 'county', None)
+            candidates = index.search(current, county=county, limit=25)
+            # 指定縣市內沒有符合的車站時，改列出其他縣市的候選
+            if not candidates and county:
+                candidates = index.search(current, limit=25)
+            return [
+                app_commands.Choice(name=station.label()[:100], value=station.id)
+                for station in candidates
+            ]
+        except Exception as e:
+            logger.error(f"台鐵車站自動完成時發生錯誤: {str(e)}")
+            return []
+
     @app_commands.command(name='tra_delay', description='查詢台鐵列車誤點資訊')
     @app_commands.describe(county='選擇縣市 (可選，不選擇則查詢全台)')
     @app_commands.choices(county=[
@@ -3762,10 +3835,11 @@ class InfoCommands(commands.Cog):
         try:
             logger.info(f"使用者 {interaction.user} 查詢捷運車站設施: {metro_system.name}")
             
-            # 獲取車站設施資料
-            facility_data = await self.fetch_metro_facility(metro_system.value)
+            # 取得已按路線分組的車站設施索引
+            index = await self.metro_reference.get(metro_system.value, (FACILITY,))
+            lines_data = index.facility_lines
             
-            if facility_data is None or len(facility_data) == 0:
+            if not lines_data:
                 embed = discord.Embed(
                     title=f"🚇 {metro_system.name} 車站設施",
                     description="❌ 目前無法取得車站設施資料，請稍後再試。",
@@ -3775,52 +3849,6 @@ class InfoCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # 按路線分組
-            lines_data = {}
-            # 除錯：記錄第一筆資料的結構
-            if facility_data:
-                logger.info(f"🔍 捷運設施API回傳欄位: {list(facility_data[0].keys())}")
-                logger.info(f"🔍 第一筆資料範例: {facility_data[0]}")
-            
-            for station in facility_data:
-                # 嘗試多種可能的路線ID欄位名稱，並從StationID中提取路線資訊
-                line_id = (station.get('LineID') or 
-                          station.get('LineName') or 
-                          station.get('RouteID') or 
-                          station.get('RouteName') or 
-                          station.get('Line') or 
-                          station.get('Route'))
-                
-                # 如果沒找到，嘗試從StationID中提取路線資訊
-                if not line_id:
-                    station_id = station.get('StationID', '')
-                    logger.info(f"🔍 車站 {station.get('StationName', {station.get('StationID', '')})} StationID: {station_id}")
-                    if station_id:
-                        # 從BL14, R22, O07等格式中提取路線代碼
-                        import re
-                        match = re.match(r'^([A-Z]+)', station_id)
-                        if match:
-                            line_code = match.group(1)
-                            logger.info(f"🔍 提取到路線代碼: {line_code}")
-                            # 路線代碼對應
-                            line_mapping = {
-                                'BL': '板南線', 'BR': '文湖線', 'R': '淡水信義線', 
-                                'G': '松山新店線', 'O': '中和新蘆線', 'Y': '環狀線',
-                                'A': '機場線', 'AP': '機場線', 'TYMC': '桃園捷運'
-                            }
-                            line_id = line_mapping.get(line_code, f'{line_code}線')
-                            logger.info(f"🔍 對應到路線: {line_id}")
-                        else:
-                            logger.info(f"🔍 無法提取路線代碼")
-                            line_id = '未知路線'
-                    else:
-                        logger.info(f"🔍 無StationID")
-                        line_id = '未知路線'
-                
-                if line_id not in lines_data:
-                    lines_data[line_id] = []
-                lines_data[line_id].append(station)
-            
             # 創建路線選擇視圖
             view = MetroFacilityLineSelectionView(lines_data, interaction.user.id, metro_system.name, metro_system.value)
             
@@ -3832,7 +3860,7 @@ class InfoCommands(commands.Cog):
             
             # 列出所有路線
             line_list = []
-            for line_id in sorted(lines_data.keys()):
+            for line_id in lines_data:
                 station_count = len(lines_data[line_id])
                 line_list.append(f"🚉 **{line_id}** - {station_count} 個車站")
             
@@ -3869,10 +3897,10 @@ class InfoCommands(commands.Cog):
         try:
             logger.info(f"使用者 {interaction.user} 查詢捷運路網: {metro_system.name}")
             
-            # 獲取路網資料
-            network_data = await self.fetch_metro_network(metro_system.value)
+            # 取得路網索引
+            index = await self.metro_reference.get(metro_system.value, (NETWORK,))
             
-            if network_data is None or len(network_data) == 0:
+            if not index.network:
                 embed = discord.Embed(
                     title=f"🗺️ {metro_system.name} 路網資料",
                     description="❌ 目前無法取得路網資料，請稍後再試。",
@@ -3882,8 +3910,12 @@ class InfoCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # 使用分頁視圖顯示路網資料
-            view = MetroNetworkPaginationView(network_data, interaction.user.id, metro_system.name)
+            # 使用分頁視圖顯示路網資料 (每個索引版本只建立一次所有分頁)
+            pages = index.derived(
+                f'network_pages:{metro_system.name}',
+                lambda index: MetroNetworkPaginationView.build_pages(index.network, metro_system.name)
+            )
+            view = MetroNetworkPaginationView(pages, interaction.user.id, metro_system.name)
             embed = view.create_embed()
             await interaction.followup.send(embed=embed, view=view)
             
@@ -3895,6 +3927,7 @@ class InfoCommands(commands.Cog):
     # 捷運新聞查詢功能
     # ================================
     
+    @coalesce('metro_news')
     async def fetch_metro_news(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
         """從TDX平台取得捷運最新消息"""
         try:
@@ -3926,67 +3959,63 @@ class InfoCommands(commands.Cog):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
             }
             
-            # 建立SSL連接
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
                         
-                        # 處理不同的API回傳格式
-                        if data:
-                            # 如果回傳的是dict，嘗試提取新聞列表
-                            if isinstance(data, dict):
-                                logger.info(f"API回傳dict格式，鍵: {list(data.keys())}")
-                                # 常見的新聞列表鍵名
-                                possible_keys = ['News', 'news', 'data', 'Data', 'items', 'results']
-                                news_list = []
+                    # 處理不同的API回傳格式
+                    if data:
+                        # 如果回傳的是dict，嘗試提取新聞列表
+                        if isinstance(data, dict):
+                            logger.info(f"API回傳dict格式，鍵: {list(data.keys())}")
+                            # 常見的新聞列表鍵名
+                            possible_keys = ['News', 'news', 'data', 'Data', 'items', 'results']
+                            news_list = []
                                 
-                                for key in possible_keys:
-                                    if key in data and isinstance(data[key], list):
-                                        news_list = data[key]
-                                        logger.info(f"找到新聞列表於鍵 '{key}'，共{len(news_list)}筆")
-                                        break
+                            for key in possible_keys:
+                                if key in data and isinstance(data[key], list):
+                                    news_list = data[key]
+                                    logger.info(f"找到新聞列表於鍵 '{key}'，共{len(news_list)}筆")
+                                    break
                                 
-                                # 如果沒找到列表，將dict本身當作單一新聞項目
-                                if not news_list:
-                                    news_list = [data]
-                                    logger.info(f"將dict當作單一新聞項目處理")
+                            # 如果沒找到列表，將dict本身當作單一新聞項目
+                            if not news_list:
+                                news_list = [data]
+                                logger.info(f"將dict當作單一新聞項目處理")
                                 
-                                data = news_list
+                            data = news_list
                             
-                            # 按照發布時間排序,最新的在前面
-                            if isinstance(data, list):
-                                try:
-                                    data.sort(key=lambda x: x.get('PublishTime', x.get('NewsDate', '')), reverse=True)
-                                    logger.info(f"✅ 成功取得{metro_system}新聞資料，共{len(data)}筆 (已按時間排序)")
-                                except Exception as sort_error:
-                                    logger.warning(f"⚠️ 排序{metro_system}新聞時發生錯誤: {str(sort_error)}，使用原始順序")
-                                    logger.info(f"成功取得{metro_system}新聞資料，共{len(data)}筆")
-                            else:
-                                logger.warning(f"處理後資料仍非列表格式: {type(data)}")
-                                return None
+                        # 按照發布時間排序,最新的在前面
+                        if isinstance(data, list):
+                            try:
+                                data.sort(key=lambda x: x.get('PublishTime', x.get('NewsDate', '')), reverse=True)
+                                logger.info(f"✅ 成功取得{metro_system}新聞資料，共{len(data)}筆 (已按時間排序)")
+                            except Exception as sort_error:
+                                logger.warning(f"⚠️ 排序{metro_system}新聞時發生錯誤: {str(sort_error)}，使用原始順序")
+                                logger.info(f"成功取得{metro_system}新聞資料，共{len(data)}筆")
                         else:
-                            logger.info(f"API回傳空資料")
+                            logger.warning(f"處理後資料仍非列表格式: {type(data)}")
                             return None
-                        
-                        return data
                     else:
-                        logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
+                        logger.info(f"API回傳空資料")
                         return None
                         
+                    return data
+                else:
+                    logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
+                    return None
+                        
         except Exception as e:
             logger.error(f"取得捷運新聞時發生錯誤: {str(e)}")
             return None
 
     async def fetch_metro_facility(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
-        """從TDX平台取得捷運車站設施資料"""
+        """從TDX平台取得捷運車站設施資料 (含持久化快取)"""
+        return await self.metro_reference.fetch_dataset(metro_system, FACILITY)
+
+    @coalesce('metro_facility')
+    async def _request_metro_facility(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
+        """向TDX平台請求捷運車站設施資料"""
         try:
             logger.info(f"正在從TDX平台取得{metro_system}車站設施資料...")
             
@@ -4005,30 +4034,26 @@ class InfoCommands(commands.Cog):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            # 建立SSL連接
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"✅ 成功取得{metro_system}車站設施資料，共{len(data) if data else 0}筆")
-                        return data
-                    else:
-                        logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
-                        return None
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.info(f"✅ 成功取得{metro_system}車站設施資料，共{len(data) if data else 0}筆")
+                    return data
+                else:
+                    logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
+                    return None
                         
         except Exception as e:
             logger.error(f"取得捷運車站設施資料時發生錯誤: {str(e)}")
             return None
 
     async def fetch_metro_network(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
-        """從TDX平台取得捷運路網資料"""
+        """從TDX平台取得捷運路網資料 (含持久化快取)"""
+        return await self.metro_reference.fetch_dataset(metro_system, NETWORK)
+
+    @coalesce('metro_network')
+    async def _request_metro_network(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
+        """向TDX平台請求捷運路網資料"""
         try:
             logger.info(f"正在從TDX平台取得{metro_system}路網資料...")
             
@@ -4047,55 +4072,73 @@ class InfoCommands(commands.Cog):
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            # 建立SSL連接
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            timeout = aiohttp.ClientTimeout(total=30)
-            
-            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"✅ 成功取得{metro_system}路網資料，共{len(data) if data else 0}筆")
-                        return data
-                    else:
-                        logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
-                        return None
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status == 200:
+                    data = await response.json()
+                    logger.info(f"✅ 成功取得{metro_system}路網資料，共{len(data) if data else 0}筆")
+                    return data
+                else:
+                    logger.error(f"TDX API 返回錯誤狀態碼: {response.status}")
+                    return None
                         
         except Exception as e:
             logger.error(f"取得捷運路網資料時發生錯誤: {str(e)}")
             return None
 
+    async def fetch_metro_station_of_line(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
+        """從TDX平台取得捷運路線車站序列 (含持久化快取)"""
+        return await self.metro_reference.fetch_dataset(metro_system, STATION_OF_LINE)
+
+    @coalesce('metro_station_of_line')
+    async def _request_metro_station_of_line(self, metro_system: str = "TRTC") -> Optional[List[Dict[str, Any]]]:
+        """向TDX平台請求捷運路線車站序列 (StationOfLine)"""
+        try:
+            url = f"https://tdx.transportdata.tw/api/basic/v2/Rail/Metro/StationOfLine/{metro_system}?%24format=JSON"
+            headers = {
+                'Accept': 'application/json',
+                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+            }
+            
+            async with self.tdx.get(url, headers=headers) as response:
+                if response.status != 200:
+                    logger.error(f"取得{metro_system}路線車站序列失敗: HTTP {response.status}")
+                    return None
+                data = await response.json()
+            
+            if not isinstance(data, list) or not data:
+                logger.warning(f"⚠️ {metro_system} 沒有可用的路線車站序列")
+                return None
+            logger.info(f"✅ 成功取得{metro_system}路線車站序列，共{len(data)}條路線")
+            return data
+            
+        except Exception as e:
+            logger.error(f"取得捷運路線車站序列時發生錯誤: {str(e)}")
+            return None
+
 # 捷運即時電子看板方向視圖類
 class MetroLiveboardByDirectionView(View):
-    """捷運即時電子看板按方向分類視圖"""
-    def __init__(self, cog, user_id: int, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str):
+    """捷運即時電子看板按方向分類視圖 (只記住快照的系統與版本)"""
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, system_name: str):
         super().__init__(timeout=300)  # 5分鐘超時
         self.cog = cog
         self.user_id = user_id
-        self.liveboard_data = liveboard_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
         self.system_name = system_name
         self.current_direction = None  # None: 全部, 'up': 上行, 'down': 下行
         self.message = None
         
-        # 按路線分組資料
-        self.lines_data = {}
-        for station_data in liveboard_data:
-            line_id = station_data.get('LineID', '未知路線')
-            if line_id not in self.lines_data:
-                self.lines_data[line_id] = []
-            self.lines_data[line_id].append(station_data)
-        
-        self.available_lines = list(self.lines_data.keys())
+        # 路線分組由快照預先建立
+        self.available_lines = snapshot.line_ids
         self.current_line_index = 0
         self.selected_line = self.available_lines[0] if self.available_lines else None
         
         self._update_buttons()
     
+    @property
+    def snapshot(self) -> Optional[MetroSnapshot]:
+        return self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+    
     def _update_buttons(self):
         """更新按鈕狀態"""
         self.clear_items()
@@ -4226,20 +4269,11 @@ class MetroLiveboardByDirectionView(View):
         await interaction.response.defer()
         
         try:
-            # 重新獲取資料
-            new_data = await self.cog.fetch_metro_liveboard(self.metro_system)
-            if new_data:
-                self.liveboard_data = new_data
-                
-                # 重新按路線分組
-                self.lines_data = {}
-                for station_data in new_data:
-                    line_id = station_data.get('LineID', '未知路線')
-                    if line_id not in self.lines_data:
-                        self.lines_data[line_id] = []
-                    self.lines_data[line_id].append(station_data)
-                
-                self.available_lines = list(self.lines_data.keys())
+            # 改用最新的快照 (快照服務在背景保持新鮮，這裡只是讀取記憶體)
+            snapshot = await self.cog.get_metro_snapshot(self.metro_system)
+            if snapshot is not None:
+                self.snapshot_version = snapshot.version
+                self.available_lines = snapshot.line_ids
                 
                 # 調整當前路線索引
                 if self.current_line_index >= len(self.available_lines):
@@ -4260,9 +4294,8 @@ class MetroLiveboardByDirectionView(View):
     
     def create_direction_embed(self) -> discord.Embed:
         """創建方向分類的嵌入訊息"""
-        return self.cog.format_metro_liveboard_by_direction(
-            self.liveboard_data, 
-            self.metro_system, 
+        return self.cog.render_metro_liveboard_by_direction(
+            self.snapshot, 
             self.system_name, 
             self.selected_line,
             self.current_direction
@@ -4322,10 +4355,10 @@ class MetroSystemSelectionView(View):
         try:
             logger.info(f"使用者 {interaction.user} 選擇捷運系統: {system_name}")
             
-            # 獲取即時電子看板資料
-            liveboard_data = await self.cog.fetch_metro_liveboard(metro_system)
+            # 取得即時電子看板快照
+            snapshot = await self.cog.get_metro_snapshot(metro_system)
             
-            if not liveboard_data:
+            if snapshot is None:
                 embed = discord.Embed(
                     title="🚇 車站即時電子看板",
                     description="❌ 目前無法取得即時電子看板資料，請稍後再試。",
@@ -4343,8 +4376,7 @@ class MetroSystemSelectionView(View):
                 view = MetroLiveboardByDirectionView(
                     cog=self.cog,
                     user_id=interaction.user.id,
-                    liveboard_data=liveboard_data,
-                    metro_system=metro_system,
+                    snapshot=snapshot,
                     system_name=system_name
                 )
                 embed = view.create_direction_embed()
@@ -4354,8 +4386,7 @@ class MetroSystemSelectionView(View):
                 view = MetroLineSelectionView(
                     cog=self.cog,
                     user_id=interaction.user.id,
-                    liveboard_data=liveboard_data,
-                    metro_system=metro_system,
+                    snapshot=snapshot,
                     system_name=system_name
                 )
                 embed = view.create_line_selection_embed()
@@ -4448,26 +4479,13 @@ class MetroSystemSelect(discord.ui.Select):
         try:
             metro_system = self.values[0]
             
-            # 系統名稱對照
-            system_names = {
-                "TRTC": "臺北捷運",
-                "KRTC": "高雄捷運", 
-                "TYMC": "桃園捷運",
-                "TMRT": "臺中捷運",
-                "KLRT": "高雄輕軌",
-                "NTDLRT": "淡海輕軌",
-                "TRTCMG": "貓空纜車",
-                "NTMC": "新北捷運",
-                "NTALRT": "安坑輕軌"
-            }
-            
-            system_name = system_names.get(metro_system, metro_system)
+            system_name = METRO_SYSTEM_NAMES.get(metro_system, metro_system)
             logger.info(f"使用者 {interaction.user} 選擇捷運系統: {system_name}")
             
-            # 獲取即時電子看板資料
-            liveboard_data = await self.cog.fetch_metro_liveboard(metro_system)
+            # 取得即時電子看板快照
+            snapshot = await self.cog.get_metro_snapshot(metro_system)
             
-            if not liveboard_data:
+            if snapshot is None:
                 embed = discord.Embed(
                     title="🚇 捷運即時電子看板",
                     description=f"❌ {system_name} 目前無法取得即時電子看板資料，可能原因：\n"
@@ -4489,8 +4507,7 @@ class MetroSystemSelect(discord.ui.Select):
                 view = MetroLiveboardByDirectionView(
                     cog=self.cog,
                     user_id=interaction.user.id,
-                    liveboard_data=liveboard_data,
-                    metro_system=metro_system,
+                    snapshot=snapshot,
                     system_name=system_name
                 )
                 embed = view.create_direction_embed()
@@ -4500,8 +4517,7 @@ class MetroSystemSelect(discord.ui.Select):
                 view = MetroLineSelectionView(
                     cog=self.cog,
                     user_id=interaction.user.id,
-                    liveboard_data=liveboard_data,
-                    metro_system=metro_system,
+                    snapshot=snapshot,
                     system_name=system_name
                 )
                 embed = view.create_line_selection_embed()
@@ -4528,21 +4544,16 @@ class MetroSystemSelect(discord.ui.Select):
 
 class MetroLineSelectionView(View):
     """捷運路線選擇視圖"""
-    def __init__(self, cog, user_id: int, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str):
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, system_name: str):
         super().__init__(timeout=300)  # 5分鐘超時
         self.cog = cog
         self.user_id = user_id
-        self.liveboard_data = liveboard_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
         self.system_name = system_name
         
-        # 按路線分組資料
-        self.lines_data = {}
-        for station_data in liveboard_data:
-            line_id = station_data.get('LineID', '未知路線')
-            if line_id not in self.lines_data:
-                self.lines_data[line_id] = []
-            self.lines_data[line_id].append(station_data)
+        # 路線分組由快照預先建立
+        self.lines_data = snapshot.lines
         
         # 路線名稱對照 - 支援所有捷運系統
         self.line_names = {
@@ -4634,7 +4645,14 @@ class MetroLineSelectionView(View):
             self.add_item(button)
     
     def create_line_selection_embed(self) -> discord.Embed:
-        """創建路線選擇嵌入訊息"""
+        """創建路線選擇嵌入訊息 (依快照版本快取)"""
+        snapshot = self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+        return self.cog._render_metro_embed(
+            ('line_selection', self.metro_system, snapshot.version if snapshot is not None else None, self.system_name),
+            self._build_line_selection_embed
+        )
+    
+    def _build_line_selection_embed(self) -> discord.Embed:
         embed = discord.Embed(
             title=f"🚇 {self.system_name} - 路線選擇",
             description=f"請選擇要查詢的路線：",
@@ -4695,8 +4713,7 @@ class MetroLineSelectionView(View):
             view = MetroSingleLineView(
                 cog=self.cog,
                 user_id=interaction.user.id,
-                liveboard_data=line_stations,
-                metro_system=self.metro_system,
+                snapshot=self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version),
                 system_name=self.system_name,
                 line_id=line_id,
                 line_name=self.line_names.get(line_id, f"{line_id}線")
@@ -4740,12 +4757,12 @@ class MetroLineSelectionView(View):
 
 class MetroSingleLineView(View):
     """單一路線車站選擇視圖"""
-    def __init__(self, cog, user_id: int, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str, line_id: str, line_name: str):
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, system_name: str, line_id: str, line_name: str):
         super().__init__(timeout=300)  # 5分鐘超時
         self.cog = cog
         self.user_id = user_id
-        self.liveboard_data = liveboard_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
         self.system_name = system_name
         self.line_id = line_id
         self.line_name = line_name
@@ -4754,8 +4771,7 @@ class MetroSingleLineView(View):
         self.add_item(MetroStationSelect(
             cog=cog,
             user_id=user_id,
-            stations_data=liveboard_data,
-            metro_system=metro_system,
+            snapshot=snapshot,
             system_name=system_name,
             line_id=line_id
         ))
@@ -4778,6 +4794,12 @@ class MetroSingleLineView(View):
         view_all_button.callback = self.view_all_stations
         self.add_item(view_all_button)
     
+    @property
+    def liveboard_data(self) -> Tuple[Dict[str, Any], ...]:
+        """此路線在快照中的車站看板資料"""
+        snapshot = self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+        return snapshot.lines.get(self.line_id, ()) if snapshot is not None else ()
+    
     def create_single_line_embed(self) -> discord.Embed:
         """創建單一路線選擇嵌入訊息"""
         embed = discord.Embed(
@@ -4821,9 +4843,9 @@ class MetroSingleLineView(View):
                 raise e
         
         try:
-            # 重新獲取完整的liveboard資料
-            full_liveboard_data = await self.cog.fetch_metro_liveboard(self.metro_system)
-            if not full_liveboard_data:
+            # 改用最新的快照
+            snapshot = await self.cog.get_metro_snapshot(self.metro_system)
+            if snapshot is None:
                 embed = discord.Embed(
                     title="🚇 返回路線選擇",
                     description="❌ 無法重新載入路線資料。",
@@ -4836,8 +4858,7 @@ class MetroSingleLineView(View):
             view = MetroLineSelectionView(
                 cog=self.cog,
                 user_id=interaction.user.id,
-                liveboard_data=full_liveboard_data,
-                metro_system=self.metro_system,
+                snapshot=snapshot,
                 system_name=self.system_name
             )
             
@@ -4871,9 +4892,8 @@ class MetroSingleLineView(View):
         
         try:
             # 使用原有的格式化方法顯示全部車站
-            embed = self.cog.format_metro_liveboard_by_line(
-                self.liveboard_data,
-                self.metro_system,
+            embed = self.cog.render_metro_liveboard_by_line(
+                self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version),
                 self.system_name,
                 self.line_id
             )
@@ -4914,13 +4934,14 @@ class MetroSingleLineView(View):
 class MetroStationSelect(discord.ui.Select):
     """捷運車站選擇下拉選單"""
     
-    def __init__(self, cog, user_id: int, stations_data: List[Dict[str, Any]], metro_system: str, system_name: str, line_id: str):
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, system_name: str, line_id: str):
         self.cog = cog
         self.user_id = user_id
-        self.stations_data = stations_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
         self.system_name = system_name
         self.line_id = line_id
+        stations_data = snapshot.lines.get(line_id, ())
         
         # 建立車站選項
         options = []
@@ -5016,11 +5037,8 @@ class MetroStationSelect(discord.ui.Select):
         selected_station_id = self.values[0]
         
         # 找到選中的車站資料
-        selected_station = None
-        for station_data in self.stations_data:
-            if station_data.get('StationID') == selected_station_id:
-                selected_station = station_data
-                break
+        snapshot = self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+        selected_station = snapshot.station(selected_station_id) if snapshot is not None else None
         
         if not selected_station:
             await interaction.response.send_message("❌ 找不到該車站的詳細資訊", ephemeral=True)
@@ -5033,8 +5051,8 @@ class MetroStationSelect(discord.ui.Select):
             view = MetroSingleStationView(
                 cog=self.cog,
                 user_id=self.user_id,
-                station_data=selected_station,
-                metro_system=self.metro_system,
+                snapshot=snapshot,
+                station_id=selected_station_id,
                 system_name=self.system_name,
                 line_id=self.line_id
             )
@@ -5050,17 +5068,33 @@ class MetroStationSelect(discord.ui.Select):
 class MetroSingleStationView(View):
     """單一捷運車站詳細資訊視圖"""
     
-    def __init__(self, cog, user_id: int, station_data: Dict[str, Any], metro_system: str, system_name: str, line_id: str):
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, station_id: str, system_name: str, line_id: str,
+                 station_name: Optional[str] = None):
         super().__init__(timeout=300)
         self.cog = cog
         self.user_id = user_id
-        self.station_data = station_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
+        self.station_id = station_id
         self.system_name = system_name
         self.line_id = line_id
+        # 車站目前沒有看板資料時顯示的站名 (由車站搜尋開啟時提供)
+        self.station_name = station_name
         
         self._add_buttons()
     
+    @property
+    def station_data(self) -> Dict[str, Any]:
+        """此車站在快照中的看板資料"""
+        snapshot = self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+        station = snapshot.station(self.station_id) if snapshot is not None else None
+        if station:
+            return station
+        fallback = {'StationID': self.station_id}
+        if self.station_name:
+            fallback['StationName'] = {'Zh_tw': self.station_name}
+        return fallback
+    
     def _add_buttons(self):
         """添加控制按鈕"""
         # 返回路線按鈕
@@ -5088,14 +5122,13 @@ class MetroSingleStationView(View):
         await interaction.response.defer()
         
         try:
-            # 重新獲取路線資料
-            liveboard_data = await self.cog.fetch_metro_liveboard(self.metro_system)
-            if liveboard_data:
+            # 改用最新的快照
+            snapshot = await self.cog.get_metro_snapshot(self.metro_system)
+            if snapshot is not None:
                 view = MetroLiveboardByLineView(
                     cog=self.cog,
                     user_id=self.user_id,
-                    liveboard_data=liveboard_data,
-                    metro_system=self.metro_system,
+                    snapshot=snapshot,
                     system_name=self.system_name
                 )
                 embed = view.create_line_embed()
@@ -5115,20 +5148,11 @@ class MetroSingleStationView(View):
         await interaction.response.defer()
         
         try:
-            # 重新獲取該車站資料
-            liveboard_data = await self.cog.fetch_metro_liveboard(self.metro_system)
-            if liveboard_data:
-                station_id = self.station_data.get('StationID')
-                
-                # 找到更新的車站資料
-                updated_station = None
-                for station_data in liveboard_data:
-                    if station_data.get('StationID') == station_id:
-                        updated_station = station_data
-                        break
-                
-                if updated_station:
-                    self.station_data = updated_station
+            # 改用最新的快照 (快照服務在背景保持新鮮，這裡只是讀取記憶體)
+            snapshot = await self.cog.get_metro_snapshot(self.metro_system)
+            if snapshot is not None:
+                if snapshot.station(self.station_id):
+                    self.snapshot_version = snapshot.version
                     embed = self.create_station_embed()
                     embed.description += "\n🔄 **資料已刷新**"
                     await interaction.followup.edit_message(interaction.message.id, embed=embed, view=self)
@@ -5141,7 +5165,15 @@ class MetroSingleStationView(View):
             await interaction.followup.send("❌ 刷新資料時發生錯誤", ephemeral=True)
     
     def create_station_embed(self) -> discord.Embed:
-        """創建車站詳細資訊嵌入訊息"""
+        """創建車站詳細資訊嵌入訊息 (依快照版本快取)"""
+        snapshot = self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+        return self.cog._render_metro_embed(
+            ('station', self.metro_system, snapshot.version if snapshot is not None else None, self.station_id, self.line_id,
+             self.system_name, self.station_name),
+            self._build_station_embed
+        )
+    
+    def _build_station_embed(self) -> discord.Embed:
         # 取得車站名稱
         station_name_info = self.station_data.get('StationName', {})
         if isinstance(station_name_info, dict):
@@ -5221,24 +5253,17 @@ class MetroSingleStationView(View):
 
 # 捷運即時電子看板翻頁視圖類
 class MetroLiveboardByLineView(View):
-    """捷運即時電子看板按路線分類視圖"""
-    def __init__(self, cog, user_id: int, liveboard_data: List[Dict[str, Any]], metro_system: str, system_name: str):
+    """捷運即時電子看板按路線分類視圖 (只記住快照的系統與版本)"""
+    def __init__(self, cog, user_id: int, snapshot: MetroSnapshot, system_name: str):
         super().__init__(timeout=300)  # 5分鐘超時
         self.cog = cog
         self.user_id = user_id
-        self.liveboard_data = liveboard_data
-        self.metro_system = metro_system
+        self.metro_system = snapshot.system
+        self.snapshot_version = snapshot.version
         self.system_name = system_name
         
-        # 按路線分組資料
-        self.lines_data = {}
-        for station_data in liveboard_data:
-            line_id = station_data.get('LineID', '未知路線')
-            if line_id not in self.lines_data:
-                self.lines_data[line_id] = []
-            self.lines_data[line_id].append(station_data)
-        
-        self.available_lines = list(self.lines_data.keys())
+        # 路線分組由快照預先建立
+        self.available_lines = snapshot.line_ids
         self.current_line_index = 0  # 當前顯示的路線索引
         self.selected_line = self.available_lines[0] if self.available_lines else None
         
@@ -5263,6 +5288,10 @@ class MetroLiveboardByLineView(View):
         
         self._update_buttons()
     
+    @property
+    def snapshot(self) -> Optional[MetroSnapshot]:
+        return self.cog.metro_snapshots.get_version(self.metro_system, self.snapshot_version)
+    
     def _update_buttons(self):
         """更新按鈕狀態"""
         self.clear_items()
@@ -5296,18 +5325,16 @@ class MetroLiveboardByLineView(View):
             self.add_item(next_line_button)
         
         # 車站選擇下拉選單
-        if self.selected_line and self.selected_line in self.lines_data:
-            stations_data = self.lines_data[self.selected_line]
-            if stations_data:
-                station_select = MetroStationSelect(
-                    self.cog, 
-                    self.user_id, 
-                    stations_data, 
-                    self.metro_system, 
-                    self.system_name,
-                    self.selected_line
-                )
-                self.add_item(station_select)
+        snapshot = self.snapshot
+        if snapshot is not None and self.selected_line and snapshot.lines.get(self.selected_line):
+            station_select = MetroStationSelect(
+                self.cog, 
+                self.user_id, 
+                snapshot, 
+                self.system_name,
+                self.selected_line
+            )
+            self.add_item(station_select)
         
         # 全部路線總覽按鈕
         overview_button = discord.ui.Button(
@@ -5373,20 +5400,11 @@ class MetroLiveboardByLineView(View):
         await interaction.response.defer()
         
         try:
-            # 重新獲取資料
-            new_data = await self.cog.fetch_metro_liveboard(self.metro_system)
-            if new_data:
-                self.liveboard_data = new_data
-                
-                # 重新按路線分組
-                self.lines_data = {}
-                for station_data in new_data:
-                    line_id = station_data.get('LineID', '未知路線')
-                    if line_id not in self.lines_data:
-                        self.lines_data[line_id] = []
-                    self.lines_data[line_id].append(station_data)
-                
-                self.available_lines = list(self.lines_data.keys())
+            # 改用最新的快照 (快照服務在背景保持新鮮，這裡只是讀取記憶體)
+            snapshot = await self.cog.get_metro_snapshot(self.metro_system)
+            if snapshot is not None:
+                self.snapshot_version = snapshot.version
+                self.available_lines = snapshot.line_ids
                 
                 # 調整當前路線索引
                 if self.current_line_index >= len(self.available_lines):
@@ -5407,18 +5425,16 @@ class MetroLiveboardByLineView(View):
     
     def create_line_embed(self) -> discord.Embed:
         """創建單一路線的嵌入訊息"""
-        return self.cog.format_metro_liveboard_by_line(
-            self.liveboard_data, 
-            self.metro_system, 
+        return self.cog.render_metro_liveboard_by_line(
+            self.snapshot, 
             self.system_name, 
             self.selected_line
         )
     
     def create_overview_embed(self) -> discord.Embed:
         """創建全路線總覽的嵌入訊息"""
-        return self.cog.format_metro_liveboard_by_line(
-            self.liveboard_data, 
-            self.metro_system, 
+        return self.cog.render_metro_liveboard_by_line(
+            self.snapshot, 
             self.system_name, 
             None  # 顯示所有路線
         )
@@ -5769,129 +5785,54 @@ class TRALiveboardView(View):
     
     async def get_liveboard_data(self):
         try:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            # 由全線快照取出此車站的列車 (不會為每個查詢或重新整理另外向 TDX 請求)
+            logger.info(f"正在查詢台鐵電子看板資料 - 車站: {self.station_name} (ID: {self.station_id})")
+            trains_data = await self.cog.get_tra_station_liveboard(self.station_id, self.station_name)
             
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                access_token = await self.cog.get_tdx_access_token()
-                
-                headers = {
-                    'Authorization': f'Bearer {access_token}',
-                    'Accept': 'application/json',
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
-                }
-                
-                # 修改API端點為新的v3版本
-                url = f"https://tdx.transportdata.tw/api/basic/v3/Rail/TRA/StationLiveBoard?%24format=JSON&%24filter=StationID%20eq%20%27{self.station_id}%27"
+            if trains_data is None:
+                embed = discord.Embed(
+                    title="❌ 錯誤",
+                    description=f"無法獲取 {self.station_name} 的台鐵到站資訊，請稍後再試",
+                    color=0xFF0000
+                )
+                return embed
                 
-                logger.info(f"正在查詢台鐵電子看板資料 - 車站: {self.station_name} (ID: {self.station_id})")
-                logger.info(f"API URL: {url}")
+            # 進一步篩選和處理資料
+            valid_trains = []
+            current_time = datetime.datetime.now()
                 
-                async with session.get(url, headers=headers) as response:
-                    logger.info(f"API 回應狀態: {response.status}")
-                    
-                    if response.status == 200:
-                        data = await response.json()
-                        logger.info(f"取得原始資料結構: {type(data)}")
+            for train in trains_data:
+                # 檢查必要欄位 - v3 API 使用不同的欄位名稱
+                if 'TrainNo' in train and ('ScheduleArrivalTime' in train or 'ScheduleDepartureTime' in train):
+                    # 過濾已過時的班車 (超過30分鐘前的)
+                    arrival_time_str = train.get('ScheduleArrivalTime', '')
+                    departure_time_str = train.get('ScheduleDepartureTime', '')
                         
-                        # v3 API返回的是包含StationLiveBoards的物件，而不是直接的陣列
-                        trains_data = []
-                        if isinstance(data, dict) and 'StationLiveBoards' in data:
-                            trains_data = data['StationLiveBoards']
-                            logger.info(f"從StationLiveBoards取得資料: {len(trains_data)} 筆")
-                        elif isinstance(data, list):
-                            trains_data = data
-                            logger.info(f"直接列表資料: {len(trains_data)} 筆")
+                    # 優先使用到站時間，如果沒有則使用離站時間
+                    time_to_check = arrival_time_str or departure_time_str
                         
-                        if trains_data:
-                            # 進一步篩選和處理資料
-                            valid_trains = []
-                            current_time = datetime.datetime.now()
-                            
-                            for train in trains_data:
-                                # 檢查必要欄位 - v3 API 使用不同的欄位名稱
-                                if 'TrainNo' in train and ('ScheduleArrivalTime' in train or 'ScheduleDepartureTime' in train):
-                                    # 過濾已過時的班車 (超過30分鐘前的)
-                                    arrival_time_str = train.get('ScheduleArrivalTime', '')
-                                    departure_time_str = train.get('ScheduleDepartureTime', '')
-                                    
-                                    # 優先使用到站時間，如果沒有則使用離站時間
-                                    time_to_check = arrival_time_str or departure_time_str
-                                    
-                                    if time_to_check:
-                                        try:
-                                            today = current_time.date()
-                                            check_datetime = datetime.datetime.combine(today, datetime.datetime.strptime(time_to_check, '%H:%M:%S').time())
-                                            
-                                            # 如果班車時間已過，可能是明天的
-                                            if check_datetime < current_time - datetime.timedelta(minutes=30):
-                                                check_datetime += datetime.timedelta(days=1)
-                                            
-                                            # 只顯示未來24小時內的班車
-                                            if check_datetime <= current_time + datetime.timedelta(hours=24):
-                                                valid_trains.append(train)
-                                        except:
-                                            # 時間解析失敗，仍然保留
-                                            valid_trains.append(train)
-                            
-                            # 按照時間排序 (v3 API使用ScheduleArrivalTime)
-                            valid_trains.sort(key=lambda x: x.get('ScheduleArrivalTime', '') or x.get('ScheduleDepartureTime', ''))
-                            self.trains = valid_trains
-                            logger.info(f"篩選後有效班車: {len(valid_trains)} 筆")
-                            
-                        else:
-                            self.trains = []
-                            logger.warning("API 未返回有效的列車資料")
-                            
-                        return self.format_liveboard_data()
-                        
-                    elif response.status == 404:
-                        # 嘗試使用不帶篩選的通用API端點
-                        logger.info("嘗試使用不帶篩選的通用v3 API端點")
-                        general_url = "https://tdx.transportdata.tw/api/basic/v3/Rail/TRA/StationLiveBoard?%24format=JSON"
-                        
-                        async with session.get(general_url, headers=headers) as general_response:
-                            if general_response.status == 200:
-                                all_data = await general_response.json()
-                                logger.info(f"通用API取得資料結構: {type(all_data)}")
+                    if time_to_check:
+                        try:
+                            today = current_time.date()
+                            check_datetime = datetime.datetime.combine(today, datetime.datetime.strptime(time_to_check, '%H:%M:%S').time())
                                 
-                                # v3 API的資料結構處理
-                                all_trains = []
-                                if isinstance(all_data, dict) and 'StationLiveBoards' in all_data:
-                                    all_trains = all_data['StationLiveBoards']
-                                    logger.info(f"從StationLiveBoards取得總資料: {len(all_trains)} 筆")
-                                elif isinstance(all_data, list):
-                                    all_trains = all_data
-                                    logger.info(f"直接列表總資料: {len(all_trains)} 筆")
+                            # 如果班車時間已過，可能是明天的
+                            if check_datetime < current_time - datetime.timedelta(minutes=30):
+                                check_datetime += datetime.timedelta(days=1)
                                 
-                                if all_trains:
-                                    # 篩選指定車站的資料
-                                    station_trains = [train for train in all_trains if train.get('StationID') == self.station_id]
-                                    logger.info(f"車站 {self.station_id} 的班車: {len(station_trains)} 筆")
-                                    
-                                    if not station_trains:
-                                        # 嘗試使用車站名稱篩選
-                                        station_trains = [train for train in all_trains 
-                                                        if train.get('StationName', {}).get('Zh_tw', '') == self.station_name]
-                                        logger.info(f"使用車站名稱篩選後: {len(station_trains)} 筆")
-                                    
-                                    self.trains = station_trains
-                                    return self.format_liveboard_data()
-                                
-                            embed = discord.Embed(
-                                title="❌ 錯誤",
-                                description=f"無法獲取 {self.station_name} 的台鐵到站資訊 (狀態碼: {general_response.status})",
-                                color=0xFF0000
-                            )
-                            return embed
-                    else:
-                        embed = discord.Embed(
-                            title="❌ 錯誤",
-                            description=f"無法獲取台鐵到站資訊 (狀態碼: {response.status})",
-                            color=0xFF0000
-                        )
-                        return embed
+                            # 只顯示未來24小時內的班車
+                            if check_datetime <= current_time + datetime.timedelta(hours=24):
+                                valid_trains.append(train)
+                        except:
+                            # 時間解析失敗，仍然保留
+                            valid_trains.append(train)
+                
+            # 按照時間排序 (v3 API使用ScheduleArrivalTime)
+            valid_trains.sort(key=lambda x: x.get('ScheduleArrivalTime', '') or x.get('ScheduleDepartureTime', ''))
+            self.trains = valid_trains
+            logger.info(f"篩選後有效班車: {len(valid_trains)} 筆")
+                
+            return self.format_liveboard_data()
                         
         except Exception as e:
             logger.error(f"取得台鐵電子看板資料時發生錯誤: {str(e)}")
@@ -6114,46 +6055,22 @@ class TRADelayView(View):
     
     async def get_delay_data(self):
         try:
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            # 由全線誤點快照查詢 (縣市篩選只是字典查詢，不需組合 OData 篩選條件)
+            snapshot = await self.cog.fetch_tra_delay_snapshot()
+            if not snapshot:
+                embed = discord.Embed(
+                    title="❌ 錯誤",
+                    description="無法獲取台鐵誤點資訊",
+                    color=0xFF0000
+                )
+                return embed
             
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                access_token = await self.cog.get_tdx_access_token()
-                
-                headers = {
-                    'Authorization': f'Bearer {access_token}',
-                    'Accept': 'application/json',
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
-                }
-                
-                # 如果指定縣市，篩選該縣市的車站
-                if self.county:
-                    tra_stations = await self.cog.get_updated_tra_stations()
-                    if self.county in tra_stations:
-                        station_ids = [station['id'] for station in tra_stations[self.county]]
-                        station_filter = "(" + " or ".join([f"OriginStopTime/StationID eq '{sid}' or DestinationStopTime/StationID eq '{sid}'" for sid in station_ids]) + ")"
-                        url = f"https://tdx.transportdata.tw/api/basic/v2/Rail/TRA/LiveTrainDelay?%24filter={station_filter}&%24format=JSON"
-                    else:
-                        url = "https://tdx.transportdata.tw/api/basic/v2/Rail/TRA/LiveTrainDelay?%24format=JSON"
-                else:
-                    url = "https://tdx.transportdata.tw/api/basic/v2/Rail/TRA/LiveTrainDelay?%24format=JSON"
-                
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        # 只保留有誤點的列車
-                        self.delays = [train for train in data if train.get('DelayTime', 0) > 0]
-                        # 按誤點時間排序（由高到低）
-                        self.delays.sort(key=lambda x: x.get('DelayTime', 0), reverse=True)
-                        return self.format_delay_data()
-                    else:
-                        embed = discord.Embed(
-                            title="❌ 錯誤",
-                            description="無法獲取台鐵誤點資訊",
-                            color=0xFF0000
-                        )
-                        return embed
+            # 快照中的清單已按誤點時間排序（由高到低）
+            if self.county:
+                self.delays = snapshot['by_county'].get(self.county, [])
+            else:
+                self.delays = snapshot['all']
+            return self.format_delay_data()
         except Exception as e:
             embed = discord.Embed(
                 title="❌ 錯誤",
@@ -6304,7 +6221,7 @@ class MetroFacilityLineSelect(discord.ui.Select):
         
         # 創建選項(最多25個)
         options = []
-        for line_id in sorted(lines_data.keys())[:25]:
+        for line_id in list(lines_data)[:25]:
             station_count = len(lines_data[line_id])
             options.append(discord.SelectOption(
                 label=f"{line_id} 線",
@@ -6397,6 +6314,7 @@ class MetroFacilityStationSelect(discord.ui.Select):
         self.line_id = line_id
         self.system_code = system_code
         self.page = page
+        self.stations_by_id = {station.get('StationID'): station for station in stations}
         
         # 創建選項
         options = []
@@ -6427,11 +6345,7 @@ class MetroFacilityStationSelect(discord.ui.Select):
             selected_station_id = self.values[0]
             
             # 找到選中的車站
-            station_data = None
-            for station in self.stations:
-                if station.get('StationID') == selected_station_id:
-                    station_data = station
-                    break
+            station_data = self.stations_by_id.get(selected_station_id)
             
             if not station_data:
                 await interaction.response.send_message("❌ 找不到該車站資料", ephemeral=True)
@@ -6585,39 +6499,51 @@ class MetroFacilityStationSelect(discord.ui.Select):
 # ================================
 
 class MetroNetworkPaginationView(View):
-    """捷運路網分頁視圖"""
+    """捷運路網分頁視圖 (分頁由參考資料索引預先建好，翻頁只是複製對應的頁面)"""
     
-    def __init__(self, network_data: List[Dict], user_id: int, system_name: str):
+    items_per_page = 2  # 每頁顯示2條路線
+    
+    def __init__(self, pages: List[Dict[str, Any]], user_id: int, system_name: str):
         super().__init__(timeout=300)  # 5分鐘超時
-        self.network_data = network_data if network_data else []
+        self.pages = pages
         self.user_id = user_id
         self.system_name = system_name
         self.current_page = 0
-        self.items_per_page = 2  # 每頁顯示2條路線
-        
-        if len(self.network_data) == 0:
-            self.total_pages = 1
-        else:
-            self.total_pages = (len(self.network_data) + self.items_per_page - 1) // self.items_per_page
-            logger.info(f"MetroNetworkPaginationView 初始化: {len(self.network_data)} 條路線, {self.total_pages} 頁")
-        
+        self.total_pages = len(pages)
+        
+    @classmethod
+    def build_pages(cls, network_data: List[Dict], system_name: str) -> List[Dict[str, Any]]:
+        """將路網資料建立為所有分頁的 embed (以 dict 保存)"""
+        network_data = network_data or []
+        total_pages = max(1, (len(network_data) + cls.items_per_page - 1) // cls.items_per_page)
+        logger.info(f"MetroNetworkPaginationView 建立分頁: {len(network_data)} 條路線, {total_pages} 頁")
+        return [
+            cls._build_page(network_data, system_name, page, total_pages).to_dict()
+            for page in range(total_pages)
+        ]
+    
     def create_embed(self) -> discord.Embed:
         """創建當前頁面的 embed"""
+        return discord.Embed.from_dict(copy.deepcopy(self.pages[self.current_page]))
+    
+    @classmethod
+    def _build_page(cls, network_data: List[Dict], system_name: str, page: int, total_pages: int) -> discord.Embed:
+        """建立單一分頁的 embed"""
         embed = discord.Embed(
-            title=f"🗺️ {self.system_name} 路網資料",
+            title=f"🗺️ {system_name} 路網資料",
             color=0x3498DB
         )
         
-        if len(self.network_data) == 0:
+        if len(network_data) == 0:
             embed.description = "目前沒有路網資料。"
             return embed
         
         # 計算當前頁面要顯示的路線
-        start_idx = self.current_page * self.items_per_page
-        end_idx = min(start_idx + self.items_per_page, len(self.network_data))
+        start_idx = page * cls.items_per_page
+        end_idx = min(start_idx + cls.items_per_page, len(network_data))
         
         for i in range(start_idx, end_idx):
-            line = self.network_data[i]
+            line = network_data[i]
             
             line_name = line.get('LineName', {}).get('Zh_tw', '未知路線')
             line_id = line.get('LineID', 'N/A')
@@ -6696,7 +6622,7 @@ class MetroNetworkPaginationView(View):
         
         # 設置頁腳
         embed.set_footer(
-            text=f"第 {self.current_page + 1}/{self.total_pages} 頁 | 共 {len(self.network_data)} 條路線 | TDX運輸資料流通服務"
+            text=f"第 {page + 1}/{total_pages} 頁 | 共 {len(network_data)} 條路線 | TDX運輸資料流通服務"
         )
         
         return embed
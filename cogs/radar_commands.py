@@ -8,14 +8,18 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 import json
 import asyncio
 import logging
-import ssl
 from typing import Optional, Dict
 from datetime import datetime
 
+from utils.http_pool import get_http_pool
+from utils.conditional_fetch import get_conditional_fetcher
+from utils.cache_manager import TTLCache, mark_stale
+from utils.single_flight import coalesce
+from utils.prefetch_scheduler import get_prefetch_scheduler
+
 logger = logging.getLogger(__name__)
 
 class RadarCommands(commands.Cog):
@@ -59,22 +63,24 @@ class RadarCommands(commands.Cog):
             logger.error("❌ 錯誤: 找不到 CWA_API_KEY 環境變數")
             logger.info("請在 .env 檔案中設定 CWA_API_KEY=您的中央氣象署API密鑰")
         
-        self.radar_cache = {}  # 快取雷達圖資料
-        self.large_radar_cache = {}  # 快取大範圍雷達圖資料
-        self.rainfall_radar_cache = {}  # 快取降雨雷達圖資料
-        self.cache_timestamp = 0
-        self.large_cache_timestamp = 0
-        self.rainfall_cache_timestamp = {}  # 各雷達站的快取時間戳
         self.cache_duration = 300  # 快取 5 分鐘（雷達圖更新頻繁）
-        
-        # 初始化降雨雷達快取時間戳
-        for station in self.rainfall_radar_apis.keys():
-            self.rainfall_cache_timestamp[station] = 0
-        
-        # 設定 SSL 上下文
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
+        # 雷達圖資料快取 (鍵: normal / large / 各降雨雷達站)，過期後先回傳舊圖並於背景更新
+        self.radar_cache = TTLCache('radar', ttl=self.cache_duration, stale_ttl=600, max_entries=16)
+    
+    async def cog_load(self):
+        """向背景預取排程註冊雷達圖資料 (最近 30 分鐘內有人查詢時才會預取)"""
+        self.prefetch.register('radar:normal', self.radar_cache, 'normal', self._request_radar_data)
+        self.prefetch.register('radar:large', self.radar_cache, 'large', self._request_large_radar_data)
+        for station in self.rainfall_radar_apis:
+            self.prefetch.register(
+                f'radar:rainfall:{station}', self.radar_cache, ('rainfall', station),
+                lambda station=station: self._request_rainfall_radar_data(station)
+            )
+    
+    async def cog_unload(self):
+        """Cog 卸載時移除預取項目"""
+        for name in ['radar:normal', 'radar:large'] + [f'radar:rainfall:{station}' for station in self.rainfall_radar_apis]:
+            self.prefetch.unregister(name)
     
     def _add_timestamp_to_url(self, url):
         """為雷達圖片 URL 加上時間戳避免快取"""
@@ -90,15 +96,30 @@ class RadarCommands(commands.Cog):
         else:
             return f"{url}?_t={timestamp}"
         
-    async def fetch_radar_data(self) -> Dict:
-        """從中央氣象署 API 獲取雷達圖資料"""
+    @property
+    def conditional(self):
+        """機器人共用的條件式下載器 (ETag / Last-Modified / 內容雜湊)"""
+        return get_conditional_fetcher(self.bot)
+    
+    @property
+    def prefetch(self):
+        """機器人共用的背景預取排程"""
+        return get_prefetch_scheduler(self.bot)
+    
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
+    
+    async def fetch_radar_data(self, force_refresh: bool = False) -> Dict:
+        """從中央氣象署 API 獲取雷達圖資料 (含快取)"""
+        data = await self.radar_cache.get_or_fetch('normal', self._request_radar_data, force_refresh=force_refresh)
+        return data or {}
+    
+    @coalesce('radar')
+    async def _request_radar_data(self) -> Dict:
+        """向中央氣象署請求雷達圖資料"""
         try:
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (self.radar_cache and 
-                current_time - self.cache_timestamp < self.cache_duration):
-                return self.radar_cache
-            
             # 構建 API 參數
             params = {
                 "Authorization": self.authorization,
@@ -108,42 +129,28 @@ class RadarCommands(commands.Cog):
             
             logger.info(f"正在從中央氣象署 API 獲取雷達圖資料: {self.cwa_radar_api}")
             
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(self.cwa_radar_api, params=params) as response:
-                    if response.status == 200:
-                        # 處理 MIME 類型問題，強制讀取為文本並解析 JSON
-                        try:
-                            response_text = await response.text()
-                            data = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            # 如果 JSON 解析失敗，嘗試直接使用 response.json()
-                            data = await response.json(content_type=None)
-                        
-                        # 更新快取
-                        self.radar_cache = data
-                        self.cache_timestamp = current_time
-                        
-                        logger.info("成功獲取雷達圖資料")
-                        return data
-                    else:
-                        logger.error(f"雷達圖 API 請求失敗: HTTP {response.status}")
-                        return {}
+            # 條件式下載：資料未更新時沿用上一次的解析結果，不必重新解析
+            result = await self.conditional.fetch(self.cwa_radar_api, params=params)
+            if result.ok:
+                logger.info("成功獲取雷達圖資料")
+                return result.data
+            else:
+                logger.error(f"雷達圖 API 請求失敗: HTTP {result.status}")
+                return {}
                         
         except Exception as e:
             logger.error(f"獲取雷達圖資料時發生錯誤: {e}")
             return {}
     
-    async def fetch_large_radar_data(self) -> Dict:
-        """從中央氣象署 API 獲取大範圍雷達圖資料"""
+    async def fetch_large_radar_data(self, force_refresh: bool = False) -> Dict:
+        """從中央氣象署 API 獲取大範圍雷達圖資料 (含快取)"""
+        data = await self.radar_cache.get_or_fetch('large', self._request_large_radar_data, force_refresh=force_refresh)
+        return data or {}
+    
+    @coalesce('radar_large')
+    async def _request_large_radar_data(self) -> Dict:
+        """向中央氣象署請求大範圍雷達圖資料"""
         try:
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (self.large_radar_cache and 
-                current_time - self.large_cache_timestamp < self.cache_duration):
-                return self.large_radar_cache
-            
             # 構建 API 參數
             params = {
                 "Authorization": self.authorization,
@@ -153,46 +160,36 @@ class RadarCommands(commands.Cog):
             
             logger.info(f"正在從中央氣象署 API 獲取大範圍雷達圖資料: {self.cwa_large_radar_api}")
             
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(self.cwa_large_radar_api, params=params) as response:
-                    if response.status == 200:
-                        # 處理 MIME 類型問題，強制讀取為文本並解析 JSON
-                        try:
-                            response_text = await response.text()
-                            data = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            # 如果 JSON 解析失敗，嘗試直接使用 response.json()
-                            data = await response.json(content_type=None)
-                        
-                        # 更新快取
-                        self.large_radar_cache = data
-                        self.large_cache_timestamp = current_time
-                        
-                        logger.info("成功獲取大範圍雷達圖資料")
-                        return data
-                    else:
-                        logger.error(f"大範圍雷達圖 API 請求失敗: HTTP {response.status}")
-                        return {}
+            # 條件式下載：資料未更新時沿用上一次的解析結果，不必重新解析
+            result = await self.conditional.fetch(self.cwa_large_radar_api, params=params)
+            if result.ok:
+                logger.info("成功獲取大範圍雷達圖資料")
+                return result.data
+            else:
+                logger.error(f"大範圍雷達圖 API 請求失敗: HTTP {result.status}")
+                return {}
                         
         except Exception as e:
             logger.error(f"獲取大範圍雷達圖資料時發生錯誤: {e}")
             return {}
     
-    async def fetch_rainfall_radar_data(self, station: str) -> Dict:
-        """從中央氣象署 API 獲取降雨雷達圖資料"""
+    async def fetch_rainfall_radar_data(self, station: str, force_refresh: bool = False) -> Dict:
+        """從中央氣象署 API 獲取降雨雷達圖資料 (含快取)"""
         if station not in self.rainfall_radar_apis:
             logger.error(f"未知的降雨雷達站: {station}")
             return {}
         
+        data = await self.radar_cache.get_or_fetch(
+            ('rainfall', station),
+            lambda: self._request_rainfall_radar_data(station),
+            force_refresh=force_refresh
+        )
+        return data or {}
+    
+    @coalesce('radar_rainfall')
+    async def _request_rainfall_radar_data(self, station: str) -> Dict:
+        """向中央氣象署請求指定雷達站的降雨雷達圖資料"""
         try:
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (station in self.rainfall_radar_cache and 
-                current_time - self.rainfall_cache_timestamp.get(station, 0) < self.cache_duration):
-                return self.rainfall_radar_cache[station]
-            
             station_info = self.rainfall_radar_apis[station]
             
             # 構建 API 參數
@@ -204,28 +201,14 @@ class RadarCommands(commands.Cog):
             
             logger.info(f"正在從中央氣象署 API 獲取 {station_info['location']} 降雨雷達圖資料: {station_info['api_url']}")
             
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(station_info['api_url'], params=params) as response:
-                    if response.status == 200:
-                        # 處理 MIME 類型問題，強制讀取為文本並解析 JSON
-                        try:
-                            response_text = await response.text()
-                            data = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            # 如果 JSON 解析失敗，嘗試直接使用 response.json()
-                            data = await response.json(content_type=None)
-                        
-                        # 更新快取
-                        self.rainfall_radar_cache[station] = data
-                        self.rainfall_cache_timestamp[station] = current_time
-                        
-                        logger.info(f"成功獲取 {station_info['location']} 降雨雷達圖資料")
-                        return data
-                    else:
-                        logger.error(f"{station_info['location']} 降雨雷達圖 API 請求失敗: HTTP {response.status}")
-                        return {}
+            # 條件式下載：資料未更新時沿用上一次的解析結果，不必重新解析
+            result = await self.conditional.fetch(station_info['api_url'], params=params)
+            if result.ok:
+                logger.info(f"成功獲取 {station_info['location']} 降雨雷達圖資料")
+                return result.data
+            else:
+                logger.error(f"{station_info['location']} 降雨雷達圖 API 請求失敗: HTTP {result.status}")
+                return {}
                         
         except Exception as e:
             logger.error(f"獲取 {station} 降雨雷達圖資料時發生錯誤: {e}")
@@ -715,7 +698,7 @@ class RadarCommands(commands.Cog):
                 return
             
             # 建立回應
-            embed = self.create_radar_embed(radar_info)
+            embed = mark_stale(self.create_radar_embed(radar_info), self.radar_cache, 'normal')
             
             # 建立視圖（包含重新整理和說明按鈕）
             view = RadarView(self)
@@ -760,7 +743,7 @@ class RadarCommands(commands.Cog):
                 return
             
             # 建立回應
-            embed = self.create_large_radar_embed(radar_info)
+            embed = mark_stale(self.create_large_radar_embed(radar_info), self.radar_cache, 'large')
             
             # 建立視圖（包含重新整理和說明按鈕）
             view = LargeRadarView(self)
@@ -806,7 +789,7 @@ class RadarCommands(commands.Cog):
                 return
             
             # 建立回應
-            embed = self.create_rainfall_radar_embed(radar_info, station)
+            embed = mark_stale(self.create_rainfall_radar_embed(radar_info, station), self.radar_cache, ('rainfall', station))
             
             # 建立視圖（包含重新整理和切換按鈕）
             view = RainfallRadarView(self, station)
@@ -830,11 +813,8 @@ class RadarView(discord.ui.View):
         await interaction.response.defer()
         
         try:
-            # 清除快取，強制重新獲取
-            self.cog.radar_cache = {}
-            
-            # 獲取最新資料
-            data = await self.cog.fetch_radar_data()
+            # 略過快取，強制重新獲取
+            data = await self.cog.fetch_radar_data(force_refresh=True)
             
             if not data:
                 await interaction.followup.send("❌ 無法獲取最新雷達圖資料。", ephemeral=True)
@@ -947,11 +927,8 @@ class LargeRadarView(discord.ui.View):
         await interaction.response.defer()
         
         try:
-            # 清除快取，強制重新獲取
-            self.cog.large_radar_cache = {}
-            
-            # 獲取最新資料
-            data = await self.cog.fetch_large_radar_data()
+            # 略過快取，強制重新獲取
+            data = await self.cog.fetch_large_radar_data(force_refresh=True)
             
             if not data:
                 await interaction.followup.send("❌ 無法獲取最新大範圍雷達圖資料。", ephemeral=True)
@@ -1072,12 +1049,8 @@ class RainfallRadarView(discord.ui.View):
         await interaction.response.defer()
         
         try:
-            # 清除快取，強制重新獲取
-            if self.current_station in self.cog.rainfall_radar_cache:
-                del self.cog.rainfall_radar_cache[self.current_station]
-            
-            # 獲取最新資料
-            data = await self.cog.fetch_rainfall_radar_data(self.current_station)
+            # 略過快取，強制重新獲取
+            data = await self.cog.fetch_rainfall_radar_data(self.current_station, force_refresh=True)
             
             if not data:
                 station_info = self.cog.rainfall_radar_apis[self.current_station]
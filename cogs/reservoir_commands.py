@@ -10,14 +10,22 @@ import aiohttp
 import discord
 import datetime
 import json
-import ssl
 import logging
 import xml.etree.ElementTree as ET
 import os
+from typing import Optional
 from discord.ext import commands
 from discord import app_commands
 from dotenv import load_dotenv
 
+from utils.http_pool import get_http_pool
+from utils.conditional_fetch import get_conditional_fetcher
+from utils.single_flight import coalesce
+from utils.cache_manager import TTLCache, mark_stale
+from utils.persistent_cache import get_persistent_cache
+from utils.prefetch_scheduler import get_prefetch_scheduler
+from utils.county_resolver import resolve_county
+
 # 載入環境變數
 load_dotenv()
 
@@ -51,60 +59,129 @@ class ReservoirCommands(commands.Cog):
             "14602": "牡丹水庫",
             "14603": "龍鑾潭水庫"
         }
+        
+        # 河川警戒水位資料 (變動少，同步寫入 data/ 供重啟後立即使用)
+        self.alert_level_cache = TTLCache(
+            'water_level_alert', ttl=6 * 3600, stale_ttl=7 * 86400, max_entries=1,
+            persistent=get_persistent_cache(bot)
+        )
+        # 河川即時水位資料 (水利署約每 10 分鐘更新)
+        self.water_level_cache = TTLCache('water_level', ttl=600, stale_ttl=600, max_entries=1)
+        # 預熱警戒水位資料的背景工作 (保留參照，卸載時取消)
+        self.warm_task: Optional[asyncio.Task] = None
+    
+    async def cog_load(self):
+        """Cog 載入時從磁碟載回警戒水位資料，並在背景重新驗證"""
+        self.warm_task = asyncio.create_task(self._warm_alert_levels())
+        # 即時水位由背景預取保持新鮮 (最近 30 分鐘內有人查詢時)
+        self.prefetch.register('water_level', self.water_level_cache, 'realtime', self._request_water_level_data)
+    
+    async def cog_unload(self):
+        """Cog 卸載時取消預熱工作並移除預取項目"""
+        if self.warm_task and not self.warm_task.done():
+            self.warm_task.cancel()
+        self.prefetch.unregister('water_level')
+    
+    async def _warm_alert_levels(self):
+        try:
+            await self.alert_level_cache.warm()
+            await self._get_alert_water_levels()
+        except Exception as e:
+            logger.error(f"預熱警戒水位資料時發生錯誤: {str(e)}")
+    
+    @property
+    def conditional(self):
+        """機器人共用的條件式下載器 (ETag / Last-Modified / 內容雜湊)"""
+        return get_conditional_fetcher(self.bot)
+    
+    @property
+    def prefetch(self):
+        """機器人共用的背景預取排程"""
+        return get_prefetch_scheduler(self.bot)
+    
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
     
     async def _get_alert_water_levels(self):
-        """取得河川警戒水位資料"""
+        """取得河川警戒水位資料 (含持久化快取)"""
+        data = await self.alert_level_cache.get_or_fetch('alert_levels', self._request_alert_water_levels)
+        return data or {}
+    
+    @coalesce('water_level_alert')
+    async def _request_alert_water_levels(self):
+        """向水利署請求河川警戒水位資料"""
         try:
             api_url = "https://opendata.wra.gov.tw/Service/OpenData.aspx?format=json&id=47F8D7F2-4D6C-4F78-B90C-C4C7C1C6F7B7"
             
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
+            # 條件式下載：資料未更新時沿用上一次的解析結果 (parse_json_body 會處理 UTF-8 BOM)
+            try:
+                result = await self.conditional.fetch(api_url, timeout=aiohttp.ClientTimeout(total=15))
+            except json.JSONDecodeError as e:
+                logger.warning(f"警戒水位 JSON 解析失敗: {e}")
+                return {}
+            if not result.ok:
+                logger.warning(f"警戒水位 API 請求失敗，狀態碼: {result.status}")
+                return {}
+            data = result.data
+                
+            # 檢查資料結構
+            if isinstance(data, dict) and 'AlertingWaterLevel_OPENDATA' in data:
+                records = data['AlertingWaterLevel_OPENDATA']
+            elif isinstance(data, list):
+                records = data
+            else:
+                logger.warning("警戒水位 API 回應格式不符預期")
+                return {}
+                
+            # 建立測站對應表
+            alert_data = {}
+            for record in records:
+                if isinstance(record, dict):
+                    station_id = record.get('ST_NO', '')
+                    if station_id:
+                        alert_data[station_id] = {
+                            'first_alert': record.get('FirstAlert', ''),
+                            'second_alert': record.get('SecondAlert', ''),
+                            'third_alert': record.get('ThirdAlert', '')
+                        }
+                
+            return alert_data
+                
+        except Exception as e:
+            logger.warning(f"獲取警戒水位資料時發生錯誤: {str(e)}")
+            return {}
+    
+    async def _get_water_level_data(self):
+        """取得河川即時水位資料 (含快取)"""
+        data = await self.water_level_cache.get_or_fetch('realtime', self._request_water_level_data)
+        return data or {}
+    
+    @coalesce('water_level')
+    async def _request_water_level_data(self):
+        """向水利署請求河川即時水位資料"""
+        try:
+            api_url = "https://opendata.wra.gov.tw/Service/OpenData.aspx?format=json&id=2D09DB8B-6A1B-485E-88B5-923A462F475C"
             
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
+            # 條件式下載：資料未更新時沿用上一次的解析結果 (parse_json_body 會處理 UTF-8 BOM)
+            try:
+                result = await self.conditional.fetch(api_url, timeout=aiohttp.ClientTimeout(total=30))
+            except json.JSONDecodeError as e:
+                logger.warning(f"水位 JSON 解析失敗: {e}")
+                return {}
+            if not result.ok:
+                logger.warning(f"水位 API 請求失敗，狀態碼: {result.status}")
+                return {}
+            
+            # 檢查資料結構 - 水利署 API 回應是字典格式
+            if not isinstance(result.data, dict):
+                logger.warning("水位 API 回應格式錯誤")
+                return {}
+            return result.data
             
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=15)) as response:
-                    if response.status != 200:
-                        logger.warning(f"警戒水位 API 請求失敗，狀態碼: {response.status}")
-                        return {}
-                    
-                    text = await response.text()
-                    if text.startswith('\ufeff'):
-                        text = text[1:]
-                    
-                    try:
-                        data = json.loads(text)
-                        
-                        # 檢查資料結構
-                        if isinstance(data, dict) and 'AlertingWaterLevel_OPENDATA' in data:
-                            records = data['AlertingWaterLevel_OPENDATA']
-                        elif isinstance(data, list):
-                            records = data
-                        else:
-                            logger.warning("警戒水位 API 回應格式不符預期")
-                            return {}
-                        
-                        # 建立測站對應表
-                        alert_data = {}
-                        for record in records:
-                            if isinstance(record, dict):
-                                station_id = record.get('ST_NO', '')
-                                if station_id:
-                                    alert_data[station_id] = {
-                                        'first_alert': record.get('FirstAlert', ''),
-                                        'second_alert': record.get('SecondAlert', ''),
-                                        'third_alert': record.get('ThirdAlert', '')
-                                    }
-                        
-                        return alert_data
-                        
-                    except json.JSONDecodeError as e:
-                        logger.warning(f"警戒水位 JSON 解析失敗: {e}")
-                        return {}
-                        
         except Exception as e:
-            logger.warning(f"獲取警戒水位資料時發生錯誤: {str(e)}")
+            logger.warning(f"獲取水位資料時發生錯誤: {str(e)}")
             return {}
     
     def _check_water_level_alert(self, water_level, alert_data):
@@ -180,216 +257,195 @@ class ReservoirCommands(commands.Cog):
     ):
         """查詢河川水位資料（包含警戒水位檢查）"""
         await interaction.response.defer()
+        # 簡稱 (例如「台北」) 統一為標準縣市名稱
+        if city:
+            city = resolve_county(city) or city
         
         try:
-            # 同時獲取水位資料和警戒水位資料
-            api_url = "https://opendata.wra.gov.tw/Service/OpenData.aspx?format=json&id=2D09DB8B-6A1B-485E-88B5-923A462F475C"
-            
-            # 設定 SSL 上下文
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            # 獲取警戒水位資料
-            alert_levels = await self._get_alert_water_levels()
+            # 同時獲取水位資料和警戒水位資料 (兩者皆有快取)
+            data, alert_levels = await asyncio.gather(
+                self._get_water_level_data(),
+                self._get_alert_water_levels()
+            )
             
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status != 200:
-                        await interaction.followup.send(f"❌ API 請求失敗，狀態碼: {response.status}")
-                        return
-                    
-                    # 處理 UTF-8 BOM 問題
-                    text = await response.text()
-                    if text.startswith('\ufeff'):
-                        text = text[1:]
-                    
-                    try:
-                        data = json.loads(text)
-                    except json.JSONDecodeError as e:
-                        await interaction.followup.send(f"❌ JSON 解析失敗: {str(e)}")
-                        return
-                    
-                    # 檢查資料結構 - 水利署 API 回應是字典格式
-                    if not isinstance(data, dict):
-                        await interaction.followup.send("❌ API 回應格式錯誤")
-                        return
+            if not data:
+                await interaction.followup.send("❌ 無法取得水位資料，請稍後再試")
+                return
+                
+            # 從回應中提取實際的水位資料列表
+            records = data.get('RealtimeWaterLevel_OPENDATA', [])
+                
+            if not records:
+                await interaction.followup.send("❌ 無水位資料")
+                return
+                
+            # 篩選資料
+            filtered_records = []
+                
+            for record in records:
+                # 確保 record 是字典
+                if not isinstance(record, dict):
+                    logger.warning(f"跳過非字典記錄: {type(record)} - {record}")
+                    continue
                     
-                    # 從回應中提取實際的水位資料列表
-                    records = data.get('RealtimeWaterLevel_OPENDATA', [])
+                station_id = record.get('ST_NO', '')
+                observatory_id = record.get('ObservatoryIdentifier', '')
+                water_level = record.get('WaterLevel', '')
                     
-                    if not records:
-                        await interaction.followup.send("❌ 無水位資料")
-                        return
+                # 篩選條件 (由於缺少縣市和河川資訊，只能根據測站編號篩選)
+                matches = True
                     
-                    # 篩選資料
-                    filtered_records = []
+                if city:
+                    # 由於沒有縣市資訊，暫時跳過縣市篩選
+                    # 可以在未來加入測站編號對應表
+                    pass
                     
-                    for record in records:
-                        # 確保 record 是字典
-                        if not isinstance(record, dict):
-                            logger.warning(f"跳過非字典記錄: {type(record)} - {record}")
-                            continue
-                        
-                        station_id = record.get('ST_NO', '')
-                        observatory_id = record.get('ObservatoryIdentifier', '')
-                        water_level = record.get('WaterLevel', '')
-                        
-                        # 篩選條件 (由於缺少縣市和河川資訊，只能根據測站編號篩選)
-                        matches = True
-                        
-                        if city:
-                            # 由於沒有縣市資訊，暫時跳過縣市篩選
-                            # 可以在未來加入測站編號對應表
-                            pass
-                        
-                        if river:
-                            # 由於沒有河川資訊，暫時跳過河川篩選
-                            pass
-                        
-                        if station and matches:
-                            # 根據測站編號或識別碼篩選
-                            if (station.lower() not in station_id.lower() and 
-                                station.lower() not in observatory_id.lower()):
-                                matches = False
-                        
-                        # 過濾空水位資料
-                        if water_level == '' or water_level is None:
-                            matches = False
-                        
-                        if matches:
-                            filtered_records.append(record)
+                if river:
+                    # 由於沒有河川資訊，暫時跳過河川篩選
+                    pass
                     
-                    if not filtered_records:
-                        filter_msg = []
-                        if city:
-                            filter_msg.append(f"縣市: {city} (註: 目前API未提供縣市資訊)")
-                        if river:
-                            filter_msg.append(f"河川: {river} (註: 目前API未提供河川資訊)")
-                        if station:
-                            filter_msg.append(f"測站: {station}")
-                        
-                        filter_text = "、".join(filter_msg) if filter_msg else "全台"
-                        await interaction.followup.send(f"❌ 找不到符合條件的水位資料\n篩選條件: {filter_text}")
-                        return
+                if station and matches:
+                    # 根據測站編號或識別碼篩選
+                    if (station.lower() not in station_id.lower() and 
+                        station.lower() not in observatory_id.lower()):
+                        matches = False
                     
-                    # 限制顯示數量
-                    display_records = filtered_records[:15]
+                # 過濾空水位資料
+                if water_level == '' or water_level is None:
+                    matches = False
                     
-                    # 統計警戒狀況
-                    alert_counts = {"正常": 0, "一級警戒": 0, "二級警戒": 0, "三級警戒": 0, "無警戒資料": 0}
+                if matches:
+                    filtered_records.append(record)
+                
+            if not filtered_records:
+                filter_msg = []
+                if city:
+                    filter_msg.append(f"縣市: {city} (註: 目前API未提供縣市資訊)")
+                if river:
+                    filter_msg.append(f"河川: {river} (註: 目前API未提供河川資訊)")
+                if station:
+                    filter_msg.append(f"測站: {station}")
                     
-                    # 建立 embed
-                    embed = discord.Embed(
-                        title="🌊 河川水位查詢結果",
-                        color=0x0099ff,
-                        timestamp=datetime.datetime.now()
-                    )
+                filter_text = "、".join(filter_msg) if filter_msg else "全台"
+                await interaction.followup.send(f"❌ 找不到符合條件的水位資料\n篩選條件: {filter_text}")
+                return
+                
+            # 限制顯示數量
+            display_records = filtered_records[:15]
+                
+            # 統計警戒狀況
+            alert_counts = {"正常": 0, "一級警戒": 0, "二級警戒": 0, "三級警戒": 0, "無警戒資料": 0}
+                
+            # 建立 embed
+            embed = discord.Embed(
+                title="🌊 河川水位查詢結果",
+                color=0x0099ff,
+                timestamp=datetime.datetime.now()
+            )
+            mark_stale(embed, self.water_level_cache, 'realtime')
+                
+            # 設定篩選資訊
+            filter_info = []
+            if city:
+                filter_info.append(f"縣市: {city}")
+            if river:
+                filter_info.append(f"河川: {river}")
+            if station:
+                filter_info.append(f"測站: {station}")
+                
+            if filter_info:
+                embed.add_field(
+                    name="🔍 篩選條件",
+                    value=" | ".join(filter_info),
+                    inline=False
+                )
+                
+            # 加入水位資料
+            for i, record in enumerate(display_records, 1):
+                # 使用實際可用的欄位
+                station_id = record.get('ST_NO', 'N/A')
+                observatory_id = record.get('ObservatoryIdentifier', 'N/A')
+                water_level = record.get('WaterLevel', 'N/A')
+                record_time = record.get('RecordTime', 'N/A')
                     
-                    # 設定篩選資訊
-                    filter_info = []
-                    if city:
-                        filter_info.append(f"縣市: {city}")
-                    if river:
-                        filter_info.append(f"河川: {river}")
-                    if station:
-                        filter_info.append(f"測站: {station}")
+                # 檢查警戒水位
+                station_alert_data = alert_levels.get(station_id, {})
+                alert_status, alert_icon = self._check_water_level_alert(water_level, station_alert_data)
+                alert_counts[alert_status] = alert_counts.get(alert_status, 0) + 1
                     
-                    if filter_info:
-                        embed.add_field(
-                            name="🔍 篩選條件",
-                            value=" | ".join(filter_info),
-                            inline=False
-                        )
+                # 格式化水位資料
+                if water_level != 'N/A' and water_level is not None and str(water_level).strip():
+                    try:
+                        water_level_num = float(water_level)
+                        water_level_str = f"{water_level_num:.2f} 公尺"
+                    except:
+                        water_level_str = str(water_level)
+                else:
+                    water_level_str = "無資料"
                     
-                    # 加入水位資料
-                    for i, record in enumerate(display_records, 1):
-                        # 使用實際可用的欄位
-                        station_id = record.get('ST_NO', 'N/A')
-                        observatory_id = record.get('ObservatoryIdentifier', 'N/A')
-                        water_level = record.get('WaterLevel', 'N/A')
-                        record_time = record.get('RecordTime', 'N/A')
-                        
-                        # 檢查警戒水位
-                        station_alert_data = alert_levels.get(station_id, {})
-                        alert_status, alert_icon = self._check_water_level_alert(water_level, station_alert_data)
-                        alert_counts[alert_status] = alert_counts.get(alert_status, 0) + 1
-                        
-                        # 格式化水位資料
-                        if water_level != 'N/A' and water_level is not None and str(water_level).strip():
-                            try:
-                                water_level_num = float(water_level)
-                                water_level_str = f"{water_level_num:.2f} 公尺"
-                            except:
-                                water_level_str = str(water_level)
+                # 格式化時間
+                try:
+                    if record_time != 'N/A' and record_time:
+                        # 處理不同的時間格式
+                        if 'T' in record_time:
+                            dt = datetime.datetime.fromisoformat(record_time.replace('Z', '+00:00'))
+                            # 轉換為台灣時間 (UTC+8)
+                            dt_tw = dt + datetime.timedelta(hours=8)
+                            time_str = dt_tw.strftime('%m/%d %H:%M')
                         else:
-                            water_level_str = "無資料"
-                        
-                        # 格式化時間
-                        try:
-                            if record_time != 'N/A' and record_time:
-                                # 處理不同的時間格式
-                                if 'T' in record_time:
-                                    dt = datetime.datetime.fromisoformat(record_time.replace('Z', '+00:00'))
-                                    # 轉換為台灣時間 (UTC+8)
-                                    dt_tw = dt + datetime.timedelta(hours=8)
-                                    time_str = dt_tw.strftime('%m/%d %H:%M')
-                                else:
-                                    # 假設已經是本地時間
-                                    time_str = record_time
-                            else:
-                                time_str = "無資料"
-                        except:
-                            time_str = str(record_time)
-                        
-                        embed.add_field(
-                            name=f"{i}. 測站: {station_id}",
-                            value=f"🏷️ 識別碼: {observatory_id}\n💧 水位: {water_level_str}\n{alert_icon} 警戒: {alert_status}\n⏰ 時間: {time_str}",
-                            inline=True
-                        )
-                    
-                    # 加入警戒統計
-                    alert_summary = []
-                    for status, count in alert_counts.items():
-                        if count > 0:
-                            if status == "正常":
-                                alert_summary.append(f"🟢 {status}: {count}")
-                            elif status == "一級警戒":
-                                alert_summary.append(f"🟡 {status}: {count}")
-                            elif status == "二級警戒":
-                                alert_summary.append(f"🟠 {status}: {count}")
-                            elif status == "三級警戒":
-                                alert_summary.append(f"🔴 {status}: {count}")
-                            else:
-                                alert_summary.append(f"⚪ {status}: {count}")
-                    
-                    if alert_summary:
-                        embed.add_field(
-                            name="🚨 警戒狀況統計",
-                            value=" | ".join(alert_summary),
-                            inline=False
-                        )
-                    
-                    # 加入統計資訊
-                    if len(filtered_records) > len(display_records):
-                        embed.add_field(
-                            name="📊 資料統計",
-                            value=f"總共找到 {len(filtered_records)} 筆資料，顯示前 {len(display_records)} 筆",
-                            inline=False
-                        )
+                            # 假設已經是本地時間
+                            time_str = record_time
                     else:
-                        embed.add_field(
-                            name="📊 資料統計",
-                            value=f"共 {len(filtered_records)} 筆資料",
-                            inline=False
-                        )
-                    
-                    embed.set_footer(text="💡 使用 city/river/station 參數可以縮小搜尋範圍 | 🚨 警戒水位資料來源：水利署")
-                    
-                    await interaction.followup.send(embed=embed)
+                        time_str = "無資料"
+                except:
+                    time_str = str(record_time)
                     
+                embed.add_field(
+                    name=f"{i}. 測站: {station_id}",
+                    value=f"🏷️ 識別碼: {observatory_id}\n💧 水位: {water_level_str}\n{alert_icon} 警戒: {alert_status}\n⏰ 時間: {time_str}",
+                    inline=True
+                )
+                
+            # 加入警戒統計
+            alert_summary = []
+            for status, count in alert_counts.items():
+                if count > 0:
+                    if status == "正常":
+                        alert_summary.append(f"🟢 {status}: {count}")
+                    elif status == "一級警戒":
+                        alert_summary.append(f"🟡 {status}: {count}")
+                    elif status == "二級警戒":
+                        alert_summary.append(f"🟠 {status}: {count}")
+                    elif status == "三級警戒":
+                        alert_summary.append(f"🔴 {status}: {count}")
+                    else:
+                        alert_summary.append(f"⚪ {status}: {count}")
+                
+            if alert_summary:
+                embed.add_field(
+                    name="🚨 警戒狀況統計",
+                    value=" | ".join(alert_summary),
+                    inline=False
+                )
+                
+            # 加入統計資訊
+            if len(filtered_records) > len(display_records):
+                embed.add_field(
+                    name="📊 資料統計",
+                    value=f"總共找到 {len(filtered_records)} 筆資料，顯示前 {len(display_records)} 筆",
+                    inline=False
+                )
+            else:
+                embed.add_field(
+                    name="📊 資料統計",
+                    value=f"共 {len(filtered_records)} 筆資料",
+                    inline=False
+                )
+                
+            embed.set_footer(text="💡 使用 city/river/station 參數可以縮小搜尋範圍 | 🚨 警戒水位資料來源：水利署")
+                
+            await interaction.followup.send(embed=embed)
+                
         except Exception as e:
             logger.error(f"查詢河川水位時發生錯誤: {str(e)}")
             await interaction.followup.send(f"❌ 查詢水位資料時發生錯誤: {str(e)}")
@@ -8,14 +8,17 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import aiohttp
 import json
 import asyncio
 import logging
-import ssl
 from typing import Optional, Dict, List
 from datetime import datetime
 
+from utils.http_pool import get_http_pool
+from utils.conditional_fetch import get_conditional_fetcher
+from utils.cache_manager import TTLCache
+from utils.single_flight import coalesce
+
 logger = logging.getLogger(__name__)
 
 class TemperatureCommands(commands.Cog):
@@ -36,24 +39,28 @@ class TemperatureCommands(commands.Cog):
             logger.info("請在 .env 檔案中設定 CWA_API_KEY=您的中央氣象署API密鑰")
         
         # 快取設定
-        self.temperature_cache = {}
-        self.cache_timestamp = 0
         self.cache_duration = 1800  # 快取 30 分鐘
-        
-        # SSL 設定
-        self.ssl_context = ssl.create_default_context()
-        self.ssl_context.check_hostname = False
-        self.ssl_context.verify_mode = ssl.CERT_NONE
+        self.temperature_cache = TTLCache('temperature', ttl=self.cache_duration, stale_ttl=1800, max_entries=1)
+    
+    @property
+    def conditional(self):
+        """機器人共用的條件式下載器 (ETag / Last-Modified / 內容雜湊)"""
+        return get_conditional_fetcher(self.bot)
     
-    async def fetch_temperature_data(self) -> Dict:
-        """從中央氣象署 API 獲取溫度分布資料"""
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
+    
+    async def fetch_temperature_data(self, force_refresh: bool = False) -> Dict:
+        """從中央氣象署 API 獲取溫度分布資料 (含快取)"""
+        data = await self.temperature_cache.get_or_fetch('O-A0038-001', self._request_temperature_data, force_refresh=force_refresh)
+        return data or {}
+    
+    @coalesce('temperature')
+    async def _request_temperature_data(self) -> Dict:
+        """向中央氣象署請求溫度分布資料"""
         try:
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (self.temperature_cache and 
-                current_time - self.cache_timestamp < self.cache_duration):
-                return self.temperature_cache
-            
             # 構建 API 參數
             params = {
                 "Authorization": self.authorization,
@@ -63,28 +70,14 @@ class TemperatureCommands(commands.Cog):
             
             logger.info(f"正在從中央氣象署 API 獲取溫度分布資料: {self.temperature_api}")
             
-            connector = aiohttp.TCPConnector(ssl=self.ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(self.temperature_api, params=params) as response:
-                    if response.status == 200:
-                        # 處理 MIME 類型問題，使用雙重解析機制
-                        try:
-                            response_text = await response.text()
-                            data = json.loads(response_text)
-                        except json.JSONDecodeError:
-                            # 如果 JSON 解析失敗，嘗試直接使用 response.json()
-                            data = await response.json(content_type=None)
-                        
-                        # 更新快取
-                        self.temperature_cache = data
-                        self.cache_timestamp = current_time
-                        
-                        logger.info("成功獲取溫度分布資料")
-                        return data
-                    else:
-                        logger.error(f"溫度分布 API 請求失敗: HTTP {response.status}")
-                        return {}
+            # 條件式下載：資料未更新時沿用上一次的解析結果，不必重新解析
+            result = await self.conditional.fetch(self.temperature_api, params=params)
+            if result.ok:
+                logger.info("成功獲取溫度分布資料")
+                return result.data
+            else:
+                logger.error(f"溫度分布 API 請求失敗: HTTP {result.status}")
+                return {}
                         
         except Exception as e:
             logger.error(f"獲取溫度分布資料時發生錯誤: {e}")
@@ -395,11 +388,8 @@ class TemperatureView(discord.ui.View):
         await interaction.response.defer()
         
         try:
-            # 清除快取，強制重新獲取
-            self.cog.temperature_cache = {}
-            
-            # 獲取最新資料
-            data = await self.cog.fetch_temperature_data()
+            # 略過快取，強制重新獲取
+            data = await self.cog.fetch_temperature_data(force_refresh=True)
             
             if not data:
                 await interaction.followup.send("❌ 無法獲取最新溫度分布資料。", ephemeral=True)
@@ -16,6 +16,12 @@ from typing import Optional, List, Dict, Tuple
 import urllib.parse
 from datetime import datetime
 
+from utils.http_pool import get_http_pool
+from utils.cache_manager import TTLCache
+from utils.persistent_cache import get_persistent_cache
+from utils.single_flight import coalesce
+from utils.county_resolver import resolve_county
+
 logger = logging.getLogger(__name__)
 
 class WeatherCommands(commands.Cog):
@@ -34,19 +40,44 @@ class WeatherCommands(commands.Cog):
             logger.error("❌ 錯誤: 找不到 CWA_API_KEY 環境變數")
             logger.info("請在 .env 檔案中設定 CWA_API_KEY=您的中央氣象署API密鑰")
         
-        self.station_data_cache = {}  # 快取測站資料
-        self.cache_timestamp = 0
         self.cache_duration = 3600  # 快取 1 小時
+        # 快取測站資料 (同步寫入 data/，重啟後可立即使用)
+        self.station_data_cache = TTLCache(
+            'weather_station', ttl=self.cache_duration, stale_ttl=7 * 86400, max_entries=1,
+            persistent=get_persistent_cache(bot)
+        )
+        # 預熱測站資料的背景工作 (保留參照，卸載時取消)
+        self.warm_task: Optional[asyncio.Task] = None
         
+    async def cog_load(self):
+        """Cog 載入時從磁碟載回測站資料，並在背景重新驗證"""
+        self.warm_task = asyncio.create_task(self._warm_station_data())
+    
+    async def cog_unload(self):
+        """Cog 卸載時取消尚未完成的預熱工作"""
+        if self.warm_task and not self.warm_task.done():
+            self.warm_task.cancel()
+    
+    async def _warm_station_data(self):
+        try:
+            await self.station_data_cache.warm()
+            await self.fetch_station_data()
+        except Exception as e:
+            logger.error(f"預熱測站資料時發生錯誤: {str(e)}")
+    
+    @property
+    def http(self):
+        """機器人共用的 HTTP 連線池"""
+        return get_http_pool(self.bot)
+    
     async def fetch_station_data(self) -> Dict:
-        """從 CWA API 獲取無人氣象測站基本資料"""
+        """從 CWA API 獲取無人氣象測站基本資料 (含快取)"""
+        return await self.station_data_cache.get_or_fetch('C-B0074-002', self._request_station_data)
+    
+    @coalesce('weather_station')
+    async def _request_station_data(self) -> Dict:
+        """向 CWA API 請求無人氣象測站基本資料"""
         try:
-            # 檢查快取
-            current_time = asyncio.get_event_loop().time()
-            if (self.station_data_cache and 
-                current_time - self.cache_timestamp < self.cache_duration):
-                return self.station_data_cache
-            
             # 構建 API URL
             endpoint = "C-B0074-002"
             url = f"{self.cwa_api_base}/{endpoint}"
@@ -58,25 +89,15 @@ class WeatherCommands(commands.Cog):
             
             logger.info(f"正在從 CWA API 獲取測站資料: {url}")
             
-            if hasattr(self.bot, 'connector') and self.bot.connector:
-                connector = self.bot.connector
-            else:
-                connector = aiohttp.TCPConnector(ssl=False)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        
-                        # 更新快取
-                        self.station_data_cache = data
-                        self.cache_timestamp = current_time
+            async with self.http.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 200:
+                    data = await response.json()
                         
-                        logger.info("成功獲取測站資料")
-                        return data
-                    else:
-                        logger.error(f"API 請求失敗，狀態碼: {response.status}")
-                        return None
+                    logger.info("成功獲取測站資料")
+                    return data
+                else:
+                    logger.error(f"API 請求失敗，狀態碼: {response.status}")
+                    return None
                         
         except Exception as e:
             logger.error(f"獲取測站資料時發生錯誤: {str(e)}")
@@ -305,6 +326,7 @@ class WeatherCommands(commands.Cog):
         embed.set_footer(text=f"第 {page}/{total_pages} 頁 | 資料來源：中央氣象署開放資料平臺")
         return embed, total_pages
     
+    @coalesce('weather_observation')
     async def fetch_weather_observation_data(self) -> Dict:
         """從 CWA API 獲取實際天氣觀測資料"""
         try:
@@ -319,27 +341,18 @@ class WeatherCommands(commands.Cog):
             
             logger.info(f"正在從 CWA API 獲取天氣觀測資料: {url}")
             
-            # 設定 SSL 上下文
-            import ssl
-            ssl_context = ssl.create_default_context()
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-            
-            connector = aiohttp.TCPConnector(ssl=ssl_context)
-            
-            async with aiohttp.ClientSession(connector=connector) as session:
-                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            async with self.http.get(url, params=params, timeout=aiohttp.ClientTimeout(total=30)) as response:
+                if response.status == 200:
+                    data = await response.json()
                         
-                        if data.get('success') == 'true':
-                            return data
-                        else:
-                            logger.error(f"API 回應失敗: {data}")
-                            return {}
+                    if data.get('success') == 'true':
+                        return data
                     else:
-                        logger.error(f"API 請求失敗，狀態碼: {response.status}")
+                        logger.error(f"API 回應失敗: {data}")
                         return {}
+                else:
+                    logger.error(f"API 請求失敗，狀態碼: {response.status}")
+                    return {}
                         
         except Exception as e:
             logger.error(f"獲取天氣觀測資料時發生錯誤: {str(e)}")
@@ -584,8 +597,12 @@ class WeatherCommands(commands.Cog):
                 await interaction.followup.send(embed=embed)
                 return
             
-            # 篩選縣市
-            county_stations = [s for s in stations if county.lower() in s.get('county', '').lower()]
+            # 篩選縣市 (以縣市解析器比對，「台北」、「臺北市」都能找到同一批測站)
+            target_county = resolve_county(county)
+            if target_county:
+                county_stations = [s for s in stations if resolve_county(s.get('county', '')) == target_county]
+            else:
+                county_stations = [s for s in stations if county.lower() in s.get('county', '').lower()]
             
             # 篩選狀態
             if status != "all":
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試自適應輪詢間隔 (以固定的時間點模擬，不需等待)
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.adaptive_poller import AdaptivePoller
+
+
+def test_burst_window_speeds_up_then_expires():
+    poller = AdaptivePoller('test_poller_burst', quiet_interval=60, burst_interval=15, burst_window=100)
+    assert poller.next_interval(now=0) == 60
+
+    poller.burst(now=10)
+    assert poller.next_interval(now=50) == 15
+    # 期間內再次偵測到新報告會延長快速輪詢，但只算一次進入快速模式
+    poller.burst(now=90)
+    assert poller.next_interval(now=150) == 15
+    assert poller.next_interval(now=191) == 60
+    assert poller.get_stats()['bursts'] == 1
+
+
+def test_detection_latency_percentiles():
+    poller = AdaptivePoller('test_poller_latency', history=3)
+    for event_id, latency in [('1', 500.0), ('2', 30.0), ('3', 45.0), ('4', 60.0)]:
+        poller.record_detection(event_id, latency)
+    poller.record_cycle(0.5)
+    poller.record_cycle(1.5)
+
+    stats = poller.get_stats()
+    # 只保留最近 3 筆
+    assert stats['detections'] == 3
+    assert stats['latency_p50'] == 45.0 and stats['latency_p95'] == 60.0
+    assert stats['last_event'] == '4' and stats['avg_cycle_time'] == 1.0
+
+
+def test_send_latency_is_tracked_separately():
+    poller = AdaptivePoller('test_poller_send')
+    poller.record_detection('1', 30.0)
+    poller.record_send('1', 42.0)
+
+    stats = poller.get_stats()
+    assert stats['detections'] == 1 and stats['latency_p50'] == 30.0
+    assert stats['sends'] == 1 and stats['send_latency_p50'] == 42.0
+    assert stats['last_sent_event'] == '1' and stats['last_send_latency'] == 42.0
+
+
+def test_send_latency_is_recorded_after_broadcast():
+    from cogs.info_commands_fixed_v4_clean import InfoCommands, TAIWAN_TZ
+
+    class FakeSubscriptions:
+        def __init__(self):
+            self.watermark = '114000'
+
+        def get_watermark(self, name):
+            return self.watermark
+
+        async def set_watermark(self, name, report_no):
+            self.watermark = report_no
+
+        def match(self, county_intensity):
+            return [1]
+
+    class FakeBroadcaster:
+        async def broadcast(self, event_id, targets, send, started_at=None):
+            events.append('broadcast')
+            return type('Result', (), {'sent': len(targets)})()
+
+    class RecordingPoller(AdaptivePoller):
+        def record_detection(self, event_id, latency):
+            events.append('detection')
+            super().record_detection(event_id, latency)
+
+        def record_send(self, event_id, latency):
+            events.append('send')
+            super().record_send(event_id, latency)
+
+    events = []
+    poller = RecordingPoller('test_poller_cog')
+    origin = (datetime.datetime.now(TAIWAN_TZ) - datetime.timedelta(seconds=60)).strftime('%Y-%m-%d %H:%M:%S')
+    latest_eq = {'EarthquakeNo': 114001, 'EarthquakeInfo': {'OriginTime': origin}, 'Intensity': {'ShakingArea': []}}
+
+    async def run():
+        cog = InfoCommands.__new__(InfoCommands)
+        cog.subscriptions = FakeSubscriptions()
+        cog.earthquake_broadcaster = FakeBroadcaster()
+        cog.earthquake_poller = poller
+        cog._subscription_targets = lambda guild_ids: [(guild_id, object()) for guild_id in guild_ids]
+
+        async def format_earthquake_data(eq):
+            return type('Embed', (), {'title': ''})()
+
+        cog.format_earthquake_data = format_earthquake_data
+        assert await cog.broadcast_earthquake(latest_eq, '114001')
+
+    asyncio.run(run())
+    # 偵測延遲在發送前記錄，發送延遲在廣播結束後記錄
+    assert events == ['detection', 'broadcast', 'send']
+    stats = poller.get_stats()
+    assert stats['last_event'] == '114001' and stats['last_sent_event'] == '114001'
+    assert 60 <= stats['latency_p50'] <= stats['send_latency_p50'] < 120
+
+
+if __name__ == '__main__':
+    test_burst_window_speeds_up_then_expires()
+    test_detection_latency_percentiles()
+    test_send_latency_is_tracked_separately()
+    test_send_latency_is_recorded_after_broadcast()
+    print('✅ 自適應輪詢測試通過')
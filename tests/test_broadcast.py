@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試通知廣播引擎 (以假的頻道取代 Discord)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.broadcast import BroadcastEngine, RateLimiter
+
+
+class FakeForbiddenResponse:
+    status = 403
+    reason = 'Forbidden'
+
+
+class FakeChannel:
+    def __init__(self, channel_id, forbidden=False):
+        self.id = channel_id
+        self.forbidden = forbidden
+        self.messages = []
+
+
+def test_fan_out_is_bounded_and_records_latency():
+    async def run():
+        active = {'now': 0, 'max': 0}
+
+        async def send(channel):
+            if channel.forbidden:
+                raise discord.Forbidden(FakeForbiddenResponse(), 'Missing Permissions')
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            await asyncio.sleep(0.01)
+            active['now'] -= 1
+            channel.messages.append('🚨')
+
+        channels = [FakeChannel(i, forbidden=(i == 3)) for i in range(20)]
+        engine = BroadcastEngine('test_broadcast', max_concurrency=4, rate=1000)
+        result = await engine.broadcast('114001', [(c.id, c) for c in channels], send)
+
+        assert result.sent == 19 and result.forbidden == 1
+        assert active['max'] <= 4
+        assert set(result.latencies) == set(range(20)) - {3}
+        # 並行發送：總耗時遠小於逐一發送 (20 × 0.01 秒)
+        assert result.duration < 0.15
+        stats = engine.get_stats()
+        assert stats['last_event'] == '114001' and stats['last_p95'] > 0
+
+    asyncio.run(run())
+
+
+def test_rate_limiter_spaces_out_sends():
+    async def run():
+        limiter = RateLimiter(rate=50, burst=5)
+        started = time.monotonic()
+        for _ in range(10):
+            await limiter.acquire()
+        # 前 5 次立即通過，其餘 5 次以每秒 50 次的速率放行 (約 0.1 秒)
+        assert 0.07 < time.monotonic() - started < 0.5
+
+    asyncio.run(run())
+
+
+def test_empty_target_list():
+    async def run():
+        engine = BroadcastEngine('test_broadcast_empty')
+        result = await engine.broadcast('114002', [], lambda channel: None)
+        assert result.sent == 0 and result.percentile(0.95) == 0.0
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_fan_out_is_bounded_and_records_latency()
+    test_rate_limiter_spaces_out_sends()
+    test_empty_target_list()
+    print('✅ 通知廣播測試通過')
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試通用 TTL 快取 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import TTLCache
+
+
+def test_keys_expire_independently():
+    async def run():
+        cache = TTLCache('test_independent', ttl=0.05)
+        calls = []
+
+        async def fetcher(key):
+            calls.append(key)
+            return {'key': key, 'n': len(calls)}
+
+        await cache.get_or_fetch('normal', lambda: fetcher('normal'))
+        await asyncio.sleep(0.03)
+        await cache.get_or_fetch('small', lambda: fetcher('small'))
+        await asyncio.sleep(0.03)
+
+        # normal 已過期需要重新取得，small 仍然有效
+        await cache.get_or_fetch('normal', lambda: fetcher('normal'))
+        await cache.get_or_fetch('small', lambda: fetcher('small'))
+        assert calls == ['normal', 'small', 'normal']
+
+    asyncio.run(run())
+
+
+def test_stale_while_revalidate():
+    async def run():
+        cache = TTLCache('test_swr', ttl=0.01, stale_ttl=10)
+        release = asyncio.Event()
+        version = {'n': 0}
+
+        async def slow_fetcher():
+            if version['n'] > 0:
+                await release.wait()
+            version['n'] += 1
+            return {'version': version['n']}
+
+        first = await cache.get_or_fetch('k', slow_fetcher)
+        await asyncio.sleep(0.02)
+
+        # 過期但在寬限期內: 立即回傳舊資料，不等待更新
+        stale = await asyncio.wait_for(cache.get_or_fetch('k', slow_fetcher), timeout=0.5)
+        assert stale == first
+
+        release.set()
+        await asyncio.sleep(0.01)
+        assert cache.get_entry('k').value == {'version': 2}
+
+        stats = cache.get_stats()
+        assert stats['stale_hits'] == 1
+        assert stats['refreshes'] == 2
+
+    asyncio.run(run())
+
+
+def test_failed_refresh_keeps_old_value():
+    async def run():
+        cache = TTLCache('test_fallback', ttl=0.01)
+        await cache.get_or_fetch('k', lambda: asyncio.sleep(0, result={'ok': True}))
+        await asyncio.sleep(0.02)
+
+        async def failing():
+            raise RuntimeError('upstream down')
+
+        assert await cache.get_or_fetch('k', failing) == {'ok': True}
+        assert cache.get_stats()['refresh_errors'] == 1
+
+        # 空值不寫入快取
+        assert await TTLCache('test_empty', ttl=10).get_or_fetch('k', lambda: asyncio.sleep(0, result={})) == {}
+
+    asyncio.run(run())
+
+
+def test_concurrent_misses_share_one_fetch():
+    async def run():
+        cache = TTLCache('test_concurrent', ttl=10)
+        calls = {'n': 0}
+
+        async def fetcher():
+            calls['n'] += 1
+            await asyncio.sleep(0.02)
+            return [1, 2, 3]
+
+        results = await asyncio.gather(*[cache.get_or_fetch('k', fetcher) for _ in range(5)])
+        assert calls['n'] == 1
+        assert all(r == [1, 2, 3] for r in results)
+
+    asyncio.run(run())
+
+
+def test_lru_bound():
+    cache = TTLCache('test_lru', ttl=10, max_entries=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1   # a 變成最近使用
+    cache.set('c', 3)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_get_or_compute_memoizes_local_results():
+    cache = TTLCache('test_compute', ttl=10)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'title': 'x'}
+
+    assert cache.get_or_compute(('line', 'TRTC', 1), compute) == {'title': 'x'}
+    assert cache.get_or_compute(('line', 'TRTC', 1), compute) == {'title': 'x'}
+    assert len(calls) == 1
+    # 空結果不寫入快取
+    assert cache.get_or_compute('empty', lambda: None) is None and 'empty' not in cache
+    stats = cache.get_stats()
+    assert stats['hits'] == 1 and stats['misses'] == 2
+
+
+if __name__ == '__main__':
+    test_keys_expire_independently()
+    test_stale_while_revalidate()
+    test_failed_refresh_keeps_old_value()
+    test_concurrent_misses_share_one_fetch()
+    test_lru_bound()
+    test_get_or_compute_memoizes_local_results()
+    print('✅ TTL 快取測試通過')
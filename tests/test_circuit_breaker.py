@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試上游主機斷路器 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import aiohttp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import TTLCache, mark_stale
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError, GuardedRequest
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.released = False
+
+    def release(self):
+        self.released = True
+
+
+def test_opens_after_threshold_and_recovers():
+    breaker = CircuitBreaker('example.com', failure_threshold=3, recovery_timeout=0.05)
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.get_stats()['rejected'] == 1
+
+    time.sleep(0.06)
+    # 冷卻結束只放行一個試探請求
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens():
+    breaker = CircuitBreaker('example.com', failure_threshold=1, recovery_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow() and breaker.state == 'half_open'
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert breaker.get_stats()['opened'] == 2
+
+
+def test_guarded_request_counts_5xx_and_errors():
+    async def run():
+        breaker = CircuitBreaker('example.com', failure_threshold=2, recovery_timeout=60)
+        calls = {'n': 0}
+
+        async def server_error():
+            calls['n'] += 1
+            return FakeResponse(503)
+
+        async def connection_error():
+            calls['n'] += 1
+            raise aiohttp.ClientConnectionError('boom')
+
+        async with GuardedRequest(breaker, server_error) as response:
+            assert response.status == 503
+        assert response.released
+
+        try:
+            await GuardedRequest(breaker, connection_error)
+        except aiohttp.ClientConnectionError:
+            pass
+        assert breaker.state == 'open'
+
+        # 開啟中：不呼叫上游，立即拋出 (也是 ClientError，既有的錯誤處理可直接接住)
+        try:
+            await GuardedRequest(breaker, server_error)
+            assert False, '應該拋出 CircuitOpenError'
+        except CircuitOpenError as e:
+            assert isinstance(e, aiohttp.ClientError)
+        assert calls['n'] == 2
+
+        # 4xx 代表上游仍可回應，不計入失敗
+        breaker.reset()
+
+        async def not_found():
+            return FakeResponse(404)
+
+        for _ in range(3):
+            await GuardedRequest(breaker, not_found)
+        assert breaker.state == 'closed'
+
+    asyncio.run(run())
+
+
+def test_cache_serves_stale_snapshot_with_marker():
+    async def run():
+        cache = TTLCache('test_circuit_stale', ttl=0.01)
+        await cache.get_or_fetch('k', lambda: asyncio.sleep(0, result={'v': 1}))
+        assert cache.stale_notice('k') is None
+        await asyncio.sleep(0.02)
+
+        async def circuit_open():
+            raise CircuitOpenError('example.com', 30)
+
+        assert await cache.get_or_fetch('k', circuit_open) == {'v': 1}
+
+        class Embed:
+            description = '原本的說明'
+
+        embed = mark_stale(Embed(), cache, 'k')
+        assert embed.description.startswith('⚠️') and embed.description.endswith('原本的說明')
+
+        # 恢復後提示消失
+        await cache.get_or_fetch('k', lambda: asyncio.sleep(0, result={'v': 2}))
+        assert cache.stale_notice('k') is None
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_opens_after_threshold_and_recovers()
+    test_failed_probe_reopens()
+    test_guarded_request_counts_5xx_and_errors()
+    test_cache_serves_stale_snapshot_with_marker()
+    print('✅ 斷路器測試通過')
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試條件式下載 (以假的連線池取代網路請求)
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.conditional_fetch import ConditionalFetcher
+from utils.persistent_cache import PersistentCache
+
+
+class FakeResponse:
+    def __init__(self, status, body=b'', headers=None):
+        self.status = status
+        self._body = body
+        self.headers = headers or {}
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+
+class FakePool:
+    """依序回傳預先設定的回應，並記錄每次請求帶出的標頭"""
+
+    closed = False
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.sent_headers = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.sent_headers.append(dict(headers or {}))
+        return self.responses.pop(0)
+
+
+def test_not_modified_reuses_parsed_payload():
+    async def run():
+        body = json.dumps({'records': [1, 2]}).encode('utf-8')
+        pool = FakePool([
+            FakeResponse(200, body, {'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'}),
+            FakeResponse(304),
+        ])
+        parsed = []
+
+        def parse(raw):
+            parsed.append(raw)
+            return json.loads(raw)
+
+        fetcher = ConditionalFetcher(http_pool=pool)
+        first = await fetcher.fetch('https://example.com/a', params={'Authorization': 'secret'}, parse=parse)
+        second = await fetcher.fetch('https://example.com/a', params={'Authorization': 'secret'}, parse=parse)
+
+        assert first.changed and not second.changed
+        assert second.data == {'records': [1, 2]}
+        assert len(parsed) == 1
+        assert pool.sent_headers[0] == {}
+        assert pool.sent_headers[1]['If-None-Match'] == '"v1"'
+        assert pool.sent_headers[1]['If-Modified-Since'] == 'Mon, 01 Jan 2024 00:00:00 GMT'
+        assert fetcher.get_stats()['not_modified'] == 1
+
+    asyncio.run(run())
+
+
+def test_same_body_skips_parse_without_validators():
+    async def run():
+        # 水利署資料帶有 UTF-8 BOM 且不提供 ETag
+        body = '\ufeff{"RealtimeWaterLevel_OPENDATA": []}'.encode('utf-8')
+        pool = FakePool([FakeResponse(200, body), FakeResponse(200, body), FakeResponse(200, b'{"changed": true}')])
+        fetcher = ConditionalFetcher(http_pool=pool)
+
+        first = await fetcher.fetch('https://example.com/wra')
+        second = await fetcher.fetch('https://example.com/wra')
+        third = await fetcher.fetch('https://example.com/wra')
+
+        assert first.data == {'RealtimeWaterLevel_OPENDATA': []}
+        assert second.data is first.data and not second.changed
+        assert third.changed and third.data == {'changed': True}
+        assert fetcher.get_stats()['unchanged'] == 1
+
+    asyncio.run(run())
+
+
+def test_validators_survive_restart_without_secrets():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentCache(os.path.join(tmp, 'cache.db'))
+            pool = FakePool([FakeResponse(200, b'{"v": 1}', {'ETag': '"abc"'})])
+            await ConditionalFetcher(http_pool=pool, persistent=store).fetch(
+                'https://example.com/b', params={'Authorization': 'secret', 'format': 'JSON'}
+            )
+
+            # 模擬重啟：新的下載器從磁碟讀回驗證資訊
+            restarted_pool = FakePool([FakeResponse(304)])
+            result = await ConditionalFetcher(http_pool=restarted_pool, persistent=store).fetch(
+                'https://example.com/b', params={'Authorization': 'other-secret', 'format': 'JSON'}
+            )
+            assert result.data == {'v': 1}
+            assert restarted_pool.sent_headers[0]['If-None-Match'] == '"abc"'
+
+            keys = [d.key for d in await store.load_prefix('conditional:')]
+            assert keys == ['conditional:https://example.com/b?format=JSON']
+            store.close()
+
+    asyncio.run(run())
+
+
+def test_unchanged_body_does_not_reserialize_payload():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentCache(os.path.join(tmp, 'cache.db'))
+            saved = []
+            original_save = store._save_sync
+
+            def counting_save(*args):
+                saved.append(args[0])
+                return original_save(*args)
+
+            store._save_sync = counting_save
+            body = b'{"radar": [1, 2, 3]}'
+            pool = FakePool([FakeResponse(200, body), FakeResponse(200, body, {'ETag': '"v2"'})])
+            fetcher = ConditionalFetcher(http_pool=pool, persistent=store)
+
+            await fetcher.fetch('https://example.com/radar')
+            result = await fetcher.fetch('https://example.com/radar')
+            assert not result.changed and result.data == {'radar': [1, 2, 3]}
+            # 只有第一次寫入整份資料，內容相同時只更新驗證資訊
+            assert saved == ['conditional:https://example.com/radar']
+            dataset = await store.load('conditional:https://example.com/radar')
+            assert dataset.etag == '"v2"' and dataset.payload == {'radar': [1, 2, 3]}
+            store.close()
+
+    asyncio.run(run())
+
+
+def test_error_status_returns_no_data():
+    async def run():
+        fetcher = ConditionalFetcher(http_pool=FakePool([FakeResponse(503)]))
+        result = await fetcher.fetch('https://example.com/c')
+        assert not result.ok and result.status == 503
+        assert fetcher.get_stats()['errors'] == 1
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_not_modified_reuses_parsed_payload()
+    test_same_body_skips_parse_without_validators()
+    test_validators_survive_restart_without_secrets()
+    test_unchanged_body_does_not_reserialize_payload()
+    test_error_status_returns_no_data()
+    print('✅ 條件式下載測試通過')
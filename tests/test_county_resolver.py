@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試縣市名稱解析 (不需網路)
+"""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.county_resolver import COUNTIES, resolve_county, same_county
+
+
+def test_aliases_and_longest_match():
+    # 台/臺 與省略「市/縣」
+    assert resolve_county('台北') == '臺北市'
+    assert resolve_county('臺東') == '臺東縣'
+    assert resolve_county('台中市西屯區') == '臺中市'
+    # 同一位置取最長的別名：新竹市不會被簡稱「新竹」(對應新竹縣) 吃掉
+    assert resolve_county('300新竹市東區中華路二段 445 號') == '新竹市'
+    assert resolve_county('302新竹縣竹北市') == '新竹縣'
+    assert resolve_county('嘉義') == '嘉義縣'
+    assert resolve_county('嘉義市西區') == '嘉義市'
+    # 新北市不會被判斷為臺北市
+    assert resolve_county('220227新北市板橋區縣民大道二段 7 號') == '新北市'
+    # 升格前的舊縣名
+    assert resolve_county('臺北縣板橋市') == '新北市'
+    assert resolve_county('高雄縣鳳山市') == '高雄市'
+    assert resolve_county('') is None and resolve_county('東京都') is None
+    assert same_county('台南', '臺南市') and not same_county('台南', '高雄')
+
+
+def test_every_county_resolves_to_itself():
+    for county in COUNTIES:
+        assert resolve_county(county) == county
+        assert resolve_county(county.replace('臺', '台')) == county
+
+
+def test_tra_station_addresses_match_known_counties():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, '車站基本資料集.json'), 'r', encoding='utf-8') as f:
+        stations = {item['stationCode']: item['stationAddrTw'] for item in json.load(f)}
+    with open(os.path.join(root, 'correct_tra_stations.json'), 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    for county, county_stations in expected.items():
+        for station in county_stations:
+            assert resolve_county(stations[station['id']]) == county, station
+
+
+if __name__ == '__main__':
+    test_aliases_and_longest_match()
+    test_every_county_resolves_to_itself()
+    test_tra_station_addresses_match_known_counties()
+    print('✅ 縣市名稱解析測試通過')
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試地震歷史紀錄 (使用暫存資料庫)
+"""
+
+import asyncio
+import datetime
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.earthquake_history import EarthquakeHistory, summarize_earthquake
+from utils.earthquake_intensity import epicenter_county
+
+
+def make_eq(report_no, origin_time, magnitude, depth, location, intensity='3級', county='花蓮縣'):
+    return {
+        'EarthquakeNo': report_no,
+        'Web': f'https://scweb.cwa.gov.tw/{report_no}',
+        'EarthquakeInfo': {
+            'OriginTime': origin_time,
+            'FocalDepth': depth,
+            'Epicenter': {'Location': location},
+            'EarthquakeMagnitude': {'MagnitudeValue': magnitude},
+        },
+        'Intensity': {'ShakingArea': [{'CountyName': county, 'AreaIntensity': intensity}]},
+    }
+
+
+def test_epicenter_county():
+    assert epicenter_county('花蓮縣政府東南方 25.1 公里 (位於花蓮縣近海)') == '花蓮縣'
+    assert epicenter_county('臺東縣政府北方 10.0 公里 (位於台東縣海端鄉)') == '臺東縣'
+    assert epicenter_county('宜蘭縣政府東方 70.0 公里') == '宜蘭縣'
+    # 「位於」的縣市優先於描述開頭的縣市；括號內沒有縣市時採用開頭的縣市
+    assert epicenter_county('花蓮縣政府北北東方 30.0 公里 (位於宜蘭縣南澳鄉)') == '宜蘭縣'
+    assert epicenter_county('花蓮縣政府東方 70.0 公里 (位於臺灣東部海域)') == '花蓮縣'
+    assert epicenter_county('') is None
+
+
+def test_record_and_query():
+    async def run():
+        taiwan_now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=8)))
+        recent = (taiwan_now - datetime.timedelta(days=2)).strftime('%Y-%m-%d %H:%M:%S')
+        old = (taiwan_now - datetime.timedelta(days=90)).strftime('%Y-%m-%d %H:%M:%S')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            history = EarthquakeHistory(os.path.join(tmp, 'earthquake_history.db'))
+            assert await history.record([
+                make_eq(114001, old, 6.1, 15.0, '花蓮縣政府東南方 25.1 公里 (位於花蓮縣近海)', intensity='5弱'),
+                make_eq(114002, recent, 4.2, 8.3, '臺東縣政府北方 10.0 公里 (位於臺東縣海端鄉)'),
+            ]) == 2
+            # 同一筆報告重複輪詢不會再寫入
+            assert await history.record([make_eq(114002, recent, 4.2, 8.3, '臺東縣政府北方 10.0 公里')]) == 1
+            assert await history.record([make_eq(114002, recent, 4.2, 8.3, '臺東縣政府北方 10.0 公里')]) == 0
+
+            newest_first = await history.query()
+            assert [row['report_no'] for row in newest_first] == ['114002', '114001']
+
+            strong = await history.query(min_magnitude=5)
+            assert [row['report_no'] for row in strong] == ['114001']
+            assert strong[0]['max_intensity'] == 5 and strong[0]['county'] == '花蓮縣'
+
+            assert await history.query(county='花蓮縣', days=30) == []
+            assert [row['report_no'] for row in await history.query(county='台東縣', days=30)] == ['114002']
+            assert [row['report_no'] for row in await history.query(county='台東', days=30)] == ['114002']
+            history.close()
+
+    asyncio.run(run())
+
+
+def test_poll_records_every_report_since_last_poll():
+    from cogs.info_commands_fixed_v4_clean import InfoCommands
+
+    first = make_eq(114010, '2025-03-01 10:00:00', 4.0, 10.0, '花蓮縣政府東方 20.0 公里')
+    second = make_eq(114011, '2025-03-01 10:05:00', 4.5, 12.0, '宜蘭縣政府東方 30.0 公里')
+    third = make_eq(114012, '2025-03-01 10:07:00', 5.0, 8.0, '臺東縣政府北方 10.0 公里')
+
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            cog = InfoCommands.__new__(InfoCommands)
+            cog.earthquake_history = EarthquakeHistory(os.path.join(tmp, 'earthquake_history.db'))
+            feed = {'latest': first, 'window': [first]}
+            requests = []
+
+            async def fetch_earthquake_data(small_area=False, force_refresh=False):
+                return {'records': {'Earthquake': [feed['latest']]}}
+
+            async def request_earthquake_data(small_area=False, limit=1):
+                requests.append(limit)
+                return {'records': {'Earthquake': feed['window']}}
+
+            async def broadcast_earthquake(latest_eq, report_no, watermark_name='earthquake'):
+                return False
+
+            cog.fetch_earthquake_data = fetch_earthquake_data
+            cog._request_earthquake_data = request_earthquake_data
+            cog.broadcast_earthquake = broadcast_earthquake
+
+            await cog.poll_earthquake_feed()
+            # 最新報告已記錄時不再補抓
+            await cog.poll_earthquake_feed()
+            assert len(requests) == 1
+
+            # 兩次輪詢之間發布了兩筆報告：補抓最近的報告，兩筆都寫入
+            feed['latest'], feed['window'] = third, [third, second, first]
+            await cog.poll_earthquake_feed()
+            assert len(requests) == 2 and requests[-1] > 1
+            rows = await cog.earthquake_history.query()
+            assert [row['report_no'] for row in rows] == ['114012', '114011', '114010']
+            assert await cog.earthquake_history.newest() == ('2025-03-01 10:07:00', '114012')
+
+            # 最新報告被撤回後，上游的最新一筆比已記錄的舊：不再每次輪詢都補抓
+            feed['latest'], feed['window'] = second, [second, first]
+            await cog.poll_earthquake_feed()
+            await cog.poll_earthquake_feed()
+            assert len(requests) == 2
+            cog.earthquake_history.close()
+
+    asyncio.run(run())
+
+
+def test_record_newer_skips_reports_already_covered():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'earthquake_history.db')
+            history = EarthquakeHistory(path)
+            await history.record([make_eq(114020, '2025-04-01 08:00:00', 4.0, 10.0, '花蓮縣政府東方 20.0 公里')])
+            history.close()
+
+            # 重新啟動後由資料庫載入已記錄的最新一筆
+            history = EarthquakeHistory(path)
+            assert await history.record_newer([
+                make_eq(114022, '2025-04-01 09:00:00', 4.1, 10.0, '花蓮縣政府東方 20.0 公里'),
+                make_eq(114021, '2025-04-01 08:30:00', 4.2, 10.0, '花蓮縣政府東方 20.0 公里'),
+                make_eq(114019, '2025-04-01 07:00:00', 4.3, 10.0, '花蓮縣政府東方 20.0 公里'),
+            ]) == 2
+            assert [row['report_no'] for row in await history.query()] == ['114022', '114021', '114020']
+            # 小區域地震各自計算
+            assert await history.newest(small_area=True) is None
+            history.close()
+
+    asyncio.run(run())
+
+
+def test_summarize_skips_incomplete_reports():
+    assert summarize_earthquake({'EarthquakeNo': 1}) is None
+    row = summarize_earthquake({'EarthquakeNo': 2, 'OriginTime': '2025-01-01 00:00:00'}, small_area=True)
+    assert row['magnitude'] is None and row['small_area'] == 1
+
+
+if __name__ == '__main__':
+    test_epicenter_county()
+    test_record_and_query()
+    test_poll_records_every_report_since_last_poll()
+    test_record_newer_skips_reports_already_covered()
+    test_summarize_skips_incomplete_reports()
+    print('✅ 地震歷史紀錄測試通過')
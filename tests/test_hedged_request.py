@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試對沖請求 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.hedged_request import HedgedRequest
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    async def run():
+        cancelled = []
+
+        async def slow_auth():
+            try:
+                await asyncio.sleep(5)
+                return {'mode': 'auth'}
+            except asyncio.CancelledError:
+                cancelled.append('auth')
+                raise
+
+        async def fast_no_auth():
+            await asyncio.sleep(0.01)
+            return {'mode': 'no_auth'}
+
+        hedge = HedgedRequest('test_hedge_slow', delay=0.05)
+        started = time.monotonic()
+        result = await hedge.run([slow_auth, fast_no_auth], labels=['auth', 'no_auth'])
+        await asyncio.sleep(0)
+
+        assert result == {'mode': 'no_auth'}
+        assert time.monotonic() - started < 1
+        assert cancelled == ['auth']
+        stats = hedge.get_stats()
+        assert stats['hedges'] == 1 and stats['cancelled'] == 1
+        assert stats['wins'] == {'no_auth': 1}
+
+    asyncio.run(run())
+
+
+def test_fast_primary_never_hedges():
+    async def run():
+        calls = []
+
+        async def primary():
+            calls.append('primary')
+            return {'ok': 1}
+
+        async def backup():
+            calls.append('backup')
+            return {'ok': 2}
+
+        result = await HedgedRequest('test_hedge_fast', delay=0.5).run([primary, backup])
+        assert result == {'ok': 1}
+        assert calls == ['primary']
+
+    asyncio.run(run())
+
+
+def test_failures_and_invalid_results_launch_next_immediately():
+    async def run():
+        async def broken():
+            raise RuntimeError('boom')
+
+        async def invalid():
+            return {'records': []}
+
+        async def good():
+            return {'records': [1]}
+
+        hedge = HedgedRequest('test_hedge_fail', delay=10)
+        started = time.monotonic()
+        result = await hedge.run([broken, invalid, good], validate=lambda d: bool(d.get('records')))
+        assert result == {'records': [1]}
+        # 不必等待 10 秒延遲
+        assert time.monotonic() - started < 1
+
+        # 全部失敗時回傳 None
+        assert await hedge.run([broken, invalid], validate=lambda d: bool(d.get('records'))) is None
+        assert hedge.get_stats()['failures'] == 1
+
+    asyncio.run(run())
+
+
+def test_zero_delay_sends_all_at_once():
+    async def run():
+        started = []
+
+        def make(name, delay):
+            async def attempt():
+                started.append(name)
+                await asyncio.sleep(delay)
+                return name
+            return attempt
+
+        result = await HedgedRequest('test_hedge_all', delay=0).run(
+            [make('a', 0.2), make('b', 0.01), make('c', 0.2)]
+        )
+        assert result == 'b'
+        assert started == ['a', 'b', 'c']
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_slow_primary_is_hedged_and_cancelled()
+    test_fast_primary_never_hedges()
+    test_failures_and_invalid_results_launch_next_immediately()
+    test_zero_delay_sends_all_at_once()
+    print('✅ 對沖請求測試通過')
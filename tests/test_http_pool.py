@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試共用 HTTP 連線池 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.http_pool import HttpClientPool, get_http_pool
+
+
+def test_session_shared_per_host():
+    async def run():
+        pool = HttpClientPool()
+        a = pool.session_for('https://tdx.transportdata.tw/api/basic/v2/Rail/Metro/LiveBoard/TRTC')
+        b = pool.session_for('https://tdx.transportdata.tw/auth/realms/TDXConnect/protocol/openid-connect/token')
+        c = pool.session_for('https://opendata.cwa.gov.tw/api/v1/rest/datastore/E-A0015-001')
+        assert a is b
+        assert a is not c
+        assert a.connector.limit == 20
+        assert c.connector.limit == 10
+        await pool.close()
+        assert pool.closed
+        assert a.closed and c.closed
+
+    asyncio.run(run())
+
+
+def test_configure_host_limit():
+    async def run():
+        pool = HttpClientPool(default_limit=3)
+        pool.configure_host('Example.COM', limit=7)
+        assert pool.session_for('https://example.com/a').connector.limit == 7
+        assert pool.session_for('https://other.example.org/').connector.limit == 3
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_get_http_pool_fallback():
+    class DummyBot:
+        pass
+
+    bot = DummyBot()
+    fallback = get_http_pool(bot)
+    assert isinstance(fallback, HttpClientPool)
+    assert get_http_pool(None) is fallback
+
+    bot.http_pool = HttpClientPool()
+    assert get_http_pool(bot) is bot.http_pool
+
+
+if __name__ == '__main__':
+    test_session_shared_per_host()
+    test_configure_host_limit()
+    test_get_http_pool_fallback()
+    print('✅ 共用 HTTP 連線池測試通過')
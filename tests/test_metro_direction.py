@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試捷運列車方向對照表 (不需網路)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metro_direction import DIRECTION_DOWN, DIRECTION_UP, MetroDirectionTable, compile_direction_table
+
+
+def _line(line_id, station_ids):
+    return {
+        'LineID': line_id,
+        'Stations': [{'Sequence': i + 1, 'StationID': sid} for i, sid in enumerate(station_ids)],
+    }
+
+
+# 板南線 (節錄)，順序刻意打亂以確認依 Sequence 排序
+BL = _line('BL', ['BL01', 'BL02', 'BL05', 'BL12', 'BL21', 'BL22', 'BL23'])
+BL['Stations'].reverse()
+# 中和新蘆線：主線與蘆洲支線為兩筆序列
+O_MAIN = _line('O', ['O01', 'O05', 'O12', 'O18', 'O21'])
+O_BRANCH = _line('O', ['O01', 'O05', 'O12', 'O50', 'O54'])
+
+
+def test_compile_by_sequence_halves():
+    compiled = compile_direction_table([BL, O_MAIN, O_BRANCH])
+    # 往序列後半段 (南港展覽館、昆陽) 為上行，往前半段 (頂埔、亞東醫院) 為下行
+    assert compiled['BL']['BL23'] == DIRECTION_UP and compiled['BL']['BL21'] == DIRECTION_UP
+    assert compiled['BL']['BL01'] == DIRECTION_DOWN and compiled['BL']['BL05'] == DIRECTION_DOWN
+    # 正中間的車站無法判斷
+    assert 'BL12' not in compiled['BL']
+    # 兩條支線的終點站都是上行
+    assert compiled['O']['O21'] == DIRECTION_UP and compiled['O']['O54'] == DIRECTION_UP
+    assert compiled['O']['O01'] == DIRECTION_DOWN
+
+
+def test_conflicting_sequences_are_unresolved():
+    compiled = compile_direction_table([_line('X', ['A', 'B', 'C']), _line('X', ['C', 'B', 'A'])])
+    assert compiled['X'] == {}
+
+
+def test_classify_counts_unresolved():
+    table = MetroDirectionTable('test_direction_table')
+    table.load('TRTC', compile_direction_table([BL]))
+    assert table.classify('TRTC', 'BL', 'BL23') == DIRECTION_UP
+    assert table.classify('TRTC', 'BL', 'BL01') == DIRECTION_DOWN
+    assert table.classify('TRTC', 'BL', 'BL99') is None
+    assert table.classify('KRTC', 'R', 'R3') is None
+    stats = table.get_stats()
+    assert stats['resolved'] == 2 and stats['unresolved'] == 2
+    assert ('TRTC/BL/BL99', 1) in stats['top_unresolved']
+
+    # 重新載入同一系統時取代舊資料，不影響其他系統
+    table.load('KRTC', compile_direction_table([_line('R', ['R3', 'R4', 'R5'])]))
+    table.load('TRTC', compile_direction_table([_line('BL', ['BL23', 'BL12', 'BL01'])]))
+    assert table.classify('TRTC', 'BL', 'BL23') == DIRECTION_DOWN
+    assert table.classify('KRTC', 'R', 'R5') == DIRECTION_UP
+
+
+if __name__ == '__main__':
+    test_compile_by_sequence_halves()
+    test_conflicting_sequences_are_unresolved()
+    test_classify_counts_unresolved()
+    print('✅ 捷運方向對照表測試通過')
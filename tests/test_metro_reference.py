@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試捷運靜態參考資料索引 (以假的上游資料模擬，不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import TTLCache
+from utils.metro_reference import (
+    FACILITY, NETWORK, STATION_OF_LINE, MetroReferenceStore, dataset_key, facility_line_id
+)
+
+FACILITIES = [
+    {'StationID': 'BL12', 'StationName': {'Zh_tw': '台北車站'}},
+    {'StationID': 'R10', 'StationName': {'Zh_tw': '台北車站'}},
+    {'StationID': 'BL13', 'StationName': {'Zh_tw': '善導寺'}},
+    {'StationID': 'Y07', 'LineID': 'Y', 'StationName': {'Zh_tw': '板新'}},
+]
+
+STATION_OF_LINE_DATA = [
+    {'LineID': 'BL', 'Stations': [
+        {'Sequence': 3, 'StationID': 'BL03'},
+        {'Sequence': 1, 'StationID': 'BL01'},
+        {'Sequence': 2, 'StationID': 'BL02'},
+    ]},
+]
+
+
+def test_facility_line_id():
+    assert facility_line_id({'StationID': 'BL12'}) == '板南線'
+    assert facility_line_id({'StationID': 'Z01'}) == 'Z線'
+    assert facility_line_id({'StationID': 'Y07', 'LineID': 'Y'}) == 'Y'
+    assert facility_line_id({}) == '未知路線'
+
+
+def test_index_is_built_once_per_data_version():
+    async def run():
+        calls = []
+        upstream = {
+            FACILITY: FACILITIES,
+            NETWORK: [{'LineID': 'BL'}, {'LineID': 'R'}],
+            STATION_OF_LINE: STATION_OF_LINE_DATA,
+        }
+
+        def fetcher(dataset):
+            async def fetch(system):
+                calls.append((dataset, system))
+                await asyncio.sleep(0)
+                return list(upstream[dataset])
+            return fetch
+
+        cache = TTLCache('test_metro_reference', ttl=60, max_entries=16)
+        store = MetroReferenceStore(cache, {dataset: fetcher(dataset) for dataset in upstream})
+
+        # 只要求設施資料時只向上游取得設施
+        index = await store.get('TRTC', (FACILITY,))
+        assert calls == [(FACILITY, 'TRTC')]
+        assert list(index.facility_lines) == ['Y', '板南線', '淡水信義線']
+        assert [s['StationID'] for s in index.facility_lines['板南線']] == ['BL12', 'BL13']
+        assert index.facilities['R10']['StationName']['Zh_tw'] == '台北車站'
+        assert index.network == [] and index.lines == {}
+
+        # 資料沒變時沿用同一個索引 (連衍生的分頁也不重建)
+        builds = []
+        pages = index.derived('pages', lambda index: builds.append(1) or ['page'])
+        again = await store.get('TRTC', (FACILITY,))
+        assert again is index and again.derived('pages', list) is pages and builds == [1]
+        assert calls == [(FACILITY, 'TRTC')]
+
+        # 加入其他資料集後重建索引並遞增版本
+        full = await store.get('TRTC')
+        assert full is not index and full.version > index.version
+        assert [line['LineID'] for line in full.network] == ['BL', 'R']
+        assert [s['StationID'] for s in full.lines['BL']] == ['BL01', 'BL02', 'BL03']
+        assert full.directions == {'BL': {'BL01': 'down', 'BL03': 'up'}}
+        assert len(calls) == 3
+
+        # 背景預取寫入新資料後，current() 不發請求即可取得新索引
+        cache.set(dataset_key(NETWORK, 'TRTC'), [{'LineID': 'BL'}])
+        assert len(store.current('TRTC').network) == 1 and len(calls) == 3
+
+    asyncio.run(run())
+
+
+def test_register_prefetch_names_match_cache_keys():
+    class FakeScheduler:
+        def __init__(self):
+            self.jobs = {}
+
+        def register(self, name, cache, key, fetcher, idle_after=1800):
+            self.jobs[name] = (key, fetcher, idle_after)
+
+    async def fetch(system):
+        return [{'LineID': system}]
+
+    scheduler = FakeScheduler()
+    store = MetroReferenceStore(TTLCache('test_metro_reference_prefetch', ttl=60), {FACILITY: fetch, NETWORK: fetch})
+    names = store.register_prefetch(scheduler, {FACILITY: ['TRTC'], NETWORK: ['TRTC', 'KRTC']})
+    assert names == ['metro_facility:TRTC', 'metro_network:TRTC', 'metro_network:KRTC']
+    key, fetcher, idle_after = scheduler.jobs['metro_network:KRTC']
+    assert key == 'metro_network:KRTC' and idle_after is None
+    assert asyncio.run(fetcher()) == [{'LineID': 'KRTC'}]
+
+
+if __name__ == '__main__':
+    test_facility_line_id()
+    test_index_is_built_once_per_data_version()
+    test_register_prefetch_names_match_cache_keys()
+    print('✅ 捷運參考資料索引測試通過')
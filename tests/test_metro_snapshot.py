@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試捷運看板快照服務 (以假的上游資料模擬，不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metro_snapshot import MetroSnapshotService
+
+
+def _stations(estimate):
+    return [
+        {'StationID': 'BL12', 'LineID': 'BL', 'up_trains': [{'EstimateTime': estimate}], 'down_trains': []},
+        {'StationID': 'R10', 'LineID': 'R', 'up_trains': [], 'down_trains': []},
+        {'StationID': 'BL13', 'LineID': 'BL', 'up_trains': [], 'down_trains': []},
+    ]
+
+
+def test_versions_only_change_with_content():
+    async def run():
+        upstream = {'TRTC': _stations(60), 'KRTC': None}
+        calls = []
+
+        async def fetcher(system):
+            calls.append(system)
+            await asyncio.sleep(0)
+            return upstream[system]
+
+        service = MetroSnapshotService('test_snapshot_versions', ['TRTC', 'KRTC'], fetcher, keep_versions=2)
+        first = await service.get('TRTC')
+        assert first.version == 1 and first.line_ids == ['BL', 'R']
+        assert [s['StationID'] for s in first.lines['BL']] == ['BL12', 'BL13']
+        assert first.station('R10')['LineID'] == 'R'
+
+        # 快照仍新鮮時只讀取記憶體
+        assert await service.get('TRTC') is first and calls == ['TRTC']
+
+        # 內容相同沿用版本，內容改變才發佈新版本
+        await service.poll_all()
+        assert service.current('TRTC') is first
+        upstream['TRTC'] = _stations(30)
+        await service.poll_all()
+        second = service.current('TRTC')
+        assert second.version == 2 and second.station('BL12')['up_trains'][0]['EstimateTime'] == 30
+
+        # 仍在使用舊版本的視圖讀到的是原本的資料，淘汰後改讀最新版本
+        assert service.get_version('TRTC', 1) is first
+        upstream['TRTC'] = _stations(0)
+        await service.refresh('TRTC')
+        assert service.get_version('TRTC', 1).version == 3
+
+        # 上游失敗時不發佈，也不影響其他系統
+        assert await service.get('KRTC') is None
+        stats = service.get_stats()
+        assert stats['failures'] >= 1 and stats['systems']['TRTC']['version'] == 3
+        assert await service.get('XXXX') is None
+
+    asyncio.run(run())
+
+
+def test_concurrent_readers_share_one_request():
+    async def run():
+        calls = []
+
+        async def fetcher(system):
+            calls.append(system)
+            await asyncio.sleep(0.01)
+            return _stations(60)
+
+        service = MetroSnapshotService('test_snapshot_coalesce', ['TRTC'], fetcher)
+        snapshots = await asyncio.gather(*(service.get('TRTC') for _ in range(5)))
+        assert calls == ['TRTC']
+        assert all(snapshot is snapshots[0] for snapshot in snapshots)
+
+    asyncio.run(run())
+
+
+def test_empty_response_is_published_not_failed():
+    async def run():
+        calls = []
+
+        async def fetcher(system):
+            calls.append(system)
+            return []
+
+        service = MetroSnapshotService('test_snapshot_empty', ['NTALRT'], fetcher)
+        snapshot = await service.get('NTALRT')
+        # 沒有列車是成功的結果：發佈空快照，之後的讀取不再同步向上游請求
+        assert snapshot is not None and len(snapshot) == 0 and snapshot.line_ids == []
+        assert await service.get('NTALRT') is snapshot and calls == ['NTALRT']
+        assert service.get_stats()['failures'] == 0
+
+    asyncio.run(run())
+
+
+def test_derived_structures_are_built_once_per_snapshot():
+    async def run():
+        async def fetcher(system):
+            return _stations(60)
+
+        service = MetroSnapshotService('test_snapshot_derived', ['TRTC'], fetcher)
+        snapshot = await service.get('TRTC')
+        builds = []
+
+        def group(stations):
+            builds.append(len(stations))
+            return {station['StationID']: station['LineID'] for station in stations}
+
+        assert snapshot.derived('groups', group) == {'BL12': 'BL', 'R10': 'R', 'BL13': 'BL'}
+        assert snapshot.derived('groups', group) is snapshot.derived('groups', group)
+        assert builds == [3]
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_versions_only_change_with_content()
+    test_concurrent_readers_share_one_request()
+    test_empty_response_is_published_not_failed()
+    test_derived_structures_are_built_once_per_snapshot()
+    print('✅ 捷運看板快照服務測試通過')
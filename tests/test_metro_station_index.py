@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試跨系統捷運車站索引 (不需網路)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.metro_station_index import MetroStationIndex, station_key
+
+
+def _station(station_id, zh, en):
+    return {'StationID': station_id, 'StationName': {'Zh_tw': zh, 'En': en}}
+
+
+LINES = {
+    'TRTC': {
+        'BL': [_station('BL12', '台北車站', 'Taipei Main Station'), _station('BL13', '善導寺', 'Shandao Temple')],
+        'R': [_station('R10', '台北車站', 'Taipei Main Station'), _station('R11', '中山', 'Zhongshan')],
+    },
+    'KRTC': {
+        'O': [_station('O5', '美麗島', 'Formosa Boulevard'), _station('O6', '信義國小', 'Sinyi Elementary School')],
+        'R': [_station('R10', '美麗島', 'Formosa Boulevard'), _station('R11', '高雄車站', 'Kaohsiung Main Station')],
+    },
+    'TYMC': {'A': [_station('A1', '台北車站', 'Taipei Main Station'), {'StationID': 'A2'}]},
+}
+NAMES = {'TRTC': '臺北捷運', 'KRTC': '高雄捷運', 'TYMC': '桃園捷運'}
+
+
+def test_search_across_systems():
+    index = MetroStationIndex(LINES, NAMES)
+    # 沒有站名的車站不列入
+    assert len(index) == 9
+    # 台/臺與結尾的「站」視為相同，轉乘站每條路線各一筆，系統依順序排列
+    assert [s.key for s in index.search('臺北車站')] == ['TRTC:BL:BL12', 'TRTC:R:R10', 'TYMC:A:A1']
+    # 英文站名 (不分大小寫)、車站代碼
+    assert [s.key for s in index.search('formosa')] == ['KRTC:O:O5', 'KRTC:R:R10']
+    assert sorted(s.key for s in index.search('r10')) == ['KRTC:R:R10', 'TRTC:R:R10']
+    # 完全符合 > 前綴 > 子字串
+    assert [s.name for s in index.search('中山')] == ['中山']
+    # 同級時短站名優先，再依系統順序
+    assert [s.key for s in index.search('R1')] == ['TRTC:R:R11', 'KRTC:R:R10', 'TRTC:R:R10', 'KRTC:R:R11']
+    assert [s.name for s in index.search('車站', system='KRTC')] == ['高雄車站']
+    # 空白查詢依系統、路線與代碼列出
+    assert [s.id for s in index.search('', system='KRTC')] == ['O5', 'O6', 'R10', 'R11']
+    assert index.search('不存在') == []
+
+
+def test_resolve_and_labels():
+    index = MetroStationIndex(LINES, NAMES)
+    # 自動完成的值直接對應單一車站 (同代碼不同系統不會混淆)
+    station = index.resolve(station_key('KRTC', 'R10', 'R'))
+    assert station.system == 'KRTC' and station.name == '美麗島' and station.line_id == 'R'
+    assert station.label() == '美麗島 (Formosa Boulevard) - 高雄捷運 R R10'
+    # 完全符合的轉乘站取排序最前的路線
+    assert index.resolve('台北車站').key == 'TRTC:BL:BL12'
+    # 唯一的前綴符合
+    assert index.resolve('善導').id == 'BL13'
+    # 多個前綴候選時無法判斷
+    assert index.resolve('R1') is None
+    # 重建後舊資料不殘留
+    index.build({'TRTC': {'BR': [_station('BR01', '動物園', 'Taipei Zoo')]}}, NAMES)
+    assert len(index) == 1 and index.resolve('zoo').id == 'BR01' and index.search('台北車站') == []
+
+
+if __name__ == '__main__':
+    test_search_across_systems()
+    test_resolve_and_labels()
+    print('✅ 捷運車站索引測試通過')
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試資料集持久化快取 (使用暫存目錄，不需網路)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import TTLCache
+from utils.persistent_cache import PersistentCache
+
+
+def test_save_and_load_roundtrip():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PersistentCache(os.path.join(tmp, 'cache.db'))
+            payload = {'臺北市': [{'name': '臺北', 'id': '1000'}]}
+            await store.save('tra_stations', payload, etag='"abc"', content_hash='123')
+
+            dataset = await store.load('tra_stations')
+            assert dataset.payload == payload
+            assert dataset.etag == '"abc"'
+            assert dataset.content_hash == '123'
+            assert dataset.age < 5
+            assert await store.load('missing') is None
+            store.close()
+
+    asyncio.run(run())
+
+
+def test_ttl_cache_warms_from_disk_after_restart():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache.db')
+
+            # 第一次啟動：取得資料並寫入磁碟
+            store = PersistentCache(path)
+            cache = TTLCache('test_reference', ttl=60, stale_ttl=600, persistent=store)
+            await cache.get_or_fetch('metro_network:TRTC', lambda: asyncio.sleep(0, result=[{'LineID': 'BL'}]))
+            await cache.get_or_fetch(('rainfall', '樹林'), lambda: asyncio.sleep(0, result={'ok': True}))
+            store.close()
+
+            # 模擬資料已經放了 2 分鐘
+            old = time.time() - 120
+            store = PersistentCache(path)
+            for key in ('test_reference:"metro_network:TRTC"', 'test_reference:["rainfall", "樹林"]'):
+                dataset = await store.load(key)
+                await store.save(key, dataset.payload, fetched_at=old)
+
+            # 重新啟動：不呼叫上游就能回傳資料，並在背景更新過期資料
+            cache = TTLCache('test_reference', ttl=60, stale_ttl=600, persistent=store)
+            assert await cache.warm() == 2
+
+            calls = []
+
+            async def fetcher():
+                calls.append(1)
+                return [{'LineID': 'R'}]
+
+            assert await cache.get_or_fetch('metro_network:TRTC', fetcher) == [{'LineID': 'BL'}]
+            assert cache.get(('rainfall', '樹林'), allow_stale=True) == {'ok': True}
+            await asyncio.sleep(0.05)
+            assert calls == [1]
+            assert cache.get('metro_network:TRTC') == [{'LineID': 'R'}]
+            store.close()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_save_and_load_roundtrip()
+    test_ttl_cache_warms_from_disk_after_restart()
+    print('✅ 持久化快取測試通過')
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試背景預取排程 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.cache_manager import TTLCache
+from utils.prefetch_scheduler import PrefetchScheduler
+
+
+def test_refreshes_before_expiry():
+    async def run():
+        cache = TTLCache('test_prefetch_hot', ttl=0.2)
+        calls = {'n': 0}
+
+        async def fetcher():
+            calls['n'] += 1
+            return {'n': calls['n']}
+
+        await cache.get_or_fetch('k', fetcher)
+        scheduler = PrefetchScheduler(tick=0.02)
+        scheduler.register('hot', cache, 'k', fetcher, interval=0.05, jitter=0)
+        scheduler.start()
+        await asyncio.sleep(0.18)
+        await scheduler.close()
+
+        # 使用者查詢的資料一直保持新鮮，不必等待上游
+        assert calls['n'] >= 3
+        assert cache.get('k') is not None
+        stats = scheduler.get_stats()['hot']
+        assert stats['runs'] >= 2 and stats['failures'] == 0
+
+    asyncio.run(run())
+
+
+def test_idle_datasets_are_skipped():
+    async def run():
+        cache = TTLCache('test_prefetch_idle', ttl=10)
+        calls = {'n': 0}
+
+        async def fetcher():
+            calls['n'] += 1
+            return {'n': calls['n']}
+
+        scheduler = PrefetchScheduler(tick=0.02)
+        scheduler.register('idle', cache, 'k', fetcher, interval=0.05, idle_after=60)
+        scheduler.start()
+        await asyncio.sleep(0.1)
+        await scheduler.close()
+
+        # 從未被查詢過：不向上游請求
+        assert calls['n'] == 0
+        assert scheduler.get_stats()['idle']['skipped_idle'] >= 1
+
+    asyncio.run(run())
+
+
+def test_concurrency_limit_and_failures():
+    async def run():
+        cache = TTLCache('test_prefetch_limit', ttl=10)
+        active = {'now': 0, 'max': 0}
+
+        async def slow_fetcher():
+            active['now'] += 1
+            active['max'] = max(active['max'], active['now'])
+            await asyncio.sleep(0.03)
+            active['now'] -= 1
+            return {'ok': True}
+
+        async def failing():
+            raise RuntimeError('upstream down')
+
+        scheduler = PrefetchScheduler(max_concurrency=2, tick=0.02)
+        for i in range(5):
+            scheduler.register(f'job{i}', cache, i, slow_fetcher, idle_after=None)
+        scheduler.register('broken', cache, 'broken', failing, interval=1, idle_after=None)
+        scheduler.start()
+        await asyncio.sleep(0.2)
+        await scheduler.close()
+
+        assert active['max'] == 2
+        assert all(i in cache for i in range(5))
+        # 失敗後等待一個週期才重試
+        assert scheduler.get_stats()['broken']['failures'] == 1
+
+    asyncio.run(run())
+
+
+def test_close_cancels_running_jobs():
+    async def run():
+        cache = TTLCache('test_prefetch_close', ttl=10)
+        state = {'started': False, 'cancelled': False}
+
+        async def hanging():
+            state['started'] = True
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                state['cancelled'] = True
+                raise
+            return {'ok': True}
+
+        scheduler = PrefetchScheduler(tick=0.02)
+        scheduler.register('hanging', cache, 'k', hanging, idle_after=None)
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        assert state['started']
+        await scheduler.close()
+
+        # close() 回傳前，進行中的更新已被取消並結束
+        assert state['cancelled']
+        assert scheduler._job_tasks == set()
+        pending = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        assert pending == []
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_refreshes_before_expiry()
+    test_idle_datasets_are_skipped()
+    test_concurrency_limit_and_failures()
+    test_close_cancels_running_jobs()
+    print('✅ 背景預取排程測試通過')
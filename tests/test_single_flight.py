@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試相同上游請求合併 (不需網路)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.single_flight import SingleFlight, coalesce, get_group
+
+
+def test_concurrent_calls_share_one_execution():
+    async def run():
+        group = SingleFlight('test_group')
+        calls = {'n': 0}
+
+        async def fetch():
+            calls['n'] += 1
+            await asyncio.sleep(0.02)
+            return {'data': calls['n']}
+
+        results = await asyncio.gather(*[group.do(('LiveBoard', 'TRTC'), fetch) for _ in range(6)])
+        assert calls['n'] == 1
+        assert all(r == {'data': 1} for r in results)
+
+        stats = group.get_stats()
+        assert stats['calls'] == 6
+        assert stats['executions'] == 1
+        assert stats['coalesced'] == 5
+        assert stats['inflight'] == 0
+
+        # 完成後的下一次呼叫會重新執行
+        await group.do(('LiveBoard', 'TRTC'), fetch)
+        assert calls['n'] == 2
+
+    asyncio.run(run())
+
+
+def test_decorator_keys_by_arguments():
+    class FakeCog:
+        def __init__(self):
+            self.requests = []
+
+        @coalesce('test_metro_liveboard')
+        async def fetch_metro_liveboard(self, metro_system: str = "TRTC"):
+            self.requests.append(metro_system)
+            await asyncio.sleep(0.02)
+            return [metro_system]
+
+    async def run():
+        cog = FakeCog()
+        results = await asyncio.gather(
+            cog.fetch_metro_liveboard(),
+            cog.fetch_metro_liveboard("TRTC"),
+            cog.fetch_metro_liveboard(metro_system="TRTC"),
+            cog.fetch_metro_liveboard("KRTC"),
+        )
+        assert sorted(cog.requests) == ["KRTC", "TRTC"]
+        assert results == [["TRTC"], ["TRTC"], ["TRTC"], ["KRTC"]]
+        assert get_group('test_metro_liveboard').get_stats()['coalesced'] == 2
+
+    asyncio.run(run())
+
+
+def test_exception_propagates_to_all_waiters():
+    async def run():
+        group = SingleFlight('test_errors')
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('upstream down')
+
+        results = await asyncio.gather(group.do('k', failing), group.do('k', failing), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert group.get_stats()['executions'] == 1
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_concurrent_calls_share_one_execution()
+    test_decorator_keys_by_arguments()
+    test_exception_propagates_to_all_waiters()
+    print('✅ 請求合併測試通過')
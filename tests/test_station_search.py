@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試車站名稱搜尋索引的共用實作 (不需網路)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.station_search import StationNameIndex
+
+
+class NameIndex(StationNameIndex):
+    """只有站名與代碼的最小索引"""
+
+    def __init__(self, stations):
+        super().__init__()
+        for station_id, name in stations:
+            self._add(station_id, (station_id, name), (name,))
+
+    def _texts(self, station):
+        return (station[1],)
+
+    def _sort_key(self, station):
+        return len(station[1]), station[0]
+
+
+def test_ranking_is_shared_by_subclasses():
+    index = NameIndex([('1', '南港'), ('2', '南港展覽館'), ('3', '台南'), ('4', '南科')])
+    assert len(index) == 4
+    # 完全符合 > 前綴 > 子字串，同級時依子類別的排序
+    assert [s[0] for s in index._search('南港')] == ['1', '2']
+    assert [s[0] for s in index._search('南')] == ['1', '4', '2', '3']
+    # 車站鍵值直接命中
+    assert index._resolve('3') == ('3', '台南')
+    assert index._resolve('臺南站') == ('3', '台南')
+    # 多個前綴候選時無法判斷，篩選後唯一時可以
+    assert index._resolve('南') is None
+    assert index._resolve('南', accept=lambda s: s[0] == '3') == ('3', '台南')
+    # 空白查詢依 _listing_key (預設為 _sort_key)
+    assert [s[0] for s in index._search('', limit=2)] == ['1', '3']
+    index._clear()
+    assert len(index) == 0 and index._search('南') == []
+
+
+def test_subclasses_must_implement_texts_and_sort_key():
+    class Incomplete(StationNameIndex):
+        def _texts(self, station):
+            return (station,)
+
+    # 未實作 _sort_key 的索引無法建立
+    for cls in (StationNameIndex, Incomplete):
+        try:
+            cls()
+        except TypeError:
+            pass
+        else:
+            raise AssertionError(f'{cls.__name__} 不應可以建立')
+
+
+if __name__ == '__main__':
+    test_ranking_is_shared_by_subclasses()
+    test_subclasses_must_implement_texts_and_sort_key()
+    print('✅ 車站名稱搜尋索引測試通過')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試地震通知訂閱儲存 (使用暫存資料庫)
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.earthquake_intensity import county_max_intensity, parse_intensity
+from utils.subscription_store import SubscriptionStore
+
+
+def test_subscriptions_and_watermark_survive_restart():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'subscriptions.db')
+            store = SubscriptionStore(path)
+            await store.load()
+            assert store.get_watermark('earthquake') is None
+
+            await store.subscribe(1, 100)
+            await store.subscribe(2, 200, region='花蓮縣', min_intensity=4)
+            await store.set_watermark('earthquake', '114050')
+            store.close()
+
+            # 模擬重啟
+            restarted = SubscriptionStore(path)
+            await restarted.load()
+            assert len(restarted) == 2
+            assert restarted.get(1).channel_id == 100
+            assert restarted.get(2).region == '花蓮縣' and restarted.get(2).min_intensity == 4
+            assert restarted.get_watermark('earthquake') == '114050'
+            restarted.close()
+
+    asyncio.run(run())
+
+
+def test_resubscribe_and_unsubscribe_keep_indexes_consistent():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SubscriptionStore(os.path.join(tmp, 'subscriptions.db'))
+            await store.load()
+
+            await store.subscribe(1, 100, region='臺北市', min_intensity=3)
+            # 改訂閱全臺：舊的地區索引要移除
+            await store.subscribe(1, 101)
+            assert store.get(1).channel_id == 101
+            assert '臺北市' not in store._by_region
+            assert store._by_region[None][0] == {1}
+
+            assert await store.unsubscribe(1) is True
+            assert await store.unsubscribe(1) is False
+            assert len(store) == 0 and store._by_region == {}
+            store.close()
+
+    asyncio.run(run())
+
+
+def test_county_max_intensity_parses_summary_and_observations():
+    shaking_area = [
+        {'AreaDesc': '最大震度5弱地區', 'CountyName': '花蓮縣、宜蘭縣', 'AreaIntensity': '5弱'},
+        {'AreaDesc': '花蓮縣地區', 'CountyName': '花蓮縣', 'AreaIntensity': '5弱'},
+        {'AreaDesc': '台北市地區', 'CountyName': '台北市', 'AreaIntensity': '3級'},
+        {'AreaDesc': '臺北市地區', 'CountyName': '臺北市', 'AreaIntensity': '2級'},
+        {'AreaDesc': '', 'CountyName': '', 'AreaIntensity': '0級'},
+    ]
+    assert county_max_intensity(shaking_area) == {'花蓮縣': 5, '宜蘭縣': 5, '臺北市': 3}
+    assert parse_intensity('5強') > parse_intensity('5弱') > parse_intensity('4級')
+    assert parse_intensity('4') == parse_intensity('4級') and parse_intensity('未知') == 0
+
+
+def test_match_uses_region_and_threshold_buckets():
+    async def run():
+        with tempfile.TemporaryDirectory() as tmp:
+            store = SubscriptionStore(os.path.join(tmp, 'subscriptions.db'))
+            await store.load()
+            await store.subscribe(1, 100)                                      # 全臺、所有地震
+            await store.subscribe(2, 200, min_intensity=5)                     # 全臺 5弱 以上
+            await store.subscribe(3, 300, region='花蓮縣', min_intensity=4)     # 花蓮 4級 以上
+            await store.subscribe(4, 400, region='台北市', min_intensity=4)     # 臺北 4級 以上
+            await store.subscribe(5, 500, region='臺北市')                      # 臺北有感
+            # 簡稱與舊縣名與其他指令一樣解析為標準縣市名稱
+            assert (await store.subscribe(6, 600, region='臺北')).region == '臺北市'
+            assert (await store.subscribe(7, 700, region='台北縣', min_intensity=4)).region == '新北市'
+
+            assert store.match({'花蓮縣': 4, '臺北市': 2}) == {1, 3, 5, 6}
+            assert store.match({'花蓮縣': 5, '臺北市': 4}) == {1, 2, 3, 4, 5, 6}
+            assert store.match({'新北市': 4}) == {1, 7}
+            # 無感地震只通知未設定條件的訂閱
+            assert store.match({}) == {1}
+            store.close()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_subscriptions_and_watermark_survive_restart()
+    test_resubscribe_and_unsubscribe_keep_indexes_consistent()
+    test_county_max_intensity_parses_summary_and_observations()
+    test_match_uses_region_and_threshold_buckets()
+    print('✅ 地震通知訂閱測試通過')
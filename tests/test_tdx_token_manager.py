@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 TDX 存取權杖管理器 (以假的連線池取代網路請求)
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tdx_auth import TDXTokenManager
+
+
+class FakeResponse:
+    def __init__(self, status, payload=None):
+        self.status = status
+        self._payload = payload or {}
+        self.released = False
+
+    async def json(self):
+        return self._payload
+
+    async def text(self):
+        return str(self._payload)
+
+    def release(self):
+        self.released = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+
+class FakeRequest:
+    """模擬 aiohttp 的請求物件：可 await 也可 async with"""
+
+    def __init__(self, response):
+        self.response = response
+
+    def __await__(self):
+        async def resolve():
+            return self.response
+        return resolve().__await__()
+
+    async def __aenter__(self):
+        return self.response
+
+    async def __aexit__(self, *exc):
+        self.response.release()
+
+
+class FakePool:
+    closed = False
+
+    def __init__(self, statuses=None):
+        self.token_requests = 0
+        self.seen_tokens = []
+        self.statuses = list(statuses or [])
+
+    def post(self, url, **kwargs):
+        self.token_requests += 1
+        return FakeRequest(FakeResponse(200, {'access_token': f'token-{self.token_requests}', 'expires_in': 3600}))
+
+    def get(self, url, headers=None, **kwargs):
+        self.seen_tokens.append(headers.get('Authorization'))
+        status = self.statuses.pop(0) if self.statuses else 200
+        return FakeRequest(FakeResponse(status, {'ok': status == 200}))
+
+
+def test_concurrent_callers_share_one_refresh():
+    async def run():
+        pool = FakePool()
+        manager = TDXTokenManager('id', 'secret', http_pool=pool)
+        tokens = await asyncio.gather(*[manager.get_token() for _ in range(10)])
+        assert pool.token_requests == 1
+        assert set(tokens) == {'token-1'}
+        await manager.close()
+
+    asyncio.run(run())
+
+
+def test_unauthorized_invalidates_and_retries_once():
+    async def run():
+        pool = FakePool(statuses=[401, 200])
+        manager = TDXTokenManager('id', 'secret', http_pool=pool)
+        async with manager.get('https://tdx.transportdata.tw/api/basic/v2/Rail/Metro/LiveBoard/TRTC',
+                               headers={'Accept': 'application/json'}) as response:
+            assert response.status == 200
+            assert await response.json() == {'ok': True}
+        assert pool.seen_tokens == ['Bearer token-1', 'Bearer token-2']
+        assert manager.get_stats()['unauthorized_retries'] == 1
+        await manager.close()
+
+    asyncio.run(run())
+
+
+def test_background_renewal_before_expiry():
+    async def run():
+        pool = FakePool()
+        manager = TDXTokenManager('id', 'secret', http_pool=pool, refresh_margin=3600)
+        await manager.start()
+        # 續期最短間隔為 30 秒，這裡直接觸發一次排程以驗證續期流程
+        manager._schedule_renewal(0)
+        await asyncio.sleep(0.05)
+        assert pool.token_requests == 2
+        assert await manager.get_token() == 'token-2'
+        assert manager.get_stats()['background_renewals'] == 1
+        await manager.close()
+
+    asyncio.run(run())
+
+
+if __name__ == '__main__':
+    test_concurrent_callers_share_one_refresh()
+    test_unauthorized_invalidates_and_retries_once()
+    test_background_renewal_before_expiry()
+    print('✅ TDX 權杖管理器測試通過')
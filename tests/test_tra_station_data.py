@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試預先編譯的台鐵車站資料檔 (不需網路)
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.tra_station_data import (
+    DEFAULT_DATA_PATH, StationRecord, TRAStationDataset, build, compile_dataset, read_source
+)
+
+
+def test_round_trip_columns():
+    records = [
+        StationRecord('0900', '基隆', 'Keelung', '基隆市', 25.13191, 121.73837),
+        StationRecord('1000', '臺北', 'Taipei', '臺北市', 25.04775, 121.51711),
+        StationRecord('1001', '臺北-環島', '', '臺北市', 25.04775, 121.51711),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tra_stations.bin')
+        with open(path, 'wb') as f:
+            f.write(compile_dataset(records))
+
+        dataset = TRAStationDataset(path)
+        assert len(dataset) == 3
+        assert dataset.stations_by_county() == {
+            '基隆市': [{'name': '基隆', 'id': '0900'}],
+            '臺北市': [{'name': '臺北', 'id': '1000'}, {'name': '臺北-環島', 'id': '1001'}],
+        }
+        assert dataset.english_names() == {'0900': 'Keelung', '1000': 'Taipei'}
+        lat, lon = dataset.coordinates(1)
+        assert abs(lat - 25.04775) < 1e-4 and abs(lon - 121.51711) < 1e-4
+
+
+def test_corrupted_file_is_rejected():
+    content = bytearray(compile_dataset([StationRecord('0900', '基隆', 'Keelung', '基隆市', 25.1, 121.7)]))
+    content[-1] ^= 0xFF
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tra_stations.bin')
+        with open(path, 'wb') as f:
+            f.write(content)
+        try:
+            TRAStationDataset(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('損毀的資料檔應該被拒絕')
+
+
+def test_shipped_file_matches_source():
+    # 車站基本資料集更新後需重新編譯 (python -m utils.tra_station_data)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'tra_stations.bin')
+        assert build(output_path=path) == len(read_source())
+        assert TRAStationDataset(path).version == TRAStationDataset(DEFAULT_DATA_PATH).version
+
+
+if __name__ == '__main__':
+    test_round_trip_columns()
+    test_corrupted_file_is_rejected()
+    test_shipped_file_matches_source()
+    print('✅ 台鐵車站資料檔測試通過')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試台鐵車站索引 (不需網路)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.station_search import normalize_station_name
+from utils.tra_station_index import TRAStationIndex, load_english_names
+
+STATIONS = {
+    "臺北市": [{"name": "臺北", "id": "1000"}, {"name": "萬華", "id": "1010"}, {"name": "南港", "id": "0980"}],
+    "新北市": [{"name": "板橋", "id": "1020"}, {"name": "浮洲", "id": "1030"}],
+    "新竹市": [{"name": "新竹", "id": "1210"}, {"name": "北新竹", "id": "1190"}],
+    "臺南市": [{"name": "臺南", "id": "4220"}, {"name": "南科", "id": "4130"}],
+}
+ENGLISH = {"1000": "Taipei", "1210": "Hsinchu", "1190": "North Hsinchu", "4220": "Tainan"}
+
+
+def test_ranking_exact_prefix_substring():
+    index = TRAStationIndex(STATIONS, ENGLISH)
+    assert len(index) == 9
+    # 台/臺 與結尾的「站」視為相同
+    assert [s.id for s in index.search('台北站')] == ['1000']
+    # 完全符合排在前綴與子字串之前
+    assert [s.name for s in index.search('新竹')] == ['新竹', '北新竹']
+    # 子字串：「南」出現在三個站名中，前綴符合者優先
+    assert [s.name for s in index.search('南')] == ['南港', '南科', '臺南']
+    # 英文站名不分大小寫
+    assert [s.name for s in index.search('hsinchu')] == ['新竹', '北新竹']
+    assert index.search('不存在') == []
+
+
+def test_county_filter_and_lookup_by_id():
+    index = TRAStationIndex(STATIONS, ENGLISH)
+    assert [s.name for s in index.search('南', county='臺北市')] == ['南港']
+    # 車站代碼可跨縣市查詢
+    assert index.get('4220').county == '臺南市'
+    assert index.resolve('4220').name == '臺南'
+    assert index.resolve('浮').id == '1030'
+    # 有多個同等候選時不自行猜測
+    assert index.resolve('南') is None
+    assert index.resolve('Tainan').id == '4220'
+
+
+def test_english_names_from_station_dataset():
+    names = load_english_names()
+    assert names.get('0900') == 'Keelung'
+    assert load_english_names('/nonexistent/車站基本資料集.json') == {}
+    assert normalize_station_name(' 台 中站 ') == '臺中'
+
+
+if __name__ == '__main__':
+    test_ranking_exact_prefix_substring()
+    test_county_filter_and_lookup_by_id()
+    test_english_names_from_station_dataset()
+    print('✅ 台鐵車站索引測試通過')
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+測試 /upstream_status 嵌入訊息的拆分 (Discord 每則 25 個欄位、6000 字元上限)
+"""
+
+import os
+import sys
+
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cogs.admin_commands_new import AdminCommands
+
+
+def test_split_embed_respects_discord_limits():
+    embed = discord.Embed(title="🌐 上游 API 連線狀態", description="說明")
+    for i in range(20):
+        embed.add_field(name=f"host{i}.example.com", value="x" * 200, inline=True)
+    for i in range(9):
+        embed.add_field(name=f"統計 {i}", value="y" * 1024, inline=False)
+
+    embeds = AdminCommands._split_embed(embed)
+    assert len(embeds) > 1
+    assert all(len(part.fields) <= 25 and len(part) <= 6000 for part in embeds)
+    # 欄位順序與內容不變，只有第一則保留說明
+    assert [field.name for part in embeds for field in part.fields] == [field.name for field in embed.fields]
+    assert embeds[0].description == "說明" and all(part.description is None for part in embeds[1:])
+    assert embeds[1].title.endswith("(續)")
+
+
+def test_small_embed_is_sent_as_is():
+    embed = discord.Embed(title="🌐 上游 API 連線狀態", description="目前尚無任何上游請求紀錄")
+    assert AdminCommands._split_embed(embed) == [embed]
+    embed.add_field(name="host", value="ok")
+    parts = AdminCommands._split_embed(embed)
+    assert len(parts) == 1 and parts[0].fields[0].value == "ok"
+
+
+if __name__ == '__main__':
+    test_split_embed_respects_discord_limits()
+    test_small_embed_is_sent_as_is()
+    print('✅ 上游狀態嵌入訊息拆分測試通過')
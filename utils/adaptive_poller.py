@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自適應輪詢間隔
+平時以較慢的頻率輪詢，一旦偵測到新事件 (例如新的地震報告) 就在一段時間內切換為快速輪詢，
+以便盡快取得修正報告與餘震；同時記錄事件從發生到被偵測、以及到通知發送完成的延遲
+"""
+
+import time
+import logging
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的輪詢器 (供管理指令查看統計)
+_pollers: Dict[str, 'AdaptivePoller'] = {}
+
+
+class AdaptivePoller:
+    """決定下一次輪詢前要等待多久
+
+    Args:
+        name: 名稱 (顯示於統計資料)
+        quiet_interval: 平時的輪詢間隔 (秒)
+        burst_interval: 偵測到新事件後的輪詢間隔 (秒)
+        burst_window: 新事件後維持快速輪詢的時間 (秒)
+        history: 保留多少筆偵測/發送延遲用於計算百分位數
+    """
+
+    def __init__(self, name: str, quiet_interval: float = 60, burst_interval: float = 15,
+                 burst_window: float = 1800, history: int = 100):
+        self.name = name
+        self.quiet_interval = quiet_interval
+        self.burst_interval = burst_interval
+        self.burst_window = burst_window
+        self._burst_until = 0.0
+        self._latencies: Deque[float] = deque(maxlen=history)
+        self._send_latencies: Deque[float] = deque(maxlen=history)
+        self._stats = {
+            'cycles': 0,
+            'bursts': 0,
+            'total_cycle_time': 0.0,
+            'last_event': None,
+            'last_latency': None,
+            'last_sent_event': None,
+            'last_send_latency': None,
+        }
+        _pollers[name] = self
+
+    def in_burst(self, now: Optional[float] = None) -> bool:
+        """目前是否處於快速輪詢期間"""
+        return (now if now is not None else time.monotonic()) < self._burst_until
+
+    def burst(self, now: Optional[float] = None):
+        """偵測到新事件：從現在起的 burst_window 秒內改為快速輪詢 (重複觸發會延長期間)"""
+        now = now if now is not None else time.monotonic()
+        if not self.in_burst(now):
+            self._stats['bursts'] += 1
+            logger.info(f"⚡ {self.name} 進入快速輪詢 (每 {self.burst_interval:g} 秒，持續 {self.burst_window:g} 秒)")
+        self._burst_until = now + self.burst_window
+
+    def next_interval(self, now: Optional[float] = None) -> float:
+        """下一次輪詢前應等待的秒數"""
+        return self.burst_interval if self.in_burst(now) else self.quiet_interval
+
+    def record_cycle(self, duration: float):
+        """記錄一次輪詢耗時"""
+        self._stats['cycles'] += 1
+        self._stats['total_cycle_time'] += duration
+
+    def record_detection(self, event_id: str, latency: float):
+        """記錄事件從發生到被偵測 (尚未產生與發送通知) 的秒數"""
+        self._latencies.append(latency)
+        self._stats['last_event'] = event_id
+        self._stats['last_latency'] = latency
+        logger.info(f"⏱️ {self.name} 事件 {event_id} 偵測延遲 {latency:.1f} 秒")
+
+    def record_send(self, event_id: str, latency: float):
+        """記錄事件從發生到通知發送完成的秒數"""
+        self._send_latencies.append(latency)
+        self._stats['last_sent_event'] = event_id
+        self._stats['last_send_latency'] = latency
+        logger.info(f"⏱️ {self.name} 事件 {event_id} 發送延遲 {latency:.1f} 秒")
+
+    @staticmethod
+    def _percentile(latencies: Deque[float], ratio: float) -> float:
+        if not latencies:
+            return 0.0
+        ordered = sorted(latencies)
+        return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+    def latency_percentile(self, ratio: float) -> float:
+        """近期偵測延遲的百分位數 (秒)"""
+        return self._percentile(self._latencies, ratio)
+
+    def send_latency_percentile(self, ratio: float) -> float:
+        """近期發送延遲的百分位數 (秒)"""
+        return self._percentile(self._send_latencies, ratio)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得輪詢次數、目前模式與偵測/發送延遲"""
+        stats = dict(self._stats)
+        cycles = stats.pop('total_cycle_time')
+        stats['avg_cycle_time'] = cycles / stats['cycles'] if stats['cycles'] else 0.0
+        stats['mode'] = 'burst' if self.in_burst() else 'quiet'
+        stats['interval'] = self.next_interval()
+        stats['detections'] = len(self._latencies)
+        stats['latency_p50'] = self.latency_percentile(0.5)
+        stats['latency_p95'] = self.latency_percentile(0.95)
+        stats['sends'] = len(self._send_latencies)
+        stats['send_latency_p50'] = self.send_latency_percentile(0.5)
+        stats['send_latency_p95'] = self.send_latency_percentile(0.95)
+        return stats
+
+
+def get_all_poller_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有輪詢器的統計資料"""
+    return {name: poller.get_stats() for name, poller in _pollers.items()}
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知廣播引擎
+同一則通知 (例如地震速報) 只產生一次嵌入訊息，再以有限的並行數發送到所有訂閱頻道，
+並以全域速率限制避免觸發 Discord 的 429；記錄每個伺服器的送達延遲
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import discord
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的廣播引擎 (供管理指令查看統計)
+_engines: Dict[str, 'BroadcastEngine'] = {}
+
+
+class RateLimiter:
+    """簡單的權杖桶：平均每秒最多 rate 次，允許 burst 次的瞬間突發"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(int(rate), 1)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class BroadcastResult:
+    """單次廣播的結果"""
+
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        self.sent = 0
+        self.failed = 0
+        self.forbidden = 0
+        # 伺服器 ID → 從事件發生 (開始廣播) 到送達的秒數
+        self.latencies: Dict[int, float] = {}
+        self.duration = 0.0
+
+    def percentile(self, ratio: float) -> float:
+        """送達延遲的百分位數 (秒)"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies.values())
+        return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+class BroadcastEngine:
+    """將同一則訊息並行發送到多個頻道
+
+    Args:
+        name: 引擎名稱 (顯示於統計資料)
+        max_concurrency: 同時進行的發送數量上限
+        rate: 全域每秒發送上限 (Discord 全域限制為每秒 50 次請求，保留餘裕給其他指令)
+    """
+
+    def __init__(self, name: str, max_concurrency: int = 10, rate: float = 25.0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.limiter = RateLimiter(rate)
+        self.last_result: Optional[BroadcastResult] = None
+        self._stats = {
+            'broadcasts': 0,
+            'sent': 0,
+            'failed': 0,
+            'forbidden': 0,
+        }
+        _engines[name] = self
+
+    async def broadcast(self,
+                        event_id: str,
+                        targets: Iterable[Tuple[int, Any]],
+                        send: Callable[[Any], Awaitable[Any]],
+                        started_at: Optional[float] = None) -> BroadcastResult:
+        """發送一則通知
+
+        Args:
+            event_id: 事件識別碼 (例如地震編號)，用於日誌
+            targets: (伺服器 ID, 頻道) 的序列，只需列出已訂閱的頻道
+            send: 實際發送的函式，接收頻道 (例如 lambda channel: channel.send(embed=embed))
+            started_at: 延遲計算的起點 (time.monotonic)，預設為呼叫時
+        """
+        started_at = started_at or time.monotonic()
+        result = BroadcastResult(event_id)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def deliver(guild_id: int, channel: Any):
+            async with semaphore:
+                await self.limiter.acquire()
+                try:
+                    # discord.py 會依各頻道的路由額度自動等待，此處只需控制整體並行與速率
+                    await send(channel)
+                    result.sent += 1
+                    result.latencies[guild_id] = time.monotonic() - started_at
+                except discord.Forbidden:
+                    result.forbidden += 1
+                    logger.warning(f"⚠️ 廣播 {self.name} 無法發送到伺服器 {guild_id} 的頻道 {getattr(channel, 'id', '?')} (權限不足)")
+                except Exception as e:
+                    result.failed += 1
+                    logger.error(f"廣播 {self.name} 發送到伺服器 {guild_id} 時發生錯誤: {str(e)}")
+
+        tasks: List[asyncio.Task] = [asyncio.ensure_future(deliver(guild_id, channel)) for guild_id, channel in targets]
+        if tasks:
+            await asyncio.gather(*tasks)
+        result.duration = time.monotonic() - started_at
+
+        self.last_result = result
+        self._stats['broadcasts'] += 1
+        self._stats['sent'] += result.sent
+        self._stats['failed'] += result.failed
+        self._stats['forbidden'] += result.forbidden
+        logger.info(
+            f"✅ 廣播 {self.name} {event_id} 完成: 送達 {result.sent} / 失敗 {result.failed} / "
+            f"權限不足 {result.forbidden}，耗時 {result.duration:.2f} 秒 (p95 {result.percentile(0.95):.2f} 秒)"
+        )
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得累計發送次數與最近一次廣播的延遲"""
+        stats = dict(self._stats)
+        last = self.last_result
+        stats['last_event'] = last.event_id if last else None
+        stats['last_p50'] = last.percentile(0.5) if last else 0.0
+        stats['last_p95'] = last.percentile(0.95) if last else 0.0
+        stats['last_max'] = max(last.latencies.values()) if last and last.latencies else 0.0
+        return stats
+
+
+def get_all_broadcast_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有廣播引擎的統計資料"""
+    return {name: engine.get_stats() for name, engine in _engines.items()}
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通用非同步 TTL 快取
+每個鍵各自記錄過期時間，超過容量時以 LRU 淘汰；
+資料過期但仍在寬限期內時先回傳舊資料，並在背景重新整理，
+避免斜線指令因等待上游 API 而卡住
+"""
+
+import json
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的快取 (供管理指令查看統計)
+_registry: Dict[str, 'TTLCache'] = {}
+
+
+class CacheEntry:
+    """單一快取項目"""
+
+    __slots__ = ('value', 'stored_at', 'expires_at', 'stale_until')
+
+    def __init__(self, value: Any, ttl: float, stale_ttl: float, age: float = 0):
+        now = time.monotonic() - age
+        self.value = value
+        self.stored_at = now
+        self.expires_at = now + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+    @property
+    def age(self) -> float:
+        """項目存在的秒數"""
+        return time.monotonic() - self.stored_at
+
+
+class TTLCache:
+    """具備逐鍵過期、LRU 容量上限與 stale-while-revalidate 的非同步快取
+
+    Args:
+        name: 快取名稱 (顯示於統計資料)
+        ttl: 資料保持新鮮的秒數
+        stale_ttl: 過期後仍可先回傳舊資料、同時在背景更新的秒數
+        max_entries: 最多保留的鍵數，超過時淘汰最久未使用者
+        persistent: 持久化快取 (utils.persistent_cache.PersistentCache)，
+                    提供時每次更新成功都會寫入磁碟，並可用 warm() 在啟動時載回
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 128,
+                 persistent: Any = None):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, CacheEntry]' = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # 各鍵最後一次被查詢的時間 (背景預取據此略過沒人使用的資料)
+        self._last_access: Dict[Hashable, float] = {}
+        # 最近一次更新失敗的鍵 (上游故障或斷路器開啟時，讀到的是舊資料)
+        self._failed: set = set()
+        self.persistent = persistent
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'evictions': 0,
+            'warmed': 0,
+        }
+        _registry[name] = self
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, allow_stale: bool = False) -> Optional[Any]:
+        """直接讀取快取 (不會觸發更新)，過期資料預設不回傳"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        self._last_access[key] = now
+        if now < entry.expires_at or (allow_stale and now < entry.stale_until):
+            self._entries.move_to_end(key)
+            return entry.value
+        return None
+
+    def get_entry(self, key: Hashable) -> Optional[CacheEntry]:
+        """取得快取項目本身 (包含存入時間)，不論是否過期"""
+        return self._entries.get(key)
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None, age: float = 0):
+        """寫入快取 (age: 資料已存在的秒數，用於載入磁碟上的舊資料)"""
+        self._entries[key] = CacheEntry(value, self.ttl if ttl is None else ttl, self.stale_ttl, age)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._last_access.pop(evicted, None)
+            self._stats['evictions'] += 1
+
+    def invalidate(self, key: Hashable = None):
+        """清除指定鍵，未指定時清除全部"""
+        if key is None:
+            self._entries.clear()
+            self._last_access.clear()
+            self._failed.clear()
+        else:
+            self._entries.pop(key, None)
+            self._last_access.pop(key, None)
+            self._failed.discard(key)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Optional[Any]:
+        """同步版本的 get_or_fetch (用於本機計算結果，例如建好的嵌入訊息)：
+        沒有新鮮資料時呼叫 compute 並存入，回傳 None 或空值時不寫入快取"""
+        value = self.get(key)
+        if value is not None:
+            self._stats['hits'] += 1
+            return value
+        self._stats['misses'] += 1
+        value = compute()
+        if value:
+            self.set(key, value)
+        return value
+
+    async def get_or_fetch(self, key: Hashable,
+                           fetcher: Callable[[], Awaitable[Any]],
+                           ttl: Optional[float] = None,
+                           force_refresh: bool = False) -> Optional[Any]:
+        """取得快取資料，必要時呼叫 fetcher 取得新資料
+
+        - force_refresh: 略過快取直接更新 (失敗時仍會退回舊資料)
+        - 新鮮資料: 直接回傳
+        - 寬限期內的舊資料: 立即回傳，並在背景更新
+        - 無資料或已完全過期: 等待 fetcher；若取得失敗則退回最後一份舊資料
+
+        fetcher 回傳 None 或空值時視為失敗，不會寫入快取
+        """
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        self._last_access[key] = now
+
+        if entry is not None and not force_refresh:
+            if now < entry.expires_at:
+                self._stats['hits'] += 1
+                self._entries.move_to_end(key)
+                return entry.value
+
+            if now < entry.stale_until:
+                self._stats['stale_hits'] += 1
+                self._entries.move_to_end(key)
+                self._start_refresh(key, fetcher, ttl)
+                return entry.value
+
+        self._stats['misses'] += 1
+        # 以 shield 保護共用的更新工作，避免單一呼叫者被取消時連帶中斷其他等待者
+        value = await asyncio.shield(self._start_refresh(key, fetcher, ttl))
+        if value:
+            return value
+
+        if entry is not None:
+            logger.warning(f"⚠️ 快取 {self.name} 的 {key} 更新失敗，改用 {entry.age:.0f} 秒前的資料")
+            return entry.value
+        return value
+
+    async def refresh(self, key: Hashable,
+                      fetcher: Callable[[], Awaitable[Any]],
+                      ttl: Optional[float] = None) -> Optional[Any]:
+        """在背景更新指定鍵 (供預取排程使用，不計入命中統計，也不算是一次查詢)
+
+        與進行中的更新共用同一個工作；失敗時快取中的舊資料維持不變
+        """
+        return await asyncio.shield(self._start_refresh(key, fetcher, ttl))
+
+    def idle_for(self, key: Hashable) -> Optional[float]:
+        """距離指定鍵最後一次被查詢的秒數，從未被查詢時回傳 None"""
+        last = self._last_access.get(key)
+        return None if last is None else time.monotonic() - last
+
+    def stale_notice(self, key: Hashable) -> Optional[str]:
+        """資料已過期且最近一次更新失敗時 (例如斷路器開啟)，回傳提示文字；否則回傳 None"""
+        entry = self._entries.get(key)
+        if entry is None or key not in self._failed or time.monotonic() < entry.expires_at:
+            return None
+        return f"⚠️ 資料來源暫時無法連線，以下為 {max(int(entry.age // 60), 1)} 分鐘前的快取資料"
+
+    def cancel_refresh(self, key: Hashable) -> Optional['asyncio.Task']:
+        """取消指定鍵進行中的更新 (關閉時使用)，回傳被取消的工作供呼叫端等待；沒有進行中的更新時回傳 None"""
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            return None
+        task.cancel()
+        return task
+
+    def _start_refresh(self, key: Hashable,
+                       fetcher: Callable[[], Awaitable[Any]],
+                       ttl: Optional[float]) -> 'asyncio.Task':
+        """啟動 (或沿用進行中的) 更新工作，同一個鍵同時只會有一個更新"""
+        task = self._inflight.get(key)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._refresh(key, fetcher, ttl))
+            self._inflight[key] = task
+        return task
+
+    async def _refresh(self, key: Hashable,
+                       fetcher: Callable[[], Awaitable[Any]],
+                       ttl: Optional[float]) -> Optional[Any]:
+        self._stats['refreshes'] += 1
+        try:
+            value = await fetcher()
+            if value:
+                self._failed.discard(key)
+                self.set(key, value, ttl)
+                if self.persistent is not None:
+                    await self.persistent.save(self._storage_key(key), value)
+            else:
+                self._stats['refresh_errors'] += 1
+                self._failed.add(key)
+            return value
+        except Exception as e:
+            self._stats['refresh_errors'] += 1
+            self._failed.add(key)
+            logger.error(f"更新快取 {self.name} 的 {key} 時發生錯誤: {str(e)}")
+            return None
+        finally:
+            self._inflight.pop(key, None)
+
+    def _storage_key(self, key: Hashable) -> str:
+        """持久化快取使用的鍵 (快取名稱 + JSON 編碼的鍵)"""
+        return f"{self.name}:{json.dumps(key, ensure_ascii=False)}"
+
+    async def warm(self) -> int:
+        """從持久化快取載回資料 (保留原本的取得時間)，回傳載入筆數
+
+        載回的資料若已過期，下一次讀取時會依 stale-while-revalidate 規則在背景更新
+        """
+        if self.persistent is None:
+            return 0
+
+        def decode(value):
+            return tuple(decode(v) for v in value) if isinstance(value, list) else value
+
+        count = 0
+        for dataset in await self.persistent.load_prefix(f"{self.name}:"):
+            try:
+                key = decode(json.loads(dataset.key[len(self.name) + 1:]))
+            except ValueError:
+                continue
+            if key not in self._entries:
+                self.set(key, dataset.payload, age=dataset.age)
+                count += 1
+        self._stats['warmed'] += count
+        if count:
+            logger.info(f"✅ 快取 {self.name} 已從磁碟載入 {count} 筆資料")
+        return count
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得命中/未命中/更新次數等統計"""
+        stats = dict(self._stats)
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses']
+        stats['size'] = len(self._entries)
+        stats['hit_rate'] = ((stats['hits'] + stats['stale_hits']) / lookups) if lookups else 0.0
+        return stats
+
+
+def mark_stale(embed: Any, cache: TTLCache, key: Hashable) -> Any:
+    """若快取資料為舊資料，在嵌入訊息 (discord.Embed) 的說明最前面加上提示"""
+    notice = cache.stale_notice(key)
+    if notice:
+        embed.description = f"{notice}\n{embed.description}" if embed.description else notice
+    return embed
+
+
+def get_all_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有已建立快取的統計資料"""
+    return {name: cache.get_stats() for name, cache in _registry.items()}
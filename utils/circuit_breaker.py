@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+上游主機斷路器
+某個上游主機連續失敗 (逾時、連線錯誤、5xx) 達到門檻時暫時停止對它送出請求，
+讓指令立即改用快取中的最後一份資料；冷卻時間過後放行一個試探請求，
+成功才恢復正常
+"""
+
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(aiohttp.ClientConnectionError):
+    """斷路器開啟中，請求未送出 (視同連線失敗，現有的錯誤處理會改用快取資料)"""
+
+    def __init__(self, host: str, retry_in: float):
+        super().__init__(f"{host} 暫時無法使用 (斷路器開啟中，{retry_in:.0f} 秒後重試)")
+        self.host = host
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """單一上游主機的斷路器 (closed → open → half_open → closed)
+
+    Args:
+        host: 上游主機名稱
+        failure_threshold: 連續失敗幾次後開啟
+        recovery_timeout: 開啟後多少秒放行試探請求
+    """
+
+    def __init__(self, host: str, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {
+            'failures': 0,
+            'rejected': 0,
+            'opened': 0,
+        }
+
+    @property
+    def retry_in(self) -> float:
+        """距離放行試探請求還有幾秒 (未開啟時為 0)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.recovery_timeout - time.monotonic(), 0.0)
+
+    def allow(self) -> bool:
+        """是否可以送出請求；開啟中回傳 False，冷卻結束後只放行一個試探請求"""
+        if self.state == OPEN and self.retry_in <= 0:
+            self.state = HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"斷路器 {self.host} 進入半開狀態，放行試探請求")
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        self._stats['rejected'] += 1
+        return False
+
+    def record_success(self):
+        """請求成功 (包含 4xx，代表上游仍可回應)"""
+        if self.state != CLOSED:
+            logger.info(f"✅ 斷路器 {self.host} 已恢復正常")
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        """請求失敗 (逾時、連線錯誤或 5xx)"""
+        self._stats['failures'] += 1
+        self._consecutive_failures += 1
+        if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def release(self):
+        """試探請求被取消 (未得到結果)，讓下一個請求可以重新試探"""
+        self._probe_in_flight = False
+
+    def _open(self):
+        if self.state != OPEN:
+            self._stats['opened'] += 1
+            logger.warning(
+                f"⚠️ 斷路器 {self.host} 開啟 (連續失敗 {self._consecutive_failures} 次)，"
+                f"{self.recovery_timeout:.0f} 秒內直接使用快取資料"
+            )
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+
+    def reset(self):
+        """手動關閉斷路器"""
+        self.record_success()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得斷路器狀態與統計"""
+        stats = dict(self._stats)
+        stats['state'] = self.state
+        stats['consecutive_failures'] = self._consecutive_failures
+        stats['retry_in'] = self.retry_in
+        return stats
+
+
+class GuardedRequest:
+    """經過斷路器把關的請求：與 aiohttp 的請求物件一樣可 await 也可 async with"""
+
+    def __init__(self, breaker: CircuitBreaker, request_factory):
+        self._breaker = breaker
+        self._request_factory = request_factory
+        self._response: Optional[aiohttp.ClientResponse] = None
+
+    async def _send(self) -> aiohttp.ClientResponse:
+        if not self._breaker.allow():
+            raise CircuitOpenError(self._breaker.host, self._breaker.retry_in)
+        try:
+            response = await self._request_factory()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._breaker.record_failure()
+            raise
+        except BaseException:
+            # 取消等非上游造成的中斷，不計入失敗
+            self._breaker.release()
+            raise
+
+        if response.status >= 500:
+            self._breaker.record_failure()
+        else:
+            self._breaker.record_success()
+        return response
+
+    def __await__(self):
+        return self._send().__await__()
+
+    async def __aenter__(self) -> aiohttp.ClientResponse:
+        self._response = await self._send()
+        return self._response
+
+    async def __aexit__(self, *exc):
+        if self._response is not None:
+            self._response.release()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+條件式下載 (Conditional GET)
+依 URL 保存 ETag / Last-Modified，下次請求帶上 If-None-Match / If-Modified-Since，
+上游回應 304 時直接沿用上一份解析結果；上游不提供驗證資訊時，
+改以內容雜湊判斷資料是否變更，未變更就不必重新解析
+"""
+
+import json
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlencode
+
+from utils.http_pool import HttpClientPool, get_http_pool
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 不應寫入快取鍵 (以及磁碟) 的參數
+SECRET_PARAMS = {'Authorization', 'api_key'}
+
+
+def parse_json_body(body: bytes) -> Any:
+    """預設解析方式：移除 UTF-8 BOM 後解析 JSON (水利署資料常帶有 BOM)"""
+    return json.loads(body.decode('utf-8-sig'))
+
+
+class ConditionalResult:
+    """條件式下載的結果
+
+    Attributes:
+        data: 解析後的資料 (失敗時為 None)
+        status: HTTP 狀態碼
+        changed: 資料是否與上一次不同 (False 表示沿用了上一次的解析結果)
+    """
+
+    __slots__ = ('data', 'status', 'changed')
+
+    def __init__(self, data: Any, status: int, changed: bool):
+        self.data = data
+        self.status = status
+        self.changed = changed
+
+    @property
+    def ok(self) -> bool:
+        return self.data is not None
+
+
+class _ValidatorState:
+    __slots__ = ('payload', 'etag', 'last_modified', 'content_hash')
+
+    def __init__(self, payload: Any = None, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, content_hash: Optional[str] = None):
+        self.payload = payload
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+
+
+class ConditionalFetcher:
+    """帶有驗證資訊快取的下載器
+
+    Args:
+        http_pool: 共用連線池，未提供時使用模組層級的備用連線池
+        persistent: 持久化快取 (utils.persistent_cache.PersistentCache)，
+                    提供時驗證資訊與最後一份資料會寫入磁碟，重啟後仍可發送條件式請求
+    """
+
+    def __init__(self, http_pool: Optional[HttpClientPool] = None, persistent: Any = None):
+        self._http_pool = http_pool
+        self.persistent = persistent
+        self._states: Dict[str, _ValidatorState] = {}
+        self._stats = {
+            'requests': 0,
+            'not_modified': 0,     # 304
+            'unchanged': 0,        # 200 但內容雜湊相同
+            'changed': 0,
+            'errors': 0,
+        }
+
+    @property
+    def http(self) -> HttpClientPool:
+        if self._http_pool is not None and not self._http_pool.closed:
+            return self._http_pool
+        return get_http_pool()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """以 URL 與 (排除金鑰後的) 參數組成快取鍵"""
+        public_params = sorted((k, str(v)) for k, v in (params or {}).items() if k not in SECRET_PARAMS)
+        return f"{url}?{urlencode(public_params)}" if public_params else url
+
+    async def _get_state(self, key: str) -> Optional[_ValidatorState]:
+        state = self._states.get(key)
+        if state is None and self.persistent is not None:
+            dataset = await self.persistent.load(f"conditional:{key}")
+            if dataset is not None:
+                state = _ValidatorState(dataset.payload, dataset.etag, dataset.last_modified, dataset.content_hash)
+                self._states[key] = state
+        return state
+
+    async def fetch(self, url: str,
+                    params: Optional[Dict[str, Any]] = None,
+                    parse: Callable[[bytes], Any] = parse_json_body,
+                    headers: Optional[Dict[str, str]] = None,
+                    **kwargs) -> ConditionalResult:
+        """發送條件式 GET 請求
+
+        - 304: 回傳上一次的解析結果 (changed=False)
+        - 200 且內容雜湊與上次相同: 回傳上一次的解析結果 (changed=False)
+        - 200 且內容不同: 解析新資料並更新驗證資訊 (changed=True)
+        - 其他狀態碼: data 為 None
+        """
+        key = self.make_key(url, params)
+        state = await self._get_state(key)
+        self._stats['requests'] += 1
+
+        request_headers = dict(headers or {})
+        if state is not None and state.payload is not None:
+            if state.etag:
+                request_headers['If-None-Match'] = state.etag
+            if state.last_modified:
+                request_headers['If-Modified-Since'] = state.last_modified
+
+        async with self.http.get(url, params=params, headers=request_headers, **kwargs) as response:
+            if response.status == 304 and state is not None and state.payload is not None:
+                self._stats['not_modified'] += 1
+                logger.info(f"資料未變更 (304): {key}")
+                if self.persistent is not None:
+                    await self.persistent.touch(f"conditional:{key}")
+                return ConditionalResult(state.payload, 304, changed=False)
+
+            if response.status != 200:
+                self._stats['errors'] += 1
+                return ConditionalResult(None, response.status, changed=False)
+
+            body = await response.read()
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+        content_hash = hashlib.sha256(body).hexdigest()
+        if state is not None and state.payload is not None and state.content_hash == content_hash:
+            self._stats['unchanged'] += 1
+            logger.info(f"資料內容未變更 (雜湊相同)，略過解析: {key}")
+            state.etag, state.last_modified = etag, last_modified
+            if self.persistent is not None:
+                # 內容沒變，只更新驗證資訊與時間 (不重新壓縮、寫入整份資料)
+                await self.persistent.touch(f"conditional:{key}", etag=etag, last_modified=last_modified)
+            return ConditionalResult(state.payload, 200, changed=False)
+
+        payload = parse(body)
+        self._stats['changed'] += 1
+        self._states[key] = _ValidatorState(payload, etag, last_modified, content_hash)
+        if self.persistent is not None:
+            await self.persistent.save(f"conditional:{key}", payload, etag, last_modified, content_hash)
+        return ConditionalResult(payload, 200, changed=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得 304 / 內容未變更 / 已變更次數"""
+        stats = dict(self._stats)
+        stats['tracked_urls'] = len(self._states)
+        return stats
+
+
+# 沒有機器人實例時 (例如獨立測試腳本) 使用的備用下載器
+_fallback_fetcher: Optional[ConditionalFetcher] = None
+
+
+def get_conditional_fetcher(bot: Any = None) -> ConditionalFetcher:
+    """取得機器人共用的條件式下載器，若機器人未提供則使用模組層級的備用下載器"""
+    global _fallback_fetcher
+    fetcher = getattr(bot, 'conditional_fetcher', None) if bot is not None else None
+    if isinstance(fetcher, ConditionalFetcher):
+        return fetcher
+    if _fallback_fetcher is None:
+        _fallback_fetcher = ConditionalFetcher(http_pool=getattr(bot, 'http_pool', None))
+    return _fallback_fetcher
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+縣市名稱解析
+以預先建立的別名表 (台/臺 寫法、省略「市/縣」的簡稱、升格前的舊縣名) 與前綴樹，
+一次掃描地址或使用者輸入就找出對應的縣市，供台鐵、天氣、空氣品質與水情指令共用
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 標準縣市名稱 (與中央氣象署、環境部資料相同的「臺」寫法)
+COUNTIES: List[str] = [
+    "基隆市", "臺北市", "新北市", "桃園市", "新竹市", "新竹縣", "苗栗縣",
+    "臺中市", "彰化縣", "南投縣", "雲林縣", "嘉義市", "嘉義縣", "臺南市",
+    "高雄市", "屏東縣", "宜蘭縣", "花蓮縣", "臺東縣", "澎湖縣", "金門縣", "連江縣"
+]
+
+# 額外的別名 (升格前的舊縣名等)
+EXTRA_ALIASES: Dict[str, str] = {
+    "臺北縣": "新北市",
+    "桃園縣": "桃園市",
+    "臺中縣": "臺中市",
+    "臺南縣": "臺南市",
+    "高雄縣": "高雄市",
+    "馬祖": "連江縣",
+}
+
+# 省略「市/縣」的簡稱同時對應到市與縣時，採用縣 (例如「新竹」、「嘉義」)
+_AMBIGUOUS_SHORT_NAME_PREFERENCE = '縣'
+
+
+def build_alias_table(counties: Iterable[str] = COUNTIES,
+                      extra_aliases: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """建立「別名 → 標準縣市名稱」對照表 (含台/臺兩種寫法)"""
+    aliases: Dict[str, str] = {}
+    short_names: Dict[str, List[str]] = {}
+    for county in counties:
+        aliases[county] = county
+        short_names.setdefault(county[:-1], []).append(county)
+    for short_name, candidates in short_names.items():
+        if len(candidates) == 1:
+            aliases[short_name] = candidates[0]
+        else:
+            preferred = [c for c in candidates if c.endswith(_AMBIGUOUS_SHORT_NAME_PREFERENCE)]
+            aliases[short_name] = (preferred or candidates)[0]
+    aliases.update(EXTRA_ALIASES if extra_aliases is None else extra_aliases)
+    # 台/臺 兩種寫法都接受
+    for alias, county in list(aliases.items()):
+        aliases.setdefault(alias.replace('臺', '台'), county)
+    return aliases
+
+
+class CountyResolver:
+    """以前綴樹比對別名：由左至右找到第一個出現的別名，同一位置取最長的別名
+
+    例如「300新竹市東區」會比對到「新竹市」而不是簡稱「新竹」，
+    「新北市板橋區」不會被誤判為其他包含「北」的縣市
+    """
+
+    def __init__(self, aliases: Dict[str, str]):
+        self._trie: Dict[str, dict] = {}
+        self._max_length = 0
+        for alias, county in aliases.items():
+            node = self._trie
+            for char in alias:
+                node = node.setdefault(char, {})
+            # '' 鍵存放在此結束的別名對應的縣市
+            node[''] = county
+            self._max_length = max(self._max_length, len(alias))
+
+    def resolve(self, text: Optional[str]) -> Optional[str]:
+        """解析文字中的縣市，找不到時回傳 None"""
+        if not text:
+            return None
+        for start in range(len(text)):
+            node = self._trie
+            match = None
+            for char in text[start:start + self._max_length]:
+                node = node.get(char)
+                if node is None:
+                    break
+                match = node.get('', match)
+            if match:
+                return match
+        return None
+
+
+_default_resolver = CountyResolver(build_alias_table())
+
+
+@lru_cache(maxsize=4096)
+def resolve_county(text: Optional[str]) -> Optional[str]:
+    """解析地址或使用者輸入中的縣市 (例如「台北」、「新竹縣竹北市…」)，找不到時回傳 None"""
+    return _default_resolver.resolve(text)
+
+
+def same_county(a: Optional[str], b: Optional[str]) -> bool:
+    """兩段文字是否指向同一縣市 (無法解析的一方視為不同)"""
+    county = resolve_county(a)
+    return county is not None and county == resolve_county(b)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+地震歷史紀錄
+監控迴圈取得的每一筆地震報告都精簡後寫入 data/ 下的 SQLite 資料庫，
+並對發生時間、規模、深度與震央縣市建立索引，讓歷史查詢不必再向中央氣象署反覆請求
+"""
+
+import os
+import sqlite3
+import asyncio
+import datetime
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from utils.county_resolver import resolve_county
+from utils.earthquake_intensity import county_max_intensity, epicenter_county
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'earthquake_history.db'
+)
+
+# 查詢時每次最多回傳的筆數
+MAX_QUERY_LIMIT = 50
+
+_COLUMNS = (
+    'report_no', 'origin_time', 'magnitude', 'depth', 'county',
+    'location', 'max_intensity', 'small_area', 'web'
+)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def summarize_earthquake(eq: Dict[str, Any], small_area: bool = False) -> Optional[Dict[str, Any]]:
+    """將地震報告精簡為歷史紀錄的一列，缺少編號或發生時間時回傳 None"""
+    report_no = str(eq.get('EarthquakeNo', '') or '')
+    eq_info = eq.get('EarthquakeInfo') or {}
+    origin_time = eq_info.get('OriginTime') or eq.get('OriginTime')
+    if not report_no or not origin_time:
+        return None
+    location = (eq_info.get('Epicenter') or {}).get('Location', '')
+    intensity = county_max_intensity((eq.get('Intensity') or {}).get('ShakingArea'))
+    return {
+        'report_no': report_no,
+        'origin_time': origin_time,
+        'magnitude': _to_float((eq_info.get('EarthquakeMagnitude') or {}).get('MagnitudeValue')),
+        'depth': _to_float(eq_info.get('FocalDepth')),
+        'county': epicenter_county(location),
+        'location': location,
+        'max_intensity': max(intensity.values(), default=0),
+        'small_area': int(small_area),
+        'web': eq.get('Web', ''),
+    }
+
+
+class EarthquakeHistory:
+    """地震歷史紀錄 (所有磁碟存取都在背景執行緒進行)"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # 已寫入的報告內容，避免每次輪詢都重複寫入同一筆 (內容被修正時才會覆寫)
+        self._seen: Dict[str, tuple] = {}
+        # 一般/小區域地震各自已記錄的最新一筆 (origin_time, report_no)，第一次使用時由資料庫載入
+        self._newest: Dict[bool, Optional[Tuple[str, str]]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS earthquakes (
+                       report_no TEXT PRIMARY KEY,
+                       origin_time TEXT NOT NULL,
+                       magnitude REAL,
+                       depth REAL,
+                       county TEXT,
+                       location TEXT,
+                       max_intensity INTEGER NOT NULL DEFAULT 0,
+                       small_area INTEGER NOT NULL DEFAULT 0,
+                       web TEXT
+                   )'''
+            )
+            # OriginTime 格式為 "YYYY-MM-DD HH:MM:SS"，字串排序即時間排序
+            for column in ('origin_time', 'magnitude', 'depth', 'county'):
+                self._conn.execute(f'CREATE INDEX IF NOT EXISTS idx_earthquakes_{column} ON earthquakes ({column})')
+            self._conn.commit()
+        return self._conn
+
+    # ---- 同步實作 (在背景執行緒中執行) ----
+
+    def _insert_sync(self, rows: List[Dict[str, Any]]) -> int:
+        with self._lock:
+            conn = self._connect()
+            before = conn.total_changes
+            conn.executemany(
+                f'INSERT OR REPLACE INTO earthquakes ({", ".join(_COLUMNS)}) '
+                f'VALUES ({", ".join("?" for _ in _COLUMNS)})',
+                [tuple(row[column] for column in _COLUMNS) for row in rows]
+            )
+            conn.commit()
+            return conn.total_changes - before
+
+    def _query_sync(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        with self._lock:
+            conn = self._connect()
+            return [dict(row) for row in conn.execute(sql, params).fetchall()]
+
+    def _newest_sync(self, small_area: bool) -> Optional[Tuple[str, str]]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                'SELECT origin_time, report_no FROM earthquakes WHERE small_area = ? '
+                'ORDER BY origin_time DESC, report_no DESC LIMIT 1',
+                (int(small_area),)
+            ).fetchone()
+            return (row['origin_time'], row['report_no']) if row else None
+
+    # ---- 非同步介面 ----
+
+    async def newest(self, small_area: bool = False) -> Optional[Tuple[str, str]]:
+        """已記錄的最新一筆報告 (origin_time, report_no)，沒有紀錄時回傳 None"""
+        if small_area not in self._newest:
+            try:
+                self._newest[small_area] = await asyncio.to_thread(self._newest_sync, small_area)
+            except Exception as e:
+                logger.error(f"讀取最新地震歷史紀錄時發生錯誤: {str(e)}")
+                return None
+        return self._newest[small_area]
+
+    async def record_newer(self, earthquakes: List[Dict[str, Any]], small_area: bool = False) -> int:
+        """只寫入比已記錄最新一筆更新的報告 (補齊兩次輪詢之間或離線期間發布的報告)，回傳寫入筆數"""
+        newest = await self.newest(small_area)
+        newer = []
+        for eq in earthquakes:
+            row = summarize_earthquake(eq, small_area)
+            if row and (newest is None or (row['origin_time'], row['report_no']) > newest):
+                newer.append(eq)
+        return await self.record(newer, small_area=small_area)
+
+    async def record(self, earthquakes: List[Dict[str, Any]], small_area: bool = False) -> int:
+        """寫入地震報告 (內容未變的報告會略過)，回傳寫入筆數"""
+        rows = []
+        for eq in earthquakes:
+            row = summarize_earthquake(eq, small_area)
+            if row and self._seen.get(row['report_no']) != tuple(row.values()):
+                rows.append(row)
+        if not rows:
+            return 0
+        try:
+            written = await asyncio.to_thread(self._insert_sync, rows)
+        except Exception as e:
+            logger.error(f"寫入地震歷史紀錄時發生錯誤: {str(e)}")
+            return 0
+        self._seen.update((row['report_no'], tuple(row.values())) for row in rows)
+        newest = max((row['origin_time'], row['report_no']) for row in rows)
+        if small_area in self._newest and (self._newest[small_area] is None or newest > self._newest[small_area]):
+            self._newest[small_area] = newest
+        logger.info(f"✅ 已寫入 {written} 筆地震歷史紀錄")
+        return written
+
+    async def query(self,
+                    limit: int = 10,
+                    min_magnitude: Optional[float] = None,
+                    county: Optional[str] = None,
+                    days: Optional[int] = None,
+                    max_depth: Optional[float] = None) -> List[Dict[str, Any]]:
+        """依條件查詢歷史地震 (由新到舊)
+
+        Args:
+            limit: 最多回傳筆數 (上限 MAX_QUERY_LIMIT)
+            min_magnitude: 最小規模
+            county: 震央縣市
+            days: 只查詢最近幾天 (以臺灣時間計算)
+            max_depth: 最大深度 (公里)
+        """
+        conditions, params = [], []
+        if min_magnitude is not None:
+            conditions.append('magnitude >= ?')
+            params.append(min_magnitude)
+        if county:
+            conditions.append('county = ?')
+            params.append(resolve_county(county) or county)
+        if days:
+            taiwan_now = datetime.datetime.now(datetime.timezone(datetime.timedelta(hours=8)))
+            since = taiwan_now - datetime.timedelta(days=days)
+            conditions.append('origin_time >= ?')
+            params.append(since.strftime('%Y-%m-%d %H:%M:%S'))
+        if max_depth is not None:
+            conditions.append('depth <= ?')
+            params.append(max_depth)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(max(1, min(limit, MAX_QUERY_LIMIT)))
+        try:
+            return await asyncio.to_thread(
+                self._query_sync,
+                f'SELECT {", ".join(_COLUMNS)} FROM earthquakes {where} ORDER BY origin_time DESC LIMIT ?',
+                tuple(params)
+            )
+        except Exception as e:
+            logger.error(f"查詢地震歷史紀錄時發生錯誤: {str(e)}")
+            return []
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+地震震度工具
+將中央氣象署的震度文字 (例如 "5弱") 轉成可比較的等級，
+並把地震報告的 Intensity.ShakingArea 一次整理成「縣市 → 最大震度」
+"""
+
+import re
+from typing import Any, Dict, Iterable, Optional
+
+from utils.county_resolver import resolve_county
+
+# 震度文字 → 等級 (由小到大，0 代表無感或未知)
+INTENSITY_LEVELS: Dict[str, int] = {
+    '1級': 1,
+    '2級': 2,
+    '3級': 3,
+    '4級': 4,
+    '5弱': 5,
+    '5強': 6,
+    '6弱': 7,
+    '6強': 8,
+    '7級': 9,
+}
+
+# 等級 → 顯示文字
+INTENSITY_NAMES: Dict[int, str] = {level: name for name, level in INTENSITY_LEVELS.items()}
+
+_COUNTY_SEPARATORS = re.compile(r'[、,，\s]+')
+
+
+def parse_intensity(text: Optional[str]) -> int:
+    """將震度文字轉為等級，無法辨識時回傳 0
+
+    同時接受 "5弱"、"5 弱"、"4" 與 "4級" 等寫法
+    """
+    if not text:
+        return 0
+    text = str(text).replace(' ', '').replace('級', '')
+    if text.isdigit():
+        text = f"{text}級"
+    elif text and text[-1] not in ('弱', '強'):
+        return 0
+    return INTENSITY_LEVELS.get(text, 0)
+
+
+def intensity_name(level: int) -> str:
+    """將等級轉回顯示文字"""
+    return INTENSITY_NAMES.get(level, '0級')
+
+
+def county_max_intensity(shaking_area: Optional[Iterable[Dict[str, Any]]]) -> Dict[str, int]:
+    """整理地震報告的 ShakingArea 為「縣市 → 最大震度等級」
+
+    ShakingArea 同時包含各縣市的觀測資料與「最大震度 X 級地區」的摘要，
+    摘要的 CountyName 可能以頓號列出多個縣市，一併取最大值即可
+    """
+    result: Dict[str, int] = {}
+    for area in shaking_area or []:
+        if not isinstance(area, dict):
+            continue
+        level = parse_intensity(area.get('AreaIntensity'))
+        if level <= 0:
+            continue
+        for county in _COUNTY_SEPARATORS.split(area.get('CountyName') or ''):
+            if not county:
+                continue
+            county = resolve_county(county) or county
+            if level > result.get(county, 0):
+                result[county] = level
+    return result
+
+
+def epicenter_county(location: Optional[str]) -> Optional[str]:
+    """從震央位置描述取出縣市
+
+    例如 "花蓮縣政府東南方 25.1 公里 (位於花蓮縣近海)" → "花蓮縣"，
+    優先採用括號內的「位於」，其次是描述開頭的縣市
+    """
+    if not location:
+        return None
+    _, found, inside = location.partition('位於')
+    return (resolve_county(inside) if found else None) or resolve_county(location)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+對沖請求 (hedged requests)
+依序啟動多個可互相替代的請求方式 (例如有認證/無認證模式、鏡像端點)，
+前一個在指定時間內沒有結果或已失敗時就立即啟動下一個，
+採用第一個通過驗證的結果，其餘仍在進行中的請求一律取消
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的對沖群組 (供管理指令查看統計)
+_groups: Dict[str, 'HedgedRequest'] = {}
+
+
+class HedgedRequest:
+    """一組可互相替代的請求方式
+
+    Args:
+        name: 群組名稱 (顯示於統計資料)
+        delay: 前一個請求啟動後多少秒仍無結果就啟動下一個；0 表示全部同時送出
+    """
+
+    def __init__(self, name: str, delay: float = 1.0):
+        self.name = name
+        self.delay = delay
+        self._stats: Dict[str, Any] = {
+            'calls': 0,
+            'hedges': 0,       # 額外啟動的請求數
+            'cancelled': 0,    # 因已有結果而取消的請求數
+            'failures': 0,     # 全部請求方式都失敗的次數
+            'wins': {},        # 各請求方式勝出的次數
+        }
+        _groups[name] = self
+
+    async def run(self,
+                  attempts: Sequence[Callable[[], Awaitable[Any]]],
+                  validate: Callable[[Any], bool] = bool,
+                  labels: Optional[Sequence[str]] = None) -> Optional[Any]:
+        """執行對沖請求，回傳第一個通過 validate 的結果；全部失敗時回傳 None
+
+        Args:
+            attempts: 依優先順序排列的請求函式
+            validate: 判斷結果是否可用 (預設為非空值)
+            labels: 各請求方式的名稱 (用於日誌與統計)
+        """
+        labels = list(labels or [f"#{i + 1}" for i in range(len(attempts))])
+        self._stats['calls'] += 1
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            index = next_index
+            next_index += 1
+            if index > 0:
+                self._stats['hedges'] += 1
+                logger.info(f"對沖請求 {self.name}: 啟動 {labels[index]}")
+            pending[asyncio.ensure_future(attempts[index]())] = index
+
+        try:
+            launch()
+            if self.delay <= 0:
+                while next_index < len(attempts):
+                    launch()
+
+            while pending:
+                timeout = self.delay if next_index < len(attempts) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # 等待逾時仍沒有結果，加派下一個請求方式
+                    launch()
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    if task.cancelled():
+                        continue
+                    error = task.exception()
+                    if error is not None:
+                        logger.warning(f"對沖請求 {self.name}: {labels[index]} 發生錯誤: {str(error)}")
+                        continue
+                    result = task.result()
+                    if result is not None and validate(result):
+                        wins: Dict[str, int] = self._stats['wins']
+                        wins[labels[index]] = wins.get(labels[index], 0) + 1
+                        logger.info(f"對沖請求 {self.name}: 採用 {labels[index]} 的結果")
+                        return result
+
+                # 有請求失敗或結果不可用，不必等待延遲，立即啟動下一個
+                if next_index < len(attempts):
+                    launch()
+
+            self._stats['failures'] += 1
+            return None
+        finally:
+            for task in pending:
+                if not task.done():
+                    task.cancel()
+                    self._stats['cancelled'] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得呼叫/加派/取消次數與各請求方式勝出次數"""
+        stats = dict(self._stats)
+        stats['wins'] = dict(self._stats['wins'])
+        return stats
+
+
+def get_hedge_group(name: str, delay: float = 1.0) -> HedgedRequest:
+    """取得 (或建立) 指定名稱的對沖群組"""
+    group = _groups.get(name)
+    if group is None:
+        group = HedgedRequest(name, delay)
+    return group
+
+
+def get_all_hedge_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有對沖群組的統計資料"""
+    return {name: group.get_stats() for name, group in _groups.items()}
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+機器人共用 HTTP 連線池
+依上游主機分別維護 aiohttp 工作階段，保持長連線並共用 SSL 上下文，
+讓各個 Cog 不必每次請求都重新建立 TCP/TLS 連線
+"""
+
+import ssl
+import time
+import logging
+from typing import Optional, Dict, Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from utils.circuit_breaker import CircuitBreaker, GuardedRequest
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 各上游主機的連線數上限 (未列出的主機使用預設值)
+DEFAULT_HOST_LIMITS: Dict[str, int] = {
+    'tdx.transportdata.tw': 20,       # TDX 運輸資料平臺 (捷運/台鐵/高鐵)
+    'opendata.cwa.gov.tw': 10,        # 中央氣象署開放資料
+    'opendata.wra.gov.tw': 6,         # 水利署開放資料
+    'ods.railway.gov.tw': 4,          # 台鐵開放資料
+    'data.epa.gov.tw': 4,             # 環保署空氣品質
+    'data.moenv.gov.tw': 4,           # 環境部空氣品質
+    'opendata.epa.gov.tw': 4,         # 環保署開放資料平台
+}
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36'
+}
+
+
+def create_ssl_context() -> ssl.SSLContext:
+    """建立共用的 SSL 上下文 (與各 Cog 原本的設定一致，停用憑證驗證)"""
+    ssl_context = ssl.create_default_context()
+    ssl_context.check_hostname = False
+    ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+class HttpClientPool:
+    """依主機分組的 aiohttp 工作階段池
+
+    每個上游主機擁有自己的 TCPConnector，可個別設定連線上限與長連線時間；
+    所有連線共用同一個 SSL 上下文。工作階段在第一次使用時才建立，
+    因此可以在事件循環啟動前建立本物件。
+    """
+
+    def __init__(self,
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 default_limit: int = 10,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 keepalive_timeout: float = 60.0,
+                 timeout: Optional[aiohttp.ClientTimeout] = None):
+        self.ssl_context = ssl_context or create_ssl_context()
+        self.default_limit = default_limit
+        self.host_limits = dict(DEFAULT_HOST_LIMITS)
+        if host_limits:
+            self.host_limits.update(host_limits)
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout or aiohttp.ClientTimeout(total=30, connect=10, sock_read=20)
+        self._host_ssl: Dict[str, ssl.SSLContext] = {}
+        self._sessions: Dict[str, aiohttp.ClientSession] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        # 各主機的斷路器 (上游故障時快速失敗，讓指令改用快取資料)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._closed = False
+
+    @staticmethod
+    def _host_of(url: str) -> str:
+        """取得 URL 的主機名稱"""
+        return (urlsplit(url).hostname or '').lower()
+
+    def _host_stats(self, host: str) -> Dict[str, Any]:
+        if host not in self._stats:
+            self._stats[host] = {
+                'requests': 0,
+                'errors': 0,
+                'new_connections': 0,
+                'reused_connections': 0,
+                'total_time': 0.0,
+                'last_status': None,
+            }
+        return self._stats[host]
+
+    def _build_trace_config(self, host: str) -> aiohttp.TraceConfig:
+        """建立追蹤設定，用於統計請求數與連線重用情形"""
+        stats = self._host_stats(host)
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            context.started_at = time.monotonic()
+            stats['requests'] += 1
+
+        async def on_request_end(session, context, params):
+            stats['total_time'] += time.monotonic() - getattr(context, 'started_at', time.monotonic())
+            stats['last_status'] = params.response.status
+
+        async def on_request_exception(session, context, params):
+            stats['errors'] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats['new_connections'] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats['reused_connections'] += 1
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_request_end.append(on_request_end)
+        trace_config.on_request_exception.append(on_request_exception)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def configure_host(self, host: str,
+                       limit: Optional[int] = None,
+                       ssl_context: Optional[ssl.SSLContext] = None):
+        """為特定主機設定連線上限或專用 SSL 上下文 (須在第一次請求前設定才會生效)"""
+        host = host.lower()
+        if limit is not None:
+            self.host_limits[host] = limit
+        if ssl_context is not None:
+            self._host_ssl[host] = ssl_context
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """取得指定 URL 所屬主機的共用工作階段"""
+        if self._closed:
+            raise RuntimeError('HTTP 連線池已關閉')
+
+        host = self._host_of(url)
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            limit = self.host_limits.get(host, self.default_limit)
+            connector = aiohttp.TCPConnector(
+                ssl=self._host_ssl.get(host, self.ssl_context),
+                limit=limit,
+                limit_per_host=limit,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers=DEFAULT_HEADERS,
+                trace_configs=[self._build_trace_config(host)],
+                trust_env=True   # 允許從環境變數讀取代理設定
+            )
+            self._sessions[host] = session
+            logger.info(f'已建立 {host or "(未知主機)"} 的共用 HTTP 工作階段 (連線上限: {limit})')
+        return session
+
+    def breaker_for(self, url_or_host: str) -> CircuitBreaker:
+        """取得指定 URL (或主機名稱) 的斷路器"""
+        host = self._host_of(url_or_host) if '://' in url_or_host else url_or_host.lower()
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(host or '(未知主機)')
+        return breaker
+
+    def get(self, url: str, **kwargs):
+        """發送 GET 請求 (回傳可用於 async with 的回應物件)
+
+        斷路器開啟時會直接拋出 CircuitOpenError，不會等待逾時
+        """
+        return GuardedRequest(self.breaker_for(url), lambda: self.session_for(url).get(url, **kwargs))
+
+    def post(self, url: str, **kwargs):
+        """發送 POST 請求 (回傳可用於 async with 的回應物件)"""
+        return GuardedRequest(self.breaker_for(url), lambda: self.session_for(url).post(url, **kwargs))
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """取得各主機的連線池統計資料"""
+        result = {}
+        for host, stats in self._stats.items():
+            session = self._sessions.get(host)
+            connector = session.connector if session and not session.closed else None
+            requests = stats['requests']
+            result[host] = {
+                'requests': requests,
+                'errors': stats['errors'],
+                'new_connections': stats['new_connections'],
+                'reused_connections': stats['reused_connections'],
+                'avg_time': (stats['total_time'] / requests) if requests else 0.0,
+                'last_status': stats['last_status'],
+                'limit': connector.limit if connector else self.host_limits.get(host, self.default_limit),
+                'open': connector is not None,
+                'circuit': self.breaker_for(host).get_stats(),
+            }
+        return result
+
+    async def close(self):
+        """關閉所有工作階段"""
+        self._closed = True
+        for host, session in list(self._sessions.items()):
+            if not session.closed:
+                await session.close()
+                logger.info(f'已關閉 {host} 的共用 HTTP 工作階段')
+        self._sessions.clear()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+
+# 沒有機器人實例時 (例如獨立測試腳本) 使用的備用連線池
+_fallback_pool: Optional[HttpClientPool] = None
+
+
+def get_http_pool(bot: Any = None) -> HttpClientPool:
+    """取得機器人擁有的共用連線池，若機器人未提供則使用模組層級的備用連線池"""
+    global _fallback_pool
+    pool = getattr(bot, 'http_pool', None) if bot is not None else None
+    if isinstance(pool, HttpClientPool) and not pool.closed:
+        return pool
+    if _fallback_pool is None or _fallback_pool.closed:
+        _fallback_pool = HttpClientPool()
+    return _fallback_pool
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捷運列車方向對照表
+由 TDX 的 StationOfLine (各路線車站序列) 預先編譯出「(系統, 路線, 終點站代碼) → 方向」對照表，
+判斷看板上每班列車的方向只需要一次字典查詢；查不到的終點站會計入統計，方便發現資料異動
+
+方向定義：開往路線序列後半段 (序號較大一端，例如板南線往南港展覽館) 為上行 'up'，
+開往前半段為下行 'down'；折返站 (例如大安、北投) 依其所在的半段判斷，正中間的車站視為無法判斷
+"""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+DIRECTION_UP = 'up'
+DIRECTION_DOWN = 'down'
+
+# 已建立的對照表 (供管理指令查看統計)
+_tables: Dict[str, 'MetroDirectionTable'] = {}
+
+
+def compile_direction_table(station_of_line: Iterable[Dict[str, Any]]) -> Dict[str, Dict[str, str]]:
+    """將 StationOfLine 資料編譯為 {路線代碼: {車站代碼: 方向}} (可直接存成 JSON)
+
+    同一路線有多筆序列 (例如支線) 時逐一套用；同一車站在不同序列中方向相反則視為無法判斷
+    """
+    compiled: Dict[str, Dict[str, Optional[str]]] = {}
+    for line in station_of_line or []:
+        line_id = line.get('LineID')
+        stations = sorted(line.get('Stations') or [], key=lambda station: station.get('Sequence', 0))
+        if not line_id or len(stations) < 2:
+            continue
+        directions = compiled.setdefault(line_id, {})
+        middle = (len(stations) - 1) / 2
+        for position, station in enumerate(stations):
+            station_id = station.get('StationID')
+            if not station_id or position == middle:
+                continue
+            direction = DIRECTION_UP if position > middle else DIRECTION_DOWN
+            if directions.get(station_id, direction) != direction:
+                direction = None
+            directions[station_id] = direction
+    return {
+        line_id: {station_id: direction for station_id, direction in directions.items() if direction}
+        for line_id, directions in compiled.items()
+    }
+
+
+class MetroDirectionTable:
+    """所有捷運系統共用的方向對照表
+
+    Args:
+        name: 名稱 (顯示於統計資料)
+        top_unresolved: 統計資料中列出多少個最常查不到的終點站
+    """
+
+    def __init__(self, name: str = 'metro_direction', top_unresolved: int = 5):
+        self.name = name
+        self.top_unresolved = top_unresolved
+        self._table: Dict[Tuple[str, str, str], str] = {}
+        # 各系統目前載入的編譯結果 (內容沒變時不重建)
+        self._sources: Dict[str, Dict[str, Dict[str, str]]] = {}
+        self._unresolved: Counter = Counter()
+        self._stats = {'resolved': 0, 'unresolved': 0}
+        _tables[name] = self
+
+    def load(self, system: str, compiled: Optional[Dict[str, Dict[str, str]]]):
+        """載入 (或更新) 某個系統的編譯結果"""
+        if not compiled or self._sources.get(system) is compiled:
+            return
+        self._table = {key: value for key, value in self._table.items() if key[0] != system}
+        for line_id, directions in compiled.items():
+            for station_id, direction in directions.items():
+                self._table[(system, line_id, station_id)] = direction
+        self._sources[system] = compiled
+        logger.info(f"✅ 已載入 {system} 捷運方向對照表 ({sum(len(d) for d in compiled.values())} 站)")
+
+    def has_system(self, system: str) -> bool:
+        return system in self._sources
+
+    def classify(self, system: str, line_id: str, destination_id: Optional[str]) -> Optional[str]:
+        """判斷開往 destination_id 的列車方向，查不到時回傳 None 並計入統計"""
+        direction = self._table.get((system, line_id, destination_id))
+        if direction is None:
+            self._stats['unresolved'] += 1
+            self._unresolved[(system, line_id, destination_id)] += 1
+        else:
+            self._stats['resolved'] += 1
+        return direction
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['systems'] = len(self._sources)
+        stats['entries'] = len(self._table)
+        stats['top_unresolved'] = [
+            (f"{system}/{line_id}/{destination_id}", count)
+            for (system, line_id, destination_id), count in self._unresolved.most_common(self.top_unresolved)
+        ]
+        return stats
+
+
+def get_all_direction_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有方向對照表的統計資料"""
+    return {name: table.get_stats() for name, table in _tables.items()}
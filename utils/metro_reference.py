@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捷運靜態參考資料
+車站設施 (StationFacility)、路網 (Network) 與路線車站序列 (StationOfLine) 很少變動，
+原始資料存放在具持久化的參考資料快取 (每日於背景更新、重啟後立即可用)；
+此模組在資料更新時為每個捷運系統建立一次索引 (依路線、車站分組)，
+設施與路網瀏覽、方向判斷與車站搜尋都直接使用建好的索引
+"""
+
+import re
+import asyncio
+import logging
+from itertools import count
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.cache_manager import TTLCache
+from utils.metro_direction import compile_direction_table
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+FACILITY = 'facility'
+NETWORK = 'network'
+STATION_OF_LINE = 'station_of_line'
+DATASETS = (FACILITY, NETWORK, STATION_OF_LINE)
+
+# 車站設施資料沒有路線欄位時，由車站代碼前綴 (BL14 → BL) 推得的路線名稱
+FACILITY_LINE_NAMES = {
+    'BL': '板南線', 'BR': '文湖線', 'R': '淡水信義線',
+    'G': '松山新店線', 'O': '中和新蘆線', 'Y': '環狀線',
+    'A': '機場線', 'AP': '機場線', 'TYMC': '桃園捷運'
+}
+
+_STATION_PREFIX = re.compile(r'^([A-Z]+)')
+
+
+def facility_line_id(station: Dict[str, Any]) -> str:
+    """車站設施資料所屬的路線 (依序嘗試各種路線欄位，最後由車站代碼推得)"""
+    line_id = (station.get('LineID') or
+               station.get('LineName') or
+               station.get('RouteID') or
+               station.get('RouteName') or
+               station.get('Line') or
+               station.get('Route'))
+    if line_id:
+        return line_id
+    match = _STATION_PREFIX.match(station.get('StationID') or '')
+    if not match:
+        return '未知路線'
+    return FACILITY_LINE_NAMES.get(match.group(1), f'{match.group(1)}線')
+
+
+def dataset_key(dataset: str, system: str) -> str:
+    """參考資料快取中的鍵 (與 fetch_metro_facility / fetch_metro_network 共用)"""
+    return f'metro_{dataset}:{system}'
+
+
+class MetroReferenceIndex:
+    """某個捷運系統的參考資料索引 (資料更新時重建，建立後不再修改)
+
+    Args:
+        system: 捷運系統代碼
+        version: 版本號 (每次重建遞增，供嵌入訊息快取作為鍵)
+        facilities / network / station_of_line: TDX 原始資料，沒有時為 None
+    """
+
+    def __init__(self, system: str, version: int,
+                 facilities: Optional[List[Dict[str, Any]]] = None,
+                 network: Optional[List[Dict[str, Any]]] = None,
+                 station_of_line: Optional[List[Dict[str, Any]]] = None):
+        self.system = system
+        self.version = version
+
+        # 車站設施：路線 → 車站 (路線依名稱排序)，以及車站代碼 → 設施資料
+        facility_lines: Dict[str, List[Dict[str, Any]]] = {}
+        for station in facilities or []:
+            facility_lines.setdefault(facility_line_id(station), []).append(station)
+        self.facility_lines: Dict[str, List[Dict[str, Any]]] = {
+            line_id: facility_lines[line_id] for line_id in sorted(facility_lines)
+        }
+        self.facilities: Dict[str, Dict[str, Any]] = {
+            station['StationID']: station for station in facilities or [] if station.get('StationID')
+        }
+
+        # 路網：路線清單
+        self.network: List[Dict[str, Any]] = list(network or [])
+
+        # 路線車站序列：路線 → 依序排列的車站，以及方向對照表
+        self.lines: Dict[str, List[Dict[str, Any]]] = {}
+        for line in station_of_line or []:
+            line_id = line.get('LineID')
+            if not line_id:
+                continue
+            stations = sorted(line.get('Stations') or [], key=lambda station: station.get('Sequence', 0))
+            existing = self.lines.setdefault(line_id, [])
+            known = {station.get('StationID') for station in existing}
+            existing.extend(station for station in stations if station.get('StationID') not in known)
+        self.directions: Dict[str, Dict[str, str]] = compile_direction_table(station_of_line or [])
+
+        self._derived: Dict[str, Any] = {}
+
+    def derived(self, name: str, build: Callable[['MetroReferenceIndex'], Any]) -> Any:
+        """由索引衍生的結構 (例如預先建好的分頁)，每個版本只建立一次"""
+        if name not in self._derived:
+            self._derived[name] = build(self)
+        return self._derived[name]
+
+
+class MetroReferenceStore:
+    """管理各捷運系統的參考資料索引
+
+    Args:
+        cache: 存放原始資料的參考資料快取 (建議具持久化)
+        fetchers: 資料集名稱 → 向 TDX 取得該系統資料的函式 (失敗時回傳 None)
+    """
+
+    def __init__(self, cache: TTLCache, fetchers: Dict[str, Callable[[str], Awaitable[Any]]]):
+        self.cache = cache
+        self.fetchers = fetchers
+        # 系統 → (建立索引時使用的原始資料, 索引)
+        self._indexes: Dict[str, Tuple[List[Any], MetroReferenceIndex]] = {}
+        self._versions = count(1)
+
+    async def fetch_dataset(self, system: str, dataset: str) -> Optional[List[Dict[str, Any]]]:
+        """取得單一資料集 (由參考資料快取回應，過期時在背景更新)"""
+        return await self.cache.get_or_fetch(
+            dataset_key(dataset, system), lambda: self.fetchers[dataset](system)
+        )
+
+    async def get(self, system: str, datasets: Iterable[str] = DATASETS) -> MetroReferenceIndex:
+        """取得系統的索引；datasets 中的資料集必要時向上游取得，其餘只使用快取中已有的資料"""
+        datasets = tuple(datasets)
+        if datasets:
+            await asyncio.gather(*(self.fetch_dataset(system, dataset) for dataset in datasets))
+        return self.current(system)
+
+    def current(self, system: str) -> MetroReferenceIndex:
+        """以快取中現有的資料取得索引 (不觸發請求)，資料有變動時才重建"""
+        sources = [self.cache.get(dataset_key(dataset, system), allow_stale=True) for dataset in DATASETS]
+        cached = self._indexes.get(system)
+        if cached and all(old is new for old, new in zip(cached[0], sources)):
+            return cached[1]
+        index = MetroReferenceIndex(system, next(self._versions), *sources)
+        self._indexes[system] = (sources, index)
+        logger.info(
+            f"✅ 已建立 {system} 捷運參考資料索引 (v{index.version}：設施 {len(index.facilities)} 站 / "
+            f"路網 {len(index.network)} 條 / 路線車站序列 {len(index.lines)} 條)"
+        )
+        return index
+
+    def register_prefetch(self, scheduler: Any, systems: Dict[str, Iterable[str]]) -> List[str]:
+        """向背景預取排程註冊每日更新 (systems: 資料集 → 系統代碼)，回傳註冊的項目名稱"""
+        names = []
+        for dataset, dataset_systems in systems.items():
+            for system in dataset_systems:
+                name = dataset_key(dataset, system)
+                scheduler.register(
+                    name, self.cache, name,
+                    lambda dataset=dataset, system=system: self.fetchers[dataset](system),
+                    idle_after=None
+                )
+                names.append(name)
+        return names
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捷運即時電子看板快照服務
+在背景以固定間隔同時輪詢所有捷運系統，將每個系統的看板資料發佈為不可變、具版本號的快照；
+視圖只記住 (系統, 版本)，切換路線、方向與「重新整理」都直接讀取記憶體中的快照
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的快照服務 (供管理指令查看統計)
+_services: Dict[str, 'MetroSnapshotService'] = {}
+
+
+class MetroSnapshot:
+    """某個捷運系統在某一時間點的看板資料 (發佈後不再修改，車站資料請當作唯讀)
+
+    Args:
+        system: 捷運系統代碼 (例如 TRTC)
+        version: 版本號 (同一系統內遞增，資料內容改變時才會增加)
+        stations: 處理後的車站看板資料 (含 up_trains / down_trains)
+    """
+
+    __slots__ = ('system', 'version', 'published_at', 'stations', 'lines', '_by_station', '_derived')
+
+    def __init__(self, system: str, version: int, stations: Iterable[Dict[str, Any]]):
+        self.system = system
+        self.version = version
+        self.published_at = time.time()
+        self.stations: Tuple[Dict[str, Any], ...] = tuple(stations)
+        # 按路線分組 (保留 TDX 回傳的順序)，供各視圖直接取用
+        lines: Dict[str, List[Dict[str, Any]]] = {}
+        for station in self.stations:
+            lines.setdefault(station.get('LineID', '未知路線'), []).append(station)
+        self.lines: Mapping[str, Tuple[Dict[str, Any], ...]] = MappingProxyType(
+            {line_id: tuple(stations) for line_id, stations in lines.items()}
+        )
+        self._by_station = {
+            station.get('StationID'): station for station in self.stations if station.get('StationID')
+        }
+        self._derived: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    @property
+    def line_ids(self) -> List[str]:
+        return list(self.lines.keys())
+
+    def station(self, station_id: str) -> Optional[Dict[str, Any]]:
+        """依車站代碼取得車站看板資料"""
+        return self._by_station.get(station_id)
+
+    def derived(self, name: str, build: Callable[[Tuple[Dict[str, Any], ...]], Any]) -> Any:
+        """由快照資料衍生的結構 (例如按路線、車站、方向分組)，每個快照只建立一次"""
+        if name not in self._derived:
+            self._derived[name] = build(self.stations)
+        return self._derived[name]
+
+
+class MetroSnapshotService:
+    """定期同時輪詢所有捷運系統並發佈快照
+
+    Args:
+        name: 名稱 (顯示於統計資料)
+        systems: 要輪詢的捷運系統代碼
+        fetcher: 取得單一系統看板資料的函式 (失敗時回傳 None，沒有資料時回傳空列表)
+        interval: 輪詢間隔 (秒)
+        idle_after: 超過多少秒沒有人讀取快照就暫停輪詢；下一次讀取時再恢復
+        keep_versions: 每個系統保留多少個舊版本，供仍在使用舊版本的視圖讀取
+    """
+
+    def __init__(self, name: str, systems: Iterable[str],
+                 fetcher: Callable[[str], Awaitable[Optional[List[Dict[str, Any]]]]],
+                 interval: float = 30, idle_after: Optional[float] = 600, keep_versions: int = 3):
+        self.name = name
+        self.systems = list(systems)
+        self.fetcher = fetcher
+        self.interval = interval
+        self.idle_after = idle_after
+        self.keep_versions = keep_versions
+        self._versions: Dict[str, 'OrderedDict[int, MetroSnapshot]'] = {system: OrderedDict() for system in self.systems}
+        self._checked_at: Dict[str, float] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._last_access = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+        self._stats = {
+            'polls': 0,
+            'refreshes': 0,
+            'published': 0,
+            'unchanged': 0,
+            'failures': 0,
+            'skipped_idle': 0,
+            'last_poll_time': 0.0,
+        }
+        _services[name] = self
+
+    # ---- 讀取 ----
+
+    def current(self, system: str) -> Optional[MetroSnapshot]:
+        """目前最新的快照 (不觸發任何請求)"""
+        versions = self._versions.get(system)
+        if not versions:
+            return None
+        return next(reversed(versions.values()))
+
+    def get_version(self, system: str, version: Optional[int]) -> Optional[MetroSnapshot]:
+        """取得指定版本的快照；版本已被淘汰時回傳最新的快照"""
+        self._touch()
+        versions = self._versions.get(system) or {}
+        return versions.get(version) or self.current(system)
+
+    def age(self, system: str) -> Optional[float]:
+        """距離上次成功取得資料的秒數"""
+        checked_at = self._checked_at.get(system)
+        return None if checked_at is None else time.monotonic() - checked_at
+
+    async def get(self, system: str) -> Optional[MetroSnapshot]:
+        """取得最新快照；背景輪詢已保持新鮮時只是讀取記憶體，
+        沒有快照或快照已超過兩個輪詢間隔 (例如剛從閒置恢復) 時才立即向上游取得"""
+        if system not in self._versions:
+            logger.error(f"不支援的捷運系統: {system}")
+            return None
+        self._touch()
+        age = self.age(system)
+        if age is None or age > self.interval * 2:
+            await self.refresh(system)
+        return self.current(system)
+
+    def _touch(self):
+        was_idle = self.is_idle()
+        self._last_access = time.monotonic()
+        if was_idle and self._wakeup is not None:
+            self._wakeup.set()
+
+    def is_idle(self) -> bool:
+        """最近是否沒有人讀取快照"""
+        if self.idle_after is None:
+            return False
+        return time.monotonic() - self._last_access > self.idle_after
+
+    # ---- 更新 ----
+
+    async def refresh(self, system: str) -> Optional[MetroSnapshot]:
+        """向上游取得單一系統的資料並發佈 (同一系統同時只會有一個請求)"""
+        task = self._inflight.get(system)
+        if task is None or task.done():
+            task = asyncio.ensure_future(self._refresh(system))
+            self._inflight[system] = task
+        return await asyncio.shield(task)
+
+    async def _refresh(self, system: str) -> Optional[MetroSnapshot]:
+        self._stats['refreshes'] += 1
+        try:
+            stations = await self.fetcher(system)
+        except Exception as e:
+            stations = None
+            logger.error(f"取得 {system} 捷運看板快照時發生錯誤: {str(e)}")
+        if stations is None:
+            # 失敗時保留舊快照 (空的列表代表目前沒有列車，照常發佈)
+            self._stats['failures'] += 1
+            return self.current(system)
+        self._checked_at[system] = time.monotonic()
+        return self.publish(system, stations)
+
+    def publish(self, system: str, stations: List[Dict[str, Any]]) -> MetroSnapshot:
+        """發佈新快照；內容與目前的快照相同時沿用原本的版本"""
+        current = self.current(system)
+        if current is not None and list(current.stations) == list(stations):
+            self._stats['unchanged'] += 1
+            return current
+        versions = self._versions.setdefault(system, OrderedDict())
+        snapshot = MetroSnapshot(system, (current.version + 1) if current else 1, stations)
+        versions[snapshot.version] = snapshot
+        while len(versions) > self.keep_versions:
+            versions.popitem(last=False)
+        self._stats['published'] += 1
+        return snapshot
+
+    async def poll_all(self):
+        """同時更新所有系統"""
+        started = time.monotonic()
+        await asyncio.gather(*(self.refresh(system) for system in self.systems), return_exceptions=True)
+        self._stats['polls'] += 1
+        self._stats['last_poll_time'] = time.monotonic() - started
+
+    def start(self):
+        """啟動背景輪詢 (需在事件迴圈中呼叫，重複呼叫不會建立多個迴圈)"""
+        if self._closed or (self._task and not self._task.done()):
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._loop())
+        logger.info(f"✅ {self.name} 快照服務已啟動 ({len(self.systems)} 個系統，每 {self.interval:g} 秒)")
+
+    async def _loop(self):
+        try:
+            while not self._closed:
+                self._wakeup.clear()
+                if self.is_idle():
+                    # 沒有人查詢時不輪詢，等下一次讀取時喚醒
+                    self._stats['skipped_idle'] += 1
+                    await self._wakeup.wait()
+                    continue
+                await self.poll_all()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self):
+        """停止背景輪詢"""
+        self._closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['interval'] = self.interval
+        stats['idle'] = self.is_idle()
+        stats['systems'] = {}
+        for system in self.systems:
+            snapshot = self.current(system)
+            age = self.age(system)
+            stats['systems'][system] = {
+                'version': snapshot.version if snapshot else None,
+                'stations': len(snapshot) if snapshot else 0,
+                'age': age,
+            }
+        return stats
+
+
+def get_all_snapshot_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有快照服務的統計資料"""
+    return {name: service.get_stats() for name, service in _services.items()}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+捷運車站索引
+由各捷運系統的路線車站序列 (StationOfLine) 一次建立跨系統的車站名稱索引 (utils.station_search)，
+可依中文站名、英文站名與車站代碼搜尋，
+供 /metro_station 自動完成直接解析到 (系統, 路線, 車站)，不必逐層選擇系統、路線與車站
+"""
+
+import logging
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from utils.station_search import StationNameIndex
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+
+def station_key(system: str, station_id: str, line_id: str) -> str:
+    """自動完成選項的值 (系統:路線:車站代碼)，同一車站代碼在不同系統或路線可能重複"""
+    return f"{system}:{line_id}:{station_id}"
+
+
+class MetroStation:
+    """索引中的單一車站 (同一轉乘站在每條路線各有一筆)"""
+
+    __slots__ = ('key', 'system', 'system_name', 'id', 'line_id', 'name', 'ename')
+
+    def __init__(self, system: str, system_name: str, station_id: str, line_id: str, name: str, ename: str = ''):
+        self.key = station_key(system, station_id, line_id)
+        self.system = system
+        self.system_name = system_name
+        self.id = station_id
+        self.line_id = line_id
+        self.name = name
+        self.ename = ename
+
+    def label(self) -> str:
+        """自動完成選項顯示的文字"""
+        label = f"{self.name} ({self.ename})" if self.ename else self.name
+        return f"{label} - {self.system_name} {self.line_id} {self.id}"
+
+
+class MetroStationIndex(StationNameIndex[MetroStation]):
+    """所有捷運系統車站的記憶體索引
+
+    Args:
+        lines_by_system: 系統代碼 → {路線代碼: [StationOfLine 車站資料]}
+        system_names: 系統代碼 → 顯示名稱
+    """
+
+    def __init__(self, lines_by_system: Optional[Mapping[str, Mapping[str, List[Dict[str, Any]]]]] = None,
+                 system_names: Optional[Dict[str, str]] = None):
+        super().__init__()
+        # 系統順序 (同級結果依系統排序，例如臺北捷運在前)
+        self._system_order: Dict[str, int] = {}
+        if lines_by_system:
+            self.build(lines_by_system, system_names or {})
+
+    def build(self, lines_by_system: Mapping[str, Mapping[str, List[Dict[str, Any]]]], system_names: Dict[str, str]):
+        """重新建立所有索引"""
+        self._clear()
+        self._system_order = {system: order for order, system in enumerate(lines_by_system)}
+        for system, lines in lines_by_system.items():
+            for line_id, stations in lines.items():
+                for item in stations:
+                    station_id = str(item.get('StationID', '')).strip()
+                    names = item.get('StationName') or {}
+                    name = str(names.get('Zh_tw', '') if isinstance(names, dict) else names).strip()
+                    if not station_id or not name:
+                        continue
+                    ename = str(names.get('En', '') if isinstance(names, dict) else '').strip()
+                    station = MetroStation(system, system_names.get(system, system), station_id, line_id, name, ename)
+                    self._add(station.key, station, self._texts(station))
+        logger.info(f"✅ 捷運車站索引建立完成，共 {len(self)} 站 ({len(lines_by_system)} 個系統)")
+
+    def _texts(self, station: MetroStation) -> Tuple[str, str, str]:
+        return station.name, station.ename, station.id
+
+    def _sort_key(self, station: MetroStation) -> Tuple[int, int, str, str]:
+        # 同級時短站名優先，再依系統順序
+        return len(station.name), self._system_order.get(station.system, 0), station.line_id, station.id
+
+    def _listing_key(self, station: MetroStation) -> Tuple[int, str, str]:
+        return self._system_order.get(station.system, 0), station.line_id, station.id
+
+    def get(self, key: str) -> Optional[MetroStation]:
+        """以自動完成的值 (系統:路線:車站代碼) 查詢"""
+        return self._lookup(key)
+
+    def search(self, query: str, system: Optional[str] = None, limit: int = 25) -> List[MetroStation]:
+        """依相關程度排序的候選車站 (完全符合 > 前綴 > 子字串，同級時短站名、系統順序優先)
+
+        Args:
+            query: 中文站名、英文站名、車站代碼或其中一部分
+            system: 只列出此捷運系統的車站 (None 表示全部)
+            limit: 最多回傳筆數
+        """
+        return self._search(query, (lambda station: station.system == system) if system else None, limit)
+
+    def resolve(self, query: str) -> Optional[MetroStation]:
+        """將使用者輸入解析為單一車站：自動完成的值、完全符合 (轉乘站取排序最前的路線) 或唯一的前綴符合"""
+        return self._resolve(query)
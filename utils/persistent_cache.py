@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+資料集持久化快取
+將上游 API 最後一次成功取得的資料 (壓縮 JSON)、取得時間與驗證資訊
+(ETag / Last-Modified / 內容雜湊) 存放在 data/ 下的 SQLite 資料庫，
+讓機器人重新啟動後可以立即使用上次的資料，再於背景重新驗證
+"""
+
+import os
+import json
+import time
+import zlib
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'dataset_cache.db'
+)
+
+# touch() 未指定的驗證資訊保持不變
+_KEEP = object()
+
+
+class StoredDataset:
+    """從持久化快取讀出的一筆資料"""
+
+    __slots__ = ('key', 'payload', 'fetched_at', 'etag', 'last_modified', 'content_hash')
+
+    def __init__(self, key: str, payload: Any, fetched_at: float,
+                 etag: Optional[str] = None,
+                 last_modified: Optional[str] = None,
+                 content_hash: Optional[str] = None):
+        self.key = key
+        self.payload = payload
+        self.fetched_at = fetched_at
+        self.etag = etag
+        self.last_modified = last_modified
+        self.content_hash = content_hash
+
+    @property
+    def age(self) -> float:
+        """距離上次取得的秒數"""
+        return max(time.time() - self.fetched_at, 0)
+
+
+class PersistentCache:
+    """以 SQLite 儲存的資料集快取 (所有磁碟存取都在背景執行緒進行)"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = {'loads': 0, 'saves': 0, 'errors': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS datasets (
+                       key TEXT PRIMARY KEY,
+                       payload BLOB NOT NULL,
+                       fetched_at REAL NOT NULL,
+                       etag TEXT,
+                       last_modified TEXT,
+                       content_hash TEXT
+                   )'''
+            )
+            self._conn.commit()
+        return self._conn
+
+    # ---- 同步實作 (在背景執行緒中執行) ----
+
+    def _load_sync(self, key: str) -> Optional[StoredDataset]:
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT key, payload, fetched_at, etag, last_modified, content_hash FROM datasets WHERE key = ?',
+                (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        payload = json.loads(zlib.decompress(row[1]).decode('utf-8'))
+        return StoredDataset(row[0], payload, row[2], row[3], row[4], row[5])
+
+    def _load_prefix_sync(self, prefix: str) -> List[StoredDataset]:
+        with self._lock:
+            rows = self._connect().execute(
+                'SELECT key, payload, fetched_at, etag, last_modified, content_hash FROM datasets WHERE substr(key, 1, ?) = ?',
+                (len(prefix), prefix)
+            ).fetchall()
+        return [
+            StoredDataset(row[0], json.loads(zlib.decompress(row[1]).decode('utf-8')), row[2], row[3], row[4], row[5])
+            for row in rows
+        ]
+
+    def _save_sync(self, key: str, payload: Any, fetched_at: float,
+                   etag: Optional[str], last_modified: Optional[str], content_hash: Optional[str]):
+        blob = zlib.compress(json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                'INSERT OR REPLACE INTO datasets (key, payload, fetched_at, etag, last_modified, content_hash) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, blob, fetched_at, etag, last_modified, content_hash)
+            )
+            conn.commit()
+
+    def _touch_sync(self, key: str, fetched_at: float, validators: Dict[str, Optional[str]]):
+        columns = ['fetched_at', *validators]
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                f'UPDATE datasets SET {", ".join(f"{column} = ?" for column in columns)} WHERE key = ?',
+                (fetched_at, *validators.values(), key)
+            )
+            conn.commit()
+
+    # ---- 非同步介面 ----
+
+    async def load(self, key: str) -> Optional[StoredDataset]:
+        """讀取一筆資料，不存在或讀取失敗時回傳 None"""
+        try:
+            dataset = await asyncio.to_thread(self._load_sync, key)
+            if dataset is not None:
+                self._stats['loads'] += 1
+            return dataset
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"讀取持久化快取 {key} 時發生錯誤: {str(e)}")
+            return None
+
+    async def load_prefix(self, prefix: str) -> List[StoredDataset]:
+        """讀取所有以 prefix 開頭的資料"""
+        try:
+            datasets = await asyncio.to_thread(self._load_prefix_sync, prefix)
+            self._stats['loads'] += len(datasets)
+            return datasets
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"讀取持久化快取 {prefix}* 時發生錯誤: {str(e)}")
+            return []
+
+    async def save(self, key: str, payload: Any,
+                   etag: Optional[str] = None,
+                   last_modified: Optional[str] = None,
+                   content_hash: Optional[str] = None,
+                   fetched_at: Optional[float] = None):
+        """寫入 (或覆寫) 一筆資料"""
+        try:
+            await asyncio.to_thread(
+                self._save_sync, key, payload, fetched_at or time.time(), etag, last_modified, content_hash
+            )
+            self._stats['saves'] += 1
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"寫入持久化快取 {key} 時發生錯誤: {str(e)}")
+
+    async def touch(self, key: str, etag: Any = _KEEP, last_modified: Any = _KEEP):
+        """資料未變更時只更新取得時間 (以及有指定的驗證資訊)，不重新序列化資料"""
+        validators = {
+            column: value for column, value in (('etag', etag), ('last_modified', last_modified))
+            if value is not _KEEP
+        }
+        try:
+            await asyncio.to_thread(self._touch_sync, key, time.time(), validators)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"更新持久化快取 {key} 時間時發生錯誤: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得讀寫統計"""
+        stats = dict(self._stats)
+        stats['path'] = self.path
+        return stats
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# 沒有機器人實例時 (例如獨立測試腳本) 使用的備用快取
+_fallback_cache: Optional[PersistentCache] = None
+
+
+def get_persistent_cache(bot: Any = None) -> PersistentCache:
+    """取得機器人共用的持久化快取，若機器人未提供則使用模組層級的備用快取"""
+    global _fallback_cache
+    cache = getattr(bot, 'persistent_cache', None) if bot is not None else None
+    if isinstance(cache, PersistentCache):
+        return cache
+    if _fallback_cache is None:
+        _fallback_cache = PersistentCache()
+    return _fallback_cache
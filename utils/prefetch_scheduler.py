@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+背景預取排程
+在快取資料過期前於背景更新熱門資料集 (地震、捷運看板、雷達、空氣品質、水位)，
+讓互動指令幾乎都能直接取得新鮮資料；每次更新的時間加上隨機抖動，
+並限制同時進行的更新數量，最近沒人查詢的資料集則略過不更新
+"""
+
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Set
+
+from utils.cache_manager import TTLCache
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+
+class PrefetchJob:
+    """一個已註冊的預取項目 (對應某個快取的某個鍵)
+
+    Args:
+        name: 項目名稱 (顯示於統計資料)
+        cache: 要保持新鮮的快取
+        key: 快取鍵
+        fetcher: 向上游取得資料的函式 (與 cache.get_or_fetch 使用的相同)
+        interval: 資料存入後多久重新取得，預設為快取 TTL 的 80%
+        jitter: 隨機抖動比例 (0.1 表示 ±10%)，避免所有項目同時更新
+        idle_after: 超過多少秒沒有人查詢就暫停預取；None 表示永遠保持新鮮
+    """
+
+    def __init__(self, name: str, cache: TTLCache, key: Hashable,
+                 fetcher: Callable[[], Awaitable[Any]],
+                 interval: Optional[float] = None,
+                 jitter: float = 0.1,
+                 idle_after: Optional[float] = 1800):
+        self.name = name
+        self.cache = cache
+        self.key = key
+        self.fetcher = fetcher
+        self.interval = interval if interval is not None else cache.ttl * 0.8
+        self.jitter = jitter
+        self.idle_after = idle_after
+        self.running = False
+        # 閒置或更新失敗後，至少等到此時間 (time.monotonic) 才再檢查
+        self.not_before = 0.0
+        self._factor = self._next_factor()
+        self._stats = {
+            'runs': 0,
+            'failures': 0,
+            'skipped_idle': 0,
+            'total_time': 0.0,
+            'last_time': 0.0,
+        }
+
+    def _next_factor(self) -> float:
+        return 1 + random.uniform(-self.jitter, self.jitter)
+
+    def due_at(self) -> float:
+        """下一次應更新的時間 (time.monotonic)，依快取項目的存入時間計算"""
+        entry = self.cache.get_entry(self.key)
+        if entry is None:
+            return 0.0
+        return entry.stored_at + self.interval * self._factor
+
+    def is_idle(self) -> bool:
+        """最近是否沒有人查詢這份資料"""
+        if self.idle_after is None:
+            return False
+        idle_for = self.cache.idle_for(self.key)
+        return idle_for is None or idle_for > self.idle_after
+
+    def skip_idle(self, now: float):
+        """記錄一次因閒置而略過的更新，並在一個週期後再檢查"""
+        self._stats['skipped_idle'] += 1
+        self.not_before = now + self.interval
+
+    def _record_failure(self):
+        # 失敗後等待一個週期再重試，避免上游故障時每次檢查都重新請求
+        self._stats['failures'] += 1
+        self.not_before = time.monotonic() + self.interval * self._factor
+
+    async def run(self):
+        """更新一次快取 (失敗時保留舊資料，由快取本身處理)"""
+        self.running = True
+        started = time.monotonic()
+        try:
+            value = await self.cache.refresh(self.key, self.fetcher)
+            if not value:
+                self._record_failure()
+                logger.warning(f"⚠️ 背景預取 {self.name} 失敗，保留原本的快取資料")
+        except Exception as e:
+            self._record_failure()
+            logger.error(f"背景預取 {self.name} 時發生錯誤: {str(e)}")
+        finally:
+            elapsed = time.monotonic() - started
+            self._stats['runs'] += 1
+            self._stats['total_time'] += elapsed
+            self._stats['last_time'] = elapsed
+            self._factor = self._next_factor()
+            self.running = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats['avg_time'] = stats['total_time'] / stats['runs'] if stats['runs'] else 0.0
+        stats['interval'] = self.interval
+        stats['idle'] = self.is_idle()
+        return stats
+
+
+class PrefetchScheduler:
+    """集中管理所有預取項目的排程器
+
+    Args:
+        max_concurrency: 同時進行的上游更新數量上限
+        tick: 沒有項目即將到期時，檢查排程的最長間隔 (秒)
+    """
+
+    def __init__(self, max_concurrency: int = 3, tick: float = 5.0):
+        self.max_concurrency = max_concurrency
+        self.tick = tick
+        self._jobs: Dict[str, PrefetchJob] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._task: Optional[asyncio.Task] = None
+        # 進行中的更新工作 (保留參照，關閉時一併取消並等待結束)
+        self._job_tasks: Set[asyncio.Future] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._closed = False
+
+    def register(self, name: str, cache: TTLCache, key: Hashable,
+                 fetcher: Callable[[], Awaitable[Any]], **kwargs) -> PrefetchJob:
+        """註冊 (或取代同名的) 預取項目，參數同 PrefetchJob"""
+        job = PrefetchJob(name, cache, key, fetcher, **kwargs)
+        self._jobs[name] = job
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    def unregister(self, name: str):
+        """移除預取項目 (例如 Cog 卸載時)"""
+        self._jobs.pop(name, None)
+
+    def start(self):
+        """啟動排程迴圈 (需在事件迴圈中呼叫，重複呼叫不會建立多個迴圈)"""
+        if self._closed or (self._task and not self._task.done()):
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._loop())
+        logger.info(f"✅ 背景預取排程已啟動 (同時更新上限: {self.max_concurrency})")
+
+    async def _loop(self):
+        try:
+            while not self._closed:
+                self._wakeup.clear()
+                now = time.monotonic()
+                next_due = now + self.tick
+                for job in list(self._jobs.values()):
+                    if job.running or job.not_before > now:
+                        continue
+                    due = job.due_at()
+                    if due > now:
+                        next_due = min(next_due, due)
+                        continue
+                    if job.is_idle():
+                        # 沒有人查詢的資料集不主動更新，等下一次查詢時再由快取取得
+                        job.skip_idle(now)
+                        continue
+                    job.running = True
+                    task = asyncio.ensure_future(self._run_limited(job))
+                    self._job_tasks.add(task)
+                    task.add_done_callback(self._job_tasks.discard)
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_due - time.monotonic(), 0.05))
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            pass
+
+    async def _run_limited(self, job: PrefetchJob):
+        async with self._semaphore:
+            await job.run()
+        self._wakeup.set()
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """取得各預取項目的更新次數、失敗次數與耗時"""
+        return {name: job.get_stats() for name, job in self._jobs.items()}
+
+    async def close(self):
+        """停止排程迴圈並取消進行中的更新 (等待它們結束後才回傳，之後才能關閉連線池與持久化快取)"""
+        self._closed = True
+        tasks = [task for task in (self._task, *self._job_tasks) if task and not task.done()]
+        for task in tasks:
+            task.cancel()
+        # 快取以 shield 保護共用的更新工作，需另外取消進行中的上游請求
+        for job in self._jobs.values():
+            if job.running:
+                refresh = job.cache.cancel_refresh(job.key)
+                if refresh is not None:
+                    tasks.append(refresh)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._job_tasks.clear()
+
+
+# 沒有機器人實例時 (例如獨立測試腳本) 使用的備用排程器
+_fallback_scheduler: Optional[PrefetchScheduler] = None
+
+
+def get_prefetch_scheduler(bot: Any = None) -> PrefetchScheduler:
+    """取得機器人共用的預取排程器，若機器人未提供則使用模組層級的備用排程器"""
+    global _fallback_scheduler
+    scheduler = getattr(bot, 'prefetch_scheduler', None) if bot is not None else None
+    if isinstance(scheduler, PrefetchScheduler):
+        return scheduler
+    if _fallback_scheduler is None:
+        _fallback_scheduler = PrefetchScheduler()
+    return _fallback_scheduler
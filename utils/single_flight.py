@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+相同上游請求合併 (single-flight)
+同一時間對同一個端點、同一組參數的請求只會真正送出一次，
+其餘呼叫者等待同一個進行中的結果
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 已建立的合併群組 (供管理指令查看統計)
+_groups: Dict[str, 'SingleFlight'] = {}
+
+
+def make_key(*args, **kwargs) -> Hashable:
+    """把呼叫參數轉成可雜湊的鍵 (dict/list 會轉成排序後的 tuple)"""
+    def freeze(value):
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+        if isinstance(value, (list, tuple, set)):
+            return tuple(freeze(v) for v in value)
+        try:
+            hash(value)
+            return value
+        except TypeError:
+            return repr(value)
+
+    return (freeze(args), freeze(kwargs))
+
+
+class SingleFlight:
+    """合併同一鍵的並行呼叫"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {
+            'calls': 0,
+            'executions': 0,
+            'coalesced': 0,
+        }
+        _groups[name] = self
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """執行 func；若相同的鍵已有進行中的呼叫，改為等待該呼叫的結果"""
+        self._stats['calls'] += 1
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self._stats['coalesced'] += 1
+            logger.debug(f"合併請求 {self.name}: {key}")
+        else:
+            self._stats['executions'] += 1
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._forget(k, t))
+        # 以 shield 保護共用的工作，單一呼叫者被取消時不影響其他等待者
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # 避免沒有人等待時出現「例外未被取得」的警告
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得呼叫/實際執行/合併次數"""
+        stats = dict(self._stats)
+        stats['inflight'] = len(self._inflight)
+        return stats
+
+
+def get_group(name: str) -> SingleFlight:
+    """取得 (或建立) 指定名稱的合併群組"""
+    group = _groups.get(name)
+    if group is None:
+        group = SingleFlight(name)
+    return group
+
+
+def coalesce(name: str, key: Optional[Callable[..., Hashable]] = None):
+    """非同步函式裝飾器：相同參數的並行呼叫只執行一次
+
+    Args:
+        name: 合併群組名稱 (通常為端點名稱)
+        key: 自訂鍵函式，接收與被裝飾函式相同的參數；預設使用全部參數
+    """
+    def decorator(func):
+        group = get_group(name)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if key:
+                call_key = key(*args, **kwargs)
+            else:
+                # 位置參數與關鍵字參數、省略的預設值都視為相同的呼叫
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                call_key = make_key(**bound.arguments)
+            return await group.do(call_key, lambda: func(*args, **kwargs))
+
+        return wrapper
+    return decorator
+
+
+def get_all_single_flight_stats() -> Dict[str, Dict[str, Any]]:
+    """取得所有合併群組的統計資料"""
+    return {name: group.get_stats() for name, group in _groups.items()}
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+車站名稱搜尋索引 (台鐵與捷運車站索引共用)
+資料載入後一次建立：名稱完全比對、前綴樹與字元 n-gram 子字串索引，
+查詢依「完全符合 > 前綴 > 子字串」排序，不需走訪全部車站；
+各索引只需提供車站物件、要索引的文字與同級時的排序方式
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Set, Tuple, TypeVar
+
+# 排名：完全符合 < 前綴符合 < 子字串符合
+RANK_EXACT = 0
+RANK_PREFIX = 1
+RANK_SUBSTRING = 2
+
+StationT = TypeVar('StationT')
+
+
+def normalize_station_name(text: str) -> str:
+    """統一站名寫法：台 → 臺、去除空白與結尾的「站」、英文轉小寫"""
+    text = ''.join(str(text).split()).replace('台', '臺').lower()
+    if len(text) > 1 and text.endswith('站'):
+        text = text[:-1]
+    return text
+
+
+class StationNameIndex(ABC, Generic[StationT]):
+    """車站名稱索引的共用實作 (抽象類別)
+
+    子類別以 _add() 加入車站，並實作 _texts() (子字串比對的文字)、
+    _sort_key() (同級結果的排序)，需要時再覆寫 _listing_key() (空白查詢時的排序)
+    """
+
+    def __init__(self):
+        self._by_key: Dict[str, StationT] = {}
+        self._exact: Dict[str, Set[str]] = {}
+        # 前綴樹：每個節點為 {字元: 子節點}，'' 鍵存放經過此節點的所有車站
+        self._trie: Dict[str, Any] = {'': set()}
+        self._ngrams: Dict[str, Set[str]] = {}
+
+    def _clear(self):
+        self._by_key.clear()
+        self._exact.clear()
+        self._trie = {'': set()}
+        self._ngrams.clear()
+
+    def _add(self, key: str, station: StationT, texts: Iterable[str]):
+        """加入車站；texts 為可搜尋的文字 (站名、英文站名、車站代碼等)"""
+        self._by_key[key] = station
+        for text in {normalize_station_name(text) for text in texts if text}:
+            if text:
+                self._add_key(text, key)
+
+    def _add_key(self, text: str, key: str):
+        self._exact.setdefault(text, set()).add(key)
+        node = self._trie
+        node[''].add(key)
+        for char in text:
+            node = node.setdefault(char, {'': set()})
+            node[''].add(key)
+        # 單字元與雙字元 n-gram (中文站名多為 2~4 字)
+        for size in (1, 2):
+            for i in range(len(text) - size + 1):
+                self._ngrams.setdefault(text[i:i + size], set()).add(key)
+
+    def __len__(self) -> int:
+        return len(self._by_key)
+
+    def _lookup(self, key: str) -> Optional[StationT]:
+        return self._by_key.get(str(key).strip())
+
+    # ---- 子類別實作 ----
+
+    @abstractmethod
+    def _texts(self, station: StationT) -> Tuple[str, ...]:
+        """車站可供子字串比對的文字 (站名、英文站名、車站代碼等)"""
+
+    @abstractmethod
+    def _sort_key(self, station: StationT) -> Tuple:
+        """同級搜尋結果的排序鍵"""
+
+    def _listing_key(self, station: StationT) -> Tuple:
+        return self._sort_key(station)
+
+    # ---- 查詢 ----
+
+    def _prefix(self, text: str) -> Set[str]:
+        node = self._trie
+        for char in text:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node['']
+
+    def _substring(self, text: str) -> Set[str]:
+        if len(text) == 1:
+            return self._ngrams.get(text, set())
+        # 所有雙字元片段都出現的車站才是候選，再逐一確認子字串
+        candidates: Optional[Set[str]] = None
+        for i in range(len(text) - 1):
+            keys = self._ngrams.get(text[i:i + 2])
+            if not keys:
+                return set()
+            candidates = set(keys) if candidates is None else candidates & keys
+        return {
+            key for key in candidates or ()
+            if any(text in normalize_station_name(value) for value in self._texts(self._by_key[key]))
+        }
+
+    def _search(self, query: str, accept: Optional[Callable[[StationT], bool]] = None,
+                limit: int = 25) -> List[StationT]:
+        """依相關程度排序的候選車站 (完全符合 > 前綴 > 子字串，同級時依 _sort_key)"""
+        text = normalize_station_name(query or '')
+        if not text:
+            stations: Iterable[StationT] = self._by_key.values()
+            if accept:
+                stations = [station for station in stations if accept(station)]
+            return sorted(stations, key=self._listing_key)[:limit]
+
+        ranks: Dict[str, int] = {}
+        if self._lookup(query) is not None:
+            ranks[str(query).strip()] = RANK_EXACT
+        for rank, keys in ((RANK_EXACT, self._exact.get(text, ())),
+                           (RANK_PREFIX, self._prefix(text)),
+                           (RANK_SUBSTRING, self._substring(text))):
+            for key in keys:
+                ranks.setdefault(key, rank)
+
+        results = [(rank, self._by_key[key]) for key, rank in ranks.items()]
+        if accept:
+            results = [(rank, station) for rank, station in results if accept(station)]
+        results.sort(key=lambda item: (item[0],) + tuple(self._sort_key(item[1])))
+        return [station for _, station in results[:limit]]
+
+    def _resolve(self, query: str, accept: Optional[Callable[[StationT], bool]] = None) -> Optional[StationT]:
+        """將使用者輸入解析為單一車站：車站鍵值、完全符合或唯一的前綴符合"""
+        station = self._lookup(query)
+        if station is not None:
+            return station
+        candidates = self._search(query, accept, limit=2)
+        if not candidates:
+            return None
+        text = normalize_station_name(query)
+        best = candidates[0]
+        if text in (normalize_station_name(value) for value in self._texts(best)):
+            return best
+        if len(candidates) == 1:
+            return best
+        return None
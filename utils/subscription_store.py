@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+通知訂閱儲存
+將各伺服器的地震通知頻道 (含地區/震度門檻) 與全域的「最後已通知報告編號」
+存放在 data/ 下的 SQLite 資料庫，啟動時一次載入記憶體並建立索引，
+重新啟動後不會遺失訂閱，也不會重複通知同一筆報告
+"""
+
+import os
+import sqlite3
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional, Set
+
+from utils.county_resolver import resolve_county
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'subscriptions.db'
+)
+
+
+class EarthquakeSubscription:
+    """單一伺服器的地震通知訂閱
+
+    Attributes:
+        guild_id: 伺服器 ID
+        channel_id: 通知頻道 ID
+        region: 只關注的縣市 (None 表示全臺)
+        min_intensity: 最低通知震度 (0 表示所有地震)
+    """
+
+    __slots__ = ('guild_id', 'channel_id', 'region', 'min_intensity')
+
+    def __init__(self, guild_id: int, channel_id: int, region: Optional[str] = None, min_intensity: int = 0):
+        self.guild_id = guild_id
+        self.channel_id = channel_id
+        self.region = region
+        self.min_intensity = min_intensity
+
+
+class SubscriptionStore:
+    """地震通知訂閱與通知水位 (所有磁碟存取都在背景執行緒進行)
+
+    記憶體中維護兩個索引：
+    - 伺服器 → 訂閱
+    - 地區 → 震度門檻 → 伺服器集合 (None 地區代表全臺)
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._by_guild: Dict[int, EarthquakeSubscription] = {}
+        self._by_region: Dict[Optional[str], Dict[int, Set[int]]] = {}
+        self._watermarks: Dict[str, str] = {}
+        self.loaded = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS earthquake_subscriptions (
+                       guild_id INTEGER PRIMARY KEY,
+                       channel_id INTEGER NOT NULL,
+                       region TEXT,
+                       min_intensity INTEGER NOT NULL DEFAULT 0
+                   )'''
+            )
+            self._conn.execute(
+                '''CREATE TABLE IF NOT EXISTS watermarks (
+                       name TEXT PRIMARY KEY,
+                       value TEXT NOT NULL
+                   )'''
+            )
+            self._conn.commit()
+        return self._conn
+
+    # ---- 同步實作 (在背景執行緒中執行) ----
+
+    def _load_sync(self):
+        with self._lock:
+            conn = self._connect()
+            subscriptions = conn.execute(
+                'SELECT guild_id, channel_id, region, min_intensity FROM earthquake_subscriptions'
+            ).fetchall()
+            watermarks = conn.execute('SELECT name, value FROM watermarks').fetchall()
+        return subscriptions, watermarks
+
+    def _execute_sync(self, sql: str, params: tuple):
+        with self._lock:
+            conn = self._connect()
+            conn.execute(sql, params)
+            conn.commit()
+
+    # ---- 索引維護 ----
+
+    def _index(self, subscription: EarthquakeSubscription):
+        self._by_guild[subscription.guild_id] = subscription
+        thresholds = self._by_region.setdefault(subscription.region, {})
+        thresholds.setdefault(subscription.min_intensity, set()).add(subscription.guild_id)
+
+    def _unindex(self, guild_id: int) -> Optional[EarthquakeSubscription]:
+        subscription = self._by_guild.pop(guild_id, None)
+        if subscription is None:
+            return None
+        thresholds = self._by_region.get(subscription.region, {})
+        guilds = thresholds.get(subscription.min_intensity)
+        if guilds is not None:
+            guilds.discard(guild_id)
+            if not guilds:
+                del thresholds[subscription.min_intensity]
+        if not thresholds:
+            self._by_region.pop(subscription.region, None)
+        return subscription
+
+    # ---- 非同步介面 ----
+
+    async def load(self):
+        """啟動時載入所有訂閱與水位 (只需呼叫一次)"""
+        try:
+            subscriptions, watermarks = await asyncio.to_thread(self._load_sync)
+        except Exception as e:
+            logger.error(f"載入通知訂閱時發生錯誤: {str(e)}")
+            return
+        self._by_guild.clear()
+        self._by_region.clear()
+        for guild_id, channel_id, region, min_intensity in subscriptions:
+            self._index(EarthquakeSubscription(guild_id, channel_id, region, min_intensity))
+        self._watermarks = dict(watermarks)
+        self.loaded = True
+        logger.info(f"✅ 已載入 {len(self._by_guild)} 個地震通知訂閱")
+
+    async def subscribe(self, guild_id: int, channel_id: int,
+                        region: Optional[str] = None, min_intensity: int = 0) -> EarthquakeSubscription:
+        """新增或更新伺服器的訂閱"""
+        region = (resolve_county(region) or region.strip()) if region else None
+        self._unindex(guild_id)
+        subscription = EarthquakeSubscription(guild_id, channel_id, region, min_intensity)
+        self._index(subscription)
+        try:
+            await asyncio.to_thread(
+                self._execute_sync,
+                'INSERT OR REPLACE INTO earthquake_subscriptions (guild_id, channel_id, region, min_intensity) '
+                'VALUES (?, ?, ?, ?)',
+                (guild_id, channel_id, region, min_intensity)
+            )
+        except Exception as e:
+            logger.error(f"儲存伺服器 {guild_id} 的地震通知訂閱時發生錯誤: {str(e)}")
+        return subscription
+
+    async def unsubscribe(self, guild_id: int) -> bool:
+        """移除伺服器的訂閱，回傳原本是否有訂閱"""
+        if self._unindex(guild_id) is None:
+            return False
+        try:
+            await asyncio.to_thread(
+                self._execute_sync, 'DELETE FROM earthquake_subscriptions WHERE guild_id = ?', (guild_id,)
+            )
+        except Exception as e:
+            logger.error(f"刪除伺服器 {guild_id} 的地震通知訂閱時發生錯誤: {str(e)}")
+        return True
+
+    def get(self, guild_id: int) -> Optional[EarthquakeSubscription]:
+        """取得伺服器的訂閱"""
+        return self._by_guild.get(guild_id)
+
+    def all(self) -> List[EarthquakeSubscription]:
+        """所有訂閱"""
+        return list(self._by_guild.values())
+
+    def match(self, county_intensity: Dict[str, int]) -> Set[int]:
+        """找出這次地震需要通知的伺服器
+
+        Args:
+            county_intensity: 縣市 → 最大震度等級 (見 utils.earthquake_intensity.county_max_intensity)
+
+        每個縣市只需查一次反向索引，再走訪該縣市的門檻桶 (最多 10 個震度等級)，
+        與訂閱數量無關；未指定地區的訂閱以全臺最大震度比較
+        """
+        guilds: Set[int] = set()
+        overall = max(county_intensity.values(), default=0)
+        for region, level in [(None, overall)] + list(county_intensity.items()):
+            for threshold, bucket in self._by_region.get(region, {}).items():
+                if threshold <= level:
+                    guilds |= bucket
+        return guilds
+
+    def __len__(self) -> int:
+        return len(self._by_guild)
+
+    def get_watermark(self, name: str) -> Optional[str]:
+        """取得全域水位 (例如最後已通知的地震編號)，從未記錄時回傳 None"""
+        return self._watermarks.get(name)
+
+    async def set_watermark(self, name: str, value: str):
+        """更新全域水位並寫入磁碟"""
+        if self._watermarks.get(name) == value:
+            return
+        self._watermarks[name] = value
+        try:
+            await asyncio.to_thread(
+                self._execute_sync, 'INSERT OR REPLACE INTO watermarks (name, value) VALUES (?, ?)', (name, value)
+            )
+        except Exception as e:
+            logger.error(f"儲存通知水位 {name} 時發生錯誤: {str(e)}")
+
+    def close(self):
+        """關閉資料庫連線"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+TDX 運輸資料平臺存取權杖管理
+全機器人共用一個權杖，同一時間只允許一個更新請求，
+並在到期前於背景自動續期；API 回應 401 時會作廢權杖並重試一次
+"""
+
+import os
+import time
+import base64
+import asyncio
+import logging
+import contextlib
+from typing import Any, Dict, Optional
+
+from utils.http_pool import HttpClientPool, get_http_pool
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+TDX_AUTH_URL = "https://tdx.transportdata.tw/auth/realms/TDXConnect/protocol/openid-connect/token"
+
+
+class TDXTokenManager:
+    """TDX 存取權杖管理器
+
+    Args:
+        client_id / client_secret: TDX 憑證，未提供時讀取 TDX_CLIENT_ID / TDX_CLIENT_SECRET
+        http_pool: 共用連線池，未提供時使用模組層級的備用連線池
+        refresh_margin: 在到期前多少秒進行背景續期
+    """
+
+    def __init__(self,
+                 client_id: Optional[str] = None,
+                 client_secret: Optional[str] = None,
+                 http_pool: Optional[HttpClientPool] = None,
+                 refresh_margin: float = 300):
+        self.client_id = client_id or os.getenv('TDX_CLIENT_ID')
+        self.client_secret = client_secret or os.getenv('TDX_CLIENT_SECRET')
+        self._http_pool = http_pool
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+        self._renew_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._stats = {
+            'refreshes': 0,
+            'refresh_errors': 0,
+            'background_renewals': 0,
+            'unauthorized_retries': 0,
+        }
+
+    @property
+    def http(self) -> HttpClientPool:
+        if self._http_pool is not None and not self._http_pool.closed:
+            return self._http_pool
+        return get_http_pool()
+
+    @property
+    def expires_at(self) -> float:
+        """權杖到期時間 (epoch 秒)"""
+        return self._expires_at
+
+    def _is_valid(self) -> bool:
+        # 保留 60 秒緩衝，避免權杖在請求途中過期
+        return bool(self._token) and time.time() < self._expires_at - 60
+
+    async def get_token(self) -> Optional[str]:
+        """取得有效的存取權杖，必要時 (僅一個協程) 向 TDX 重新申請"""
+        if self._is_valid():
+            return self._token
+
+        async with self._lock:
+            # 等待鎖的期間可能已被其他協程更新
+            if self._is_valid():
+                return self._token
+            return await self._refresh()
+
+    def invalidate(self, token: Optional[str] = None):
+        """作廢目前的權杖 (若指定 token，僅在仍是同一個權杖時作廢)"""
+        if token is None or token == self._token:
+            self._token = None
+            self._expires_at = 0.0
+
+    async def _refresh(self) -> Optional[str]:
+        """向 TDX 申請新的存取權杖 (呼叫端須持有鎖)"""
+        if not self.client_id or not self.client_secret:
+            logger.error("❌ 錯誤: 找不到 TDX API 憑證")
+            return None
+
+        self._stats['refreshes'] += 1
+        try:
+            credentials = f"{self.client_id}:{self.client_secret}"
+            encoded_credentials = base64.b64encode(credentials.encode()).decode()
+
+            headers = {
+                'Content-Type': 'application/x-www-form-urlencoded',
+                'Authorization': f'Basic {encoded_credentials}'
+            }
+
+            logger.info("正在取得 TDX 存取權杖...")
+
+            async with self.http.post(TDX_AUTH_URL, headers=headers, data='grant_type=client_credentials') as response:
+                if response.status == 200:
+                    token_data = await response.json()
+
+                    self._token = token_data.get('access_token')
+                    expires_in = token_data.get('expires_in', 3600)  # 預設1小時
+                    self._expires_at = time.time() + expires_in
+
+                    logger.info("✅ 成功取得 TDX 存取權杖")
+                    self._schedule_renewal(max(expires_in - self.refresh_margin, 30))
+                    return self._token
+                else:
+                    error_text = await response.text()
+                    logger.error(f"❌ 取得 TDX 存取權杖失敗: {response.status} - {error_text}")
+                    self._stats['refresh_errors'] += 1
+                    return None
+
+        except Exception as e:
+            logger.error(f"取得 TDX 存取權杖時發生錯誤: {str(e)}")
+            self._stats['refresh_errors'] += 1
+            return None
+
+    def _schedule_renewal(self, delay: float):
+        """安排背景續期工作"""
+        if self._closed:
+            return
+        if self._renew_task and not self._renew_task.done():
+            if self._renew_task is asyncio.current_task():
+                # 由續期工作本身觸發的更新，排程交由續期迴圈處理
+                return
+            self._renew_task.cancel()
+        self._renew_task = asyncio.ensure_future(self._renew_loop(delay))
+
+    async def _renew_loop(self, delay: float):
+        """在權杖到期前續期；失敗時每 30 秒重試，直到成功或權杖完全過期"""
+        try:
+            while not self._closed:
+                await asyncio.sleep(delay)
+                async with self._lock:
+                    self._stats['background_renewals'] += 1
+                    token = await self._refresh()
+                if token:
+                    delay = max(self._expires_at - time.time() - self.refresh_margin, 30)
+                else:
+                    logger.warning("⚠️ TDX 權杖背景續期失敗，30 秒後重試")
+                    delay = 30
+        except asyncio.CancelledError:
+            pass
+
+    async def start(self):
+        """預先取得權杖 (例如 Cog 載入時)，讓第一個指令不必等待認證"""
+        await self.get_token()
+
+    @contextlib.asynccontextmanager
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """帶入最新權杖發送 GET 請求；若回應 401 則作廢權杖並重試一次
+
+        用法與 ``async with pool.get(...) as response`` 相同
+        """
+        for attempt in range(2):
+            token = await self.get_token()
+            request_headers = dict(headers or {})
+            if token:
+                request_headers['Authorization'] = f'Bearer {token}'
+
+            response = await self.http.get(url, headers=request_headers, **kwargs)
+            if response.status == 401 and attempt == 0:
+                response.release()
+                logger.warning("⚠️ TDX 回應 401，作廢存取權杖後重試")
+                self._stats['unauthorized_retries'] += 1
+                self.invalidate(token)
+                continue
+
+            try:
+                yield response
+            finally:
+                response.release()
+            return
+
+    def get_stats(self) -> Dict[str, Any]:
+        """取得權杖狀態與更新統計"""
+        stats = dict(self._stats)
+        stats['valid'] = self._is_valid()
+        stats['expires_in'] = max(self._expires_at - time.time(), 0) if self._token else 0
+        return stats
+
+    async def close(self):
+        """停止背景續期"""
+        self._closed = True
+        if self._renew_task and not self._renew_task.done():
+            self._renew_task.cancel()
+
+
+# 沒有機器人實例時 (例如獨立測試腳本) 使用的備用管理器
+_fallback_manager: Optional[TDXTokenManager] = None
+
+
+def get_tdx_token_manager(bot: Any = None) -> TDXTokenManager:
+    """取得機器人共用的 TDX 權杖管理器，若機器人未提供則使用模組層級的備用管理器"""
+    global _fallback_manager
+    manager = getattr(bot, 'tdx_token_manager', None) if bot is not None else None
+    if isinstance(manager, TDXTokenManager):
+        return manager
+    if _fallback_manager is None:
+        _fallback_manager = TDXTokenManager(http_pool=getattr(bot, 'http_pool', None))
+    return _fallback_manager
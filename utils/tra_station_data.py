@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台鐵車站資料檔 (預先編譯)
+將台鐵官方的車站基本資料集編譯成單一、精簡、具版本的二進位檔 (data/tra_stations.bin)，
+以欄位陣列 (車站代碼、站名、英文站名、縣市、座標) 儲存。機器人第一次需要時才以 mmap 載入，
+作為台鐵 API 無法使用時的離線備援
+
+重新編譯 (車站基本資料集更新後執行):
+    python -m utils.tra_station_data
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+import zlib
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from utils.county_resolver import COUNTIES, resolve_county
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_PATH = os.path.join(_ROOT, '車站基本資料集.json')
+DEFAULT_DATA_PATH = os.path.join(_ROOT, 'data', 'tra_stations.bin')
+
+MAGIC = b'TRAS'
+FORMAT_VERSION = 1
+# 檔頭：魔術字、格式版本、縣市數、車站數、資料版本 (內容的 CRC32)
+_HEADER = struct.Struct('<4sHHII')
+# 車站代碼固定為 4 個 ASCII 字元
+_ID_WIDTH = 4
+
+
+
+class StationRecord:
+    """編譯前的單一車站"""
+
+    __slots__ = ('id', 'name', 'ename', 'county', 'lat', 'lon')
+
+    def __init__(self, station_id: str, name: str, ename: str, county: str, lat: float, lon: float):
+        self.id = station_id
+        self.name = name
+        self.ename = ename
+        self.county = county
+        self.lat = lat
+        self.lon = lon
+
+
+def read_source(path: str = SOURCE_PATH) -> List[StationRecord]:
+    """讀取台鐵車站基本資料集 (依縣市、車站代碼排序)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    records = []
+    for item in raw:
+        station_id = str(item.get('stationCode', '')).strip()
+        name = str(item.get('stationName', '')).strip()
+        county = resolve_county(item.get('stationAddrTw', ''))
+        if not station_id or not name or not county:
+            logger.warning(f"⚠️ 略過無法判斷縣市的車站: {name} ({station_id})")
+            continue
+        try:
+            lat, lon = (float(value) for value in str(item.get('gps', '')).split())
+        except ValueError:
+            lat, lon = 0.0, 0.0
+        ename = str(item.get('stationEName') or item.get('ename') or '').strip()
+        records.append(StationRecord(station_id, name, ename, county, lat, lon))
+    records.sort(key=lambda record: (COUNTIES.index(record.county), record.id))
+    return records
+
+
+def _string_column(values: List[str]) -> Tuple[array, bytes]:
+    offsets = array('I', [0])
+    blob = bytearray()
+    for value in values:
+        blob += value.encode('utf-8')
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def compile_dataset(records: List[StationRecord]) -> bytes:
+    """將車站編譯為二進位檔內容
+
+    版面 (檔頭為小端序，欄位陣列為原生位元組順序；數值欄位皆對齊 4 bytes)：檔頭 → 車站代碼 (4 bytes × N) → 緯度、經度 (float32 × N)
+    → 站名、英文站名、縣市名稱的位移陣列 (uint32 × (N+1)) → 縣市索引 (uint8 × N) → UTF-8 字串區
+    """
+    counties = [county for county in COUNTIES if any(record.county == county for record in records)]
+    county_index = {county: i for i, county in enumerate(counties)}
+
+    ids = b''.join(record.id.encode('ascii').ljust(_ID_WIDTH)[:_ID_WIDTH] for record in records)
+    county_column = array('B', (county_index[record.county] for record in records))
+    lat_column = array('f', (record.lat for record in records))
+    lon_column = array('f', (record.lon for record in records))
+
+    blobs = bytearray()
+    offset_columns = []
+    for values in ([r.name for r in records], [r.ename for r in records], counties):
+        offsets, blob = _string_column(values)
+        # 位移以整個字串區為基準
+        offset_columns.append(array('I', (offset + len(blobs) for offset in offsets)))
+        blobs += blob
+
+    body = b''.join([
+        ids,
+        lat_column.tobytes(),
+        lon_column.tobytes(),
+        *(column.tobytes() for column in offset_columns),
+        county_column.tobytes(),
+        bytes(blobs),
+    ])
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(counties), len(records), zlib.crc32(body))
+    return header + body
+
+
+def build(source_path: str = SOURCE_PATH, output_path: str = DEFAULT_DATA_PATH) -> int:
+    """從車站基本資料集編譯資料檔，回傳車站數量"""
+    records = read_source(source_path)
+    content = compile_dataset(records)
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(content)
+    os.replace(temp_path, output_path)
+    logger.info(f"✅ 已編譯 {len(records)} 個台鐵車站至 {output_path} ({len(content)} bytes)")
+    return len(records)
+
+
+class TRAStationDataset:
+    """以 mmap 讀取的車站資料檔 (唯讀，欄位在第一次存取時才解碼)"""
+
+    def __init__(self, path: str = DEFAULT_DATA_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (ValueError, OSError):
+                # 無法 mmap 的環境 (例如空檔案或特殊檔案系統) 改為一次讀入
+                self._buffer = f.read()
+        view = memoryview(self._buffer)
+
+        magic, format_version, county_count, station_count, self.version = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"不支援的台鐵車站資料檔: {path}")
+        if zlib.crc32(view[_HEADER.size:]) != self.version:
+            raise ValueError(f"台鐵車站資料檔已損毀: {path}")
+        self.station_count = station_count
+
+        position = _HEADER.size
+        self._ids = view[position:position + station_count * _ID_WIDTH]
+        position += station_count * _ID_WIDTH
+        self._lat = view[position:position + station_count * 4].cast('f')
+        position += station_count * 4
+        self._lon = view[position:position + station_count * 4].cast('f')
+        position += station_count * 4
+        offsets = []
+        for count in (station_count, station_count, county_count):
+            offsets.append(view[position:position + (count + 1) * 4].cast('I'))
+            position += (count + 1) * 4
+        self._name_offsets, self._ename_offsets, self._county_offsets = offsets
+        self._county_index = view[position:position + station_count]
+        position += station_count
+        self._strings = view[position:]
+
+        self._stations_by_county: Optional[Dict[str, List[Dict[str, str]]]] = None
+
+    def __len__(self) -> int:
+        return self.station_count
+
+    def _string(self, offsets, i: int) -> str:
+        return bytes(self._strings[offsets[i]:offsets[i + 1]]).decode('utf-8')
+
+    def station_id(self, i: int) -> str:
+        return bytes(self._ids[i * _ID_WIDTH:(i + 1) * _ID_WIDTH]).decode('ascii').strip()
+
+    def name(self, i: int) -> str:
+        return self._string(self._name_offsets, i)
+
+    def english_name(self, i: int) -> str:
+        return self._string(self._ename_offsets, i)
+
+    def county(self, i: int) -> str:
+        return self._string(self._county_offsets, self._county_index[i])
+
+    def coordinates(self, i: int) -> Tuple[float, float]:
+        return self._lat[i], self._lon[i]
+
+    def stations_by_county(self) -> Dict[str, List[Dict[str, str]]]:
+        """縣市 → [{'name': 站名, 'id': 車站代碼}] (與台鐵 API 處理後的格式相同)"""
+        if self._stations_by_county is None:
+            result: Dict[str, List[Dict[str, str]]] = {}
+            for i in range(self.station_count):
+                result.setdefault(self.county(i), []).append({'name': self.name(i), 'id': self.station_id(i)})
+            self._stations_by_county = result
+        return self._stations_by_county
+
+    def english_names(self) -> Dict[str, str]:
+        """車站代碼 → 英文站名"""
+        return {self.station_id(i): self.english_name(i) for i in range(self.station_count) if self.english_name(i)}
+
+
+_dataset: Optional[TRAStationDataset] = None
+
+
+def get_tra_station_dataset(path: str = DEFAULT_DATA_PATH) -> Optional[TRAStationDataset]:
+    """取得內建的車站資料檔 (第一次呼叫時載入)，檔案不存在或損毀時回傳 None"""
+    global _dataset
+    if _dataset is None or _dataset.path != path:
+        try:
+            _dataset = TRAStationDataset(path)
+            logger.info(f"✅ 已載入內建台鐵車站資料 ({len(_dataset)} 站，版本 {_dataset.version:08x})")
+        except FileNotFoundError:
+            logger.error(f"❌ 找不到台鐵車站資料檔: {path} (請執行 python -m utils.tra_station_data)")
+            return None
+        except Exception as e:
+            logger.error(f"載入台鐵車站資料檔時發生錯誤: {str(e)}")
+            return None
+    return _dataset
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    count = build()
+    print(f"✅ 已編譯 {count} 個台鐵車站")
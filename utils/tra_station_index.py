@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+台鐵車站索引
+車站資料載入後一次建立名稱索引 (utils.station_search) 與英文站名，
+供指令自動完成與跨縣市的車站代碼查詢使用 (查詢不需走訪全部車站)
+"""
+
+import os
+import json
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from utils.station_search import StationNameIndex
+
+# 設定日誌
+logger = logging.getLogger(__name__)
+
+# 台鐵車站基本資料 (含英文站名)
+STATION_INFO_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '車站基本資料集.json'
+)
+
+
+def load_english_names(path: str = STATION_INFO_PATH) -> Dict[str, str]:
+    """讀取車站基本資料集的英文站名 (車站代碼 → 英文名稱)，檔案不存在時回傳空字典"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return {
+            str(item.get('stationCode', '')).strip(): (item.get('stationEName') or item.get('ename') or '').strip()
+            for item in data if item.get('stationCode')
+        }
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.error(f"讀取車站英文名稱時發生錯誤: {str(e)}")
+        return {}
+
+
+class TRAStation:
+    """索引中的單一車站"""
+
+    __slots__ = ('id', 'name', 'county', 'ename')
+
+    def __init__(self, station_id: str, name: str, county: str, ename: str = ''):
+        self.id = station_id
+        self.name = name
+        self.county = county
+        self.ename = ename
+
+    def label(self) -> str:
+        """自動完成選項顯示的文字"""
+        label = f"{self.name} ({self.ename})" if self.ename else self.name
+        return f"{label} - {self.county}"
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'name': self.name, 'id': self.id, 'county': self.county, 'ename': self.ename}
+
+
+class TRAStationIndex(StationNameIndex[TRAStation]):
+    """台鐵車站的記憶體索引
+
+    Args:
+        stations_by_county: 縣市 → [{'name': 站名, 'id': 車站代碼}] (與 TRA_STATIONS 相同格式)
+        english_names: 車站代碼 → 英文站名
+    """
+
+    def __init__(self, stations_by_county: Optional[Dict[str, List[Dict[str, str]]]] = None,
+                 english_names: Optional[Dict[str, str]] = None):
+        super().__init__()
+        if stations_by_county:
+            self.build(stations_by_county, english_names or {})
+
+    def build(self, stations_by_county: Dict[str, List[Dict[str, str]]], english_names: Dict[str, str]):
+        """重新建立所有索引"""
+        self._clear()
+        for county, stations in stations_by_county.items():
+            for item in stations:
+                station_id = str(item.get('id', '')).strip()
+                name = str(item.get('name', '')).strip()
+                if not station_id or not name:
+                    continue
+                station = TRAStation(station_id, name, county, english_names.get(station_id, ''))
+                self._add(station_id, station, self._texts(station))
+        logger.info(f"✅ 台鐵車站索引建立完成，共 {len(self)} 站")
+
+    def _texts(self, station: TRAStation) -> Tuple[str, str]:
+        return station.name, station.ename
+
+    def _sort_key(self, station: TRAStation) -> Tuple[int, str]:
+        # 同級時短站名優先
+        return len(station.name), station.id
+
+    def _listing_key(self, station: TRAStation) -> Tuple[str]:
+        return (station.id,)
+
+    def get(self, station_id: str) -> Optional[TRAStation]:
+        """以車站代碼查詢 (不限縣市)"""
+        return self._lookup(station_id)
+
+    def search(self, query: str, county: Optional[str] = None, limit: int = 25) -> List[TRAStation]:
+        """依相關程度排序的候選車站 (完全符合 > 前綴 > 子字串，同級時短站名優先)
+
+        Args:
+            query: 站名、英文站名、部分站名或車站代碼
+            county: 只列出此縣市的車站 (None 表示全部)
+            limit: 最多回傳筆數
+        """
+        return self._search(query, (lambda station: station.county == county) if county else None, limit)
+
+    def resolve(self, query: str, county: Optional[str] = None) -> Optional[TRAStation]:
+        """將使用者輸入解析為單一車站：車站代碼、完全符合或唯一的前綴符合"""
+        return self._resolve(query, (lambda station: station.county == county) if county else None)